@@ -230,64 +230,30 @@ FETCH FIRST 25 ROWS ONLY;
 -- Report 9: Patient Risk Assessment
 -- Purpose: Identify high-risk patients based on various factors
 -- Usage: Interactive report with alerts
+-- Reads the precomputed patient_risk_profile (see v_patient_risk_factors for
+-- the scoring); the top-N comes straight off idx_patient_risk_score.
 
 SELECT 
     p.patient_id,
     pkg_patient_mgmt.get_full_name(p.first_name, p.last_name) as patient_name,
-    pkg_patient_mgmt.get_patient_age(p.patient_id) as age,
+    r.age,
     p.phone,
     p.email,
     -- Risk factors
-    CASE WHEN pkg_patient_mgmt.get_patient_age(p.patient_id) >= 65 THEN 1 ELSE 0 END as elderly_risk,
-    CASE WHEN p.medical_conditions IS NOT NULL AND LENGTH(p.medical_conditions) > 0 THEN 1 ELSE 0 END as chronic_conditions,
-    CASE WHEN p.allergies IS NOT NULL AND LENGTH(p.allergies) > 0 THEN 1 ELSE 0 END as has_allergies,
-    active_meds.medication_count,
-    recent_visits.visit_count as recent_visits,
-    missed_appts.missed_count as missed_appointments,
-    -- Calculate risk score
-    (CASE WHEN pkg_patient_mgmt.get_patient_age(p.patient_id) >= 65 THEN 2 ELSE 0 END +
-     CASE WHEN p.medical_conditions IS NOT NULL AND LENGTH(p.medical_conditions) > 0 THEN 2 ELSE 0 END +
-     CASE WHEN p.allergies IS NOT NULL AND LENGTH(p.allergies) > 0 THEN 1 ELSE 0 END +
-     CASE WHEN NVL(active_meds.medication_count, 0) >= 5 THEN 2 ELSE 0 END +
-     CASE WHEN NVL(recent_visits.visit_count, 0) >= 5 THEN 1 ELSE 0 END +
-     CASE WHEN NVL(missed_appts.missed_count, 0) >= 2 THEN 2 ELSE 0 END) as risk_score,
+    r.elderly_risk,
+    r.chronic_conditions,
+    r.has_allergies,
+    r.medication_count,
+    r.recent_visits,
+    r.missed_appointments,
+    r.risk_score,
     -- Last visit
-    last_visit.last_visit_date,
-    next_appt.next_appointment_date
-FROM patients p
-LEFT JOIN (
-    SELECT patient_id, COUNT(*) as medication_count
-    FROM prescriptions
-    WHERE is_active = 'Y'
-    GROUP BY patient_id
-) active_meds ON p.patient_id = active_meds.patient_id
-LEFT JOIN (
-    SELECT patient_id, COUNT(*) as visit_count
-    FROM medical_records
-    WHERE visit_date >= SYSDATE - 90  -- Last 90 days
-    GROUP BY patient_id
-) recent_visits ON p.patient_id = recent_visits.patient_id
-LEFT JOIN (
-    SELECT patient_id, COUNT(*) as missed_count
-    FROM appointments
-    WHERE status = 'No Show'
-      AND appointment_date >= SYSDATE - 365  -- Last year
-    GROUP BY patient_id
-) missed_appts ON p.patient_id = missed_appts.patient_id
-LEFT JOIN (
-    SELECT patient_id, MAX(visit_date) as last_visit_date
-    FROM medical_records
-    GROUP BY patient_id
-) last_visit ON p.patient_id = last_visit.patient_id
-LEFT JOIN (
-    SELECT patient_id, MIN(appointment_date) as next_appointment_date
-    FROM appointments
-    WHERE appointment_date >= TRUNC(SYSDATE)
-      AND status IN ('Scheduled', 'Confirmed')
-    GROUP BY patient_id
-) next_appt ON p.patient_id = next_appt.patient_id
-WHERE p.is_active = 'Y'
-ORDER BY risk_score DESC, patient_name;
+    r.last_visit_date,
+    r.next_appointment_date
+FROM patient_risk_profile r
+JOIN patients p ON p.patient_id = r.patient_id
+ORDER BY r.risk_score DESC, r.patient_id
+FETCH FIRST 100 ROWS ONLY;
 
 -- Report 10: Financial Summary (if billing data available)
 -- Purpose: Basic financial metrics
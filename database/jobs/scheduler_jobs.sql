@@ -0,0 +1,203 @@
+-- Healthcare System Scheduler Jobs
+-- Background refresh of precomputed reporting tables, audit maintenance, reminders
+-- and notification outbox cleanup
+--
+-- Each job is dropped and recreated so the script can be re-run safely.
+
+SET SERVEROUTPUT ON
+
+-- Dashboard statistics (v_dashboard_stats)
+BEGIN
+    FOR rec IN (SELECT job_name FROM user_scheduler_jobs WHERE job_name = 'JOB_REFRESH_DASHBOARD_STATS') LOOP
+        DBMS_SCHEDULER.DROP_JOB(job_name => rec.job_name, force => TRUE);
+    END LOOP;
+
+    DBMS_SCHEDULER.CREATE_JOB(
+        job_name => 'JOB_REFRESH_DASHBOARD_STATS',
+        job_type => 'PLSQL_BLOCK',
+        job_action => 'BEGIN pkg_reporting_mgmt.refresh_dashboard_stats; END;',
+        start_date => SYSTIMESTAMP,
+        repeat_interval => 'FREQ=MINUTELY; INTERVAL=5',
+        enabled => TRUE,
+        comments => 'Refreshes dashboard_daily_stats for the current week and month'
+    );
+
+    -- Populate now rather than waiting for the first run
+    pkg_reporting_mgmt.refresh_dashboard_stats;
+
+    DBMS_OUTPUT.PUT_LINE('Scheduled JOB_REFRESH_DASHBOARD_STATS');
+END;
+/
+
+-- Trial dashboard metrics (v_trial_dashboard)
+BEGIN
+    FOR rec IN (SELECT job_name FROM user_scheduler_jobs WHERE job_name = 'JOB_REFRESH_TRIAL_METRICS') LOOP
+        DBMS_SCHEDULER.DROP_JOB(job_name => rec.job_name, force => TRUE);
+    END LOOP;
+
+    DBMS_SCHEDULER.CREATE_JOB(
+        job_name => 'JOB_REFRESH_TRIAL_METRICS',
+        job_type => 'PLSQL_BLOCK',
+        job_action => 'BEGIN pkg_clinical_trials_mgmt.refresh_trial_metrics; END;',
+        start_date => SYSTIMESTAMP,
+        repeat_interval => 'FREQ=MINUTELY; INTERVAL=5',
+        enabled => TRUE,
+        comments => 'Refreshes trial_dashboard_metrics for all trials'
+    );
+
+    pkg_clinical_trials_mgmt.refresh_trial_metrics;
+
+    DBMS_OUTPUT.PUT_LINE('Scheduled JOB_REFRESH_TRIAL_METRICS');
+END;
+/
+
+-- Provider schedule occupancy (v_provider_schedule). trg_appointments_occupancy
+-- keeps it current; the nightly run drops past days and corrects any drift.
+BEGIN
+    FOR rec IN (SELECT job_name FROM user_scheduler_jobs WHERE job_name = 'JOB_REFRESH_PROVIDER_OCCUPANCY') LOOP
+        DBMS_SCHEDULER.DROP_JOB(job_name => rec.job_name, force => TRUE);
+    END LOOP;
+
+    DBMS_SCHEDULER.CREATE_JOB(
+        job_name => 'JOB_REFRESH_PROVIDER_OCCUPANCY',
+        job_type => 'PLSQL_BLOCK',
+        job_action => 'BEGIN pkg_reporting_mgmt.refresh_provider_occupancy; END;',
+        start_date => SYSTIMESTAMP,
+        repeat_interval => 'FREQ=DAILY; BYHOUR=0; BYMINUTE=5',
+        enabled => TRUE,
+        comments => 'Recomputes provider_day_occupancy for the schedule window and drops past days'
+    );
+
+    -- Populate now rather than waiting for the first run
+    pkg_reporting_mgmt.refresh_provider_occupancy;
+
+    DBMS_OUTPUT.PUT_LINE('Scheduled JOB_REFRESH_PROVIDER_OCCUPANCY');
+END;
+/
+
+-- Patient risk profiles (APEX Report 9). JOB_DRAIN_RISK_QUEUE applies the
+-- changes queued by the triggers; the nightly rebuild moves age and the
+-- 90-day/one-year windows to the new day.
+BEGIN
+    FOR rec IN (SELECT job_name FROM user_scheduler_jobs WHERE job_name = 'JOB_REBUILD_RISK_PROFILES') LOOP
+        DBMS_SCHEDULER.DROP_JOB(job_name => rec.job_name, force => TRUE);
+    END LOOP;
+
+    DBMS_SCHEDULER.CREATE_JOB(
+        job_name => 'JOB_REBUILD_RISK_PROFILES',
+        job_type => 'PLSQL_BLOCK',
+        job_action => 'BEGIN pkg_patient_mgmt.rebuild_risk_profiles; END;',
+        start_date => SYSTIMESTAMP,
+        repeat_interval => 'FREQ=DAILY; BYHOUR=0; BYMINUTE=15',
+        enabled => TRUE,
+        comments => 'Recomputes patient_risk_profile for the new day'
+    );
+
+    -- Populate now rather than waiting for the first run
+    pkg_patient_mgmt.rebuild_risk_profiles;
+
+    DBMS_OUTPUT.PUT_LINE('Scheduled JOB_REBUILD_RISK_PROFILES');
+END;
+/
+
+-- Patient risk queue drainer (a no-op when the queue is empty)
+BEGIN
+    FOR rec IN (SELECT job_name FROM user_scheduler_jobs WHERE job_name = 'JOB_DRAIN_RISK_QUEUE') LOOP
+        DBMS_SCHEDULER.DROP_JOB(job_name => rec.job_name, force => TRUE);
+    END LOOP;
+
+    DBMS_SCHEDULER.CREATE_JOB(
+        job_name => 'JOB_DRAIN_RISK_QUEUE',
+        job_type => 'PLSQL_BLOCK',
+        job_action => 'DECLARE l_changed NUMBER; BEGIN l_changed := pkg_patient_mgmt.drain_risk_queue; END;',
+        start_date => SYSTIMESTAMP,
+        repeat_interval => 'FREQ=SECONDLY; INTERVAL=15',
+        enabled => TRUE,
+        comments => 'Recalculates the risk profiles of patients queued in patient_risk_queue'
+    );
+
+    DBMS_OUTPUT.PUT_LINE('Scheduled JOB_DRAIN_RISK_QUEUE');
+END;
+/
+
+-- Patient audit retention (drops monthly patient_audit partitions)
+BEGIN
+    FOR rec IN (SELECT job_name FROM user_scheduler_jobs WHERE job_name = 'JOB_PURGE_PATIENT_AUDIT') LOOP
+        DBMS_SCHEDULER.DROP_JOB(job_name => rec.job_name, force => TRUE);
+    END LOOP;
+
+    DBMS_SCHEDULER.CREATE_JOB(
+        job_name => 'JOB_PURGE_PATIENT_AUDIT',
+        job_type => 'PLSQL_BLOCK',
+        job_action => 'BEGIN pkg_patient_mgmt.purge_patient_audit; END;',
+        start_date => SYSTIMESTAMP,
+        repeat_interval => 'FREQ=MONTHLY; BYMONTHDAY=1; BYHOUR=2; BYMINUTE=0',
+        enabled => TRUE,
+        comments => 'Drops patient_audit partitions older than pkg_patient_mgmt.c_audit_retention_months'
+    );
+
+    DBMS_OUTPUT.PUT_LINE('Scheduled JOB_PURGE_PATIENT_AUDIT');
+END;
+/
+
+-- Audit capture queue drainer (QUEUED mode of pkg_audit_mgmt; a no-op when the queue is empty)
+BEGIN
+    FOR rec IN (SELECT job_name FROM user_scheduler_jobs WHERE job_name = 'JOB_DRAIN_AUDIT_QUEUE') LOOP
+        DBMS_SCHEDULER.DROP_JOB(job_name => rec.job_name, force => TRUE);
+    END LOOP;
+
+    DBMS_SCHEDULER.CREATE_JOB(
+        job_name => 'JOB_DRAIN_AUDIT_QUEUE',
+        job_type => 'PLSQL_BLOCK',
+        job_action => 'DECLARE l_moved NUMBER; BEGIN l_moved := pkg_audit_mgmt.drain_audit_queue; END;',
+        start_date => SYSTIMESTAMP,
+        repeat_interval => 'FREQ=SECONDLY; INTERVAL=15',
+        enabled => TRUE,
+        comments => 'Moves queued clinical trial audit records from audit_log_queue to audit_log'
+    );
+
+    DBMS_OUTPUT.PUT_LINE('Scheduled JOB_DRAIN_AUDIT_QUEUE');
+END;
+/
+
+-- Appointment reminders (queues tomorrow's reminders; reminder-worker.py sends them)
+BEGIN
+    FOR rec IN (SELECT job_name FROM user_scheduler_jobs WHERE job_name = 'JOB_QUEUE_APPOINTMENT_REMINDERS') LOOP
+        DBMS_SCHEDULER.DROP_JOB(job_name => rec.job_name, force => TRUE);
+    END LOOP;
+
+    -- Hourly so appointments booked during the day still get a reminder;
+    -- appointments already queued are skipped
+    DBMS_SCHEDULER.CREATE_JOB(
+        job_name => 'JOB_QUEUE_APPOINTMENT_REMINDERS',
+        job_type => 'PLSQL_BLOCK',
+        job_action => 'DECLARE l_queued NUMBER; BEGIN l_queued := pkg_appointment_mgmt.queue_appointment_reminders; END;',
+        start_date => SYSTIMESTAMP,
+        repeat_interval => 'FREQ=HOURLY; BYMINUTE=0',
+        enabled => TRUE,
+        comments => 'Queues PENDING email reminders for appointments due tomorrow'
+    );
+
+    DBMS_OUTPUT.PUT_LINE('Scheduled JOB_QUEUE_APPOINTMENT_REMINDERS');
+END;
+/
+
+-- Notification outbox cleanup (delivered notifications; FAILED rows are kept)
+BEGIN
+    FOR rec IN (SELECT job_name FROM user_scheduler_jobs WHERE job_name = 'JOB_PURGE_NOTIFICATIONS') LOOP
+        DBMS_SCHEDULER.DROP_JOB(job_name => rec.job_name, force => TRUE);
+    END LOOP;
+
+    DBMS_SCHEDULER.CREATE_JOB(
+        job_name => 'JOB_PURGE_NOTIFICATIONS',
+        job_type => 'PLSQL_BLOCK',
+        job_action => 'DECLARE l_deleted NUMBER; BEGIN l_deleted := pkg_notification_mgmt.purge_notifications; END;',
+        start_date => SYSTIMESTAMP,
+        repeat_interval => 'FREQ=DAILY; BYHOUR=3; BYMINUTE=30',
+        enabled => TRUE,
+        comments => 'Deletes SENT notifications older than pkg_notification_mgmt.c_sent_retention_days'
+    );
+
+    DBMS_OUTPUT.PUT_LINE('Scheduled JOB_PURGE_NOTIFICATIONS');
+END;
+/
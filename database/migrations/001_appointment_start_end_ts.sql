@@ -0,0 +1,115 @@
+-- Healthcare System - Migration 001
+-- Native start/end timestamps for appointments
+--
+-- Adds appointments.start_ts / end_ts, backfills historical rows in batches
+-- and builds the (provider_id, start_ts, end_ts) overlap index used by
+-- pkg_appointment_mgmt.is_time_slot_available and trg_appointments_validation.
+--
+-- The script is safe to re-run: columns and index are only created when
+-- missing and the backfill only touches rows whose start_ts is still NULL.
+-- Run it before redeploying triggers.sql and pkg_appointment_mgmt.sql.
+-- The appointment triggers are disabled while the backfill runs, so schedule
+-- it in a maintenance window on production.
+
+SET SERVEROUTPUT ON
+
+PROMPT Migration 001: appointments start_ts/end_ts
+
+-- 1. Add the columns
+DECLARE
+    l_count NUMBER;
+BEGIN
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_tab_columns
+    WHERE table_name = 'APPOINTMENTS'
+      AND column_name IN ('START_TS', 'END_TS');
+
+    IF l_count = 0 THEN
+        EXECUTE IMMEDIATE 'ALTER TABLE appointments ADD (start_ts DATE, end_ts DATE)';
+        DBMS_OUTPUT.PUT_LINE('Added start_ts/end_ts columns');
+    END IF;
+END;
+/
+
+-- 2. Backfill in primary key ranges, committing after each batch so the
+--    undo footprint stays bounded on large tables. The validation and
+--    auto-status triggers are disabled for the duration: they would otherwise
+--    re-run conflict checks, stamp modified_date and auto-complete past
+--    appointments on every historical row.
+DECLARE
+    c_batch_size CONSTANT NUMBER := 50000;
+    l_min_id NUMBER;
+    l_max_id NUMBER;
+    l_from_id NUMBER;
+    l_rows NUMBER := 0;
+    l_started NUMBER := DBMS_UTILITY.GET_TIME;
+
+    PROCEDURE set_triggers(p_state IN VARCHAR2) IS
+    BEGIN
+        FOR rec IN (SELECT trigger_name
+                    FROM user_triggers
+                    WHERE trigger_name IN ('TRG_APPOINTMENTS_VALIDATION', 'TRG_APPOINTMENTS_AUTO_STATUS')) LOOP
+            EXECUTE IMMEDIATE 'ALTER TRIGGER ' || rec.trigger_name || ' ' || p_state;
+        END LOOP;
+    END set_triggers;
+BEGIN
+    SELECT MIN(appointment_id), MAX(appointment_id)
+    INTO l_min_id, l_max_id
+    FROM appointments
+    WHERE start_ts IS NULL;
+
+    IF l_min_id IS NULL THEN
+        DBMS_OUTPUT.PUT_LINE('Nothing to backfill');
+        RETURN;
+    END IF;
+
+    set_triggers('DISABLE');
+
+    l_from_id := l_min_id;
+    WHILE l_from_id <= l_max_id LOOP
+        UPDATE appointments
+        SET start_ts = TO_DATE(TO_CHAR(appointment_date, 'YYYY-MM-DD') || ' ' || appointment_time,
+                               'YYYY-MM-DD HH24:MI'),
+            end_ts = TO_DATE(TO_CHAR(appointment_date, 'YYYY-MM-DD') || ' ' || appointment_time,
+                             'YYYY-MM-DD HH24:MI') + (NVL(duration_minutes, 30) / (24 * 60))
+        WHERE appointment_id >= l_from_id
+          AND appointment_id < l_from_id + c_batch_size
+          AND start_ts IS NULL;
+
+        l_rows := l_rows + SQL%ROWCOUNT;
+        COMMIT;
+
+        l_from_id := l_from_id + c_batch_size;
+    END LOOP;
+
+    set_triggers('ENABLE');
+
+    DBMS_OUTPUT.PUT_LINE('Backfilled ' || l_rows || ' appointments in ' ||
+                         ROUND((DBMS_UTILITY.GET_TIME - l_started) / 100, 1) || 's');
+EXCEPTION
+    WHEN OTHERS THEN
+        ROLLBACK;
+        set_triggers('ENABLE');
+        RAISE;
+END;
+/
+
+-- 3. Overlap index for range probes
+DECLARE
+    l_count NUMBER;
+BEGIN
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_indexes
+    WHERE index_name = 'IDX_APPOINTMENTS_PROVIDER_TS';
+
+    IF l_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX idx_appointments_provider_ts ' ||
+                          'ON appointments(provider_id, start_ts, end_ts) ONLINE';
+        DBMS_OUTPUT.PUT_LINE('Created idx_appointments_provider_ts');
+    END IF;
+END;
+/
+
+PROMPT Migration 001 completed
@@ -0,0 +1,34 @@
+-- Healthcare System - Migration 002
+-- Reconcile clinical_trials.current_enrollment
+--
+-- enroll_participant and withdraw_participant used to adjust
+-- current_enrollment on top of trg_update_trial_enrollment, so trials
+-- touched through the package API drifted from the real participant count.
+-- Recount every trial once from trial_participants; from here on the
+-- compound trigger is the only writer of the column.
+
+SET SERVEROUTPUT ON
+
+PROMPT Migration 002: reconcile trial enrollment counts
+
+BEGIN
+    MERGE INTO clinical_trials ct
+    USING (
+        SELECT ct2.trial_id,
+               COUNT(tp.participant_id) as enrollment_count
+        FROM clinical_trials ct2
+        LEFT JOIN trial_participants tp ON tp.trial_id = ct2.trial_id
+            AND tp.status IN ('Screening', 'Active')
+        GROUP BY ct2.trial_id
+    ) src
+    ON (ct.trial_id = src.trial_id)
+    WHEN MATCHED THEN UPDATE
+    SET ct.current_enrollment = src.enrollment_count
+    WHERE DECODE(ct.current_enrollment, src.enrollment_count, 0, 1) = 1;
+
+    DBMS_OUTPUT.PUT_LINE('Reconciled ' || SQL%ROWCOUNT || ' trials');
+    COMMIT;
+END;
+/
+
+PROMPT Migration 002 completed
@@ -0,0 +1,48 @@
+-- Healthcare System - Migration 003
+-- Precomputed dashboard statistics
+--
+-- Creates dashboard_daily_stats (read by v_dashboard_stats) and the
+-- patients(created_date) index used by its refresh. Safe to re-run.
+-- Afterwards redeploy 03_views.sql, pkg_reporting_mgmt.sql and
+-- database/jobs/scheduler_jobs.sql, which schedules and runs the first refresh.
+
+SET SERVEROUTPUT ON
+
+PROMPT Migration 003: dashboard_daily_stats
+
+DECLARE
+    l_count NUMBER;
+BEGIN
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_tables
+    WHERE table_name = 'DASHBOARD_DAILY_STATS';
+
+    IF l_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE TABLE dashboard_daily_stats (
+            stat_date DATE PRIMARY KEY,
+            total_appointments NUMBER DEFAULT 0 NOT NULL,
+            scheduled_appointments NUMBER DEFAULT 0 NOT NULL,
+            completed_appointments NUMBER DEFAULT 0 NOT NULL,
+            cancelled_appointments NUMBER DEFAULT 0 NOT NULL,
+            new_records NUMBER DEFAULT 0 NOT NULL,
+            new_prescriptions NUMBER DEFAULT 0 NOT NULL,
+            new_patients NUMBER DEFAULT 0 NOT NULL,
+            refreshed_date DATE DEFAULT SYSDATE NOT NULL
+        )';
+        DBMS_OUTPUT.PUT_LINE('Created dashboard_daily_stats');
+    END IF;
+
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_indexes
+    WHERE index_name = 'IDX_PATIENTS_CREATED_DATE';
+
+    IF l_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX idx_patients_created_date ON patients(created_date) ONLINE';
+        DBMS_OUTPUT.PUT_LINE('Created idx_patients_created_date');
+    END IF;
+END;
+/
+
+PROMPT Migration 003 completed
@@ -0,0 +1,41 @@
+-- Healthcare System - Migration 004
+-- Pre-aggregated trial dashboard metrics
+--
+-- Creates trial_dashboard_metrics (read by v_trial_dashboard). Safe to re-run.
+-- Afterwards redeploy 03_views.sql, pkg_clinical_trials_mgmt.sql and
+-- database/jobs/scheduler_jobs.sql, which schedules and runs the first refresh.
+
+SET SERVEROUTPUT ON
+
+PROMPT Migration 004: trial_dashboard_metrics
+
+DECLARE
+    l_count NUMBER;
+BEGIN
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_tables
+    WHERE table_name = 'TRIAL_DASHBOARD_METRICS';
+
+    IF l_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE TABLE trial_dashboard_metrics (
+            trial_id NUMBER PRIMARY KEY,
+            active_participants NUMBER DEFAULT 0 NOT NULL,
+            recent_enrollments NUMBER DEFAULT 0 NOT NULL,
+            upcoming_visits_week NUMBER DEFAULT 0 NOT NULL,
+            overdue_visits NUMBER DEFAULT 0 NOT NULL,
+            serious_adverse_events NUMBER DEFAULT 0 NOT NULL,
+            recent_adverse_events NUMBER DEFAULT 0 NOT NULL,
+            recent_serious_adverse_events NUMBER DEFAULT 0 NOT NULL,
+            completed_milestones NUMBER DEFAULT 0 NOT NULL,
+            overdue_milestones NUMBER DEFAULT 0 NOT NULL,
+            refreshed_date DATE DEFAULT SYSDATE NOT NULL,
+            CONSTRAINT fk_metrics_trial FOREIGN KEY (trial_id)
+                REFERENCES clinical_trials(trial_id) ON DELETE CASCADE
+        )';
+        DBMS_OUTPUT.PUT_LINE('Created trial_dashboard_metrics');
+    END IF;
+END;
+/
+
+PROMPT Migration 004 completed
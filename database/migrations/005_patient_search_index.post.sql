@@ -0,0 +1,24 @@
+-- Healthcare System - Migration 005, post-deploy step
+-- Build the patient search index for existing patients
+--
+-- Needs the pkg_patient_mgmt.sql that goes with migration 005, so it runs
+-- once the packages have been redeployed. Safe to re-run; the rebuild is
+-- idempotent.
+
+SET SERVEROUTPUT ON
+
+PROMPT Migration 005 post-deploy: patient search index rebuild
+
+DECLARE
+    l_started NUMBER := DBMS_UTILITY.GET_TIME;
+    l_rows NUMBER;
+BEGIN
+    pkg_patient_mgmt.rebuild_search_index;
+
+    SELECT COUNT(*) INTO l_rows FROM patient_search_ngrams;
+    DBMS_OUTPUT.PUT_LINE('Indexed ' || l_rows || ' trigrams in ' ||
+                         ROUND((DBMS_UTILITY.GET_TIME - l_started) / 100, 1) || 's');
+END;
+/
+
+PROMPT Migration 005 post-deploy completed
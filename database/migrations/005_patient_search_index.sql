@@ -0,0 +1,85 @@
+-- Healthcare System - Migration 005
+-- Indexed patient search
+--
+-- Adds the normalized search columns on patients, the patient_search_ngrams
+-- trigram table and their indexes. Safe to re-run.
+-- Redeploy pkg_patient_mgmt.sql and triggers.sql afterwards, then run
+-- 005_patient_search_index.post.sql to build the trigram postings for every
+-- existing patient (run-migrations.py does both after the versioned scripts).
+
+SET SERVEROUTPUT ON
+
+PROMPT Migration 005: patient search index
+
+-- 1. Normalized search columns
+DECLARE
+    l_count NUMBER;
+BEGIN
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_tab_columns
+    WHERE table_name = 'PATIENTS'
+      AND column_name = 'SEARCH_NAME';
+
+    IF l_count = 0 THEN
+        EXECUTE IMMEDIATE 'ALTER TABLE patients ADD (
+            search_name VARCHAR2(101) GENERATED ALWAYS AS (UPPER(first_name || '' '' || last_name)) VIRTUAL,
+            phone_digits VARCHAR2(20) GENERATED ALWAYS AS (REGEXP_REPLACE(phone, ''[^0-9]'', '''')) VIRTUAL,
+            email_lower VARCHAR2(100) GENERATED ALWAYS AS (LOWER(email)) VIRTUAL
+        )';
+        DBMS_OUTPUT.PUT_LINE('Added search_name/phone_digits/email_lower columns');
+    END IF;
+END;
+/
+
+-- 2. Trigram table
+DECLARE
+    l_count NUMBER;
+BEGIN
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_tables
+    WHERE table_name = 'PATIENT_SEARCH_NGRAMS';
+
+    IF l_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE TABLE patient_search_ngrams (
+            ngram VARCHAR2(3 CHAR) NOT NULL,
+            patient_id NUMBER NOT NULL,
+            CONSTRAINT pk_patient_search_ngrams PRIMARY KEY (ngram, patient_id)
+        ) ORGANIZATION INDEX COMPRESS 1';
+        DBMS_OUTPUT.PUT_LINE('Created patient_search_ngrams');
+    END IF;
+END;
+/
+
+-- 3. Indexes
+DECLARE
+    TYPE t_index_tab IS TABLE OF VARCHAR2(200) INDEX BY VARCHAR2(30);
+    l_indexes t_index_tab;
+    l_name VARCHAR2(30);
+    l_count NUMBER;
+BEGIN
+    l_indexes('IDX_PATIENTS_SEARCH_NAME') := 'patients(search_name)';
+    l_indexes('IDX_PATIENTS_LAST_NAME_UPPER') := 'patients(UPPER(last_name))';
+    l_indexes('IDX_PATIENTS_PHONE_DIGITS') := 'patients(phone_digits)';
+    l_indexes('IDX_PATIENTS_EMAIL_LOWER') := 'patients(email_lower)';
+    l_indexes('IDX_PATIENT_SEARCH_NGRAMS_PAT') := 'patient_search_ngrams(patient_id)';
+
+    l_name := l_indexes.FIRST;
+    WHILE l_name IS NOT NULL LOOP
+        SELECT COUNT(*)
+        INTO l_count
+        FROM user_indexes
+        WHERE index_name = l_name;
+
+        IF l_count = 0 THEN
+            EXECUTE IMMEDIATE 'CREATE INDEX ' || l_name || ' ON ' || l_indexes(l_name) || ' ONLINE';
+            DBMS_OUTPUT.PUT_LINE('Created ' || LOWER(l_name));
+        END IF;
+
+        l_name := l_indexes.NEXT(l_name);
+    END LOOP;
+END;
+/
+
+PROMPT Migration 005 completed
@@ -0,0 +1,138 @@
+-- Healthcare System - Migration 006
+-- Compact, partitioned patient audit
+--
+-- Rewrites existing UPDATE rows of patient_audit to keep only the changed
+-- columns, converts the table to monthly interval partitions on
+-- changed_date and adds a local (patient_id, changed_date) index.
+-- Safe to re-run; each step checks whether it has already been applied.
+-- Redeploy triggers.sql and pkg_patient_mgmt.sql afterwards, then
+-- scheduler_jobs.sql for the monthly purge.
+
+SET SERVEROUTPUT ON
+
+PROMPT Migration 006: patient audit partitioning
+
+-- 1. Reduce full before/after snapshots of updates to the changed columns.
+--    Done before partitioning so the online rebuild reclaims the space.
+--    Legacy rows are recognised by patient_id, which never changes and so
+--    only appears in full snapshots.
+DECLARE
+    l_started NUMBER := DBMS_UTILITY.GET_TIME;
+    l_old JSON_OBJECT_T;
+    l_new JSON_OBJECT_T;
+    l_old_diff JSON_OBJECT_T;
+    l_new_diff JSON_OBJECT_T;
+    l_keys JSON_KEY_LIST;
+    l_rows NUMBER := 0;
+
+    FUNCTION value_text(p_object IN JSON_OBJECT_T, p_key IN VARCHAR2) RETURN VARCHAR2 IS
+    BEGIN
+        RETURN CASE WHEN p_object.has(p_key) THEN p_object.get(p_key).to_string ELSE 'null' END;
+    END value_text;
+BEGIN
+    FOR rec IN (
+        SELECT audit_id, old_values, new_values
+        FROM patient_audit
+        WHERE operation = 'UPDATE'
+          AND JSON_EXISTS(old_values, '$.patient_id')
+          AND JSON_EXISTS(new_values, '$.patient_id')
+    ) LOOP
+        l_old := JSON_OBJECT_T.parse(rec.old_values);
+        l_new := JSON_OBJECT_T.parse(rec.new_values);
+        l_old_diff := JSON_OBJECT_T();
+        l_new_diff := JSON_OBJECT_T();
+        l_keys := l_new.get_keys;
+
+        FOR i IN 1 .. l_keys.COUNT LOOP
+            IF value_text(l_old, l_keys(i)) <> value_text(l_new, l_keys(i)) THEN
+                IF l_old.has(l_keys(i)) THEN
+                    l_old_diff.put(l_keys(i), l_old.get(l_keys(i)));
+                ELSE
+                    l_old_diff.put_null(l_keys(i));
+                END IF;
+                l_new_diff.put(l_keys(i), l_new.get(l_keys(i)));
+            END IF;
+        END LOOP;
+
+        UPDATE patient_audit
+        SET old_values = l_old_diff.to_clob,
+            new_values = l_new_diff.to_clob
+        WHERE audit_id = rec.audit_id;
+
+        l_rows := l_rows + 1;
+        IF MOD(l_rows, 10000) = 0 THEN
+            COMMIT;
+        END IF;
+    END LOOP;
+
+    COMMIT;
+    DBMS_OUTPUT.PUT_LINE('Compacted ' || l_rows || ' update audit rows in ' ||
+                         ROUND((DBMS_UTILITY.GET_TIME - l_started) / 100, 1) || 's');
+END;
+/
+
+-- 2. changed_date becomes the partition key and must not be NULL
+DECLARE
+    l_nullable VARCHAR2(1);
+BEGIN
+    SELECT nullable
+    INTO l_nullable
+    FROM user_tab_columns
+    WHERE table_name = 'PATIENT_AUDIT'
+      AND column_name = 'CHANGED_DATE';
+
+    IF l_nullable = 'Y' THEN
+        UPDATE patient_audit SET changed_date = SYSDATE WHERE changed_date IS NULL;
+        COMMIT;
+        EXECUTE IMMEDIATE 'ALTER TABLE patient_audit MODIFY (changed_date NOT NULL)';
+        DBMS_OUTPUT.PUT_LINE('Made patient_audit.changed_date NOT NULL');
+    END IF;
+END;
+/
+
+-- 3. Monthly interval partitions. The initial range partition ends at the
+--    oldest month present so every existing row lands in a droppable
+--    interval partition.
+DECLARE
+    l_count NUMBER;
+    l_boundary DATE;
+BEGIN
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_part_tables
+    WHERE table_name = 'PATIENT_AUDIT';
+
+    IF l_count = 0 THEN
+        SELECT TRUNC(NVL(MIN(changed_date), SYSDATE), 'MM')
+        INTO l_boundary
+        FROM patient_audit;
+
+        EXECUTE IMMEDIATE 'ALTER TABLE patient_audit MODIFY
+            PARTITION BY RANGE (changed_date)
+            INTERVAL (NUMTOYMINTERVAL(1, ''MONTH''))
+            (PARTITION p_patient_audit_initial VALUES LESS THAN (DATE ''' ||
+            TO_CHAR(l_boundary, 'YYYY-MM-DD') || '''))
+            ONLINE';
+        DBMS_OUTPUT.PUT_LINE('Partitioned patient_audit monthly from ' || TO_CHAR(l_boundary, 'YYYY-MM-DD'));
+    END IF;
+END;
+/
+
+-- 4. Local index for per-patient audit lookups
+DECLARE
+    l_count NUMBER;
+BEGIN
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_indexes
+    WHERE index_name = 'IDX_PATIENT_AUDIT_PATIENT';
+
+    IF l_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX idx_patient_audit_patient
+            ON patient_audit(patient_id, changed_date) LOCAL ONLINE';
+        DBMS_OUTPUT.PUT_LINE('Created idx_patient_audit_patient');
+    END IF;
+END;
+/
+
+PROMPT Migration 006 completed
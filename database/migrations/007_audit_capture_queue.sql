@@ -0,0 +1,153 @@
+-- Healthcare System - Migration 007
+-- Asynchronous audit capture for the clinical trials triggers
+--
+-- Creates audit_log (or adds logged_date to an existing one), the
+-- audit_log_queue staging table and the audit_capture_settings row.
+-- Capture stays SYNC until pkg_audit_mgmt.set_capture_mode('QUEUED').
+-- Safe to re-run. Deploy pkg_audit_mgmt.sql before clinical_trials_triggers.sql,
+-- then 03_views.sql and scheduler_jobs.sql for v_audit_queue_lag and the drain job.
+
+SET SERVEROUTPUT ON
+
+PROMPT Migration 007: audit capture queue
+
+-- 1. Sequences
+DECLARE
+    l_count NUMBER;
+BEGIN
+    FOR rec IN (
+        SELECT 'SEQ_AUDIT_ID' as sequence_name FROM dual
+        UNION ALL
+        SELECT 'SEQ_AUDIT_QUEUE_ID' FROM dual
+    ) LOOP
+        SELECT COUNT(*)
+        INTO l_count
+        FROM user_sequences
+        WHERE sequence_name = rec.sequence_name;
+
+        IF l_count = 0 THEN
+            EXECUTE IMMEDIATE 'CREATE SEQUENCE ' || rec.sequence_name || ' START WITH 1 INCREMENT BY 1 CACHE 1000';
+            DBMS_OUTPUT.PUT_LINE('Created ' || LOWER(rec.sequence_name));
+        END IF;
+    END LOOP;
+END;
+/
+
+-- 2. audit_log
+DECLARE
+    l_count NUMBER;
+    l_next NUMBER;
+BEGIN
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_tables
+    WHERE table_name = 'AUDIT_LOG';
+
+    IF l_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE TABLE audit_log (
+            audit_id NUMBER DEFAULT seq_audit_id.NEXTVAL PRIMARY KEY,
+            table_name VARCHAR2(30) NOT NULL,
+            operation_type VARCHAR2(30) NOT NULL,
+            record_id NUMBER,
+            old_values VARCHAR2(4000),
+            new_values VARCHAR2(4000),
+            changed_by VARCHAR2(255),
+            changed_date DATE DEFAULT SYSDATE NOT NULL,
+            logged_date DATE DEFAULT SYSDATE NOT NULL
+        )';
+        DBMS_OUTPUT.PUT_LINE('Created audit_log');
+    ELSE
+        SELECT COUNT(*)
+        INTO l_count
+        FROM user_tab_columns
+        WHERE table_name = 'AUDIT_LOG'
+          AND column_name = 'LOGGED_DATE';
+
+        IF l_count = 0 THEN
+            -- Existing rows were written synchronously, so logged = changed
+            EXECUTE IMMEDIATE 'ALTER TABLE audit_log ADD (logged_date DATE)';
+            EXECUTE IMMEDIATE 'UPDATE audit_log SET logged_date = NVL(changed_date, SYSDATE)';
+            COMMIT;
+            EXECUTE IMMEDIATE 'ALTER TABLE audit_log MODIFY (logged_date DEFAULT SYSDATE NOT NULL)';
+            DBMS_OUTPUT.PUT_LINE('Added audit_log.logged_date');
+        END IF;
+
+        -- Start the new sequence above ids already in use
+        EXECUTE IMMEDIATE 'SELECT NVL(MAX(audit_id), 0) + 1 FROM audit_log' INTO l_next;
+        EXECUTE IMMEDIATE 'ALTER SEQUENCE seq_audit_id RESTART START WITH ' || l_next;
+        EXECUTE IMMEDIATE 'ALTER TABLE audit_log MODIFY (audit_id DEFAULT seq_audit_id.NEXTVAL)';
+    END IF;
+END;
+/
+
+-- 3. Queue and settings
+DECLARE
+    l_count NUMBER;
+BEGIN
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_tables
+    WHERE table_name = 'AUDIT_LOG_QUEUE';
+
+    IF l_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE TABLE audit_log_queue (
+            queue_id NUMBER DEFAULT seq_audit_queue_id.NEXTVAL PRIMARY KEY,
+            table_name VARCHAR2(30) NOT NULL,
+            operation_type VARCHAR2(30) NOT NULL,
+            record_id NUMBER,
+            old_values VARCHAR2(4000),
+            new_values VARCHAR2(4000),
+            changed_by VARCHAR2(255),
+            changed_date DATE NOT NULL,
+            queued_ts TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL
+        )';
+        DBMS_OUTPUT.PUT_LINE('Created audit_log_queue');
+    END IF;
+
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_tables
+    WHERE table_name = 'AUDIT_CAPTURE_SETTINGS';
+
+    IF l_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE TABLE audit_capture_settings (
+            setting_id NUMBER DEFAULT 1 PRIMARY KEY CHECK (setting_id = 1),
+            capture_mode VARCHAR2(10) DEFAULT ''SYNC'' NOT NULL CHECK (capture_mode IN (''SYNC'', ''QUEUED'')),
+            modified_date DATE DEFAULT SYSDATE,
+            modified_by VARCHAR2(50) DEFAULT USER
+        )';
+        EXECUTE IMMEDIATE 'INSERT INTO audit_capture_settings (setting_id, capture_mode) VALUES (1, ''SYNC'')';
+        COMMIT;
+        DBMS_OUTPUT.PUT_LINE('Created audit_capture_settings (SYNC)');
+    END IF;
+END;
+/
+
+-- 4. Indexes
+DECLARE
+    TYPE t_index_tab IS TABLE OF VARCHAR2(200) INDEX BY VARCHAR2(30);
+    l_indexes t_index_tab;
+    l_name VARCHAR2(30);
+    l_count NUMBER;
+BEGIN
+    l_indexes('IDX_AUDIT_LOG_RECORD') := 'audit_log(table_name, record_id)';
+    l_indexes('IDX_AUDIT_LOG_CHANGED') := 'audit_log(changed_date)';
+
+    l_name := l_indexes.FIRST;
+    WHILE l_name IS NOT NULL LOOP
+        SELECT COUNT(*)
+        INTO l_count
+        FROM user_indexes
+        WHERE index_name = l_name;
+
+        IF l_count = 0 THEN
+            EXECUTE IMMEDIATE 'CREATE INDEX ' || l_name || ' ON ' || l_indexes(l_name) || ' ONLINE';
+            DBMS_OUTPUT.PUT_LINE('Created ' || LOWER(l_name));
+        END IF;
+
+        l_name := l_indexes.NEXT(l_name);
+    END LOOP;
+END;
+/
+
+PROMPT Migration 007 completed
@@ -0,0 +1,63 @@
+-- Healthcare System - Migration 008
+-- Batch appointment reminders
+--
+-- Adds the delivery bookkeeping columns to appointment_reminders and the
+-- indexes used by pkg_appointment_mgmt.queue_appointment_reminders and
+-- scripts/reminder-worker.py. Safe to re-run.
+-- Redeploy pkg_appointment_mgmt.sql and scheduler_jobs.sql afterwards.
+
+SET SERVEROUTPUT ON
+
+PROMPT Migration 008: batch appointment reminders
+
+-- 1. Delivery attempt columns
+DECLARE
+    l_count NUMBER;
+BEGIN
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_tab_columns
+    WHERE table_name = 'APPOINTMENT_REMINDERS'
+      AND column_name = 'ATTEMPT_COUNT';
+
+    IF l_count = 0 THEN
+        EXECUTE IMMEDIATE 'ALTER TABLE appointment_reminders ADD (
+            attempt_count NUMBER DEFAULT 0 NOT NULL,
+            last_error VARCHAR2(1000)
+        )';
+        DBMS_OUTPUT.PUT_LINE('Added attempt_count/last_error columns');
+    END IF;
+END;
+/
+
+-- 2. Indexes
+DECLARE
+    TYPE t_index_tab IS TABLE OF VARCHAR2(200) INDEX BY VARCHAR2(30);
+    l_indexes t_index_tab;
+    l_name VARCHAR2(30);
+    l_count NUMBER;
+BEGIN
+    l_indexes('IDX_REMINDERS_APPOINTMENT') := 'appointment_reminders(appointment_id, reminder_type)';
+    l_indexes('IDX_REMINDERS_STATUS') := 'appointment_reminders(status, reminder_id)';
+
+    l_name := l_indexes.FIRST;
+    WHILE l_name IS NOT NULL LOOP
+        SELECT COUNT(*)
+        INTO l_count
+        FROM user_indexes
+        WHERE index_name = l_name;
+
+        IF l_count = 0 THEN
+            EXECUTE IMMEDIATE 'CREATE INDEX ' || l_name || ' ON ' || l_indexes(l_name) || ' ONLINE';
+            DBMS_OUTPUT.PUT_LINE('Created ' || LOWER(l_name));
+        END IF;
+
+        l_name := l_indexes.NEXT(l_name);
+    END LOOP;
+END;
+/
+
+-- 3. Cache reminder ids for bulk inserts
+ALTER SEQUENCE seq_reminder_id CACHE 1000;
+
+PROMPT Migration 008 completed
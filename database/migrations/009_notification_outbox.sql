@@ -0,0 +1,90 @@
+-- Healthcare System - Migration 009
+-- Notification outbox for trg_notify_serious_ae
+--
+-- Creates system_notifications with delivery status, retry bookkeeping and
+-- the (status, priority, created_date) dispatch index. The trigger used to
+-- write to this table without it being part of the schema; a table created
+-- by hand for it is renamed to system_notifications_old so its rows are kept.
+-- Safe to re-run. Deploy pkg_notification_mgmt.sql before
+-- clinical_trials_triggers.sql, then 03_views.sql and scheduler_jobs.sql.
+
+SET SERVEROUTPUT ON
+
+PROMPT Migration 009: notification outbox
+
+-- 1. Sequence
+DECLARE
+    l_count NUMBER;
+BEGIN
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_sequences
+    WHERE sequence_name = 'SEQ_NOTIFICATION_ID';
+
+    IF l_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE SEQUENCE seq_notification_id START WITH 1 INCREMENT BY 1 CACHE 1000';
+        DBMS_OUTPUT.PUT_LINE('Created seq_notification_id');
+    END IF;
+END;
+/
+
+-- 2. Outbox table
+DECLARE
+    l_count NUMBER;
+BEGIN
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_tab_columns
+    WHERE table_name = 'SYSTEM_NOTIFICATIONS'
+      AND column_name = 'NEXT_ATTEMPT_DATE';
+
+    IF l_count = 0 THEN
+        SELECT COUNT(*)
+        INTO l_count
+        FROM user_tables
+        WHERE table_name = 'SYSTEM_NOTIFICATIONS';
+
+        IF l_count > 0 THEN
+            EXECUTE IMMEDIATE 'ALTER TABLE system_notifications RENAME TO system_notifications_old';
+            DBMS_OUTPUT.PUT_LINE('Renamed existing system_notifications to system_notifications_old');
+        END IF;
+
+        EXECUTE IMMEDIATE 'CREATE TABLE system_notifications (
+            notification_id NUMBER DEFAULT seq_notification_id.NEXTVAL PRIMARY KEY,
+            notification_type VARCHAR2(50) NOT NULL,
+            source_table VARCHAR2(30),
+            source_id NUMBER,
+            recipient_email VARCHAR2(100),
+            subject VARCHAR2(200) NOT NULL,
+            message VARCHAR2(4000),
+            priority NUMBER(1) DEFAULT 2 NOT NULL CHECK (priority IN (1, 2, 3)),
+            status VARCHAR2(20) DEFAULT ''PENDING'' NOT NULL CHECK (status IN (''PENDING'', ''SENT'', ''FAILED'')),
+            retry_count NUMBER DEFAULT 0 NOT NULL,
+            last_error VARCHAR2(1000),
+            next_attempt_date TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL,
+            created_date TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL,
+            delivered_date TIMESTAMP
+        )';
+        DBMS_OUTPUT.PUT_LINE('Created system_notifications');
+    END IF;
+END;
+/
+
+-- 3. Dispatch index
+DECLARE
+    l_count NUMBER;
+BEGIN
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_indexes
+    WHERE index_name = 'IDX_NOTIFICATIONS_DISPATCH';
+
+    IF l_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX idx_notifications_dispatch
+            ON system_notifications(status, priority, created_date) ONLINE';
+        DBMS_OUTPUT.PUT_LINE('Created idx_notifications_dispatch');
+    END IF;
+END;
+/
+
+PROMPT Migration 009 completed
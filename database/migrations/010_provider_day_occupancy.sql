@@ -0,0 +1,52 @@
+-- Healthcare System - Migration 010
+-- Precomputed provider schedule occupancy
+--
+-- Creates provider_day_occupancy (read by v_provider_schedule) and makes
+-- sure the appointments(provider_id, appointment_date) index used by its
+-- per-day recount exists. Safe to re-run.
+-- Afterwards redeploy pkg_appointment_mgmt.sql, pkg_reporting_mgmt.sql,
+-- triggers.sql, 03_views.sql and database/jobs/scheduler_jobs.sql, which
+-- schedules and runs the first refresh.
+
+SET SERVEROUTPUT ON
+
+PROMPT Migration 010: provider_day_occupancy
+
+DECLARE
+    l_count NUMBER;
+BEGIN
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_tables
+    WHERE table_name = 'PROVIDER_DAY_OCCUPANCY';
+
+    IF l_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE TABLE provider_day_occupancy (
+            provider_id NUMBER NOT NULL REFERENCES providers(provider_id),
+            schedule_date DATE NOT NULL,
+            total_appointments NUMBER DEFAULT 0 NOT NULL,
+            active_appointments NUMBER DEFAULT 0 NOT NULL,
+            scheduled_count NUMBER DEFAULT 0 NOT NULL,
+            confirmed_count NUMBER DEFAULT 0 NOT NULL,
+            completed_count NUMBER DEFAULT 0 NOT NULL,
+            cancelled_count NUMBER DEFAULT 0 NOT NULL,
+            booked_minutes NUMBER DEFAULT 0 NOT NULL,
+            refreshed_date DATE DEFAULT SYSDATE NOT NULL,
+            CONSTRAINT pk_provider_day_occupancy PRIMARY KEY (provider_id, schedule_date)
+        ) ORGANIZATION INDEX';
+        DBMS_OUTPUT.PUT_LINE('Created provider_day_occupancy');
+    END IF;
+
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_indexes
+    WHERE index_name = 'IDX_APPOINTMENTS_PROVIDER_DATE';
+
+    IF l_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX idx_appointments_provider_date ON appointments(provider_id, appointment_date) ONLINE';
+        DBMS_OUTPUT.PUT_LINE('Created idx_appointments_provider_date');
+    END IF;
+END;
+/
+
+PROMPT Migration 010 completed
@@ -0,0 +1,54 @@
+-- Healthcare System - Migration 011
+-- Persisted patient risk profiles for the high-risk patient report
+--
+-- Creates patient_risk_profile (read by APEX Report 9) and its
+-- (risk_score DESC, patient_id) index. Safe to re-run.
+-- Afterwards redeploy 03_views.sql, pkg_patient_mgmt.sql, triggers.sql and
+-- database/jobs/scheduler_jobs.sql, which schedules and runs the first
+-- rebuild. scripts/risk-profiles.py check confirms the table is in step.
+
+SET SERVEROUTPUT ON
+
+PROMPT Migration 011: patient_risk_profile
+
+DECLARE
+    l_count NUMBER;
+BEGIN
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_tables
+    WHERE table_name = 'PATIENT_RISK_PROFILE';
+
+    IF l_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE TABLE patient_risk_profile (
+            patient_id NUMBER PRIMARY KEY REFERENCES patients(patient_id) ON DELETE CASCADE,
+            age NUMBER,
+            elderly_risk NUMBER(1) DEFAULT 0 NOT NULL,
+            chronic_conditions NUMBER(1) DEFAULT 0 NOT NULL,
+            has_allergies NUMBER(1) DEFAULT 0 NOT NULL,
+            medication_count NUMBER DEFAULT 0 NOT NULL,
+            recent_visits NUMBER DEFAULT 0 NOT NULL,
+            missed_appointments NUMBER DEFAULT 0 NOT NULL,
+            last_visit_date DATE,
+            next_appointment_date DATE,
+            risk_score NUMBER DEFAULT 0 NOT NULL,
+            refreshed_date DATE DEFAULT SYSDATE NOT NULL
+        )';
+        EXECUTE IMMEDIATE 'COMMENT ON TABLE patient_risk_profile IS
+            ''Per-patient risk factors and score backing the high-risk patient report''';
+        DBMS_OUTPUT.PUT_LINE('Created patient_risk_profile');
+    END IF;
+
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_indexes
+    WHERE index_name = 'IDX_PATIENT_RISK_SCORE';
+
+    IF l_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX idx_patient_risk_score ON patient_risk_profile(risk_score DESC, patient_id) ONLINE';
+        DBMS_OUTPUT.PUT_LINE('Created idx_patient_risk_score');
+    END IF;
+END;
+/
+
+PROMPT Migration 011 completed
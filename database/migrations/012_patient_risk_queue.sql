@@ -0,0 +1,55 @@
+-- Healthcare System - Migration 012
+-- Queued patient risk profile recalculation
+--
+-- Creates patient_risk_queue, which the risk profile triggers now write
+-- instead of recalculating profiles inside clinical transactions. Safe to
+-- re-run.
+-- Afterwards redeploy pkg_patient_mgmt.sql, triggers.sql, 03_views.sql and
+-- database/jobs/scheduler_jobs.sql, which schedules the drain job.
+
+SET SERVEROUTPUT ON
+
+PROMPT Migration 012: patient_risk_queue
+
+DECLARE
+    l_count NUMBER;
+BEGIN
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_sequences
+    WHERE sequence_name = 'SEQ_RISK_QUEUE_ID';
+
+    IF l_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE SEQUENCE seq_risk_queue_id START WITH 1 INCREMENT BY 1 CACHE 1000';
+        DBMS_OUTPUT.PUT_LINE('Created seq_risk_queue_id');
+    END IF;
+
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_tables
+    WHERE table_name = 'PATIENT_RISK_QUEUE';
+
+    IF l_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE TABLE patient_risk_queue (
+            queue_id NUMBER DEFAULT seq_risk_queue_id.NEXTVAL PRIMARY KEY,
+            patient_id NUMBER NOT NULL,
+            queued_ts TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL
+        )';
+        EXECUTE IMMEDIATE 'COMMENT ON TABLE patient_risk_queue IS
+            ''Patients waiting for pkg_patient_mgmt.drain_risk_queue to recalculate their risk profile''';
+        DBMS_OUTPUT.PUT_LINE('Created patient_risk_queue');
+    END IF;
+
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_indexes
+    WHERE index_name = 'IDX_PATIENT_RISK_QUEUE_PATIENT';
+
+    IF l_count = 0 THEN
+        EXECUTE IMMEDIATE 'CREATE INDEX idx_patient_risk_queue_patient ON patient_risk_queue(patient_id)';
+        DBMS_OUTPUT.PUT_LINE('Created idx_patient_risk_queue_patient');
+    END IF;
+END;
+/
+
+PROMPT Migration 012 completed
@@ -0,0 +1,43 @@
+-- Healthcare System - Migration 013
+-- Appointments end on the day they start
+--
+-- The provider overlap searches (pkg_appointment_mgmt.is_time_slot_available
+-- and trg_appointments_validation) only look back to midnight of the new
+-- appointment's day. Adds chk_appointments_same_day so no stored appointment
+-- can run past midnight. Existing rows are not validated; any that already
+-- span midnight are listed for correction. Safe to re-run.
+-- Afterwards redeploy pkg_appointment_mgmt.sql and triggers.sql.
+
+SET SERVEROUTPUT ON
+
+PROMPT Migration 013: chk_appointments_same_day
+
+DECLARE
+    l_count NUMBER;
+BEGIN
+    SELECT COUNT(*)
+    INTO l_count
+    FROM user_constraints
+    WHERE table_name = 'APPOINTMENTS'
+      AND constraint_name = 'CHK_APPOINTMENTS_SAME_DAY';
+
+    IF l_count = 0 THEN
+        EXECUTE IMMEDIATE 'ALTER TABLE appointments ADD CONSTRAINT chk_appointments_same_day
+            CHECK (end_ts <= TRUNC(start_ts) + 1) ENABLE NOVALIDATE';
+        DBMS_OUTPUT.PUT_LINE('Added chk_appointments_same_day');
+    END IF;
+
+    FOR rec IN (
+        SELECT appointment_id, provider_id, start_ts, end_ts
+        FROM appointments
+        WHERE end_ts > TRUNC(start_ts) + 1
+        ORDER BY appointment_id
+    ) LOOP
+        DBMS_OUTPUT.PUT_LINE('Appointment ' || rec.appointment_id || ' (provider ' || rec.provider_id ||
+                             ') runs past midnight: ' || TO_CHAR(rec.start_ts, 'YYYY-MM-DD HH24:MI') ||
+                             ' - ' || TO_CHAR(rec.end_ts, 'YYYY-MM-DD HH24:MI'));
+    END LOOP;
+END;
+/
+
+PROMPT Migration 013 completed
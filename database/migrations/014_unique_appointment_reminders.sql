@@ -0,0 +1,69 @@
+-- Healthcare System - Migration 014
+-- One reminder per appointment and type
+--
+-- Makes idx_reminders_appointment unique so concurrent runs of
+-- pkg_appointment_mgmt.queue_appointment_reminders (the hourly job and a
+-- manual run) cannot queue, and send, the same reminder twice. Duplicates
+-- already queued are removed first, keeping the sent one where there is one,
+-- otherwise the oldest. Safe to re-run.
+-- Disable JOB_QUEUE_APPOINTMENT_REMINDERS while this runs, then redeploy
+-- pkg_appointment_mgmt.sql.
+
+SET SERVEROUTPUT ON
+
+PROMPT Migration 014: unique idx_reminders_appointment
+
+-- 1. Remove duplicate reminders
+DECLARE
+    l_count NUMBER;
+BEGIN
+    DELETE FROM appointment_reminders
+    WHERE ROWID IN (
+        SELECT rid
+        FROM (
+            SELECT ROWID AS rid,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY appointment_id, reminder_type
+                       ORDER BY CASE status WHEN 'SENT' THEN 0 WHEN 'PENDING' THEN 1 ELSE 2 END,
+                                reminder_id
+                   ) AS rn
+            FROM appointment_reminders
+        )
+        WHERE rn > 1
+    );
+    l_count := SQL%ROWCOUNT;
+    COMMIT;
+
+    IF l_count > 0 THEN
+        DBMS_OUTPUT.PUT_LINE('Removed ' || l_count || ' duplicate reminder(s)');
+    END IF;
+END;
+/
+
+-- 2. Rebuild the index as unique
+DECLARE
+    l_uniqueness VARCHAR2(9);
+BEGIN
+    BEGIN
+        SELECT uniqueness
+        INTO l_uniqueness
+        FROM user_indexes
+        WHERE index_name = 'IDX_REMINDERS_APPOINTMENT';
+    EXCEPTION
+        WHEN NO_DATA_FOUND THEN
+            l_uniqueness := NULL;
+    END;
+
+    IF l_uniqueness = 'NONUNIQUE' THEN
+        EXECUTE IMMEDIATE 'DROP INDEX idx_reminders_appointment';
+    END IF;
+
+    IF l_uniqueness IS NULL OR l_uniqueness = 'NONUNIQUE' THEN
+        EXECUTE IMMEDIATE 'CREATE UNIQUE INDEX idx_reminders_appointment
+            ON appointment_reminders(appointment_id, reminder_type) ONLINE';
+        DBMS_OUTPUT.PUT_LINE('Created unique idx_reminders_appointment');
+    END IF;
+END;
+/
+
+PROMPT Migration 014 completed
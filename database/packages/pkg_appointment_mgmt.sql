@@ -24,10 +24,22 @@ CREATE OR REPLACE PACKAGE pkg_appointment_mgmt AS
     
     TYPE t_time_slot_tab IS TABLE OF t_time_slot_rec;
     
+    TYPE t_slot_grid_rec IS RECORD (
+        provider_id         NUMBER,
+        slot_date           DATE,
+        time_slot           VARCHAR2(10),
+        is_available        VARCHAR2(1),
+        appointment_id      NUMBER
+    );
+    
+    TYPE t_slot_grid_tab IS TABLE OF t_slot_grid_rec;
+    
     -- Public constants
     c_default_appointment_duration CONSTANT NUMBER := 30;
     c_business_start_hour CONSTANT NUMBER := 8;  -- 8 AM
     c_business_end_hour CONSTANT NUMBER := 17;   -- 5 PM
+    c_slot_interval_minutes CONSTANT NUMBER := 15;
+    c_reminder_chunk_size CONSTANT NUMBER := 5000;
     
     -- Public procedure and function declarations
     FUNCTION validate_appointment_data(
@@ -51,6 +63,18 @@ CREATE OR REPLACE PACKAGE pkg_appointment_mgmt AS
         p_duration_minutes IN NUMBER DEFAULT c_default_appointment_duration
     ) RETURN t_time_slot_tab PIPELINED;
     
+    -- Slot grid for several providers over a date range in one call.
+    -- Pass NULL for p_provider_ids to include every active provider.
+    FUNCTION get_provider_slot_grid(
+        p_provider_ids IN SYS.ODCINUMBERLIST,
+        p_start_date IN DATE,
+        p_end_date IN DATE,
+        p_duration_minutes IN NUMBER DEFAULT c_default_appointment_duration
+    ) RETURN t_slot_grid_tab PIPELINED;
+    
+    -- Bookable minutes in a provider's working day (business hours)
+    FUNCTION get_daily_capacity_minutes RETURN NUMBER DETERMINISTIC;
+    
     PROCEDURE schedule_appointment(
         p_patient_id IN NUMBER,
         p_provider_id IN NUMBER,
@@ -94,11 +118,79 @@ CREATE OR REPLACE PACKAGE pkg_appointment_mgmt AS
         p_appointment_id IN NUMBER
     );
     
+    -- Queue PENDING email reminders for every Scheduled/Confirmed appointment
+    -- dated p_from_date .. p_to_date (whole days) that has no email reminder
+    -- yet. Inserts and commits p_chunk_size rows at a time; scripts/reminder-worker.py
+    -- sends them. Reminders queued meanwhile by a concurrent run are skipped
+    -- (idx_reminders_appointment is unique). Returns the number of reminders queued.
+    FUNCTION queue_appointment_reminders(
+        p_from_date IN DATE DEFAULT TRUNC(SYSDATE) + 1,
+        p_to_date IN DATE DEFAULT TRUNC(SYSDATE) + 1,
+        p_chunk_size IN NUMBER DEFAULT c_reminder_chunk_size
+    ) RETURN NUMBER;
+    
 END pkg_appointment_mgmt;
 /
 
 CREATE OR REPLACE PACKAGE BODY pkg_appointment_mgmt AS
 
+    -- Slot grid for a set of providers and days. Each provider's appointments
+    -- for the range are read once and every 15-minute slot is resolved in the
+    -- same pass: a slot is unavailable when any active appointment overlaps
+    -- [slot, slot + duration), and appointment_id is the appointment that is
+    -- in progress at the slot start.
+    CURSOR c_slot_grid(
+        cp_provider_ids IN SYS.ODCINUMBERLIST,
+        cp_start_date IN DATE,
+        cp_end_date IN DATE,
+        cp_duration_minutes IN NUMBER
+    ) IS
+        WITH provider_list AS (
+            SELECT DISTINCT COLUMN_VALUE AS provider_id
+            FROM TABLE(cp_provider_ids)
+        ),
+        calendar AS (
+            SELECT TRUNC(cp_start_date) + LEVEL - 1 AS slot_date
+            FROM DUAL
+            CONNECT BY LEVEL <= TRUNC(cp_end_date) - TRUNC(cp_start_date) + 1
+        ),
+        slots AS (
+            SELECT c_business_start_hour * 60 + (LEVEL - 1) * c_slot_interval_minutes AS slot_minute
+            FROM DUAL
+            CONNECT BY LEVEL <= (c_business_end_hour - c_business_start_hour) * 60 / c_slot_interval_minutes
+        ),
+        booked AS (
+            SELECT a.provider_id,
+                   TRUNC(a.start_ts) AS appointment_date,
+                   a.appointment_id,
+                   ROUND((a.start_ts - TRUNC(a.start_ts)) * 24 * 60) AS start_minute,
+                   ROUND((a.end_ts - a.start_ts) * 24 * 60) AS duration_minutes
+            FROM appointments a
+            WHERE a.provider_id IN (SELECT provider_id FROM provider_list)
+              AND a.start_ts >= TRUNC(cp_start_date)
+              AND a.start_ts < TRUNC(cp_end_date) + 1
+              AND a.status NOT IN ('Cancelled', 'No Show')
+        )
+        SELECT pl.provider_id,
+               cal.slot_date,
+               LPAD(TRUNC(s.slot_minute / 60), 2, '0') || ':' || LPAD(MOD(s.slot_minute, 60), 2, '0') AS time_slot,
+               CASE WHEN COUNT(b.appointment_id) = 0 THEN 'Y' ELSE 'N' END AS is_available,
+               MIN(CASE 
+                       WHEN b.start_minute <= s.slot_minute
+                        AND b.start_minute + b.duration_minutes > s.slot_minute
+                       THEN b.appointment_id
+                   END) AS appointment_id
+        FROM provider_list pl
+        CROSS JOIN calendar cal
+        CROSS JOIN slots s
+        LEFT JOIN booked b
+               ON b.provider_id = pl.provider_id
+              AND b.appointment_date = cal.slot_date
+              AND b.start_minute < s.slot_minute + NVL(cp_duration_minutes, c_default_appointment_duration)
+              AND b.start_minute + b.duration_minutes > s.slot_minute
+        GROUP BY pl.provider_id, cal.slot_date, s.slot_minute
+        ORDER BY pl.provider_id, cal.slot_date, s.slot_minute;
+
     FUNCTION validate_appointment_data(
         p_patient_id IN NUMBER,
         p_provider_id IN NUMBER,
@@ -179,21 +271,21 @@ CREATE OR REPLACE PACKAGE BODY pkg_appointment_mgmt AS
         l_start_time := TO_DATE(TO_CHAR(p_appointment_date, 'YYYY-MM-DD') || ' ' || p_appointment_time, 'YYYY-MM-DD HH24:MI');
         l_end_time := l_start_time + (p_duration_minutes / (24 * 60));
         
-        -- Check for conflicting appointments
+        -- Appointments cannot run past midnight (chk_appointments_same_day)
+        IF l_end_time > TRUNC(l_start_time) + 1 THEN
+            RETURN FALSE;
+        END IF;
+        
+        -- Check for conflicting appointments with a range probe on (provider_id, start_ts, end_ts)
         SELECT COUNT(*)
         INTO l_count
         FROM appointments a
         WHERE a.provider_id = p_provider_id
-          AND a.appointment_date = p_appointment_date
+          AND a.start_ts >= TRUNC(l_start_time) -- no appointment spans midnight
+          AND a.start_ts < l_end_time
+          AND a.end_ts > l_start_time
           AND a.status NOT IN ('Cancelled', 'No Show')
-          AND (p_exclude_appointment_id IS NULL OR a.appointment_id != p_exclude_appointment_id)
-          AND (
-              -- New appointment overlaps with existing appointment
-              (TO_DATE(TO_CHAR(a.appointment_date, 'YYYY-MM-DD') || ' ' || a.appointment_time, 'YYYY-MM-DD HH24:MI') < l_end_time
-               AND 
-               TO_DATE(TO_CHAR(a.appointment_date, 'YYYY-MM-DD') || ' ' || a.appointment_time, 'YYYY-MM-DD HH24:MI') + 
-               (NVL(a.duration_minutes, c_default_appointment_duration) / (24 * 60)) > l_start_time)
-          );
+          AND (p_exclude_appointment_id IS NULL OR a.appointment_id != p_exclude_appointment_id);
         
         RETURN l_count = 0;
     END is_time_slot_available;
@@ -205,49 +297,61 @@ CREATE OR REPLACE PACKAGE BODY pkg_appointment_mgmt AS
     ) RETURN t_time_slot_tab PIPELINED IS
         
         l_slot t_time_slot_rec;
-        l_time_slot VARCHAR2(10);
-        l_hour NUMBER;
-        l_minute NUMBER;
         
     BEGIN
-        -- Generate 15-minute time slots during business hours
-        FOR l_hour IN c_business_start_hour..(c_business_end_hour - 1) LOOP
-            FOR l_minute IN 0..3 LOOP -- 0, 15, 30, 45 minutes
-                l_time_slot := LPAD(l_hour, 2, '0') || ':' || LPAD(l_minute * 15, 2, '0');
-                
-                l_slot.time_slot := l_time_slot;
-                l_slot.is_available := CASE 
-                    WHEN is_time_slot_available(p_provider_id, p_appointment_date, l_time_slot, p_duration_minutes) 
-                    THEN 'Y' 
-                    ELSE 'N' 
-                END;
-                
-                -- Get appointment ID if slot is occupied
-                IF l_slot.is_available = 'N' THEN
-                    BEGIN
-                        SELECT appointment_id
-                        INTO l_slot.appointment_id
-                        FROM appointments
-                        WHERE provider_id = p_provider_id
-                          AND appointment_date = p_appointment_date
-                          AND appointment_time = l_time_slot
-                          AND status NOT IN ('Cancelled', 'No Show')
-                          AND ROWNUM = 1;
-                    EXCEPTION
-                        WHEN NO_DATA_FOUND THEN
-                            l_slot.appointment_id := NULL;
-                    END;
-                ELSE
-                    l_slot.appointment_id := NULL;
-                END IF;
-                
-                PIPE ROW(l_slot);
-            END LOOP;
+        FOR rec IN c_slot_grid(SYS.ODCINUMBERLIST(p_provider_id), p_appointment_date,
+                               p_appointment_date, p_duration_minutes) LOOP
+            l_slot.time_slot := rec.time_slot;
+            l_slot.is_available := rec.is_available;
+            l_slot.appointment_id := rec.appointment_id;
+            
+            PIPE ROW(l_slot);
         END LOOP;
         
         RETURN;
     END get_available_time_slots;
 
+    FUNCTION get_provider_slot_grid(
+        p_provider_ids IN SYS.ODCINUMBERLIST,
+        p_start_date IN DATE,
+        p_end_date IN DATE,
+        p_duration_minutes IN NUMBER DEFAULT c_default_appointment_duration
+    ) RETURN t_slot_grid_tab PIPELINED IS
+        
+        l_slot t_slot_grid_rec;
+        l_provider_ids SYS.ODCINUMBERLIST := p_provider_ids;
+        
+    BEGIN
+        IF p_start_date IS NULL OR p_end_date IS NULL OR p_end_date < p_start_date THEN
+            RAISE_APPLICATION_ERROR(-20006, 'Invalid slot grid date range');
+        END IF;
+        
+        -- Default to every active provider
+        IF l_provider_ids IS NULL THEN
+            SELECT provider_id
+            BULK COLLECT INTO l_provider_ids
+            FROM providers
+            WHERE is_active = 'Y';
+        END IF;
+        
+        FOR rec IN c_slot_grid(l_provider_ids, p_start_date, p_end_date, p_duration_minutes) LOOP
+            l_slot.provider_id := rec.provider_id;
+            l_slot.slot_date := rec.slot_date;
+            l_slot.time_slot := rec.time_slot;
+            l_slot.is_available := rec.is_available;
+            l_slot.appointment_id := rec.appointment_id;
+            
+            PIPE ROW(l_slot);
+        END LOOP;
+        
+        RETURN;
+    END get_provider_slot_grid;
+
+    FUNCTION get_daily_capacity_minutes RETURN NUMBER DETERMINISTIC IS
+    BEGIN
+        RETURN (c_business_end_hour - c_business_start_hour) * 60;
+    END get_daily_capacity_minutes;
+
     PROCEDURE schedule_appointment(
         p_patient_id IN NUMBER,
         p_provider_id IN NUMBER,
@@ -530,10 +634,101 @@ CREATE OR REPLACE PACKAGE BODY pkg_appointment_mgmt AS
     EXCEPTION
         WHEN NO_DATA_FOUND THEN
             RAISE_APPLICATION_ERROR(-20003, 'Appointment not found or not eligible for reminder');
+        WHEN DUP_VAL_ON_INDEX THEN
+            -- Already queued or sent; one email reminder per appointment
+            ROLLBACK;
         WHEN OTHERS THEN
             ROLLBACK;
             RAISE;
     END send_appointment_reminder;
 
+    FUNCTION queue_appointment_reminders(
+        p_from_date IN DATE DEFAULT TRUNC(SYSDATE) + 1,
+        p_to_date IN DATE DEFAULT TRUNC(SYSDATE) + 1,
+        p_chunk_size IN NUMBER DEFAULT c_reminder_chunk_size
+    ) RETURN NUMBER IS
+        -- One pass over the window; appointments already reminded are
+        -- skipped through idx_reminders_appointment
+        CURSOR c_due IS
+            SELECT a.appointment_id,
+                   p.email,
+                   'Reminder: You have an appointment with ' ||
+                   pkg_patient_mgmt.get_full_name(pr.first_name, pr.last_name) ||
+                   ' on ' || TO_CHAR(a.appointment_date, 'MM/DD/YYYY') ||
+                   ' at ' || a.appointment_time as message
+            FROM appointments a
+            JOIN patients p ON a.patient_id = p.patient_id
+            JOIN providers pr ON a.provider_id = pr.provider_id
+            WHERE a.appointment_date >= TRUNC(p_from_date)
+              AND a.appointment_date < TRUNC(p_to_date) + 1
+              AND a.status IN ('Scheduled', 'Confirmed')
+              AND p.email IS NOT NULL
+              AND NOT EXISTS (
+                  SELECT 1
+                  FROM appointment_reminders r
+                  WHERE r.appointment_id = a.appointment_id
+                    AND r.reminder_type = 'EMAIL'
+              );
+        
+        TYPE t_due_tab IS TABLE OF c_due%ROWTYPE;
+        
+        e_bulk_errors EXCEPTION;
+        PRAGMA EXCEPTION_INIT(e_bulk_errors, -24381);
+        
+        l_due t_due_tab;
+        l_queued NUMBER := 0;
+        l_skipped NUMBER;
+    BEGIN
+        OPEN c_due;
+        LOOP
+            FETCH c_due BULK COLLECT INTO l_due LIMIT NVL(p_chunk_size, c_reminder_chunk_size);
+            EXIT WHEN l_due.COUNT = 0;
+            
+            l_skipped := 0;
+            BEGIN
+                FORALL i IN 1 .. l_due.COUNT SAVE EXCEPTIONS
+                    INSERT INTO appointment_reminders (
+                        appointment_id,
+                        reminder_type,
+                        recipient_email,
+                        message,
+                        status
+                    ) VALUES (
+                        l_due(i).appointment_id,
+                        'EMAIL',
+                        l_due(i).email,
+                        l_due(i).message,
+                        'PENDING'
+                    );
+            EXCEPTION
+                WHEN e_bulk_errors THEN
+                    -- Rows a concurrent run queued after the anti-join read are
+                    -- skipped; anything else fails the run
+                    FOR j IN 1 .. SQL%BULK_EXCEPTIONS.COUNT LOOP
+                        IF SQL%BULK_EXCEPTIONS(j).ERROR_CODE != 1 THEN
+                            RAISE_APPLICATION_ERROR(-20009, 'Could not queue reminder for appointment ' ||
+                                l_due(SQL%BULK_EXCEPTIONS(j).ERROR_INDEX).appointment_id || ': ' ||
+                                SQLERRM(-SQL%BULK_EXCEPTIONS(j).ERROR_CODE));
+                        END IF;
+                    END LOOP;
+                    l_skipped := SQL%BULK_EXCEPTIONS.COUNT;
+            END;
+            
+            -- Commit per chunk so a long window does not hold one large transaction
+            COMMIT;
+            l_queued := l_queued + l_due.COUNT - l_skipped;
+        END LOOP;
+        CLOSE c_due;
+        
+        RETURN l_queued;
+    EXCEPTION
+        WHEN OTHERS THEN
+            IF c_due%ISOPEN THEN
+                CLOSE c_due;
+            END IF;
+            ROLLBACK;
+            RAISE;
+    END queue_appointment_reminders;
+
 END pkg_appointment_mgmt;
 /
@@ -0,0 +1,175 @@
+-- Healthcare System PL/SQL Package
+-- Audit Capture for the Clinical Trials Triggers
+
+CREATE OR REPLACE PACKAGE pkg_audit_mgmt AS
+    -- Capture modes (audit_capture_settings.capture_mode)
+    c_mode_sync   CONSTANT VARCHAR2(10) := 'SYNC';    -- triggers insert into audit_log
+    c_mode_queued CONSTANT VARCHAR2(10) := 'QUEUED';  -- triggers insert into audit_log_queue
+
+    c_default_batch_size CONSTANT NUMBER := 1000;
+
+    -- Current capture mode; result-cached, so triggers do not re-read the
+    -- settings row on every change
+    FUNCTION get_capture_mode RETURN VARCHAR2 RESULT_CACHE;
+
+    -- Switch between SYNC and QUEUED. Records already queued are still
+    -- drained after switching back to SYNC.
+    PROCEDURE set_capture_mode(p_mode IN VARCHAR2);
+
+    -- Record one change from a trigger, in the caller's transaction
+    PROCEDURE log_change(
+        p_table_name IN VARCHAR2,
+        p_operation_type IN VARCHAR2,
+        p_record_id IN NUMBER,
+        p_old_values IN VARCHAR2,
+        p_new_values IN VARCHAR2,
+        p_changed_by IN VARCHAR2,
+        p_changed_date IN DATE
+    );
+
+    -- Move queued records into audit_log in batches until the queue is empty.
+    -- Each batch is inserted and dequeued in one transaction; concurrent
+    -- drainers skip each other's locked rows. Returns the rows moved.
+    FUNCTION drain_audit_queue(p_batch_size IN NUMBER DEFAULT c_default_batch_size) RETURN NUMBER;
+
+    -- Seconds the oldest queued record has been waiting (0 when the queue is empty)
+    FUNCTION get_queue_lag RETURN NUMBER;
+
+END pkg_audit_mgmt;
+/
+
+CREATE OR REPLACE PACKAGE BODY pkg_audit_mgmt AS
+
+    FUNCTION get_capture_mode RETURN VARCHAR2 RESULT_CACHE IS
+        l_mode audit_capture_settings.capture_mode%TYPE;
+    BEGIN
+        SELECT capture_mode
+        INTO l_mode
+        FROM audit_capture_settings
+        WHERE setting_id = 1;
+
+        RETURN l_mode;
+    EXCEPTION
+        WHEN NO_DATA_FOUND THEN
+            RETURN c_mode_sync;
+    END get_capture_mode;
+
+    PROCEDURE set_capture_mode(p_mode IN VARCHAR2) IS
+    BEGIN
+        IF UPPER(p_mode) NOT IN (c_mode_sync, c_mode_queued) THEN
+            RAISE_APPLICATION_ERROR(-20008, 'Invalid audit capture mode: ' || p_mode);
+        END IF;
+
+        MERGE INTO audit_capture_settings s
+        USING (SELECT 1 as setting_id FROM dual) src
+        ON (s.setting_id = src.setting_id)
+        WHEN MATCHED THEN UPDATE
+        SET s.capture_mode = UPPER(p_mode),
+            s.modified_date = SYSDATE,
+            s.modified_by = USER
+        WHEN NOT MATCHED THEN INSERT (setting_id, capture_mode)
+        VALUES (1, UPPER(p_mode));
+
+        COMMIT;
+    EXCEPTION
+        WHEN OTHERS THEN
+            ROLLBACK;
+            RAISE;
+    END set_capture_mode;
+
+    PROCEDURE log_change(
+        p_table_name IN VARCHAR2,
+        p_operation_type IN VARCHAR2,
+        p_record_id IN NUMBER,
+        p_old_values IN VARCHAR2,
+        p_new_values IN VARCHAR2,
+        p_changed_by IN VARCHAR2,
+        p_changed_date IN DATE
+    ) IS
+    BEGIN
+        -- No COMMIT here: the record commits or rolls back with the change
+        IF get_capture_mode = c_mode_queued THEN
+            INSERT INTO audit_log_queue (
+                table_name, operation_type, record_id,
+                old_values, new_values, changed_by, changed_date
+            ) VALUES (
+                p_table_name, p_operation_type, p_record_id,
+                p_old_values, p_new_values, p_changed_by, NVL(p_changed_date, SYSDATE)
+            );
+        ELSE
+            INSERT INTO audit_log (
+                table_name, operation_type, record_id,
+                old_values, new_values, changed_by, changed_date
+            ) VALUES (
+                p_table_name, p_operation_type, p_record_id,
+                p_old_values, p_new_values, p_changed_by, NVL(p_changed_date, SYSDATE)
+            );
+        END IF;
+    END log_change;
+
+    FUNCTION drain_audit_queue(p_batch_size IN NUMBER DEFAULT c_default_batch_size) RETURN NUMBER IS
+        CURSOR c_queue IS
+            SELECT q.table_name, q.operation_type, q.record_id, q.old_values, q.new_values,
+                   q.changed_by, q.changed_date, q.ROWID as row_id
+            FROM audit_log_queue q
+            FOR UPDATE SKIP LOCKED;
+
+        TYPE t_queue_tab IS TABLE OF c_queue%ROWTYPE;
+
+        l_rows t_queue_tab;
+        l_moved NUMBER := 0;
+    BEGIN
+        LOOP
+            -- Reopened per batch: the COMMIT below closes a FOR UPDATE cursor
+            OPEN c_queue;
+            FETCH c_queue BULK COLLECT INTO l_rows LIMIT NVL(p_batch_size, c_default_batch_size);
+            CLOSE c_queue;
+
+            EXIT WHEN l_rows.COUNT = 0;
+
+            FORALL i IN 1 .. l_rows.COUNT
+                INSERT INTO audit_log (
+                    table_name, operation_type, record_id,
+                    old_values, new_values, changed_by, changed_date, logged_date
+                ) VALUES (
+                    l_rows(i).table_name, l_rows(i).operation_type, l_rows(i).record_id,
+                    l_rows(i).old_values, l_rows(i).new_values, l_rows(i).changed_by,
+                    l_rows(i).changed_date, SYSDATE
+                );
+
+            FORALL i IN 1 .. l_rows.COUNT
+                DELETE FROM audit_log_queue
+                WHERE ROWID = l_rows(i).row_id;
+
+            COMMIT;
+            l_moved := l_moved + l_rows.COUNT;
+
+            EXIT WHEN l_rows.COUNT < NVL(p_batch_size, c_default_batch_size);
+        END LOOP;
+
+        RETURN l_moved;
+    EXCEPTION
+        WHEN OTHERS THEN
+            IF c_queue%ISOPEN THEN
+                CLOSE c_queue;
+            END IF;
+            ROLLBACK;
+            RAISE;
+    END drain_audit_queue;
+
+    FUNCTION get_queue_lag RETURN NUMBER IS
+        l_oldest TIMESTAMP;
+    BEGIN
+        SELECT MIN(queued_ts)
+        INTO l_oldest
+        FROM audit_log_queue;
+
+        IF l_oldest IS NULL THEN
+            RETURN 0;
+        END IF;
+
+        RETURN ROUND((CAST(SYSTIMESTAMP AS DATE) - CAST(l_oldest AS DATE)) * 86400);
+    END get_queue_lag;
+
+END pkg_audit_mgmt;
+/
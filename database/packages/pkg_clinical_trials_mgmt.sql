@@ -24,6 +24,25 @@ CREATE OR REPLACE PACKAGE pkg_clinical_trials_mgmt AS
     
     TYPE t_trial_summary_tab IS TABLE OF t_trial_summary;
     
+    TYPE t_enrollment_request IS RECORD (
+        patient_id NUMBER,
+        study_arm VARCHAR2(100),
+        assigned_provider_id NUMBER,
+        randomization_code VARCHAR2(50)
+    );
+    
+    TYPE t_enrollment_request_tab IS TABLE OF t_enrollment_request;
+    
+    TYPE t_enrollment_result IS RECORD (
+        request_index NUMBER,
+        patient_id NUMBER,
+        participant_id NUMBER,
+        status VARCHAR2(20), -- ENROLLED, REJECTED, FAILED
+        error_message VARCHAR2(4000)
+    );
+    
+    TYPE t_enrollment_result_tab IS TABLE OF t_enrollment_result;
+    
     -- Trial management functions
     FUNCTION create_trial(
         p_trial_name VARCHAR2,
@@ -62,6 +81,16 @@ CREATE OR REPLACE PACKAGE pkg_clinical_trials_mgmt AS
         p_randomization_code VARCHAR2 DEFAULT NULL
     ) RETURN NUMBER;
     
+    -- Enroll a batch of patients in one call: eligibility is checked in a
+    -- single pass, rows are inserted with FORALL ... SAVE EXCEPTIONS and the
+    -- batch is committed once. Capacity is given out in request order; a row
+    -- that fails its insert frees its place for the next request turned away
+    -- by the enrollment limit. Returns one result per request, in order.
+    FUNCTION enroll_participants_bulk(
+        p_trial_id NUMBER,
+        p_requests t_enrollment_request_tab
+    ) RETURN t_enrollment_result_tab;
+    
     FUNCTION withdraw_participant(
         p_participant_id NUMBER,
         p_withdrawal_reason VARCHAR2,
@@ -146,6 +175,13 @@ CREATE OR REPLACE PACKAGE pkg_clinical_trials_mgmt AS
         p_trial_id NUMBER
     ) RETURN SYS_REFCURSOR;
     
+    -- get_trial_statistics for many trials in one call, with trial_id as the
+    -- first column (when p_trial_ids is NULL, the Active and Recruiting trials
+    -- that get_active_trials returns)
+    FUNCTION get_portfolio_statistics(
+        p_trial_ids SYS.ODCINUMBERLIST DEFAULT NULL
+    ) RETURN SYS_REFCURSOR;
+    
     FUNCTION get_enrollment_report(
         p_start_date DATE DEFAULT TRUNC(SYSDATE, 'MM'),
         p_end_date DATE DEFAULT SYSDATE
@@ -157,6 +193,11 @@ CREATE OR REPLACE PACKAGE pkg_clinical_trials_mgmt AS
         p_end_date DATE DEFAULT SYSDATE
     ) RETURN SYS_REFCURSOR;
     
+    -- Recompute trial_dashboard_metrics (all trials when p_trial_id is NULL)
+    PROCEDURE refresh_trial_metrics(
+        p_trial_id NUMBER DEFAULT NULL
+    );
+    
 END pkg_clinical_trials_mgmt;
 /
 
@@ -331,11 +372,7 @@ CREATE OR REPLACE PACKAGE BODY pkg_clinical_trials_mgmt AS
             p_trial_id, p_patient_id, p_study_arm, p_assigned_provider_id, p_randomization_code
         ) RETURNING participant_id INTO v_participant_id;
         
-        -- Update trial enrollment count
-        UPDATE clinical_trials 
-        SET current_enrollment = current_enrollment + 1
-        WHERE trial_id = p_trial_id;
-        
+        -- current_enrollment is maintained by trg_update_trial_enrollment
         COMMIT;
         RETURN v_participant_id;
         
@@ -349,6 +386,166 @@ CREATE OR REPLACE PACKAGE BODY pkg_clinical_trials_mgmt AS
             RAISE;
     END enroll_participant;
     
+    -- Enroll a batch of participants
+    FUNCTION enroll_participants_bulk(
+        p_trial_id NUMBER,
+        p_requests t_enrollment_request_tab
+    ) RETURN t_enrollment_result_tab IS
+        TYPE t_check_rec IS RECORD (
+            request_index NUMBER,
+            patient_id NUMBER,
+            study_arm VARCHAR2(100),
+            assigned_provider_id NUMBER,
+            randomization_code VARCHAR2(50),
+            rejection_reason VARCHAR2(200)
+        );
+        TYPE t_check_tab IS TABLE OF t_check_rec;
+        TYPE t_number_tab IS TABLE OF NUMBER INDEX BY PLS_INTEGER;
+        TYPE t_arm_tab IS TABLE OF VARCHAR2(100) INDEX BY PLS_INTEGER;
+        TYPE t_code_tab IS TABLE OF VARCHAR2(50) INDEX BY PLS_INTEGER;
+        
+        e_bulk_errors EXCEPTION;
+        PRAGMA EXCEPTION_INIT(e_bulk_errors, -24381);
+        
+        v_results t_enrollment_result_tab := t_enrollment_result_tab();
+        v_checks t_check_tab;
+        v_trial_status VARCHAR2(20);
+        v_remaining_capacity NUMBER;
+        v_count PLS_INTEGER;
+        v_enrolled PLS_INTEGER := 0;
+        v_failed PLS_INTEGER;
+        v_next PLS_INTEGER := 1;
+        v_error_index PLS_INTEGER;
+        
+        -- Rows that passed validation, bound to the FORALL insert
+        v_result_index t_number_tab;
+        v_participant_ids t_number_tab;
+        v_patient_ids t_number_tab;
+        v_provider_ids t_number_tab;
+        v_study_arms t_arm_tab;
+        v_randomization_codes t_code_tab;
+    BEGIN
+        IF p_requests IS NULL OR p_requests.COUNT = 0 THEN
+            RETURN v_results;
+        END IF;
+        
+        -- Lock the trial row so concurrent batches cannot overshoot the target
+        SELECT status, target_enrollment - current_enrollment
+        INTO v_trial_status, v_remaining_capacity
+        FROM clinical_trials
+        WHERE trial_id = p_trial_id
+        FOR UPDATE;
+        
+        IF v_trial_status NOT IN ('Active', 'Recruiting') THEN
+            RAISE trial_not_recruiting;
+        END IF;
+        
+        -- Set-based eligibility check for the whole batch
+        SELECT r.request_index,
+               r.patient_id,
+               r.study_arm,
+               r.assigned_provider_id,
+               r.randomization_code,
+               CASE 
+                   WHEN r.patient_id IS NULL THEN 'Patient ID is required'
+                   WHEN tp.participant_id IS NOT NULL THEN 'Patient already enrolled in trial'
+                   WHEN r.duplicate_rank > 1 THEN 'Duplicate patient in request'
+               END
+        BULK COLLECT INTO v_checks
+        FROM (
+            SELECT rq.*,
+                   ROW_NUMBER() OVER (PARTITION BY rq.patient_id ORDER BY rq.request_index) as duplicate_rank
+            FROM (
+                SELECT ROWNUM as request_index, t.patient_id, t.study_arm,
+                       t.assigned_provider_id, t.randomization_code
+                FROM TABLE(p_requests) t
+            ) rq
+        ) r
+        LEFT JOIN trial_participants tp ON tp.trial_id = p_trial_id
+            AND tp.patient_id = r.patient_id
+        ORDER BY r.request_index;
+        
+        v_results.EXTEND(v_checks.COUNT);
+        
+        FOR i IN 1 .. v_checks.COUNT LOOP
+            v_results(i).request_index := v_checks(i).request_index;
+            v_results(i).patient_id := v_checks(i).patient_id;
+            
+            IF v_checks(i).rejection_reason IS NOT NULL THEN
+                v_results(i).status := 'REJECTED';
+                v_results(i).error_message := v_checks(i).rejection_reason;
+            END IF;
+        END LOOP;
+        
+        -- Fill the remaining capacity in request order. Rows that fail their
+        -- insert free their place, so the next eligible requests get another round.
+        LOOP
+            v_count := 0;
+            WHILE v_next <= v_checks.COUNT
+                  AND (v_remaining_capacity IS NULL OR v_enrolled + v_count < v_remaining_capacity) LOOP
+                IF v_checks(v_next).rejection_reason IS NULL THEN
+                    v_count := v_count + 1;
+                    v_result_index(v_count) := v_next;
+                    v_participant_ids(v_count) := seq_participant_id.NEXTVAL;
+                    v_patient_ids(v_count) := v_checks(v_next).patient_id;
+                    v_provider_ids(v_count) := v_checks(v_next).assigned_provider_id;
+                    v_study_arms(v_count) := v_checks(v_next).study_arm;
+                    v_randomization_codes(v_count) := v_checks(v_next).randomization_code;
+                    
+                    v_results(v_next).participant_id := v_participant_ids(v_count);
+                    v_results(v_next).status := 'ENROLLED';
+                END IF;
+                v_next := v_next + 1;
+            END LOOP;
+            
+            EXIT WHEN v_count = 0;
+            
+            -- Insert the round's rows; constraint failures are reported per row
+            v_failed := 0;
+            BEGIN
+                FORALL i IN 1 .. v_count SAVE EXCEPTIONS
+                    INSERT INTO trial_participants (
+                        participant_id, trial_id, patient_id, study_arm,
+                        assigned_provider_id, randomization_code
+                    ) VALUES (
+                        v_participant_ids(i), p_trial_id, v_patient_ids(i), v_study_arms(i),
+                        v_provider_ids(i), v_randomization_codes(i)
+                    );
+            EXCEPTION
+                WHEN e_bulk_errors THEN
+                    FOR j IN 1 .. SQL%BULK_EXCEPTIONS.COUNT LOOP
+                        v_error_index := v_result_index(SQL%BULK_EXCEPTIONS(j).ERROR_INDEX);
+                        v_results(v_error_index).participant_id := NULL;
+                        v_results(v_error_index).status := 'FAILED';
+                        v_results(v_error_index).error_message := SQLERRM(-SQL%BULK_EXCEPTIONS(j).ERROR_CODE);
+                    END LOOP;
+                    v_failed := SQL%BULK_EXCEPTIONS.COUNT;
+            END;
+            
+            v_enrolled := v_enrolled + v_count - v_failed;
+            EXIT WHEN v_failed = 0;
+        END LOOP;
+        
+        -- Whatever is left did not fit in the trial's capacity
+        FOR i IN v_next .. v_checks.COUNT LOOP
+            IF v_checks(i).rejection_reason IS NULL THEN
+                v_results(i).status := 'REJECTED';
+                v_results(i).error_message := 'Trial enrollment limit reached';
+            END IF;
+        END LOOP;
+        
+        -- current_enrollment is recounted once by trg_update_trial_enrollment
+        COMMIT;
+        RETURN v_results;
+        
+    EXCEPTION
+        WHEN NO_DATA_FOUND THEN
+            RAISE trial_not_found;
+        WHEN OTHERS THEN
+            ROLLBACK;
+            RAISE;
+    END enroll_participants_bulk;
+    
     -- Check enrollment eligibility (simplified)
     FUNCTION check_enrollment_eligibility(
         p_trial_id NUMBER,
@@ -378,14 +575,9 @@ CREATE OR REPLACE PACKAGE BODY pkg_clinical_trials_mgmt AS
         p_withdrawal_reason VARCHAR2,
         p_withdrawal_date DATE DEFAULT SYSDATE
     ) RETURN BOOLEAN IS
-        v_trial_id NUMBER;
     BEGIN
-        -- Get trial ID for enrollment count update
-        SELECT trial_id INTO v_trial_id
-        FROM trial_participants
-        WHERE participant_id = p_participant_id;
-        
-        -- Update participant status
+        -- Update participant status; current_enrollment is maintained by
+        -- trg_update_trial_enrollment
         UPDATE trial_participants
         SET status = 'Withdrawn',
             withdrawal_reason = p_withdrawal_reason,
@@ -394,17 +586,14 @@ CREATE OR REPLACE PACKAGE BODY pkg_clinical_trials_mgmt AS
             modified_by = USER
         WHERE participant_id = p_participant_id;
         
-        -- Update trial enrollment count
-        UPDATE clinical_trials
-        SET current_enrollment = current_enrollment - 1
-        WHERE trial_id = v_trial_id;
+        IF SQL%ROWCOUNT = 0 THEN
+            RETURN FALSE;
+        END IF;
         
         COMMIT;
         RETURN TRUE;
         
     EXCEPTION
-        WHEN NO_DATA_FOUND THEN
-            RETURN FALSE;
         WHEN OTHERS THEN
             ROLLBACK;
             RETURN FALSE;
@@ -686,6 +875,10 @@ CREATE OR REPLACE PACKAGE BODY pkg_clinical_trials_mgmt AS
     END complete_milestone;
     
     -- Get trial statistics
+    -- Participants, visits and adverse events are counted in separate
+    -- aggregates and joined one row each, instead of joining the detail
+    -- rows (participants x visits x events) and de-duplicating.
+    -- Visits and events are attributed to a trial through their participant.
     FUNCTION get_trial_statistics(
         p_trial_id NUMBER
     ) RETURN SYS_REFCURSOR IS
@@ -699,22 +892,108 @@ CREATE OR REPLACE PACKAGE BODY pkg_clinical_trials_mgmt AS
                 ct.current_enrollment,
                 ct.target_enrollment,
                 ROUND((ct.current_enrollment / NULLIF(ct.target_enrollment, 0)) * 100, 1) as enrollment_percentage,
-                COUNT(DISTINCT tp.participant_id) as total_participants,
-                COUNT(DISTINCT CASE WHEN tp.status = 'Active' THEN tp.participant_id END) as active_participants,
-                COUNT(DISTINCT tv.visit_id) as total_visits,
-                COUNT(DISTINCT CASE WHEN tv.status = 'Completed' THEN tv.visit_id END) as completed_visits,
-                COUNT(DISTINCT ae.adverse_event_id) as total_adverse_events,
-                COUNT(DISTINCT CASE WHEN ae.serious = 'Y' THEN ae.adverse_event_id END) as serious_adverse_events
+                NVL(p.total_participants, 0) as total_participants,
+                NVL(p.active_participants, 0) as active_participants,
+                NVL(v.total_visits, 0) as total_visits,
+                NVL(v.completed_visits, 0) as completed_visits,
+                NVL(a.total_adverse_events, 0) as total_adverse_events,
+                NVL(a.serious_adverse_events, 0) as serious_adverse_events
             FROM clinical_trials ct
-            LEFT JOIN trial_participants tp ON ct.trial_id = tp.trial_id
-            LEFT JOIN trial_visits tv ON tp.participant_id = tv.participant_id
-            LEFT JOIN adverse_events ae ON tp.participant_id = ae.participant_id
-            WHERE ct.trial_id = p_trial_id
-            GROUP BY ct.trial_name, ct.status, ct.phase, ct.current_enrollment, ct.target_enrollment;
+            CROSS JOIN (
+                SELECT COUNT(*) as total_participants,
+                       COUNT(CASE WHEN tp.status = 'Active' THEN 1 END) as active_participants
+                FROM trial_participants tp
+                WHERE tp.trial_id = p_trial_id
+            ) p
+            CROSS JOIN (
+                SELECT COUNT(*) as total_visits,
+                       COUNT(CASE WHEN tv.status = 'Completed' THEN 1 END) as completed_visits
+                FROM trial_visits tv
+                JOIN trial_participants tp ON tp.participant_id = tv.participant_id
+                WHERE tp.trial_id = p_trial_id
+            ) v
+            CROSS JOIN (
+                SELECT COUNT(*) as total_adverse_events,
+                       COUNT(CASE WHEN ae.serious = 'Y' THEN 1 END) as serious_adverse_events
+                FROM adverse_events ae
+                JOIN trial_participants tp ON tp.participant_id = ae.participant_id
+                WHERE tp.trial_id = p_trial_id
+            ) a
+            WHERE ct.trial_id = p_trial_id;
         
         RETURN v_cursor;
     END get_trial_statistics;
     
+    -- Get portfolio statistics
+    FUNCTION get_portfolio_statistics(
+        p_trial_ids SYS.ODCINUMBERLIST DEFAULT NULL
+    ) RETURN SYS_REFCURSOR IS
+        v_cursor SYS_REFCURSOR;
+        v_trial_ids SYS.ODCINUMBERLIST := p_trial_ids;
+    BEGIN
+        IF v_trial_ids IS NULL THEN
+            SELECT trial_id
+            BULK COLLECT INTO v_trial_ids
+            FROM clinical_trials
+            WHERE status IN ('Active', 'Recruiting');
+        END IF;
+        
+        -- One grouped pass per detail table over the requested trials
+        OPEN v_cursor FOR
+            WITH trial_ids AS (
+                SELECT DISTINCT COLUMN_VALUE as trial_id
+                FROM TABLE(v_trial_ids)
+            ),
+            participant_stats AS (
+                SELECT tp.trial_id,
+                       COUNT(*) as total_participants,
+                       COUNT(CASE WHEN tp.status = 'Active' THEN 1 END) as active_participants
+                FROM trial_participants tp
+                JOIN trial_ids t ON t.trial_id = tp.trial_id
+                GROUP BY tp.trial_id
+            ),
+            visit_stats AS (
+                SELECT tp.trial_id,
+                       COUNT(*) as total_visits,
+                       COUNT(CASE WHEN tv.status = 'Completed' THEN 1 END) as completed_visits
+                FROM trial_visits tv
+                JOIN trial_participants tp ON tp.participant_id = tv.participant_id
+                JOIN trial_ids t ON t.trial_id = tp.trial_id
+                GROUP BY tp.trial_id
+            ),
+            adverse_event_stats AS (
+                SELECT tp.trial_id,
+                       COUNT(*) as total_adverse_events,
+                       COUNT(CASE WHEN ae.serious = 'Y' THEN 1 END) as serious_adverse_events
+                FROM adverse_events ae
+                JOIN trial_participants tp ON tp.participant_id = ae.participant_id
+                JOIN trial_ids t ON t.trial_id = tp.trial_id
+                GROUP BY tp.trial_id
+            )
+            SELECT 
+                ct.trial_id,
+                ct.trial_name,
+                ct.status,
+                ct.phase,
+                ct.current_enrollment,
+                ct.target_enrollment,
+                ROUND((ct.current_enrollment / NULLIF(ct.target_enrollment, 0)) * 100, 1) as enrollment_percentage,
+                NVL(p.total_participants, 0) as total_participants,
+                NVL(p.active_participants, 0) as active_participants,
+                NVL(v.total_visits, 0) as total_visits,
+                NVL(v.completed_visits, 0) as completed_visits,
+                NVL(a.total_adverse_events, 0) as total_adverse_events,
+                NVL(a.serious_adverse_events, 0) as serious_adverse_events
+            FROM clinical_trials ct
+            JOIN trial_ids t ON t.trial_id = ct.trial_id
+            LEFT JOIN participant_stats p ON p.trial_id = ct.trial_id
+            LEFT JOIN visit_stats v ON v.trial_id = ct.trial_id
+            LEFT JOIN adverse_event_stats a ON a.trial_id = ct.trial_id
+            ORDER BY ct.trial_name;
+        
+        RETURN v_cursor;
+    END get_portfolio_statistics;
+    
     -- Get enrollment report
     FUNCTION get_enrollment_report(
         p_start_date DATE DEFAULT TRUNC(SYSDATE, 'MM'),
@@ -763,5 +1042,90 @@ CREATE OR REPLACE PACKAGE BODY pkg_clinical_trials_mgmt AS
         RETURN v_cursor;
     END get_adverse_events_summary;
     
+    -- Refresh trial dashboard metrics
+    PROCEDURE refresh_trial_metrics(
+        p_trial_id NUMBER DEFAULT NULL
+    ) IS
+    BEGIN
+        -- One grouped pass over each detail table
+        MERGE INTO trial_dashboard_metrics m
+        USING (
+            SELECT 
+                ct.trial_id,
+                NVL(tp.active_participants, 0) as active_participants,
+                NVL(tp.recent_enrollments, 0) as recent_enrollments,
+                NVL(tv.upcoming_visits_week, 0) as upcoming_visits_week,
+                NVL(tv.overdue_visits, 0) as overdue_visits,
+                NVL(ae.serious_adverse_events, 0) as serious_adverse_events,
+                NVL(ae.recent_adverse_events, 0) as recent_adverse_events,
+                NVL(ae.recent_serious_adverse_events, 0) as recent_serious_adverse_events,
+                NVL(tm.completed_milestones, 0) as completed_milestones,
+                NVL(tm.overdue_milestones, 0) as overdue_milestones
+            FROM clinical_trials ct
+            LEFT JOIN (
+                SELECT trial_id,
+                       COUNT(CASE WHEN status = 'Active' THEN 1 END) as active_participants,
+                       COUNT(CASE WHEN enrollment_date >= TRUNC(SYSDATE) - 30 THEN 1 END) as recent_enrollments
+                FROM trial_participants
+                WHERE p_trial_id IS NULL OR trial_id = p_trial_id
+                GROUP BY trial_id
+            ) tp ON tp.trial_id = ct.trial_id
+            LEFT JOIN (
+                SELECT trial_id,
+                       COUNT(CASE WHEN scheduled_date <= TRUNC(SYSDATE) + 7 THEN 1 END) as upcoming_visits_week,
+                       COUNT(CASE WHEN scheduled_date < TRUNC(SYSDATE) THEN 1 END) as overdue_visits
+                FROM trial_visits
+                WHERE status = 'Scheduled'
+                AND (p_trial_id IS NULL OR trial_id = p_trial_id)
+                GROUP BY trial_id
+            ) tv ON tv.trial_id = ct.trial_id
+            LEFT JOIN (
+                SELECT trial_id,
+                       COUNT(CASE WHEN serious = 'Y' THEN 1 END) as serious_adverse_events,
+                       COUNT(CASE WHEN event_date >= TRUNC(SYSDATE) - 30 THEN 1 END) as recent_adverse_events,
+                       COUNT(CASE WHEN serious = 'Y' AND event_date >= TRUNC(SYSDATE) - 30 THEN 1 END) as recent_serious_adverse_events
+                FROM adverse_events
+                WHERE p_trial_id IS NULL OR trial_id = p_trial_id
+                GROUP BY trial_id
+            ) ae ON ae.trial_id = ct.trial_id
+            LEFT JOIN (
+                SELECT trial_id,
+                       COUNT(CASE WHEN status = 'Completed' THEN 1 END) as completed_milestones,
+                       COUNT(CASE WHEN planned_date < TRUNC(SYSDATE) AND status != 'Completed' THEN 1 END) as overdue_milestones
+                FROM trial_milestones
+                WHERE p_trial_id IS NULL OR trial_id = p_trial_id
+                GROUP BY trial_id
+            ) tm ON tm.trial_id = ct.trial_id
+            WHERE p_trial_id IS NULL OR ct.trial_id = p_trial_id
+        ) src
+        ON (m.trial_id = src.trial_id)
+        WHEN MATCHED THEN UPDATE SET
+            m.active_participants = src.active_participants,
+            m.recent_enrollments = src.recent_enrollments,
+            m.upcoming_visits_week = src.upcoming_visits_week,
+            m.overdue_visits = src.overdue_visits,
+            m.serious_adverse_events = src.serious_adverse_events,
+            m.recent_adverse_events = src.recent_adverse_events,
+            m.recent_serious_adverse_events = src.recent_serious_adverse_events,
+            m.completed_milestones = src.completed_milestones,
+            m.overdue_milestones = src.overdue_milestones,
+            m.refreshed_date = SYSDATE
+        WHEN NOT MATCHED THEN INSERT (
+            trial_id, active_participants, recent_enrollments, upcoming_visits_week,
+            overdue_visits, serious_adverse_events, recent_adverse_events,
+            recent_serious_adverse_events, completed_milestones, overdue_milestones
+        ) VALUES (
+            src.trial_id, src.active_participants, src.recent_enrollments, src.upcoming_visits_week,
+            src.overdue_visits, src.serious_adverse_events, src.recent_adverse_events,
+            src.recent_serious_adverse_events, src.completed_milestones, src.overdue_milestones
+        );
+        
+        COMMIT;
+    EXCEPTION
+        WHEN OTHERS THEN
+            ROLLBACK;
+            RAISE;
+    END refresh_trial_metrics;
+    
 END pkg_clinical_trials_mgmt;
 /
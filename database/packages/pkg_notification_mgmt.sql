@@ -0,0 +1,122 @@
+-- Healthcare System PL/SQL Package
+-- Staff Notification Outbox
+
+CREATE OR REPLACE PACKAGE pkg_notification_mgmt AS
+    -- Priorities (system_notifications.priority; lower is delivered first)
+    c_priority_high   CONSTANT NUMBER := 1;
+    c_priority_normal CONSTANT NUMBER := 2;
+    c_priority_low    CONSTANT NUMBER := 3;
+
+    c_sent_retention_days CONSTANT NUMBER := 30;
+
+    -- Add a notification to the outbox, in the caller's transaction
+    PROCEDURE enqueue_notification(
+        p_notification_type IN VARCHAR2,
+        p_recipient_email IN VARCHAR2,
+        p_subject IN VARCHAR2,
+        p_message IN VARCHAR2,
+        p_priority IN NUMBER DEFAULT c_priority_normal,
+        p_source_table IN VARCHAR2 DEFAULT NULL,
+        p_source_id IN NUMBER DEFAULT NULL
+    );
+
+    -- Return FAILED notifications (optionally of one type) to PENDING with
+    -- a fresh retry count, e.g. after fixing a mail relay. Returns the rows requeued.
+    FUNCTION requeue_failed_notifications(
+        p_notification_type IN VARCHAR2 DEFAULT NULL
+    ) RETURN NUMBER;
+
+    -- Delete SENT notifications delivered more than p_retention_days ago.
+    -- FAILED rows are kept for review. Returns the rows deleted.
+    FUNCTION purge_notifications(
+        p_retention_days IN NUMBER DEFAULT c_sent_retention_days
+    ) RETURN NUMBER;
+
+    -- Seconds the oldest due PENDING notification has been waiting (0 when none)
+    FUNCTION get_outbox_lag RETURN NUMBER;
+
+END pkg_notification_mgmt;
+/
+
+CREATE OR REPLACE PACKAGE BODY pkg_notification_mgmt AS
+
+    PROCEDURE enqueue_notification(
+        p_notification_type IN VARCHAR2,
+        p_recipient_email IN VARCHAR2,
+        p_subject IN VARCHAR2,
+        p_message IN VARCHAR2,
+        p_priority IN NUMBER DEFAULT c_priority_normal,
+        p_source_table IN VARCHAR2 DEFAULT NULL,
+        p_source_id IN NUMBER DEFAULT NULL
+    ) IS
+    BEGIN
+        -- No COMMIT here: the notification commits or rolls back with the event
+        INSERT INTO system_notifications (
+            notification_type, source_table, source_id, recipient_email,
+            subject, message, priority, status
+        ) VALUES (
+            p_notification_type, p_source_table, p_source_id, p_recipient_email,
+            SUBSTR(p_subject, 1, 200), SUBSTR(p_message, 1, 4000),
+            NVL(p_priority, c_priority_normal), 'PENDING'
+        );
+    END enqueue_notification;
+
+    FUNCTION requeue_failed_notifications(
+        p_notification_type IN VARCHAR2 DEFAULT NULL
+    ) RETURN NUMBER IS
+        l_count NUMBER;
+    BEGIN
+        UPDATE system_notifications
+        SET status = 'PENDING',
+            retry_count = 0,
+            next_attempt_date = SYSTIMESTAMP
+        WHERE status = 'FAILED'
+          AND (p_notification_type IS NULL OR notification_type = p_notification_type);
+
+        l_count := SQL%ROWCOUNT;
+        COMMIT;
+
+        RETURN l_count;
+    EXCEPTION
+        WHEN OTHERS THEN
+            ROLLBACK;
+            RAISE;
+    END requeue_failed_notifications;
+
+    FUNCTION purge_notifications(
+        p_retention_days IN NUMBER DEFAULT c_sent_retention_days
+    ) RETURN NUMBER IS
+        l_count NUMBER;
+    BEGIN
+        DELETE FROM system_notifications
+        WHERE status = 'SENT'
+          AND delivered_date < SYSTIMESTAMP - NUMTODSINTERVAL(NVL(p_retention_days, c_sent_retention_days), 'DAY');
+
+        l_count := SQL%ROWCOUNT;
+        COMMIT;
+
+        RETURN l_count;
+    EXCEPTION
+        WHEN OTHERS THEN
+            ROLLBACK;
+            RAISE;
+    END purge_notifications;
+
+    FUNCTION get_outbox_lag RETURN NUMBER IS
+        l_oldest TIMESTAMP;
+    BEGIN
+        SELECT MIN(created_date)
+        INTO l_oldest
+        FROM system_notifications
+        WHERE status = 'PENDING'
+          AND next_attempt_date <= SYSTIMESTAMP;
+
+        IF l_oldest IS NULL THEN
+            RETURN 0;
+        END IF;
+
+        RETURN ROUND((CAST(SYSTIMESTAMP AS DATE) - CAST(l_oldest AS DATE)) * 86400);
+    END get_outbox_lag;
+
+END pkg_notification_mgmt;
+/
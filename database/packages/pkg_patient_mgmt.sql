@@ -14,6 +14,26 @@ CREATE OR REPLACE PACKAGE pkg_patient_mgmt AS
     
     TYPE t_patient_tab IS TABLE OF t_patient_rec;
     
+    -- One patient_audit row with the full patient row as it was after the change
+    TYPE t_patient_history_rec IS RECORD (
+        audit_id        NUMBER,
+        operation       VARCHAR2(10),
+        changed_by      VARCHAR2(50),
+        changed_date    DATE,
+        old_values      CLOB,
+        new_values      CLOB,
+        snapshot        CLOB
+    );
+    
+    TYPE t_patient_history_tab IS TABLE OF t_patient_history_rec;
+    
+    -- Months of patient_audit partitions kept by purge_patient_audit
+    c_audit_retention_months CONSTANT NUMBER := 84;
+    
+    -- Patients recalculated per transaction by rebuild_risk_profiles and
+    -- drain_risk_queue
+    c_risk_rebuild_batch CONSTANT NUMBER := 1000;
+    
     -- Public procedure and function declarations
     FUNCTION get_patient_age(p_patient_id IN NUMBER) RETURN NUMBER;
     
@@ -60,10 +80,70 @@ CREATE OR REPLACE PACKAGE pkg_patient_mgmt AS
     
     FUNCTION get_patient_summary(p_patient_id IN NUMBER) RETURN t_patient_rec;
     
+    -- Replace the search trigrams of one patient (called by trg_patients_search_index)
+    PROCEDURE index_patient_search(
+        p_patient_id IN NUMBER,
+        p_full_name IN VARCHAR2,
+        p_phone IN VARCHAR2,
+        p_email IN VARCHAR2
+    );
+    
+    -- Rebuild patient_search_ngrams from scratch
+    PROCEDURE rebuild_search_index;
+    
+    -- Audit trail of one patient, newest first, with full row snapshots
+    -- rebuilt from the current row and the stored column diffs
+    FUNCTION get_patient_history(
+        p_patient_id IN NUMBER,
+        p_since IN DATE DEFAULT NULL
+    ) RETURN t_patient_history_tab PIPELINED;
+    
+    -- Drop patient_audit partitions older than the retention period
+    PROCEDURE purge_patient_audit(
+        p_retention_months IN NUMBER DEFAULT c_audit_retention_months
+    );
+    
+    -- Risk profiles are recalculated outside clinical transactions: the
+    -- triggers only queue patients in patient_risk_queue. The procedures
+    -- below lock the patients rows they recalculate with SKIP LOCKED and
+    -- queue again any patient another transaction holds, so they never wait
+    -- on (or deadlock with) clinical work; see pkg_reporting_mgmt for the
+    -- locks clinical DML itself takes.
+    
+    -- Recompute patient_risk_profile for the given patients from
+    -- v_patient_risk_factors now, in the caller's transaction. Inactive or
+    -- deleted patients lose their profile.
+    PROCEDURE recalculate_risk_profiles(p_patient_ids IN SYS.ODCINUMBERLIST);
+    
+    -- Row part of the risk profile triggers: remember a patient whose
+    -- profile the current statement changes
+    PROCEDURE note_patient(p_patient_id IN NUMBER);
+    
+    -- Statement part of the risk profile triggers: queue the noted patients
+    -- once, in the caller's transaction, and forget them
+    PROCEDURE flush_risk_profiles;
+    
+    -- Recalculate the patients queued before the call, p_batch_size queue
+    -- rows per transaction; concurrent drainers skip each other's rows.
+    -- Returns profiles updated or removed.
+    FUNCTION drain_risk_queue(p_batch_size IN NUMBER DEFAULT c_risk_rebuild_batch) RETURN NUMBER;
+    
+    -- Recompute every risk profile, committing every c_risk_rebuild_batch
+    -- patients. Scheduled nightly, since age and the 90-day and one-year
+    -- windows change with the calendar day.
+    PROCEDURE rebuild_risk_profiles;
+    
 END pkg_patient_mgmt;
 /
 
 CREATE OR REPLACE PACKAGE BODY pkg_patient_mgmt AS
+    
+    -- Patients noted by the risk profile triggers, keyed by id so each is
+    -- queued once per statement. Shared by the four triggers: a flush from a
+    -- nested statement only queues noted patients early, and the outer
+    -- statement notes them again for any later rows.
+    TYPE t_patient_set IS TABLE OF NUMBER INDEX BY VARCHAR2(40);
+    g_noted_patients t_patient_set;
 
     FUNCTION get_patient_age(p_patient_id IN NUMBER) RETURN NUMBER IS
         l_age NUMBER;
@@ -213,34 +293,112 @@ CREATE OR REPLACE PACKAGE BODY pkg_patient_mgmt AS
             RAISE;
     END update_patient;
 
+    -- Add the distinct trigrams of p_text to p_grams
+    PROCEDURE add_ngrams(
+        p_text IN VARCHAR2,
+        p_grams IN OUT NOCOPY SYS.ODCIVARCHAR2LIST
+    ) IS
+        l_gram VARCHAR2(12);
+        l_found BOOLEAN;
+    BEGIN
+        FOR i IN 1 .. NVL(LENGTH(p_text), 0) - 2 LOOP
+            l_gram := SUBSTR(p_text, i, 3);
+            l_found := FALSE;
+            FOR j IN 1 .. p_grams.COUNT LOOP
+                IF p_grams(j) = l_gram THEN
+                    l_found := TRUE;
+                    EXIT;
+                END IF;
+            END LOOP;
+            IF NOT l_found THEN
+                p_grams.EXTEND;
+                p_grams(p_grams.COUNT) := l_gram;
+            END IF;
+        END LOOP;
+    END add_ngrams;
+
     FUNCTION search_patients(
         p_search_term IN VARCHAR2,
         p_max_rows IN NUMBER DEFAULT 50
     ) RETURN t_patient_tab PIPELINED IS
         
         l_patient t_patient_rec;
-        l_search_term VARCHAR2(200) := '%' || UPPER(TRIM(p_search_term)) || '%';
+        l_term VARCHAR2(200) := UPPER(TRIM(p_search_term));
+        l_email_term VARCHAR2(200) := LOWER(TRIM(p_search_term));
+        l_digits VARCHAR2(200);
+        l_name_grams SYS.ODCIVARCHAR2LIST := SYS.ODCIVARCHAR2LIST();
+        l_digit_grams SYS.ODCIVARCHAR2LIST := SYS.ODCIVARCHAR2LIST();
+        l_name_gram_count NUMBER;
+        l_digit_gram_count NUMBER;
+        l_ids SYS.ODCINUMBERLIST;
+    BEGIN
+        -- Only phone-shaped terms are matched against phone numbers
+        IF REGEXP_LIKE(l_term, '^[0-9\-\(\)\+\. ]+$') THEN
+            l_digits := REGEXP_REPLACE(l_term, '[^0-9]', '');
+        END IF;
+        
+        add_ngrams(l_term, l_name_grams);
+        add_ngrams(l_digits, l_digit_grams);
+        l_name_gram_count := l_name_grams.COUNT;
+        l_digit_gram_count := l_digit_grams.COUNT;
         
-        CURSOR c_patients IS
+        IF l_name_gram_count > 0 THEN
+            -- Candidates hold every trigram of the term; confirm with the substring test
+            SELECT p.patient_id
+            BULK COLLECT INTO l_ids
+            FROM patients p
+            WHERE p.patient_id IN (
+                    SELECT g.patient_id
+                    FROM patient_search_ngrams g
+                    WHERE g.ngram IN (SELECT COLUMN_VALUE FROM TABLE(l_name_grams))
+                    GROUP BY g.patient_id
+                    HAVING COUNT(*) = l_name_gram_count
+                    UNION
+                    SELECT g.patient_id
+                    FROM patient_search_ngrams g
+                    WHERE g.ngram IN (SELECT COLUMN_VALUE FROM TABLE(l_digit_grams))
+                    GROUP BY g.patient_id
+                    HAVING COUNT(*) = l_digit_gram_count)
+              AND p.is_active = 'Y'
+              AND (p.search_name LIKE '%' || l_term || '%'
+                   OR p.email_lower LIKE '%' || l_email_term || '%'
+                   OR (l_digits IS NOT NULL AND p.phone_digits LIKE '%' || l_digits || '%'))
+            ORDER BY p.last_name, p.first_name
+            FETCH FIRST p_max_rows ROWS ONLY;
+        ELSE
+            -- Terms shorter than a trigram fall back to indexed prefix matches
+            SELECT p.patient_id
+            BULK COLLECT INTO l_ids
+            FROM patients p
+            WHERE p.is_active = 'Y'
+              AND (p.search_name LIKE l_term || '%'
+                   OR UPPER(p.last_name) LIKE l_term || '%'
+                   OR p.email_lower LIKE l_email_term || '%'
+                   OR (l_digits IS NOT NULL AND p.phone_digits LIKE l_digits || '%'))
+            ORDER BY p.last_name, p.first_name
+            FETCH FIRST p_max_rows ROWS ONLY;
+        END IF;
+        
+        -- Age computed inline, next appointment resolved in one join over the matches
+        FOR rec IN (
             SELECT p.patient_id,
-                   get_full_name(p.first_name, p.last_name) as full_name,
-                   get_patient_age(p.patient_id) as age,
+                   TRIM(p.first_name || ' ' || p.last_name) as full_name,
+                   TRUNC((SYSDATE - p.date_of_birth) / 365.25) as age,
                    p.phone,
                    p.email,
-                   (SELECT MIN(a.appointment_date)
-                    FROM appointments a
-                    WHERE a.patient_id = p.patient_id
-                      AND a.appointment_date >= SYSDATE
-                      AND a.status IN ('Scheduled', 'Confirmed')) as next_appointment
+                   na.next_appointment
             FROM patients p
-            WHERE p.is_active = 'Y'
-              AND (UPPER(p.first_name || ' ' || p.last_name) LIKE l_search_term
-                   OR UPPER(p.phone) LIKE l_search_term
-                   OR UPPER(p.email) LIKE l_search_term)
+            JOIN TABLE(l_ids) m ON m.COLUMN_VALUE = p.patient_id
+            LEFT JOIN (
+                SELECT a.patient_id, MIN(a.appointment_date) as next_appointment
+                FROM appointments a
+                WHERE a.patient_id IN (SELECT COLUMN_VALUE FROM TABLE(l_ids))
+                  AND a.appointment_date >= SYSDATE
+                  AND a.status IN ('Scheduled', 'Confirmed')
+                GROUP BY a.patient_id
+            ) na ON na.patient_id = p.patient_id
             ORDER BY p.last_name, p.first_name
-            FETCH FIRST p_max_rows ROWS ONLY;
-    BEGIN
-        FOR rec IN c_patients LOOP
+        ) LOOP
             l_patient.patient_id := rec.patient_id;
             l_patient.full_name := rec.full_name;
             l_patient.age := rec.age;
@@ -291,5 +449,347 @@ CREATE OR REPLACE PACKAGE BODY pkg_patient_mgmt AS
             RAISE_APPLICATION_ERROR(-20003, 'Patient not found with ID: ' || p_patient_id);
     END get_patient_summary;
 
+    PROCEDURE index_patient_search(
+        p_patient_id IN NUMBER,
+        p_full_name IN VARCHAR2,
+        p_phone IN VARCHAR2,
+        p_email IN VARCHAR2
+    ) IS
+        l_grams SYS.ODCIVARCHAR2LIST := SYS.ODCIVARCHAR2LIST();
+    BEGIN
+        -- Same normalization as the search_name, phone_digits and email_lower columns
+        add_ngrams(UPPER(p_full_name), l_grams);
+        add_ngrams(REGEXP_REPLACE(p_phone, '[^0-9]', ''), l_grams);
+        add_ngrams(UPPER(p_email), l_grams);
+        
+        DELETE FROM patient_search_ngrams
+        WHERE patient_id = p_patient_id;
+        
+        INSERT INTO patient_search_ngrams (ngram, patient_id)
+        SELECT COLUMN_VALUE, p_patient_id
+        FROM TABLE(l_grams);
+    END index_patient_search;
+
+    PROCEDURE rebuild_search_index IS
+    BEGIN
+        EXECUTE IMMEDIATE 'TRUNCATE TABLE patient_search_ngrams';
+        
+        INSERT /*+ APPEND */ INTO patient_search_ngrams (ngram, patient_id)
+        SELECT DISTINCT SUBSTR(s.search_text, n.pos, 3), s.patient_id
+        FROM (
+            SELECT patient_id, search_name as search_text FROM patients
+            UNION ALL
+            SELECT patient_id, phone_digits FROM patients WHERE phone_digits IS NOT NULL
+            UNION ALL
+            SELECT patient_id, UPPER(email) FROM patients WHERE email IS NOT NULL
+        ) s
+        JOIN (SELECT LEVEL as pos FROM DUAL CONNECT BY LEVEL <= 101) n
+            ON n.pos <= LENGTH(s.search_text) - 2;
+        
+        COMMIT;
+    EXCEPTION
+        WHEN OTHERS THEN
+            ROLLBACK;
+            RAISE;
+    END rebuild_search_index;
+
+    FUNCTION get_patient_history(
+        p_patient_id IN NUMBER,
+        p_since IN DATE DEFAULT NULL
+    ) RETURN t_patient_history_tab PIPELINED IS
+        l_row t_patient_history_rec;
+        l_snapshot CLOB;
+    BEGIN
+        -- Walk back from the current row, undoing each update's diff, so
+        -- history survives the purge of the original INSERT rows
+        BEGIN
+            SELECT JSON_OBJECT(
+                       'patient_id' VALUE patient_id,
+                       'first_name' VALUE first_name,
+                       'last_name' VALUE last_name,
+                       'date_of_birth' VALUE TO_CHAR(date_of_birth, 'YYYY-MM-DD'),
+                       'gender' VALUE gender,
+                       'phone' VALUE phone,
+                       'email' VALUE email,
+                       'address' VALUE address,
+                       'city' VALUE city,
+                       'state' VALUE state,
+                       'zip_code' VALUE zip_code,
+                       'is_active' VALUE is_active
+                       RETURNING CLOB
+                   )
+            INTO l_snapshot
+            FROM patients
+            WHERE patient_id = p_patient_id;
+        EXCEPTION
+            WHEN NO_DATA_FOUND THEN
+                l_snapshot := NULL;
+        END;
+        
+        FOR rec IN (
+            SELECT audit_id, operation, changed_by, changed_date, old_values, new_values
+            FROM patient_audit
+            WHERE patient_id = p_patient_id
+              AND changed_date >= NVL(p_since, DATE '1900-01-01')
+            ORDER BY changed_date DESC, audit_id DESC
+        ) LOOP
+            l_row.audit_id := rec.audit_id;
+            l_row.operation := rec.operation;
+            l_row.changed_by := rec.changed_by;
+            l_row.changed_date := rec.changed_date;
+            l_row.old_values := rec.old_values;
+            l_row.new_values := rec.new_values;
+            
+            IF rec.operation = 'DELETE' THEN
+                l_row.snapshot := NULL;
+                l_snapshot := rec.old_values;
+            ELSIF rec.operation = 'INSERT' THEN
+                l_row.snapshot := NVL(l_snapshot, rec.new_values);
+                l_snapshot := NULL;
+            ELSE
+                l_row.snapshot := l_snapshot;
+                -- Columns that were NULL before the update drop out of the snapshot
+                IF l_snapshot IS NOT NULL THEN
+                    SELECT JSON_MERGEPATCH(l_snapshot, rec.old_values RETURNING CLOB)
+                    INTO l_snapshot
+                    FROM dual;
+                END IF;
+            END IF;
+            
+            PIPE ROW(l_row);
+        END LOOP;
+        
+        RETURN;
+    END get_patient_history;
+
+    PROCEDURE purge_patient_audit(
+        p_retention_months IN NUMBER DEFAULT c_audit_retention_months
+    ) IS
+        l_cutoff DATE := ADD_MONTHS(TRUNC(SYSDATE, 'MM'), -p_retention_months);
+        l_high_value DATE;
+        l_dropped NUMBER := 0;
+    BEGIN
+        IF p_retention_months IS NULL OR p_retention_months < 1 THEN
+            RAISE_APPLICATION_ERROR(-20007, 'Audit retention must be at least one month');
+        END IF;
+        
+        -- Only interval partitions can be dropped; the initial range partition stays
+        FOR rec IN (
+            SELECT partition_name, high_value
+            FROM user_tab_partitions
+            WHERE table_name = 'PATIENT_AUDIT'
+              AND interval = 'YES'
+            ORDER BY partition_position
+        ) LOOP
+            EXECUTE IMMEDIATE 'SELECT ' || rec.high_value || ' FROM dual' INTO l_high_value;
+            EXIT WHEN l_high_value > l_cutoff;
+            
+            EXECUTE IMMEDIATE 'ALTER TABLE patient_audit DROP PARTITION ' || rec.partition_name ||
+                              ' UPDATE INDEXES';
+            l_dropped := l_dropped + 1;
+        END LOOP;
+        
+        DBMS_OUTPUT.PUT_LINE('Dropped ' || l_dropped || ' patient_audit partition(s) before ' ||
+                             TO_CHAR(l_cutoff, 'YYYY-MM-DD'));
+    END purge_patient_audit;
+
+    -- Merge fresh risk factors for p_patient_ids. Unchanged profiles are not
+    -- rewritten, so refreshed_date is when the profile last changed.
+    -- Returns rows merged.
+    FUNCTION merge_risk_profiles(p_patient_ids IN SYS.ODCINUMBERLIST) RETURN NUMBER IS
+    BEGIN
+        MERGE INTO patient_risk_profile r
+        USING (
+            SELECT f.*
+            FROM (SELECT DISTINCT COLUMN_VALUE as patient_id FROM TABLE(p_patient_ids)) t
+            JOIN v_patient_risk_factors f ON f.patient_id = t.patient_id
+        ) src
+        ON (r.patient_id = src.patient_id)
+        WHEN MATCHED THEN UPDATE SET
+            r.age = src.age,
+            r.elderly_risk = src.elderly_risk,
+            r.chronic_conditions = src.chronic_conditions,
+            r.has_allergies = src.has_allergies,
+            r.medication_count = src.medication_count,
+            r.recent_visits = src.recent_visits,
+            r.missed_appointments = src.missed_appointments,
+            r.last_visit_date = src.last_visit_date,
+            r.next_appointment_date = src.next_appointment_date,
+            r.risk_score = src.risk_score,
+            r.refreshed_date = SYSDATE
+        WHERE DECODE(r.age, src.age, 0, 1) = 1
+           OR r.chronic_conditions != src.chronic_conditions
+           OR r.has_allergies != src.has_allergies
+           OR r.medication_count != src.medication_count
+           OR r.recent_visits != src.recent_visits
+           OR r.missed_appointments != src.missed_appointments
+           OR DECODE(r.last_visit_date, src.last_visit_date, 0, 1) = 1
+           OR DECODE(r.next_appointment_date, src.next_appointment_date, 0, 1) = 1
+           OR r.risk_score != src.risk_score
+        WHEN NOT MATCHED THEN INSERT (
+            patient_id, age, elderly_risk, chronic_conditions, has_allergies, medication_count,
+            recent_visits, missed_appointments, last_visit_date, next_appointment_date, risk_score
+        ) VALUES (
+            src.patient_id, src.age, src.elderly_risk, src.chronic_conditions, src.has_allergies, src.medication_count,
+            src.recent_visits, src.missed_appointments, src.last_visit_date, src.next_appointment_date, src.risk_score
+        );
+        
+        RETURN SQL%ROWCOUNT;
+    END merge_risk_profiles;
+
+    -- Merge and prune the profiles of the patients whose row can be locked
+    -- now; returns rows changed. The lock keeps two sessions from inserting
+    -- the same profile or overwriting each other's factors. A patient held
+    -- by another transaction is still being changed, so it is queued and
+    -- recalculated after that transaction commits.
+    FUNCTION refresh_risk_profiles(p_patient_ids IN SYS.ODCINUMBERLIST) RETURN NUMBER IS
+        l_locked SYS.ODCINUMBERLIST;
+        l_changed NUMBER;
+    BEGIN
+        SELECT patient_id
+        BULK COLLECT INTO l_locked
+        FROM patients
+        WHERE patient_id IN (SELECT COLUMN_VALUE FROM TABLE(p_patient_ids))
+        FOR UPDATE SKIP LOCKED;
+        
+        INSERT INTO patient_risk_queue (patient_id)
+        SELECT p.patient_id
+        FROM patients p
+        WHERE p.patient_id IN (SELECT COLUMN_VALUE FROM TABLE(p_patient_ids))
+          AND p.patient_id NOT IN (SELECT COLUMN_VALUE FROM TABLE(l_locked));
+        
+        l_changed := merge_risk_profiles(l_locked);
+        
+        DELETE FROM patient_risk_profile r
+        WHERE r.patient_id IN (SELECT COLUMN_VALUE FROM TABLE(l_locked))
+          AND NOT EXISTS (
+              SELECT 1 FROM patients p
+              WHERE p.patient_id = r.patient_id
+                AND p.is_active = 'Y'
+          );
+        
+        RETURN l_changed + SQL%ROWCOUNT;
+    END refresh_risk_profiles;
+
+    PROCEDURE recalculate_risk_profiles(p_patient_ids IN SYS.ODCINUMBERLIST) IS
+        l_changed NUMBER;
+    BEGIN
+        IF p_patient_ids IS NULL OR p_patient_ids.COUNT = 0 THEN
+            RETURN;
+        END IF;
+        
+        l_changed := refresh_risk_profiles(p_patient_ids);
+    END recalculate_risk_profiles;
+
+    PROCEDURE note_patient(p_patient_id IN NUMBER) IS
+    BEGIN
+        IF p_patient_id IS NOT NULL THEN
+            g_noted_patients(TO_CHAR(p_patient_id)) := p_patient_id;
+        END IF;
+    END note_patient;
+
+    PROCEDURE flush_risk_profiles IS
+        l_patient_ids SYS.ODCINUMBERLIST := SYS.ODCINUMBERLIST();
+        l_key VARCHAR2(40);
+    BEGIN
+        l_key := g_noted_patients.FIRST;
+        WHILE l_key IS NOT NULL LOOP
+            l_patient_ids.EXTEND;
+            l_patient_ids(l_patient_ids.COUNT) := g_noted_patients(l_key);
+            l_key := g_noted_patients.NEXT(l_key);
+        END LOOP;
+        g_noted_patients.DELETE;
+        
+        -- No COMMIT here: the queue rows commit or roll back with the change
+        FORALL i IN 1 .. l_patient_ids.COUNT
+            INSERT INTO patient_risk_queue (patient_id)
+            VALUES (l_patient_ids(i));
+    END flush_risk_profiles;
+
+    FUNCTION drain_risk_queue(p_batch_size IN NUMBER DEFAULT c_risk_rebuild_batch) RETURN NUMBER IS
+        -- Patients queued again during the drain wait for the next one
+        CURSOR c_queue(p_last_queue_id NUMBER) IS
+            SELECT q.patient_id, q.ROWID as row_id
+            FROM patient_risk_queue q
+            WHERE q.queue_id <= p_last_queue_id
+            FOR UPDATE SKIP LOCKED;
+
+        TYPE t_queue_tab IS TABLE OF c_queue%ROWTYPE;
+
+        l_rows t_queue_tab;
+        l_ids SYS.ODCINUMBERLIST := SYS.ODCINUMBERLIST();
+        l_last_queue_id NUMBER;
+        l_changed NUMBER := 0;
+    BEGIN
+        SELECT MAX(queue_id)
+        INTO l_last_queue_id
+        FROM patient_risk_queue;
+
+        LOOP
+            -- Reopened per batch: the COMMIT below closes a FOR UPDATE cursor
+            OPEN c_queue(l_last_queue_id);
+            FETCH c_queue BULK COLLECT INTO l_rows LIMIT NVL(p_batch_size, c_risk_rebuild_batch);
+            CLOSE c_queue;
+
+            EXIT WHEN l_rows.COUNT = 0;
+
+            l_ids.DELETE;
+            l_ids.EXTEND(l_rows.COUNT);
+            FOR i IN 1 .. l_rows.COUNT LOOP
+                l_ids(i) := l_rows(i).patient_id;
+            END LOOP;
+
+            FORALL i IN 1 .. l_rows.COUNT
+                DELETE FROM patient_risk_queue
+                WHERE ROWID = l_rows(i).row_id;
+
+            l_changed := l_changed + refresh_risk_profiles(l_ids);
+            COMMIT;
+
+            EXIT WHEN l_rows.COUNT < NVL(p_batch_size, c_risk_rebuild_batch);
+        END LOOP;
+
+        RETURN l_changed;
+    EXCEPTION
+        WHEN OTHERS THEN
+            IF c_queue%ISOPEN THEN
+                CLOSE c_queue;
+            END IF;
+            ROLLBACK;
+            RAISE;
+    END drain_risk_queue;
+
+    PROCEDURE rebuild_risk_profiles IS
+        l_started NUMBER := DBMS_UTILITY.GET_TIME;
+        l_ids SYS.ODCINUMBERLIST;
+        l_last_id NUMBER := 0;
+        l_changed NUMBER := 0;
+    BEGIN
+        -- Batches keep each patient locked only briefly; inactive patients
+        -- are included so their profiles are removed, and patients held by
+        -- other transactions are left to drain_risk_queue
+        LOOP
+            SELECT patient_id
+            BULK COLLECT INTO l_ids
+            FROM patients
+            WHERE patient_id > l_last_id
+            ORDER BY patient_id
+            FETCH FIRST c_risk_rebuild_batch ROWS ONLY;
+            
+            EXIT WHEN l_ids.COUNT = 0;
+            
+            l_changed := l_changed + refresh_risk_profiles(l_ids);
+            COMMIT;
+            l_last_id := l_ids(l_ids.LAST);
+        END LOOP;
+        
+        DBMS_OUTPUT.PUT_LINE('Updated or removed ' || l_changed || ' risk profile(s) in ' ||
+                             ROUND((DBMS_UTILITY.GET_TIME - l_started) / 100, 1) || 's');
+    EXCEPTION
+        WHEN OTHERS THEN
+            ROLLBACK;
+            RAISE;
+    END rebuild_risk_profiles;
+
 END pkg_patient_mgmt;
 /
@@ -0,0 +1,252 @@
+-- Healthcare System PL/SQL Package
+-- Reporting and Dashboard Aggregates
+
+CREATE OR REPLACE PACKAGE pkg_reporting_mgmt AS
+    -- Days ahead shown by v_provider_schedule
+    c_schedule_days CONSTANT NUMBER := 30;
+
+    -- Start of the rolling window kept current by the refresh job: the earlier
+    -- of the first day of this month and the first day of this ISO week
+    FUNCTION get_dashboard_window_start RETURN DATE;
+
+    -- Recompute dashboard_daily_stats for every day from p_from_date onwards
+    -- (defaults to the rolling window). Pass an older date to backfill history.
+    PROCEDURE refresh_dashboard_stats(p_from_date IN DATE DEFAULT NULL);
+
+    -- Seconds since the dashboard statistics were last refreshed
+    FUNCTION get_dashboard_staleness RETURN NUMBER;
+
+    -- Locking. Every writer of provider_day_occupancy first locks the row of
+    -- the provider-day it recounts (creating it if missing) and keeps it
+    -- until commit, so bookings on the same provider-day recount one after
+    -- another and bookings on other days or providers do not wait. Within a
+    -- statement the rows are locked in (provider_id, schedule_date) order.
+    -- These are the only derived-table locks clinical DML takes: risk
+    -- profiles are queued and recalculated later by pkg_patient_mgmt, whose
+    -- patients row locks are taken with SKIP LOCKED and never held together
+    -- with a provider-day lock. Lock order: patients, appointments, then
+    -- provider-day rows.
+
+    -- Recompute provider_day_occupancy from p_from_date (default today) to the
+    -- end of the schedule window and delete days before p_from_date. The
+    -- trigger keeps the table current; this corrects drift after loads with
+    -- triggers disabled and drops days that have passed. Commits per
+    -- provider-day.
+    PROCEDURE refresh_provider_occupancy(p_from_date IN DATE DEFAULT NULL);
+
+    -- Recompute one provider-day, in the caller's transaction
+    -- (called by trg_appointments_occupancy). The provider-day row stays
+    -- locked until the caller commits.
+    PROCEDURE recount_provider_day(
+        p_provider_id IN NUMBER,
+        p_schedule_date IN DATE
+    );
+
+END pkg_reporting_mgmt;
+/
+
+CREATE OR REPLACE PACKAGE BODY pkg_reporting_mgmt AS
+
+    -- Get dashboard window start
+    FUNCTION get_dashboard_window_start RETURN DATE IS
+    BEGIN
+        RETURN LEAST(TRUNC(SYSDATE, 'MM'), TRUNC(SYSDATE, 'IW'));
+    END get_dashboard_window_start;
+
+    -- Refresh dashboard statistics
+    PROCEDURE refresh_dashboard_stats(p_from_date IN DATE DEFAULT NULL) IS
+        l_from_date DATE := TRUNC(NVL(p_from_date, get_dashboard_window_start));
+        l_refreshed DATE := SYSDATE;
+    BEGIN
+        -- One grouped range scan per source table, folded into daily buckets
+        MERGE INTO dashboard_daily_stats d
+        USING (
+            SELECT stat_date,
+                   SUM(total_appointments) as total_appointments,
+                   SUM(scheduled_appointments) as scheduled_appointments,
+                   SUM(completed_appointments) as completed_appointments,
+                   SUM(cancelled_appointments) as cancelled_appointments,
+                   SUM(new_records) as new_records,
+                   SUM(new_prescriptions) as new_prescriptions,
+                   SUM(new_patients) as new_patients
+            FROM (
+                SELECT TRUNC(appointment_date) as stat_date,
+                       COUNT(*) as total_appointments,
+                       COUNT(CASE WHEN status = 'Scheduled' THEN 1 END) as scheduled_appointments,
+                       COUNT(CASE WHEN status = 'Completed' THEN 1 END) as completed_appointments,
+                       COUNT(CASE WHEN status = 'Cancelled' THEN 1 END) as cancelled_appointments,
+                       0 as new_records,
+                       0 as new_prescriptions,
+                       0 as new_patients
+                FROM appointments
+                WHERE appointment_date >= l_from_date
+                GROUP BY TRUNC(appointment_date)
+                UNION ALL
+                SELECT TRUNC(visit_date), 0, 0, 0, 0, COUNT(*), 0, 0
+                FROM medical_records
+                WHERE visit_date >= l_from_date
+                GROUP BY TRUNC(visit_date)
+                UNION ALL
+                SELECT TRUNC(date_prescribed), 0, 0, 0, 0, 0, COUNT(*), 0
+                FROM prescriptions
+                WHERE date_prescribed >= l_from_date
+                GROUP BY TRUNC(date_prescribed)
+                UNION ALL
+                SELECT TRUNC(created_date), 0, 0, 0, 0, 0, 0, COUNT(*)
+                FROM patients
+                WHERE created_date >= l_from_date
+                GROUP BY TRUNC(created_date)
+            )
+            GROUP BY stat_date
+        ) src
+        ON (d.stat_date = src.stat_date)
+        WHEN MATCHED THEN UPDATE SET
+            d.total_appointments = src.total_appointments,
+            d.scheduled_appointments = src.scheduled_appointments,
+            d.completed_appointments = src.completed_appointments,
+            d.cancelled_appointments = src.cancelled_appointments,
+            d.new_records = src.new_records,
+            d.new_prescriptions = src.new_prescriptions,
+            d.new_patients = src.new_patients,
+            d.refreshed_date = l_refreshed
+        WHEN NOT MATCHED THEN INSERT (
+            stat_date, total_appointments, scheduled_appointments, completed_appointments,
+            cancelled_appointments, new_records, new_prescriptions, new_patients, refreshed_date
+        ) VALUES (
+            src.stat_date, src.total_appointments, src.scheduled_appointments, src.completed_appointments,
+            src.cancelled_appointments, src.new_records, src.new_prescriptions, src.new_patients, l_refreshed
+        );
+
+        -- Days in the window that no longer have any activity
+        DELETE FROM dashboard_daily_stats
+        WHERE stat_date >= l_from_date
+          AND refreshed_date < l_refreshed;
+
+        COMMIT;
+    EXCEPTION
+        WHEN OTHERS THEN
+            ROLLBACK;
+            RAISE;
+    END refresh_dashboard_stats;
+
+    -- Get dashboard staleness
+    FUNCTION get_dashboard_staleness RETURN NUMBER IS
+        l_last_refreshed DATE;
+    BEGIN
+        SELECT MAX(refreshed_date)
+        INTO l_last_refreshed
+        FROM dashboard_daily_stats;
+
+        RETURN ROUND((SYSDATE - l_last_refreshed) * 86400);
+    END get_dashboard_staleness;
+
+    -- Lock the provider-day row, inserting an empty one when the day has no
+    -- row yet. The insert is itself the lock: a second session inserting the
+    -- same day waits on it, and once it commits gets DUP_VAL_ON_INDEX and
+    -- locks the committed row instead. If that row is deleted before the
+    -- lock is granted (the day emptied), the loop creates it again.
+    PROCEDURE lock_provider_day(
+        p_provider_id IN NUMBER,
+        p_schedule_date IN DATE
+    ) IS
+        l_provider_id provider_day_occupancy.provider_id%TYPE;
+    BEGIN
+        LOOP
+            BEGIN
+                SELECT provider_id
+                INTO l_provider_id
+                FROM provider_day_occupancy
+                WHERE provider_id = p_provider_id
+                  AND schedule_date = p_schedule_date
+                FOR UPDATE;
+                RETURN;
+            EXCEPTION
+                WHEN NO_DATA_FOUND THEN
+                    NULL;
+            END;
+
+            BEGIN
+                INSERT INTO provider_day_occupancy (provider_id, schedule_date)
+                VALUES (p_provider_id, p_schedule_date);
+                RETURN;
+            EXCEPTION
+                WHEN DUP_VAL_ON_INDEX THEN
+                    NULL;
+            END;
+        END LOOP;
+    END lock_provider_day;
+
+    -- Refresh provider occupancy
+    PROCEDURE refresh_provider_occupancy(p_from_date IN DATE DEFAULT NULL) IS
+        l_from_date DATE := TRUNC(NVL(p_from_date, SYSDATE));
+        l_to_date DATE := GREATEST(l_from_date, TRUNC(SYSDATE)) + c_schedule_days;
+    BEGIN
+        -- Days with appointments or a stored row, one per transaction, so a
+        -- booking waits at most for one recount
+        FOR rec IN (
+            SELECT provider_id, schedule_date
+            FROM (
+                SELECT provider_id, TRUNC(appointment_date) as schedule_date
+                FROM appointments
+                WHERE appointment_date >= l_from_date
+                  AND appointment_date < l_to_date
+                UNION
+                SELECT provider_id, schedule_date
+                FROM provider_day_occupancy
+                WHERE schedule_date >= l_from_date
+                  AND schedule_date < l_to_date
+            )
+            ORDER BY provider_id, schedule_date
+        ) LOOP
+            recount_provider_day(rec.provider_id, rec.schedule_date);
+            COMMIT;
+        END LOOP;
+
+        DELETE FROM provider_day_occupancy
+        WHERE schedule_date < l_from_date;
+
+        COMMIT;
+    EXCEPTION
+        WHEN OTHERS THEN
+            ROLLBACK;
+            RAISE;
+    END refresh_provider_occupancy;
+
+    -- Recount one provider-day; a day left without appointments is removed
+    PROCEDURE recount_provider_day(
+        p_provider_id IN NUMBER,
+        p_schedule_date IN DATE
+    ) IS
+        l_schedule_date DATE := TRUNC(p_schedule_date);
+    BEGIN
+        -- No COMMIT here: the recount is part of the appointment change
+        lock_provider_day(p_provider_id, l_schedule_date);
+
+        UPDATE provider_day_occupancy o
+        SET (total_appointments, active_appointments, scheduled_count, confirmed_count,
+             completed_count, cancelled_count, booked_minutes) = (
+                SELECT COUNT(*),
+                       COUNT(CASE WHEN status IN ('Scheduled', 'Confirmed', 'In Progress') THEN 1 END),
+                       COUNT(CASE WHEN status = 'Scheduled' THEN 1 END),
+                       COUNT(CASE WHEN status = 'Confirmed' THEN 1 END),
+                       COUNT(CASE WHEN status = 'Completed' THEN 1 END),
+                       COUNT(CASE WHEN status = 'Cancelled' THEN 1 END),
+                       NVL(SUM(CASE WHEN status IN ('Scheduled', 'Confirmed', 'In Progress')
+                                    THEN duration_minutes END), 0)
+                FROM appointments
+                WHERE provider_id = p_provider_id
+                  AND appointment_date >= l_schedule_date
+                  AND appointment_date < l_schedule_date + 1
+            ),
+            o.refreshed_date = SYSDATE
+        WHERE o.provider_id = p_provider_id
+          AND o.schedule_date = l_schedule_date;
+
+        DELETE FROM provider_day_occupancy
+        WHERE provider_id = p_provider_id
+          AND schedule_date = l_schedule_date
+          AND total_appointments = 0;
+    END recount_provider_day;
+
+END pkg_reporting_mgmt;
+/
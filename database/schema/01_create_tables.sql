@@ -8,6 +8,7 @@ CREATE SEQUENCE seq_provider_id START WITH 100 INCREMENT BY 1;
 CREATE SEQUENCE seq_appointment_id START WITH 10000 INCREMENT BY 1;
 CREATE SEQUENCE seq_medical_record_id START WITH 100000 INCREMENT BY 1;
 CREATE SEQUENCE seq_prescription_id START WITH 50000 INCREMENT BY 1;
+CREATE SEQUENCE seq_risk_queue_id START WITH 1 INCREMENT BY 1 CACHE 1000;
 
 -- Patients table
 CREATE TABLE patients (
@@ -33,9 +34,21 @@ CREATE TABLE patients (
     created_by VARCHAR2(50) DEFAULT USER,
     modified_date DATE DEFAULT SYSDATE,
     modified_by VARCHAR2(50) DEFAULT USER,
-    is_active VARCHAR2(1) DEFAULT 'Y' CHECK (is_active IN ('Y', 'N'))
+    is_active VARCHAR2(1) DEFAULT 'Y' CHECK (is_active IN ('Y', 'N')),
+    -- Normalized search keys
+    search_name VARCHAR2(101) GENERATED ALWAYS AS (UPPER(first_name || ' ' || last_name)) VIRTUAL,
+    phone_digits VARCHAR2(20) GENERATED ALWAYS AS (REGEXP_REPLACE(phone, '[^0-9]', '')) VIRTUAL,
+    email_lower VARCHAR2(100) GENERATED ALWAYS AS (LOWER(email)) VIRTUAL
 );
 
+-- Trigram index over patient name, phone digits and email for substring search,
+-- maintained by trg_patients_search_index
+CREATE TABLE patient_search_ngrams (
+    ngram VARCHAR2(3 CHAR) NOT NULL,
+    patient_id NUMBER NOT NULL,
+    CONSTRAINT pk_patient_search_ngrams PRIMARY KEY (ngram, patient_id)
+) ORGANIZATION INDEX COMPRESS 1;
+
 -- Healthcare providers table
 CREATE TABLE providers (
     provider_id NUMBER DEFAULT seq_provider_id.NEXTVAL PRIMARY KEY,
@@ -65,10 +78,14 @@ CREATE TABLE appointments (
     status VARCHAR2(20) DEFAULT 'Scheduled' CHECK (status IN ('Scheduled', 'Confirmed', 'In Progress', 'Completed', 'Cancelled', 'No Show')),
     reason_for_visit VARCHAR2(500),
     notes CLOB,
+    start_ts DATE, -- appointment_date + appointment_time, maintained by trg_appointments_validation
+    end_ts DATE,   -- start_ts + duration_minutes, maintained by trg_appointments_validation
     created_date DATE DEFAULT SYSDATE,
     created_by VARCHAR2(50) DEFAULT USER,
     modified_date DATE DEFAULT SYSDATE,
-    modified_by VARCHAR2(50) DEFAULT USER
+    modified_by VARCHAR2(50) DEFAULT USER,
+    -- Overlap searches only look back to midnight of the start day
+    CONSTRAINT chk_appointments_same_day CHECK (end_ts <= TRUNC(start_ts) + 1)
 );
 
 -- Medical records table
@@ -125,15 +142,79 @@ CREATE TABLE specialties (
     is_active VARCHAR2(1) DEFAULT 'Y' CHECK (is_active IN ('Y', 'N'))
 );
 
+-- Daily dashboard aggregates, maintained by pkg_reporting_mgmt
+CREATE TABLE dashboard_daily_stats (
+    stat_date DATE PRIMARY KEY,
+    total_appointments NUMBER DEFAULT 0 NOT NULL,
+    scheduled_appointments NUMBER DEFAULT 0 NOT NULL,
+    completed_appointments NUMBER DEFAULT 0 NOT NULL,
+    cancelled_appointments NUMBER DEFAULT 0 NOT NULL,
+    new_records NUMBER DEFAULT 0 NOT NULL,
+    new_prescriptions NUMBER DEFAULT 0 NOT NULL,
+    new_patients NUMBER DEFAULT 0 NOT NULL,
+    refreshed_date DATE DEFAULT SYSDATE NOT NULL
+);
+
+-- Per provider-day appointment counts and booked minutes from today on,
+-- maintained by trg_appointments_occupancy and pkg_reporting_mgmt
+CREATE TABLE provider_day_occupancy (
+    provider_id NUMBER NOT NULL REFERENCES providers(provider_id),
+    schedule_date DATE NOT NULL,
+    total_appointments NUMBER DEFAULT 0 NOT NULL,
+    active_appointments NUMBER DEFAULT 0 NOT NULL,
+    scheduled_count NUMBER DEFAULT 0 NOT NULL,
+    confirmed_count NUMBER DEFAULT 0 NOT NULL,
+    completed_count NUMBER DEFAULT 0 NOT NULL,
+    cancelled_count NUMBER DEFAULT 0 NOT NULL,
+    booked_minutes NUMBER DEFAULT 0 NOT NULL,
+    refreshed_date DATE DEFAULT SYSDATE NOT NULL,
+    CONSTRAINT pk_provider_day_occupancy PRIMARY KEY (provider_id, schedule_date)
+) ORGANIZATION INDEX;
+
+-- Risk factors and score of each active patient (APEX Report 9), snapshot of
+-- v_patient_risk_factors maintained from patient_risk_queue and by the
+-- nightly pkg_patient_mgmt.rebuild_risk_profiles
+CREATE TABLE patient_risk_profile (
+    patient_id NUMBER PRIMARY KEY REFERENCES patients(patient_id) ON DELETE CASCADE,
+    age NUMBER,
+    elderly_risk NUMBER(1) DEFAULT 0 NOT NULL,
+    chronic_conditions NUMBER(1) DEFAULT 0 NOT NULL,
+    has_allergies NUMBER(1) DEFAULT 0 NOT NULL,
+    medication_count NUMBER DEFAULT 0 NOT NULL,
+    recent_visits NUMBER DEFAULT 0 NOT NULL,
+    missed_appointments NUMBER DEFAULT 0 NOT NULL,
+    last_visit_date DATE,
+    next_appointment_date DATE,
+    risk_score NUMBER DEFAULT 0 NOT NULL,
+    refreshed_date DATE DEFAULT SYSDATE NOT NULL
+);
+
+-- Patients whose risk profile needs recalculating, queued by the risk
+-- profile triggers and drained by pkg_patient_mgmt.drain_risk_queue. No
+-- foreign key, so a queued patient can still be deleted.
+CREATE TABLE patient_risk_queue (
+    queue_id NUMBER DEFAULT seq_risk_queue_id.NEXTVAL PRIMARY KEY,
+    patient_id NUMBER NOT NULL,
+    queued_ts TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL
+);
+
 -- Add indexes for better performance
 CREATE INDEX idx_patients_name ON patients(last_name, first_name);
 CREATE INDEX idx_patients_dob ON patients(date_of_birth);
+CREATE INDEX idx_patients_search_name ON patients(search_name);
+CREATE INDEX idx_patients_last_name_upper ON patients(UPPER(last_name));
+CREATE INDEX idx_patients_phone_digits ON patients(phone_digits);
+CREATE INDEX idx_patients_email_lower ON patients(email_lower);
+CREATE INDEX idx_patient_search_ngrams_pat ON patient_search_ngrams(patient_id);
 CREATE INDEX idx_appointments_date ON appointments(appointment_date);
 CREATE INDEX idx_appointments_patient ON appointments(patient_id);
 CREATE INDEX idx_appointments_provider ON appointments(provider_id);
+CREATE INDEX idx_appointments_provider_ts ON appointments(provider_id, start_ts, end_ts);
 CREATE INDEX idx_medical_records_patient ON medical_records(patient_id);
 CREATE INDEX idx_medical_records_date ON medical_records(visit_date);
 CREATE INDEX idx_prescriptions_patient ON prescriptions(patient_id);
+CREATE INDEX idx_patient_risk_score ON patient_risk_profile(risk_score DESC, patient_id);
+CREATE INDEX idx_patient_risk_queue_patient ON patient_risk_queue(patient_id);
 
 -- Add comments to tables
 COMMENT ON TABLE patients IS 'Patient demographics and contact information';
@@ -143,3 +224,10 @@ COMMENT ON TABLE medical_records IS 'Electronic health records for patient visit
 COMMENT ON TABLE prescriptions IS 'Medication prescriptions for patients';
 COMMENT ON TABLE appointment_types IS 'Lookup table for appointment types';
 COMMENT ON TABLE specialties IS 'Lookup table for medical specialties';
+COMMENT ON TABLE patient_search_ngrams IS 'Trigram postings used by pkg_patient_mgmt.search_patients';
+COMMENT ON TABLE dashboard_daily_stats IS 'Per-day activity counts backing v_dashboard_stats';
+COMMENT ON COLUMN dashboard_daily_stats.refreshed_date IS 'Time of the refresh that last recomputed this day';
+COMMENT ON TABLE provider_day_occupancy IS 'Per provider-day appointment counts and booked minutes backing v_provider_schedule';
+COMMENT ON COLUMN provider_day_occupancy.booked_minutes IS 'Minutes of Scheduled, Confirmed and In Progress appointments';
+COMMENT ON TABLE patient_risk_profile IS 'Per-patient risk factors and score backing the high-risk patient report';
+COMMENT ON TABLE patient_risk_queue IS 'Patients waiting for pkg_patient_mgmt.drain_risk_queue to recalculate their risk profile';
@@ -103,53 +103,48 @@ FROM appointments a
 JOIN patients p ON a.patient_id = p.patient_id
 JOIN providers pr ON a.provider_id = pr.provider_id;
 
--- View for provider schedule with availability
+-- View for provider schedule with availability. Counts come from
+-- provider_day_occupancy (maintained from appointment changes), so the cost
+-- depends on the 30-day window, not on appointment history. Availability
+-- compares booked minutes with the business-hours capacity of the day.
 CREATE OR REPLACE VIEW v_provider_schedule AS
 SELECT 
     pr.provider_id,
     pr.first_name,
     pr.last_name,
-    pkg_patient_mgmt.get_full_name(pr.first_name, pr.last_name) as provider_name,
+    TRIM(pr.first_name || ' ' || pr.last_name) as provider_name,
     pr.title,
     pr.specialty,
     pr.department,
     cal.schedule_date,
     TO_CHAR(cal.schedule_date, 'Day') as day_of_week,
     -- Count appointments by status
-    NVL(appt_stats.total_appointments, 0) as total_appointments,
-    NVL(appt_stats.scheduled_count, 0) as scheduled_count,
-    NVL(appt_stats.confirmed_count, 0) as confirmed_count,
-    NVL(appt_stats.completed_count, 0) as completed_count,
-    NVL(appt_stats.cancelled_count, 0) as cancelled_count,
+    NVL(o.total_appointments, 0) as total_appointments,
+    NVL(o.scheduled_count, 0) as scheduled_count,
+    NVL(o.confirmed_count, 0) as confirmed_count,
+    NVL(o.completed_count, 0) as completed_count,
+    NVL(o.cancelled_count, 0) as cancelled_count,
     -- Calculate availability
     CASE 
         WHEN cal.schedule_date < TRUNC(SYSDATE) THEN 'Past'
-        WHEN NVL(appt_stats.active_appointments, 0) >= 16 THEN 'Full' -- 8 hours * 2 slots per hour
-        WHEN NVL(appt_stats.active_appointments, 0) >= 12 THEN 'Busy'
-        WHEN NVL(appt_stats.active_appointments, 0) >= 6 THEN 'Moderate'
+        WHEN NVL(o.booked_minutes, 0) >= cal.capacity_minutes THEN 'Full'
+        WHEN NVL(o.booked_minutes, 0) >= cal.capacity_minutes * 0.75 THEN 'Busy'
+        WHEN NVL(o.booked_minutes, 0) >= cal.capacity_minutes * 0.375 THEN 'Moderate'
         ELSE 'Available'
-    END as availability_status
+    END as availability_status,
+    NVL(o.booked_minutes, 0) as booked_minutes,
+    cal.capacity_minutes,
+    GREATEST(cal.capacity_minutes - NVL(o.booked_minutes, 0), 0) as available_minutes
 FROM providers pr
 CROSS JOIN (
-    -- Generate dates for the next 30 days
-    SELECT TRUNC(SYSDATE) + LEVEL - 1 as schedule_date
+    -- Generate dates for the schedule window
+    SELECT TRUNC(SYSDATE) + LEVEL - 1 as schedule_date,
+           (SELECT pkg_appointment_mgmt.get_daily_capacity_minutes FROM dual) as capacity_minutes
     FROM DUAL
     CONNECT BY LEVEL <= 30
 ) cal
-LEFT JOIN (
-    SELECT 
-        provider_id,
-        appointment_date,
-        COUNT(*) as total_appointments,
-        SUM(CASE WHEN status IN ('Scheduled', 'Confirmed', 'In Progress') THEN 1 ELSE 0 END) as active_appointments,
-        SUM(CASE WHEN status = 'Scheduled' THEN 1 ELSE 0 END) as scheduled_count,
-        SUM(CASE WHEN status = 'Confirmed' THEN 1 ELSE 0 END) as confirmed_count,
-        SUM(CASE WHEN status = 'Completed' THEN 1 ELSE 0 END) as completed_count,
-        SUM(CASE WHEN status = 'Cancelled' THEN 1 ELSE 0 END) as cancelled_count
-    FROM appointments
-    GROUP BY provider_id, appointment_date
-) appt_stats ON pr.provider_id = appt_stats.provider_id 
-                AND cal.schedule_date = appt_stats.appointment_date
+LEFT JOIN provider_day_occupancy o ON o.provider_id = pr.provider_id
+                                  AND o.schedule_date = cal.schedule_date
 WHERE pr.is_active = 'Y'
   AND TO_CHAR(cal.schedule_date, 'D') NOT IN ('1', '7') -- Exclude weekends
 ORDER BY pr.last_name, pr.first_name, cal.schedule_date;
@@ -248,37 +243,38 @@ ORDER BY pr.date_prescribed DESC;
 -- View for dashboard statistics
 CREATE OR REPLACE VIEW v_dashboard_stats AS
 SELECT 
-    'Today' as metric_period,
-    (SELECT COUNT(*) FROM appointments WHERE appointment_date = TRUNC(SYSDATE)) as total_appointments,
-    (SELECT COUNT(*) FROM appointments WHERE appointment_date = TRUNC(SYSDATE) AND status = 'Scheduled') as scheduled_appointments,
-    (SELECT COUNT(*) FROM appointments WHERE appointment_date = TRUNC(SYSDATE) AND status = 'Completed') as completed_appointments,
-    (SELECT COUNT(*) FROM appointments WHERE appointment_date = TRUNC(SYSDATE) AND status = 'Cancelled') as cancelled_appointments,
-    (SELECT COUNT(*) FROM medical_records WHERE visit_date = TRUNC(SYSDATE)) as new_records,
-    (SELECT COUNT(*) FROM prescriptions WHERE date_prescribed = TRUNC(SYSDATE)) as new_prescriptions,
-    (SELECT COUNT(*) FROM patients WHERE created_date >= TRUNC(SYSDATE)) as new_patients
-FROM DUAL
-UNION ALL
-SELECT 
-    'This Week' as metric_period,
-    (SELECT COUNT(*) FROM appointments WHERE appointment_date >= TRUNC(SYSDATE, 'IW')) as total_appointments,
-    (SELECT COUNT(*) FROM appointments WHERE appointment_date >= TRUNC(SYSDATE, 'IW') AND status = 'Scheduled') as scheduled_appointments,
-    (SELECT COUNT(*) FROM appointments WHERE appointment_date >= TRUNC(SYSDATE, 'IW') AND status = 'Completed') as completed_appointments,
-    (SELECT COUNT(*) FROM appointments WHERE appointment_date >= TRUNC(SYSDATE, 'IW') AND status = 'Cancelled') as cancelled_appointments,
-    (SELECT COUNT(*) FROM medical_records WHERE visit_date >= TRUNC(SYSDATE, 'IW')) as new_records,
-    (SELECT COUNT(*) FROM prescriptions WHERE date_prescribed >= TRUNC(SYSDATE, 'IW')) as new_prescriptions,
-    (SELECT COUNT(*) FROM patients WHERE created_date >= TRUNC(SYSDATE, 'IW')) as new_patients
-FROM DUAL
-UNION ALL
+    p.metric_period,
+    NVL(SUM(s.total_appointments), 0) as total_appointments,
+    NVL(SUM(s.scheduled_appointments), 0) as scheduled_appointments,
+    NVL(SUM(s.completed_appointments), 0) as completed_appointments,
+    NVL(SUM(s.cancelled_appointments), 0) as cancelled_appointments,
+    NVL(SUM(s.new_records), 0) as new_records,
+    NVL(SUM(s.new_prescriptions), 0) as new_prescriptions,
+    NVL(SUM(s.new_patients), 0) as new_patients
+FROM (
+    SELECT 'Today' as metric_period, 1 as sort_order, TRUNC(SYSDATE) as period_start, TRUNC(SYSDATE) + 1 as period_end FROM DUAL
+    UNION ALL
+    SELECT 'This Week', 2, TRUNC(SYSDATE, 'IW'), NULL FROM DUAL
+    UNION ALL
+    SELECT 'This Month', 3, TRUNC(SYSDATE, 'MM'), NULL FROM DUAL
+) p
+LEFT JOIN dashboard_daily_stats s ON s.stat_date >= p.period_start
+    AND (p.period_end IS NULL OR s.stat_date < p.period_end)
+GROUP BY p.metric_period, p.sort_order
+ORDER BY p.sort_order;
+
+-- Freshness of the precomputed dashboard statistics
+CREATE OR REPLACE VIEW v_dashboard_stats_freshness AS
 SELECT 
-    'This Month' as metric_period,
-    (SELECT COUNT(*) FROM appointments WHERE appointment_date >= TRUNC(SYSDATE, 'MM')) as total_appointments,
-    (SELECT COUNT(*) FROM appointments WHERE appointment_date >= TRUNC(SYSDATE, 'MM') AND status = 'Scheduled') as scheduled_appointments,
-    (SELECT COUNT(*) FROM appointments WHERE appointment_date >= TRUNC(SYSDATE, 'MM') AND status = 'Completed') as completed_appointments,
-    (SELECT COUNT(*) FROM appointments WHERE appointment_date >= TRUNC(SYSDATE, 'MM') AND status = 'Cancelled') as cancelled_appointments,
-    (SELECT COUNT(*) FROM medical_records WHERE visit_date >= TRUNC(SYSDATE, 'MM')) as new_records,
-    (SELECT COUNT(*) FROM prescriptions WHERE date_prescribed >= TRUNC(SYSDATE, 'MM')) as new_prescriptions,
-    (SELECT COUNT(*) FROM patients WHERE created_date >= TRUNC(SYSDATE, 'MM')) as new_patients
-FROM DUAL;
+    s.last_refreshed,
+    ROUND((SYSDATE - s.last_refreshed) * 86400) as staleness_seconds,
+    j.state as job_state,
+    j.last_start_date as job_last_start,
+    j.last_run_duration as job_last_duration,
+    j.next_run_date as job_next_run,
+    j.failure_count as job_failure_count
+FROM (SELECT MAX(refreshed_date) as last_refreshed FROM dashboard_daily_stats) s
+LEFT JOIN user_scheduler_jobs j ON j.job_name = 'JOB_REFRESH_DASHBOARD_STATS';
 
 -- Clinical Trials Views
 
@@ -552,17 +548,17 @@ SELECT
     ct.current_enrollment,
     ROUND((ct.current_enrollment / NULLIF(ct.target_enrollment, 0)) * 100, 1) as enrollment_percentage,
     -- Enrollment metrics
-    (SELECT COUNT(*) FROM trial_participants tp WHERE tp.trial_id = ct.trial_id AND tp.status = 'Active') as active_participants,
-    (SELECT COUNT(*) FROM trial_participants tp WHERE tp.trial_id = ct.trial_id AND tp.enrollment_date >= TRUNC(SYSDATE) - 30) as recent_enrollments,
+    NVL(m.active_participants, 0) as active_participants,
+    NVL(m.recent_enrollments, 0) as recent_enrollments,
     -- Visit metrics
-    (SELECT COUNT(*) FROM trial_visits tv WHERE tv.trial_id = ct.trial_id AND tv.status = 'Scheduled' AND tv.scheduled_date <= TRUNC(SYSDATE) + 7) as upcoming_visits_week,
-    (SELECT COUNT(*) FROM trial_visits tv WHERE tv.trial_id = ct.trial_id AND tv.status = 'Scheduled' AND tv.scheduled_date < TRUNC(SYSDATE)) as overdue_visits,
+    NVL(m.upcoming_visits_week, 0) as upcoming_visits_week,
+    NVL(m.overdue_visits, 0) as overdue_visits,
     -- Safety metrics
-    (SELECT COUNT(*) FROM adverse_events ae WHERE ae.trial_id = ct.trial_id AND ae.serious = 'Y') as serious_adverse_events,
-    (SELECT COUNT(*) FROM adverse_events ae WHERE ae.trial_id = ct.trial_id AND ae.event_date >= TRUNC(SYSDATE) - 30) as recent_adverse_events,
+    NVL(m.serious_adverse_events, 0) as serious_adverse_events,
+    NVL(m.recent_adverse_events, 0) as recent_adverse_events,
     -- Milestone metrics
-    (SELECT COUNT(*) FROM trial_milestones tm WHERE tm.trial_id = ct.trial_id AND tm.status = 'Completed') as completed_milestones,
-    (SELECT COUNT(*) FROM trial_milestones tm WHERE tm.trial_id = ct.trial_id AND tm.planned_date < TRUNC(SYSDATE) AND tm.status != 'Completed') as overdue_milestones,
+    NVL(m.completed_milestones, 0) as completed_milestones,
+    NVL(m.overdue_milestones, 0) as overdue_milestones,
     -- Provider information
     pi.first_name || ' ' || pi.last_name as primary_investigator_name,
     -- Overall health score (simple calculation)
@@ -572,11 +568,12 @@ SELECT
             GREATEST(0, LEAST(100, 
                 ROUND(
                     (CASE WHEN ct.target_enrollment > 0 THEN (ct.current_enrollment / ct.target_enrollment) * 40 ELSE 0 END) +
-                    (CASE WHEN (SELECT COUNT(*) FROM trial_visits tv WHERE tv.trial_id = ct.trial_id AND tv.status = 'Scheduled' AND tv.scheduled_date < TRUNC(SYSDATE)) = 0 THEN 30 ELSE 15 END) +
-                    (CASE WHEN (SELECT COUNT(*) FROM adverse_events ae WHERE ae.trial_id = ct.trial_id AND ae.serious = 'Y' AND ae.event_date >= TRUNC(SYSDATE) - 30) = 0 THEN 30 ELSE 10 END), 0)
+                    (CASE WHEN NVL(m.overdue_visits, 0) = 0 THEN 30 ELSE 15 END) +
+                    (CASE WHEN NVL(m.recent_serious_adverse_events, 0) = 0 THEN 30 ELSE 10 END), 0)
             ))
     END as trial_health_score
 FROM clinical_trials ct
+LEFT JOIN trial_dashboard_metrics m ON m.trial_id = ct.trial_id
 LEFT JOIN providers pi ON ct.primary_investigator_id = pi.provider_id
 WHERE ct.is_active = 'Y';
 
@@ -611,23 +608,136 @@ AND (
     EXISTS (SELECT 1 FROM trial_milestones tm WHERE tm.responsible_provider_id = p.provider_id)
 );
 
+-- Backlog of the asynchronous audit capture queue (QUEUED mode)
+CREATE OR REPLACE VIEW v_audit_queue_lag AS
+SELECT 
+    c.capture_mode,
+    q.queued_records,
+    q.oldest_queued,
+    NVL(ROUND((CAST(SYSTIMESTAMP AS DATE) - CAST(q.oldest_queued AS DATE)) * 86400), 0) as lag_seconds,
+    j.state as job_state,
+    j.last_start_date as job_last_start,
+    j.last_run_duration as job_last_duration,
+    j.next_run_date as job_next_run,
+    j.failure_count as job_failure_count
+FROM (SELECT COUNT(*) as queued_records, MIN(queued_ts) as oldest_queued FROM audit_log_queue) q
+CROSS JOIN (SELECT MAX(capture_mode) as capture_mode FROM audit_capture_settings) c
+LEFT JOIN user_scheduler_jobs j ON j.job_name = 'JOB_DRAIN_AUDIT_QUEUE';
+
+-- Notification outbox by type, status and priority, with end-to-end
+-- delivery latency for what was sent in the last day
+CREATE OR REPLACE VIEW v_notification_outbox AS
+SELECT 
+    n.notification_type,
+    n.status,
+    n.priority,
+    COUNT(*) as notifications,
+    SUM(CASE WHEN n.retry_count > 0 THEN 1 ELSE 0 END) as retried,
+    MIN(CASE WHEN n.status = 'PENDING' THEN n.created_date END) as oldest_pending,
+    ROUND(AVG(CASE 
+        WHEN n.status = 'SENT' AND n.delivered_date >= SYSTIMESTAMP - INTERVAL '1' DAY
+        THEN (CAST(n.delivered_date AS DATE) - CAST(n.created_date AS DATE)) * 86400
+    END), 1) as avg_delivery_seconds_1d,
+    MAX(CASE 
+        WHEN n.status = 'SENT' AND n.delivered_date >= SYSTIMESTAMP - INTERVAL '1' DAY
+        THEN ROUND((CAST(n.delivered_date AS DATE) - CAST(n.created_date AS DATE)) * 86400)
+    END) as max_delivery_seconds_1d
+FROM system_notifications n
+GROUP BY n.notification_type, n.status, n.priority;
+
+-- Risk factors and score of every active patient, computed live. Each factor
+-- is a per-patient scalar subquery on a patient_id index, so filtering on
+-- patient_id (as the incremental recalculation does) reads only those
+-- patients' rows. Time windows start at midnight so results only change
+-- with the calendar day.
+CREATE OR REPLACE VIEW v_patient_risk_factors AS
+SELECT 
+    f.*,
+    (CASE WHEN f.age >= 65 THEN 2 ELSE 0 END +
+     f.chronic_conditions * 2 +
+     f.has_allergies +
+     CASE WHEN f.medication_count >= 5 THEN 2 ELSE 0 END +
+     CASE WHEN f.recent_visits >= 5 THEN 1 ELSE 0 END +
+     CASE WHEN f.missed_appointments >= 2 THEN 2 ELSE 0 END) as risk_score
+FROM (
+    SELECT 
+        p.patient_id,
+        TRUNC((SYSDATE - p.date_of_birth) / 365.25) as age,
+        CASE WHEN TRUNC((SYSDATE - p.date_of_birth) / 365.25) >= 65 THEN 1 ELSE 0 END as elderly_risk,
+        CASE WHEN p.medical_conditions IS NOT NULL AND LENGTH(p.medical_conditions) > 0 THEN 1 ELSE 0 END as chronic_conditions,
+        CASE WHEN p.allergies IS NOT NULL AND LENGTH(p.allergies) > 0 THEN 1 ELSE 0 END as has_allergies,
+        (SELECT COUNT(*) FROM prescriptions rx 
+         WHERE rx.patient_id = p.patient_id AND rx.is_active = 'Y') as medication_count,
+        (SELECT COUNT(*) FROM medical_records mr 
+         WHERE mr.patient_id = p.patient_id AND mr.visit_date >= TRUNC(SYSDATE) - 90) as recent_visits,
+        (SELECT COUNT(*) FROM appointments a 
+         WHERE a.patient_id = p.patient_id AND a.status = 'No Show' 
+           AND a.appointment_date >= TRUNC(SYSDATE) - 365) as missed_appointments,
+        (SELECT MAX(mr.visit_date) FROM medical_records mr 
+         WHERE mr.patient_id = p.patient_id) as last_visit_date,
+        (SELECT MIN(a.appointment_date) FROM appointments a 
+         WHERE a.patient_id = p.patient_id AND a.appointment_date >= TRUNC(SYSDATE)
+           AND a.status IN ('Scheduled', 'Confirmed')) as next_appointment_date
+    FROM patients p
+    WHERE p.is_active = 'Y'
+) f;
+
+-- Consistency check of patient_risk_profile against a fresh calculation:
+-- MISSING (active patient without a profile), ORPHANED (profile of an
+-- inactive patient) or STALE (stored factors differ). Patients still in
+-- patient_risk_queue are left out until the drain job recalculates them.
+CREATE OR REPLACE VIEW v_patient_risk_drift AS
+SELECT 
+    NVL(e.patient_id, r.patient_id) as patient_id,
+    CASE 
+        WHEN r.patient_id IS NULL THEN 'MISSING'
+        WHEN e.patient_id IS NULL THEN 'ORPHANED'
+        ELSE 'STALE'
+    END as issue,
+    r.risk_score as stored_risk_score,
+    e.risk_score as expected_risk_score,
+    r.refreshed_date
+FROM v_patient_risk_factors e
+FULL OUTER JOIN patient_risk_profile r ON r.patient_id = e.patient_id
+WHERE (r.patient_id IS NULL
+       OR e.patient_id IS NULL
+       OR DECODE(r.age, e.age, 0, 1) = 1
+       OR r.chronic_conditions != e.chronic_conditions
+       OR r.has_allergies != e.has_allergies
+       OR r.medication_count != e.medication_count
+       OR r.recent_visits != e.recent_visits
+       OR r.missed_appointments != e.missed_appointments
+       OR DECODE(r.last_visit_date, e.last_visit_date, 0, 1) = 1
+       OR DECODE(r.next_appointment_date, e.next_appointment_date, 0, 1) = 1
+       OR r.risk_score != e.risk_score)
+  AND NOT EXISTS (
+      SELECT 1 FROM patient_risk_queue q
+      WHERE q.patient_id = NVL(e.patient_id, r.patient_id)
+  );
+
 -- Create indexes on views for better performance
 CREATE INDEX idx_appointments_date_status ON appointments(appointment_date, status);
 CREATE INDEX idx_appointments_provider_date ON appointments(provider_id, appointment_date);
 CREATE INDEX idx_medical_records_visit_date ON medical_records(visit_date);
 CREATE INDEX idx_prescriptions_date_active ON prescriptions(date_prescribed, is_active);
+CREATE INDEX idx_patients_created_date ON patients(created_date);
 
 -- Add comments to views
 COMMENT ON VIEW v_patient_summary IS 'Patient summary with calculated fields for demographics and visit statistics';
 COMMENT ON VIEW v_appointment_details IS 'Comprehensive appointment view with patient and provider details';
-COMMENT ON VIEW v_provider_schedule IS 'Provider availability and schedule view with appointment statistics';
+COMMENT ON VIEW v_provider_schedule IS 'Provider availability and schedule view with appointment statistics, read from provider_day_occupancy';
 COMMENT ON VIEW v_medical_records IS 'Medical records with patient and provider information';
 COMMENT ON VIEW v_active_prescriptions IS 'Active prescriptions with patient and provider details';
-COMMENT ON VIEW v_dashboard_stats IS 'Dashboard statistics for different time periods';
+COMMENT ON VIEW v_dashboard_stats IS 'Dashboard statistics for different time periods, read from dashboard_daily_stats';
+COMMENT ON VIEW v_dashboard_stats_freshness IS 'Age of the dashboard statistics and state of their refresh job';
 COMMENT ON VIEW v_trial_summary IS 'Comprehensive trial information with enrollment and progress metrics';
 COMMENT ON VIEW v_trial_participants IS 'Trial participants with patient details and participation metrics';
 COMMENT ON VIEW v_trial_visits IS 'Trial visits with compliance and scheduling information';
 COMMENT ON VIEW v_adverse_events IS 'Adverse events with patient, trial, and regulatory context';
 COMMENT ON VIEW v_trial_milestones IS 'Trial milestones with progress tracking and deadline monitoring';
-COMMENT ON VIEW v_trial_dashboard IS 'Dashboard metrics for trial monitoring and management';
+COMMENT ON VIEW v_trial_dashboard IS 'Dashboard metrics for trial monitoring and management, read from trial_dashboard_metrics';
 COMMENT ON VIEW v_provider_trials IS 'Provider involvement and activity in clinical trials';
+COMMENT ON VIEW v_audit_queue_lag IS 'Size and age of the audit capture queue and state of its drain job';
+COMMENT ON VIEW v_notification_outbox IS 'Notification outbox backlog, retries and delivery latency by type, status and priority';
+COMMENT ON VIEW v_patient_risk_factors IS 'Live per-patient risk factors and score, the source of patient_risk_profile';
+COMMENT ON VIEW v_patient_risk_drift IS 'Patients whose stored risk profile is missing, orphaned or differs from v_patient_risk_factors';
@@ -9,6 +9,9 @@ CREATE SEQUENCE seq_protocol_id START WITH 500 INCREMENT BY 1;
 CREATE SEQUENCE seq_milestone_id START WITH 5000 INCREMENT BY 1;
 CREATE SEQUENCE seq_adverse_event_id START WITH 20000 INCREMENT BY 1;
 CREATE SEQUENCE seq_trial_visit_id START WITH 30000 INCREMENT BY 1;
+CREATE SEQUENCE seq_audit_id START WITH 1 INCREMENT BY 1 CACHE 1000;
+CREATE SEQUENCE seq_audit_queue_id START WITH 1 INCREMENT BY 1 CACHE 1000;
+CREATE SEQUENCE seq_notification_id START WITH 1 INCREMENT BY 1 CACHE 1000;
 
 -- Clinical Trials table
 CREATE TABLE clinical_trials (
@@ -169,6 +172,84 @@ CREATE TABLE trial_visits (
     CONSTRAINT fk_visit_provider FOREIGN KEY (provider_id) REFERENCES providers(provider_id)
 );
 
+-- Per-trial dashboard metrics, maintained by pkg_clinical_trials_mgmt.refresh_trial_metrics
+CREATE TABLE trial_dashboard_metrics (
+    trial_id NUMBER PRIMARY KEY,
+    active_participants NUMBER DEFAULT 0 NOT NULL,
+    recent_enrollments NUMBER DEFAULT 0 NOT NULL,
+    upcoming_visits_week NUMBER DEFAULT 0 NOT NULL,
+    overdue_visits NUMBER DEFAULT 0 NOT NULL,
+    serious_adverse_events NUMBER DEFAULT 0 NOT NULL,
+    recent_adverse_events NUMBER DEFAULT 0 NOT NULL,
+    recent_serious_adverse_events NUMBER DEFAULT 0 NOT NULL,
+    completed_milestones NUMBER DEFAULT 0 NOT NULL,
+    overdue_milestones NUMBER DEFAULT 0 NOT NULL,
+    refreshed_date DATE DEFAULT SYSDATE NOT NULL,
+    CONSTRAINT fk_metrics_trial FOREIGN KEY (trial_id) REFERENCES clinical_trials(trial_id) ON DELETE CASCADE
+);
+
+-- Audit trail written by the clinical trials triggers (via pkg_audit_mgmt.log_change).
+-- logged_date is when the row reached this table; in QUEUED capture mode it
+-- trails changed_date by the drain lag.
+CREATE TABLE audit_log (
+    audit_id NUMBER DEFAULT seq_audit_id.NEXTVAL PRIMARY KEY,
+    table_name VARCHAR2(30) NOT NULL,
+    operation_type VARCHAR2(30) NOT NULL,
+    record_id NUMBER,
+    old_values VARCHAR2(4000),
+    new_values VARCHAR2(4000),
+    changed_by VARCHAR2(255),
+    changed_date DATE DEFAULT SYSDATE NOT NULL,
+    logged_date DATE DEFAULT SYSDATE NOT NULL
+);
+
+-- Change records waiting for pkg_audit_mgmt.drain_audit_queue (QUEUED capture mode).
+-- Rows are written in the changing transaction, so a committed change always
+-- has its queue row; the drainer moves them to audit_log in one transaction.
+CREATE TABLE audit_log_queue (
+    queue_id NUMBER DEFAULT seq_audit_queue_id.NEXTVAL PRIMARY KEY,
+    table_name VARCHAR2(30) NOT NULL,
+    operation_type VARCHAR2(30) NOT NULL,
+    record_id NUMBER,
+    old_values VARCHAR2(4000),
+    new_values VARCHAR2(4000),
+    changed_by VARCHAR2(255),
+    changed_date DATE NOT NULL,
+    queued_ts TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL
+);
+
+-- Single-row audit capture settings (see pkg_audit_mgmt.set_capture_mode)
+CREATE TABLE audit_capture_settings (
+    setting_id NUMBER DEFAULT 1 PRIMARY KEY CHECK (setting_id = 1),
+    capture_mode VARCHAR2(10) DEFAULT 'SYNC' NOT NULL CHECK (capture_mode IN ('SYNC', 'QUEUED')),
+    modified_date DATE DEFAULT SYSDATE,
+    modified_by VARCHAR2(50) DEFAULT USER
+);
+
+INSERT INTO audit_capture_settings (setting_id, capture_mode) VALUES (1, 'SYNC');
+COMMIT;
+
+-- Notification outbox (see pkg_notification_mgmt). Rows are written in the
+-- triggering transaction and delivered by scripts/notification-dispatcher.py.
+-- priority: 1 = high, 2 = normal, 3 = low. created_date is the event time,
+-- so delivered_date - created_date is the end-to-end delivery latency.
+CREATE TABLE system_notifications (
+    notification_id NUMBER DEFAULT seq_notification_id.NEXTVAL PRIMARY KEY,
+    notification_type VARCHAR2(50) NOT NULL,
+    source_table VARCHAR2(30),
+    source_id NUMBER,
+    recipient_email VARCHAR2(100),
+    subject VARCHAR2(200) NOT NULL,
+    message VARCHAR2(4000),
+    priority NUMBER(1) DEFAULT 2 NOT NULL CHECK (priority IN (1, 2, 3)),
+    status VARCHAR2(20) DEFAULT 'PENDING' NOT NULL CHECK (status IN ('PENDING', 'SENT', 'FAILED')),
+    retry_count NUMBER DEFAULT 0 NOT NULL,
+    last_error VARCHAR2(1000),
+    next_attempt_date TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL,
+    created_date TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL,
+    delivered_date TIMESTAMP
+);
+
 -- Create indexes for performance
 CREATE INDEX idx_trials_status ON clinical_trials(status);
 CREATE INDEX idx_trials_phase ON clinical_trials(phase);
@@ -187,6 +268,9 @@ CREATE INDEX idx_ae_serious ON adverse_events(serious);
 CREATE INDEX idx_visits_participant ON trial_visits(participant_id);
 CREATE INDEX idx_visits_trial ON trial_visits(trial_id);
 CREATE INDEX idx_visits_date ON trial_visits(actual_date);
+CREATE INDEX idx_audit_log_record ON audit_log(table_name, record_id);
+CREATE INDEX idx_audit_log_changed ON audit_log(changed_date);
+CREATE INDEX idx_notifications_dispatch ON system_notifications(status, priority, created_date);
 
 -- Add comments for documentation
 COMMENT ON TABLE clinical_trials IS 'Master table for clinical trials information';
@@ -195,3 +279,8 @@ COMMENT ON TABLE study_protocols IS 'Study protocols and versions for each trial
 COMMENT ON TABLE trial_milestones IS 'Key milestones and deliverables for trials';
 COMMENT ON TABLE adverse_events IS 'Adverse events reported during trials';
 COMMENT ON TABLE trial_visits IS 'Scheduled and completed visits for trial participants';
+COMMENT ON TABLE trial_dashboard_metrics IS 'Pre-aggregated per-trial counts backing v_trial_dashboard';
+COMMENT ON TABLE audit_log IS 'Audit trail of clinical trial status, severity and progress changes';
+COMMENT ON TABLE audit_log_queue IS 'Audit records waiting to be drained into audit_log (QUEUED capture mode)';
+COMMENT ON TABLE audit_capture_settings IS 'Whether triggers write audit_log directly (SYNC) or through audit_log_queue (QUEUED)';
+COMMENT ON TABLE system_notifications IS 'Outbox of staff notifications awaiting or recording delivery';
@@ -13,10 +13,7 @@ BEGIN
     
     -- Log status changes
     IF :OLD.status != :NEW.status THEN
-        INSERT INTO audit_log (
-            table_name, operation_type, record_id, 
-            old_values, new_values, changed_by, changed_date
-        ) VALUES (
+        pkg_audit_mgmt.log_change(
             'CLINICAL_TRIALS', 'STATUS_CHANGE', :NEW.trial_id,
             'Status: ' || :OLD.status,
             'Status: ' || :NEW.status,
@@ -42,10 +39,7 @@ BEGIN
         
         -- Log status changes
         IF :OLD.status != :NEW.status THEN
-            INSERT INTO audit_log (
-                table_name, operation_type, record_id,
-                old_values, new_values, changed_by, changed_date
-            ) VALUES (
+            pkg_audit_mgmt.log_change(
                 'TRIAL_PARTICIPANTS', 'STATUS_CHANGE', :NEW.participant_id,
                 'Status: ' || :OLD.status,
                 'Status: ' || :NEW.status,
@@ -57,34 +51,67 @@ END;
 /
 
 -- Trigger to update trial enrollment count
+-- Compound trigger: rows only record which trials they touched, and each
+-- affected trial is recounted once when the statement completes. Bulk
+-- enrollments and status sweeps therefore cost one recount per trial
+-- instead of one per participant row.
 CREATE OR REPLACE TRIGGER trg_update_trial_enrollment
-    AFTER INSERT OR UPDATE OR DELETE ON trial_participants
-    FOR EACH ROW
-DECLARE
-    v_trial_id NUMBER;
-    v_enrollment_count NUMBER;
-BEGIN
-    -- Determine which trial to update
-    IF INSERTING OR UPDATING THEN
-        v_trial_id := :NEW.trial_id;
-    ELSE -- DELETING
-        v_trial_id := :OLD.trial_id;
-    END IF;
+    FOR INSERT OR UPDATE OF trial_id, status OR DELETE ON trial_participants
+    COMPOUND TRIGGER
     
-    -- Calculate current enrollment for active participants
-    SELECT COUNT(*)
-    INTO v_enrollment_count
-    FROM trial_participants
-    WHERE trial_id = v_trial_id
-    AND status IN ('Screening', 'Active');
+    TYPE t_trial_set IS TABLE OF NUMBER INDEX BY VARCHAR2(40);
+    g_trial_ids t_trial_set;
     
-    -- Update trial enrollment count
-    UPDATE clinical_trials
-    SET current_enrollment = v_enrollment_count,
-        modified_date = SYSDATE,
-        modified_by = NVL(SYS_CONTEXT('APEX$SESSION', 'APP_USER'), USER)
-    WHERE trial_id = v_trial_id;
-END;
+    AFTER EACH ROW IS
+    BEGIN
+        IF INSERTING THEN
+            g_trial_ids(TO_CHAR(:NEW.trial_id)) := :NEW.trial_id;
+        ELSIF DELETING THEN
+            g_trial_ids(TO_CHAR(:OLD.trial_id)) := :OLD.trial_id;
+        ELSIF :OLD.trial_id != :NEW.trial_id THEN
+            -- Participant moved between trials: both need a recount
+            g_trial_ids(TO_CHAR(:OLD.trial_id)) := :OLD.trial_id;
+            g_trial_ids(TO_CHAR(:NEW.trial_id)) := :NEW.trial_id;
+        ELSIF NVL(:OLD.status, '~') != NVL(:NEW.status, '~') THEN
+            g_trial_ids(TO_CHAR(:NEW.trial_id)) := :NEW.trial_id;
+        END IF;
+    END AFTER EACH ROW;
+    
+    AFTER STATEMENT IS
+        v_trial_ids SYS.ODCINUMBERLIST := SYS.ODCINUMBERLIST();
+        v_key VARCHAR2(40);
+    BEGIN
+        v_key := g_trial_ids.FIRST;
+        WHILE v_key IS NOT NULL LOOP
+            v_trial_ids.EXTEND;
+            v_trial_ids(v_trial_ids.COUNT) := g_trial_ids(v_key);
+            v_key := g_trial_ids.NEXT(v_key);
+        END LOOP;
+        g_trial_ids.DELETE;
+        
+        IF v_trial_ids.COUNT = 0 THEN
+            RETURN;
+        END IF;
+        
+        -- Recount active participants once per affected trial
+        MERGE INTO clinical_trials ct
+        USING (
+            SELECT t.COLUMN_VALUE as trial_id,
+                   (SELECT COUNT(*)
+                    FROM trial_participants tp
+                    WHERE tp.trial_id = t.COLUMN_VALUE
+                    AND tp.status IN ('Screening', 'Active')) as enrollment_count
+            FROM TABLE(v_trial_ids) t
+        ) src
+        ON (ct.trial_id = src.trial_id)
+        WHEN MATCHED THEN UPDATE
+        SET ct.current_enrollment = src.enrollment_count,
+            ct.modified_date = SYSDATE,
+            ct.modified_by = NVL(SYS_CONTEXT('APEX$SESSION', 'APP_USER'), USER)
+        WHERE DECODE(ct.current_enrollment, src.enrollment_count, 0, 1) = 1;
+    END AFTER STATEMENT;
+    
+END trg_update_trial_enrollment;
 /
 
 -- Trigger for adverse events audit trail and validation
@@ -114,10 +141,7 @@ BEGIN
         
         -- Log severity changes
         IF :OLD.severity != :NEW.severity THEN
-            INSERT INTO audit_log (
-                table_name, operation_type, record_id,
-                old_values, new_values, changed_by, changed_date
-            ) VALUES (
+            pkg_audit_mgmt.log_change(
                 'ADVERSE_EVENTS', 'SEVERITY_CHANGE', :NEW.adverse_event_id,
                 'Severity: ' || :OLD.severity || ', Serious: ' || :OLD.serious,
                 'Severity: ' || :NEW.severity || ', Serious: ' || :NEW.serious,
@@ -155,10 +179,7 @@ BEGIN
         
         -- Log visit completion
         IF :OLD.status != :NEW.status AND :NEW.status = 'Completed' THEN
-            INSERT INTO audit_log (
-                table_name, operation_type, record_id,
-                old_values, new_values, changed_by, changed_date
-            ) VALUES (
+            pkg_audit_mgmt.log_change(
                 'TRIAL_VISITS', 'VISIT_COMPLETED', :NEW.visit_id,
                 'Scheduled: ' || TO_CHAR(:NEW.scheduled_date, 'DD-MON-YYYY'),
                 'Completed: ' || TO_CHAR(:NEW.actual_date, 'DD-MON-YYYY'),
@@ -194,10 +215,7 @@ BEGIN
         
         -- Log milestone completion
         IF :OLD.status != :NEW.status AND :NEW.status = 'Completed' THEN
-            INSERT INTO audit_log (
-                table_name, operation_type, record_id,
-                old_values, new_values, changed_by, changed_date
-            ) VALUES (
+            pkg_audit_mgmt.log_change(
                 'TRIAL_MILESTONES', 'MILESTONE_COMPLETED', :NEW.milestone_id,
                 'Planned: ' || TO_CHAR(:NEW.planned_date, 'DD-MON-YYYY'),
                 'Completed: ' || TO_CHAR(:NEW.actual_date, 'DD-MON-YYYY'),
@@ -207,10 +225,7 @@ BEGIN
         
         -- Log progress updates
         IF :OLD.completion_percentage != :NEW.completion_percentage THEN
-            INSERT INTO audit_log (
-                table_name, operation_type, record_id,
-                old_values, new_values, changed_by, changed_date
-            ) VALUES (
+            pkg_audit_mgmt.log_change(
                 'TRIAL_MILESTONES', 'PROGRESS_UPDATE', :NEW.milestone_id,
                 'Progress: ' || :OLD.completion_percentage || '%',
                 'Progress: ' || :NEW.completion_percentage || '%',
@@ -316,11 +331,15 @@ BEGIN
 END;
 /
 
--- Create notification trigger for serious adverse events
+-- Create notification trigger for serious adverse events.
+-- Fires once when an event becomes serious (on insert, or when serious
+-- changes to 'Y'), not on every later edit of a serious event. The alert
+-- goes to the system_notifications outbox in the same transaction;
+-- notification-dispatcher.py delivers it.
 CREATE OR REPLACE TRIGGER trg_notify_serious_ae
-    AFTER INSERT OR UPDATE ON adverse_events
+    AFTER INSERT OR UPDATE OF serious ON adverse_events
     FOR EACH ROW
-WHEN (NEW.serious = 'Y')
+WHEN (NEW.serious = 'Y' AND (OLD.serious IS NULL OR OLD.serious <> 'Y'))
 DECLARE
     v_trial_name VARCHAR2(200);
     v_patient_name VARCHAR2(100);
@@ -337,25 +356,19 @@ BEGIN
     LEFT JOIN providers pr ON ct.primary_investigator_id = pr.provider_id
     WHERE tp.participant_id = :NEW.participant_id;
     
-    -- Insert notification record (would trigger email in real system)
-    INSERT INTO system_notifications (
-        notification_type, recipient_email, subject, message,
-        priority, created_date, status
-    ) VALUES (
-        'SERIOUS_AE_ALERT',
-        v_investigator_email,
-        'URGENT: Serious Adverse Event Reported - ' || v_trial_name,
-        'A serious adverse event has been reported for participant ' || v_patient_name || 
-        ' in trial ' || v_trial_name || '. Event: ' || :NEW.event_term || 
-        '. Please review immediately and take appropriate action.',
-        'HIGH',
-        SYSDATE,
-        'PENDING'
+    -- No exception handler: an alert that cannot be queued fails the event
+    -- rather than being lost. Delivery failures are retried and counted by
+    -- the dispatcher.
+    pkg_notification_mgmt.enqueue_notification(
+        p_notification_type => 'SERIOUS_AE_ALERT',
+        p_recipient_email => v_investigator_email,
+        p_subject => 'URGENT: Serious Adverse Event Reported - ' || v_trial_name,
+        p_message => 'A serious adverse event has been reported for participant ' || v_patient_name || 
+                     ' in trial ' || v_trial_name || '. Event: ' || :NEW.event_term || 
+                     '. Please review immediately and take appropriate action.',
+        p_priority => pkg_notification_mgmt.c_priority_high,
+        p_source_table => 'ADVERSE_EVENTS',
+        p_source_id => :NEW.adverse_event_id
     );
-    
-EXCEPTION
-    WHEN OTHERS THEN
-        -- Don't fail the main transaction if notification fails
-        NULL;
 END;
 /
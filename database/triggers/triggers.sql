@@ -2,6 +2,9 @@
 -- Auditing and Data Integrity
 
 -- Create audit table for patients
+-- Inserts and deletes keep a full snapshot; updates keep only the changed
+-- columns (old_values/new_values hold the same keys).
+-- pkg_patient_mgmt.get_patient_history rebuilds full snapshots.
 CREATE TABLE patient_audit (
     audit_id NUMBER PRIMARY KEY,
     patient_id NUMBER,
@@ -9,8 +12,13 @@ CREATE TABLE patient_audit (
     old_values CLOB,
     new_values CLOB,
     changed_by VARCHAR2(50),
-    changed_date DATE DEFAULT SYSDATE
-);
+    changed_date DATE DEFAULT SYSDATE NOT NULL
+)
+PARTITION BY RANGE (changed_date)
+INTERVAL (NUMTOYMINTERVAL(1, 'MONTH'))
+(PARTITION p_patient_audit_initial VALUES LESS THAN (DATE '2024-01-01'));
+
+CREATE INDEX idx_patient_audit_patient ON patient_audit(patient_id, changed_date) LOCAL;
 
 CREATE SEQUENCE seq_patient_audit START WITH 1 INCREMENT BY 1;
 
@@ -22,6 +30,25 @@ DECLARE
     l_operation VARCHAR2(10);
     l_old_values CLOB;
     l_new_values CLOB;
+    l_old_diff JSON_OBJECT_T := JSON_OBJECT_T();
+    l_new_diff JSON_OBJECT_T := JSON_OBJECT_T();
+
+    -- Record a column in the update diff when its value changed
+    PROCEDURE diff(p_name IN VARCHAR2, p_old IN VARCHAR2, p_new IN VARCHAR2) IS
+    BEGIN
+        IF p_old <> p_new OR (p_old IS NULL AND p_new IS NOT NULL) OR (p_old IS NOT NULL AND p_new IS NULL) THEN
+            l_old_diff.put(p_name, p_old);
+            l_new_diff.put(p_name, p_new);
+        END IF;
+    END diff;
+
+    PROCEDURE diff(p_name IN VARCHAR2, p_old IN NUMBER, p_new IN NUMBER) IS
+    BEGIN
+        IF p_old <> p_new OR (p_old IS NULL AND p_new IS NOT NULL) OR (p_old IS NOT NULL AND p_new IS NULL) THEN
+            l_old_diff.put(p_name, p_old);
+            l_new_diff.put(p_name, p_new);
+        END IF;
+    END diff;
 BEGIN
     -- Determine operation type
     IF INSERTING THEN
@@ -39,9 +66,32 @@ BEGIN
             'state' VALUE :NEW.state,
             'zip_code' VALUE :NEW.zip_code,
             'is_active' VALUE :NEW.is_active
+            RETURNING CLOB
         );
     ELSIF UPDATING THEN
         l_operation := 'UPDATE';
+        diff('patient_id', :OLD.patient_id, :NEW.patient_id);
+        diff('first_name', :OLD.first_name, :NEW.first_name);
+        diff('last_name', :OLD.last_name, :NEW.last_name);
+        diff('date_of_birth', TO_CHAR(:OLD.date_of_birth, 'YYYY-MM-DD'), TO_CHAR(:NEW.date_of_birth, 'YYYY-MM-DD'));
+        diff('gender', :OLD.gender, :NEW.gender);
+        diff('phone', :OLD.phone, :NEW.phone);
+        diff('email', :OLD.email, :NEW.email);
+        diff('address', :OLD.address, :NEW.address);
+        diff('city', :OLD.city, :NEW.city);
+        diff('state', :OLD.state, :NEW.state);
+        diff('zip_code', :OLD.zip_code, :NEW.zip_code);
+        diff('is_active', :OLD.is_active, :NEW.is_active);
+
+        -- Updates that only touch unaudited columns (e.g. modified_date) leave no row
+        IF l_new_diff.get_size = 0 THEN
+            RETURN;
+        END IF;
+
+        l_old_values := l_old_diff.to_clob;
+        l_new_values := l_new_diff.to_clob;
+    ELSIF DELETING THEN
+        l_operation := 'DELETE';
         l_old_values := JSON_OBJECT(
             'patient_id' VALUE :OLD.patient_id,
             'first_name' VALUE :OLD.first_name,
@@ -55,32 +105,7 @@ BEGIN
             'state' VALUE :OLD.state,
             'zip_code' VALUE :OLD.zip_code,
             'is_active' VALUE :OLD.is_active
-        );
-        l_new_values := JSON_OBJECT(
-            'patient_id' VALUE :NEW.patient_id,
-            'first_name' VALUE :NEW.first_name,
-            'last_name' VALUE :NEW.last_name,
-            'date_of_birth' VALUE TO_CHAR(:NEW.date_of_birth, 'YYYY-MM-DD'),
-            'gender' VALUE :NEW.gender,
-            'phone' VALUE :NEW.phone,
-            'email' VALUE :NEW.email,
-            'address' VALUE :NEW.address,
-            'city' VALUE :NEW.city,
-            'state' VALUE :NEW.state,
-            'zip_code' VALUE :NEW.zip_code,
-            'is_active' VALUE :NEW.is_active
-        );
-    ELSIF DELETING THEN
-        l_operation := 'DELETE';
-        l_old_values := JSON_OBJECT(
-            'patient_id' VALUE :OLD.patient_id,
-            'first_name' VALUE :OLD.first_name,
-            'last_name' VALUE :OLD.last_name,
-            'date_of_birth' VALUE TO_CHAR(:OLD.date_of_birth, 'YYYY-MM-DD'),
-            'gender' VALUE :OLD.gender,
-            'phone' VALUE :OLD.phone,
-            'email' VALUE :OLD.email,
-            'is_active' VALUE :OLD.is_active
+            RETURNING CLOB
         );
     END IF;
     
@@ -109,6 +134,57 @@ BEGIN
 END;
 /
 
+-- Trigger to maintain the patient search trigram index
+CREATE OR REPLACE TRIGGER trg_patients_search_index
+    AFTER INSERT OR UPDATE OF first_name, last_name, phone, email OR DELETE ON patients
+    FOR EACH ROW
+BEGIN
+    IF DELETING THEN
+        pkg_patient_mgmt.index_patient_search(:OLD.patient_id, NULL, NULL, NULL);
+    ELSE
+        pkg_patient_mgmt.index_patient_search(
+            :NEW.patient_id,
+            :NEW.first_name || ' ' || :NEW.last_name,
+            :NEW.phone,
+            :NEW.email
+        );
+    END IF;
+END;
+/
+
+-- Risk profile maintenance (patient_risk_profile, APEX Report 9). Each of
+-- these triggers notes the patients touched by a statement
+-- (pkg_patient_mgmt.note_patient) and queues them once when it completes
+-- (flush_risk_profiles); JOB_DRAIN_RISK_QUEUE recalculates their profiles
+-- outside the clinical transaction. Deleted patients' profiles go with the
+-- foreign key.
+CREATE OR REPLACE TRIGGER trg_patients_risk_profile
+    FOR INSERT OR UPDATE ON patients
+    COMPOUND TRIGGER
+    
+    AFTER EACH ROW IS
+    BEGIN
+        -- Only age, activity and whether conditions/allergies are recorded
+        -- affect the profile. (UPDATE OF cannot name the CLOB columns.)
+        IF INSERTING
+           OR :OLD.date_of_birth != :NEW.date_of_birth
+           OR NVL(:OLD.is_active, '~') != NVL(:NEW.is_active, '~')
+           OR SIGN(NVL(DBMS_LOB.GETLENGTH(:OLD.medical_conditions), 0)) !=
+              SIGN(NVL(DBMS_LOB.GETLENGTH(:NEW.medical_conditions), 0))
+           OR SIGN(NVL(DBMS_LOB.GETLENGTH(:OLD.allergies), 0)) !=
+              SIGN(NVL(DBMS_LOB.GETLENGTH(:NEW.allergies), 0)) THEN
+            pkg_patient_mgmt.note_patient(:NEW.patient_id);
+        END IF;
+    END AFTER EACH ROW;
+    
+    AFTER STATEMENT IS
+    BEGIN
+        pkg_patient_mgmt.flush_risk_profiles;
+    END AFTER STATEMENT;
+    
+END trg_patients_risk_profile;
+/
+
 -- Trigger to prevent deletion of patients with active appointments
 CREATE OR REPLACE TRIGGER trg_patients_delete_check
     BEFORE DELETE ON patients
@@ -160,14 +236,30 @@ BEGIN
         RAISE_APPLICATION_ERROR(-20012, 'Cannot schedule appointment with inactive provider');
     END IF;
     
-    -- Check for appointment conflicts (only for active appointments)
+    -- Set default duration if not provided
+    IF :NEW.duration_minutes IS NULL THEN
+        :NEW.duration_minutes := 30;
+    END IF;
+    
+    -- Keep the native start/end timestamps in sync with date, time and duration
+    :NEW.start_ts := TO_DATE(TO_CHAR(:NEW.appointment_date, 'YYYY-MM-DD') || ' ' || :NEW.appointment_time, 
+                             'YYYY-MM-DD HH24:MI');
+    :NEW.end_ts := :NEW.start_ts + (:NEW.duration_minutes / (24 * 60));
+    
+    -- Also enforced by chk_appointments_same_day; checked here for a clearer message
+    IF :NEW.end_ts > TRUNC(:NEW.start_ts) + 1 THEN
+        RAISE_APPLICATION_ERROR(-20025, 'Appointment must end on the day it starts');
+    END IF;
+    
+    -- Check for overlapping appointments (only for active appointments)
     IF :NEW.status NOT IN ('Cancelled', 'No Show') THEN
         SELECT COUNT(*)
         INTO l_conflicts
         FROM appointments
         WHERE provider_id = :NEW.provider_id
-          AND appointment_date = :NEW.appointment_date
-          AND appointment_time = :NEW.appointment_time
+          AND start_ts >= TRUNC(:NEW.start_ts) -- no appointment spans midnight (chk_appointments_same_day)
+          AND start_ts < :NEW.end_ts
+          AND end_ts > :NEW.start_ts
           AND status NOT IN ('Cancelled', 'No Show')
           AND (:OLD.appointment_id IS NULL OR appointment_id != :OLD.appointment_id);
         
@@ -182,11 +274,6 @@ BEGIN
         RAISE_APPLICATION_ERROR(-20014, 'Cannot schedule appointment in the past');
     END IF;
     
-    -- Set default duration if not provided
-    IF :NEW.duration_minutes IS NULL THEN
-        :NEW.duration_minutes := 30;
-    END IF;
-    
     -- Auto-update modified fields on update
     IF UPDATING THEN
         :NEW.modified_date := SYSDATE;
@@ -221,10 +308,81 @@ BEGIN
         :NEW.created_by := USER;
         :NEW.modified_date := SYSDATE;
         :NEW.modified_by := USER;
+    ELSIF UPDATING THEN
+        -- Direct updates must move modified_date for incremental backups
+        :NEW.modified_date := SYSDATE;
+        :NEW.modified_by := USER;
     END IF;
 END;
 /
 
+-- Keeps provider_day_occupancy (v_provider_schedule) current. Affected
+-- provider-days are collected per row and each is recounted once when the
+-- statement completes, in (provider_id, schedule_date) order so concurrent
+-- statements lock the day rows in the same order; days before today are
+-- left to the refresh job.
+CREATE OR REPLACE TRIGGER trg_appointments_occupancy
+    FOR INSERT OR UPDATE OF provider_id, appointment_date, status, duration_minutes OR DELETE ON appointments
+    COMPOUND TRIGGER
+    
+    TYPE t_day_rec IS RECORD (provider_id NUMBER, schedule_date DATE);
+    TYPE t_day_set IS TABLE OF t_day_rec INDEX BY VARCHAR2(60);
+    g_days t_day_set;
+    
+    PROCEDURE mark_day(p_provider_id IN NUMBER, p_appointment_date IN DATE) IS
+        l_day t_day_rec;
+    BEGIN
+        IF p_appointment_date >= TRUNC(SYSDATE) THEN
+            l_day.provider_id := p_provider_id;
+            l_day.schedule_date := TRUNC(p_appointment_date);
+            g_days(LPAD(p_provider_id, 20, '0') || TO_CHAR(l_day.schedule_date, 'YYYYMMDD')) := l_day;
+        END IF;
+    END mark_day;
+    
+    AFTER EACH ROW IS
+    BEGIN
+        IF INSERTING OR UPDATING THEN
+            mark_day(:NEW.provider_id, :NEW.appointment_date);
+        END IF;
+        -- A moved appointment frees time on the day it left
+        IF DELETING OR UPDATING THEN
+            mark_day(:OLD.provider_id, :OLD.appointment_date);
+        END IF;
+    END AFTER EACH ROW;
+    
+    AFTER STATEMENT IS
+        l_key VARCHAR2(60);
+    BEGIN
+        l_key := g_days.FIRST;
+        WHILE l_key IS NOT NULL LOOP
+            pkg_reporting_mgmt.recount_provider_day(g_days(l_key).provider_id, g_days(l_key).schedule_date);
+            l_key := g_days.NEXT(l_key);
+        END LOOP;
+        g_days.DELETE;
+    END AFTER STATEMENT;
+    
+END trg_appointments_occupancy;
+/
+
+-- Missed (No Show) and next appointments of the patient risk profile
+CREATE OR REPLACE TRIGGER trg_appointments_risk_profile
+    FOR INSERT OR UPDATE OF patient_id, appointment_date, status OR DELETE ON appointments
+    COMPOUND TRIGGER
+    
+    AFTER EACH ROW IS
+    BEGIN
+        pkg_patient_mgmt.note_patient(:NEW.patient_id);
+        pkg_patient_mgmt.note_patient(:OLD.patient_id);
+    END AFTER EACH ROW;
+    
+    AFTER STATEMENT IS
+    BEGIN
+        pkg_patient_mgmt.flush_risk_profiles;
+    END AFTER STATEMENT;
+    
+END trg_appointments_risk_profile;
+/
+
 -- Trigger for medical records validation
 CREATE OR REPLACE TRIGGER trg_medical_records_validation
     BEFORE INSERT OR UPDATE ON medical_records
@@ -277,6 +435,25 @@ BEGIN
 END;
 /
 
+-- Recent and last visits of the patient risk profile
+CREATE OR REPLACE TRIGGER trg_medical_records_risk_profile
+    FOR INSERT OR UPDATE OF patient_id, visit_date OR DELETE ON medical_records
+    COMPOUND TRIGGER
+    
+    AFTER EACH ROW IS
+    BEGIN
+        pkg_patient_mgmt.note_patient(:NEW.patient_id);
+        pkg_patient_mgmt.note_patient(:OLD.patient_id);
+    END AFTER EACH ROW;
+    
+    AFTER STATEMENT IS
+    BEGIN
+        pkg_patient_mgmt.flush_risk_profiles;
+    END AFTER STATEMENT;
+    
+END trg_medical_records_risk_profile;
+/
+
 -- Trigger for prescription validation
 CREATE OR REPLACE TRIGGER trg_prescriptions_validation
     BEFORE INSERT OR UPDATE ON prescriptions
@@ -338,6 +515,25 @@ BEGIN
 END;
 /
 
+-- Active medication count of the patient risk profile
+CREATE OR REPLACE TRIGGER trg_prescriptions_risk_profile
+    FOR INSERT OR UPDATE OF patient_id, is_active OR DELETE ON prescriptions
+    COMPOUND TRIGGER
+    
+    AFTER EACH ROW IS
+    BEGIN
+        pkg_patient_mgmt.note_patient(:NEW.patient_id);
+        pkg_patient_mgmt.note_patient(:OLD.patient_id);
+    END AFTER EACH ROW;
+    
+    AFTER STATEMENT IS
+    BEGIN
+        pkg_patient_mgmt.flush_risk_profiles;
+    END AFTER STATEMENT;
+    
+END trg_prescriptions_risk_profile;
+/
+
 -- Create table for appointment reminders (referenced in package)
 CREATE TABLE appointment_reminders (
     reminder_id NUMBER PRIMARY KEY,
@@ -348,10 +544,18 @@ CREATE TABLE appointment_reminders (
     message CLOB,
     sent_date DATE,
     status VARCHAR2(20) DEFAULT 'PENDING', -- PENDING, SENT, FAILED
-    created_date DATE DEFAULT SYSDATE
+    created_date DATE DEFAULT SYSDATE,
+    attempt_count NUMBER DEFAULT 0 NOT NULL,
+    last_error VARCHAR2(1000)
 );
 
-CREATE SEQUENCE seq_reminder_id START WITH 1 INCREMENT BY 1;
+-- One reminder per appointment and type: the already-reminded check of
+-- queue_appointment_reminders, which also keeps concurrent runs from queuing
+-- the same reminder twice; and the worker's PENDING scan
+CREATE UNIQUE INDEX idx_reminders_appointment ON appointment_reminders(appointment_id, reminder_type);
+CREATE INDEX idx_reminders_status ON appointment_reminders(status, reminder_id);
+
+CREATE SEQUENCE seq_reminder_id START WITH 1 INCREMENT BY 1 CACHE 1000;
 
 -- Trigger for appointment reminders
 CREATE OR REPLACE TRIGGER trg_appointment_reminders
@@ -364,11 +568,18 @@ BEGIN
 END;
 /
 
--- Add comments to triggers
-COMMENT ON TRIGGER trg_patients_audit IS 'Audit trigger for patients table - tracks all changes';
-COMMENT ON TRIGGER trg_patients_modified IS 'Auto-update modified_date and modified_by fields';
-COMMENT ON TRIGGER trg_patients_delete_check IS 'Prevent deletion of patients with future appointments';
-COMMENT ON TRIGGER trg_appointments_validation IS 'Validate appointment data and check for conflicts';
-COMMENT ON TRIGGER trg_appointments_auto_status IS 'Auto-update appointment status and timestamps';
-COMMENT ON TRIGGER trg_medical_records_validation IS 'Validate medical record references';
-COMMENT ON TRIGGER trg_prescriptions_validation IS 'Validate prescription data and references';
+-- Trigger summary (Oracle has no COMMENT ON TRIGGER, so these are kept as
+-- script comments rather than executed)
+--   trg_patients_audit: Audit trigger for patients table - full snapshot on insert/delete, changed columns on update
+--   trg_patients_modified: Auto-update modified_date and modified_by fields
+--   trg_patients_search_index: Keep patient_search_ngrams in sync with searchable patient fields
+--   trg_patients_risk_profile: Queue risk profiles for recalculation when age, activity, conditions or allergies change
+--   trg_patients_delete_check: Prevent deletion of patients with future appointments
+--   trg_appointments_validation: Validate appointment data and check for conflicts
+--   trg_appointments_auto_status: Auto-update appointment status and timestamps
+--   trg_appointments_occupancy: Recount provider_day_occupancy for the provider-days a statement touched
+--   trg_appointments_risk_profile: Queue risk profiles of patients whose appointments changed
+--   trg_medical_records_validation: Validate medical record references
+--   trg_medical_records_risk_profile: Queue risk profiles of patients whose visits changed
+--   trg_prescriptions_validation: Validate prescription data and references
+--   trg_prescriptions_risk_profile: Queue risk profiles of patients whose prescriptions changed
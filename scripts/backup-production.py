@@ -6,98 +6,795 @@ Creates backup of production database and APEX application
 
 import os
 import sys
+import gzip
 import json
-import subprocess
+import time
+import shutil
+import hashlib
+import argparse
 import datetime
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from healthcare_db import DatabaseUnavailable, create_pool, get_connect_params, load_config
+
+# Tables exported by their own Data Pump jobs (one per partition when partitioned):
+# the CLOB-heavy clinical notes and the ever-growing audit trails
+LARGE_TABLES = ['MEDICAL_RECORDS', 'PATIENT_AUDIT', 'AUDIT_LOG']
+
+# Tables that can be exported incrementally: key column and the columns
+# stamped by triggers on insert/update (audit tables are insert-only).
+# Deletes, including dropped audit partitions, are carried by the key
+# ranges each incremental records (KEY_RANGES_NAME).
+INCREMENTAL_TABLES = {
+    'PATIENTS': ('PATIENT_ID', ['MODIFIED_DATE', 'CREATED_DATE']),
+    'APPOINTMENTS': ('APPOINTMENT_ID', ['MODIFIED_DATE', 'CREATED_DATE']),
+    'CLINICAL_TRIALS': ('TRIAL_ID', ['MODIFIED_DATE', 'CREATED_DATE']),
+    'TRIAL_PARTICIPANTS': ('PARTICIPANT_ID', ['MODIFIED_DATE', 'CREATED_DATE']),
+    'TRIAL_VISITS': ('VISIT_ID', ['MODIFIED_DATE', 'CREATED_DATE']),
+    'TRIAL_MILESTONES': ('MILESTONE_ID', ['MODIFIED_DATE', 'CREATED_DATE']),
+    'ADVERSE_EVENTS': ('ADVERSE_EVENT_ID', ['MODIFIED_DATE', 'CREATED_DATE']),
+    'PATIENT_AUDIT': ('AUDIT_ID', ['CHANGED_DATE']),
+    # Queued audit capture writes rows after their change; logged_date is when they landed
+    'AUDIT_LOG': ('AUDIT_ID', ['LOGGED_DATE']),
+}
+
+# Rebuilt from the base tables after a restore instead of being exported incrementally
+DERIVED_TABLES = ['PATIENT_SEARCH_NGRAMS', 'DASHBOARD_DAILY_STATS', 'TRIAL_DASHBOARD_METRICS',
+                  'PROVIDER_DAY_OCCUPANCY', 'PATIENT_RISK_PROFILE']
+POST_RESTORE = [
+    'pkg_patient_mgmt.rebuild_search_index',
+    "pkg_reporting_mgmt.refresh_dashboard_stats(DATE '2000-01-01')",
+    'pkg_clinical_trials_mgmt.refresh_trial_metrics',
+    'pkg_reporting_mgmt.refresh_provider_occupancy',
+    'pkg_patient_mgmt.rebuild_risk_profiles'
+]
+
+MANIFEST_NAME = 'backup_manifest.json'
+KEY_RANGES_NAME = 'key_ranges.json.gz'
+DB_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+DEFAULT_SCHEMA = 'HEALTHCARE_SYSTEM'
+DEFAULT_SCRATCH_SCHEMA = 'HEALTHCARE_RESTORE_CHECK'
+# Rows changed just before the previous high-water mark may have committed
+# after its export SCN; re-export that much and de-duplicate on restore
+DEFAULT_OVERLAP_MINUTES = 60
+DEFAULT_DIRECTORY = 'BACKUP_DIR'
+DEFAULT_PARALLEL = 4
+DEFAULT_JOBS = 2
+DEFAULT_FILESIZE = '4G'
+CHECKSUM_CHUNK_SIZE = 1024 * 1024
+
+
+def sha256_file(path: Path) -> Dict:
+    """Stream a file through sha256; returns checksum, size and hashing time"""
+    start_time = time.time()
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHECKSUM_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+    return {'sha256': digest.hexdigest(), 'bytes': size, 'checksum_seconds': round(time.time() - start_time, 3)}
+
+
+def throughput(num_bytes: int, seconds: float) -> Optional[float]:
+    """MB/s, or None when nothing was measured"""
+    if not num_bytes or seconds <= 0:
+        return None
+    return round(num_bytes / (1024 * 1024) / seconds, 2)
+
+
+def run_datapump_tool(tool: str, lines: List[str]) -> Tuple[Optional[int], str]:
+    """Run expdp/impdp with a private parfile; returns (exit code, last output lines)"""
+    fd, parfile = tempfile.mkstemp(prefix=f"{tool}_", suffix='.par')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        result = subprocess.run([tool, f"parfile={parfile}"], capture_output=True, text=True)
+    except OSError as e:
+        return None, str(e)
+    finally:
+        os.unlink(parfile)
+    tail = (result.stderr or result.stdout or '').strip().splitlines()[-3:]
+    return result.returncode, ' | '.join(tail)
+
+
+def datapump_status(returncode: Optional[int]) -> str:
+    # Data Pump exits 5 for completed-with-warnings
+    return 'ok' if returncode == 0 else 'warning' if returncode == 5 else 'failed'
+
+
+def load_manifest(path: Path) -> Dict:
+    path = Path(path)
+    if path.is_dir():
+        path = path / MANIFEST_NAME
+    with open(path) as f:
+        manifest = json.load(f)
+    manifest['_path'] = str(path.resolve())
+    return manifest
+
+
+def find_latest_manifest(output_dir: Path) -> Optional[Path]:
+    """Newest successful backup manifest under output_dir"""
+    for path in sorted(Path(output_dir).glob(f"production_*/{MANIFEST_NAME}"), reverse=True):
+        try:
+            manifest = load_manifest(path)
+        except (OSError, ValueError):
+            continue
+        if manifest.get('succeeded') and manifest.get('high_water_mark'):
+            return path
+    return None
+
+
+def manifest_chain(manifest: Dict) -> List[Dict]:
+    """Manifests to restore in order: the full backup, then each incremental"""
+    paths = manifest.get('chain') or [manifest['_path']]
+    chain = [load_manifest(Path(p)) for p in paths]
+    if chain[0].get('backup_type') != 'full':
+        raise ValueError(f"Backup chain does not start with a full backup: {paths[0]}")
+    return chain
+
+
+class ProductionBackup:
+    """Runs the Data Pump and APEX export phases and builds the manifest.
+
+    All Data Pump jobs export as of one SCN so the schema dump and the
+    per-table dumps restore to the same point in time.
+    """
+
+    def __init__(self, config: Dict, args, backup_dir: Path, timestamp: str):
+        self.config = config
+        self.args = args
+        self.backup_dir = backup_dir
+        self.timestamp = timestamp
+        self.schema = args.schema.upper()
+        self.dump_path = Path(args.dump_path) if args.dump_path else None
+        self.phases: List[Dict] = []
+        self.artifacts: List[Dict] = []
+        self.flashback_scn = None
+        self.high_water_mark = None
+        self.jobs: List[Dict] = []
+        self.present_tables: Optional[List[str]] = None
+        self._lock = threading.Lock()
+
+        # Incremental: export rows changed since the parent's high-water mark
+        self.parent = load_manifest(args.base) if getattr(args, 'base', None) else None
+        self.since = None
+        if self.parent:
+            since = datetime.datetime.strptime(self.parent['high_water_mark'], DB_TIME_FORMAT)
+            self.since = (since - datetime.timedelta(minutes=args.overlap_minutes)).strftime(DB_TIME_FORMAT)
+
+        try:
+            self.credentials = get_connect_params(config.get('database', {}))
+        except DatabaseUnavailable:
+            self.credentials = None
+
+    # ------------------------------------------------------------------
+    # Catalog
+    # ------------------------------------------------------------------
+
+    def read_catalog(self) -> Dict:
+        """SCN and database time, tables present, large-table partitions and the APEX application id"""
+        catalog = {'scn': None, 'db_time': None, 'present': None,
+                   'tables': {t: [] for t in LARGE_TABLES}, 'apex_app_id': None}
+        try:
+            pool = create_pool(self.config, min=1, max=1)
+        except DatabaseUnavailable as e:
+            print(f"⚠️ Catalog not available ({e}); exporting without a consistent SCN")
+            return catalog
+
+        try:
+            try:
+                catalog['scn'], catalog['db_time'] = pool.query("""
+                    SELECT DBMS_FLASHBACK.GET_SYSTEM_CHANGE_NUMBER,
+                           TO_CHAR(SYSDATE, 'YYYY-MM-DD HH24:MI:SS')
+                    FROM dual
+                """)[0]
+            except Exception as e:
+                print(f"⚠️ Could not read the current SCN: {e}")
+
+            present = {row[0] for row in pool.query(
+                "SELECT table_name FROM all_tables WHERE owner = :owner",
+                {'owner': self.schema})}
+            partitions = pool.query("""
+                SELECT table_name, partition_name
+                FROM all_tab_partitions
+                WHERE table_owner = :owner
+                ORDER BY table_name, partition_position
+            """, {'owner': self.schema})
+            catalog['present'] = present
+            catalog['tables'] = {t: [p for table, p in partitions if table == t]
+                                 for t in LARGE_TABLES if t in present}
+
+            alias = self.config.get('application', {}).get('alias')
+            if alias:
+                try:
+                    rows = pool.query("""
+                        SELECT application_id FROM apex_applications
+                        WHERE UPPER(alias) = UPPER(:alias)
+                    """, {'alias': alias})
+                    catalog['apex_app_id'] = rows[0][0] if rows else None
+                except Exception:
+                    pass
+        finally:
+            pool.close()
+        return catalog
+
+    # ------------------------------------------------------------------
+    # Data Pump
+    # ------------------------------------------------------------------
+
+    def datapump_jobs(self, catalog: Dict) -> List[Dict]:
+        """Schema job plus one job per large table (or partition) and, when
+        incremental, one QUERY-filtered job per change-tracked table.
+
+        The schema job keeps the DDL of every table but leaves out the rows
+        exported by the other jobs (and, when incremental, of derived tables).
+        """
+        present = catalog['present'] if catalog['present'] is not None else set(LARGE_TABLES)
+        incremental = {t: spec for t, spec in INCREMENTAL_TABLES.items() if t in present} if self.since else {}
+        large_tables = {t: parts for t, parts in catalog['tables'].items() if t not in incremental}
+        without_rows = set(large_tables) | set(incremental)
+        if self.since:
+            without_rows |= set(DERIVED_TABLES) & present
+
+        schema_params = [f"schemas={self.schema}"]
+        for table in sorted(without_rows):
+            schema_params.append(f'query={self.schema}.{table}:"WHERE 1 = 0"')
+        jobs = [{'name': 'schema', 'mode': 'schema', 'prefix': f"healthcare_schema_{self.timestamp}",
+                 'tables': sorted(present - without_rows) if catalog['present'] is not None else None,
+                 'params': schema_params}]
+
+        for table, partitions in large_tables.items():
+            for partition in partitions or [None]:
+                suffix = f"_{partition.lower()}" if partition else ''
+                target = f"{self.schema}.{table}" + (f":{partition}" if partition else '')
+                jobs.append({
+                    'name': table.lower() + (f":{partition.lower()}" if partition else ''),
+                    'mode': 'full',
+                    'table': table,
+                    'prefix': f"healthcare_{table.lower()}{suffix}_{self.timestamp}",
+                    'params': [f"tables={target}", "content=DATA_ONLY"]
+                })
+
+        for table, (key, columns) in incremental.items():
+            condition = ' OR '.join(f"{c} > TO_DATE('{self.since}', 'YYYY-MM-DD HH24:MI:SS')" for c in columns)
+            jobs.append({
+                'name': f"{table.lower()}:incremental",
+                'mode': 'incremental',
+                'table': table,
+                'key': key,
+                'query': condition,
+                'prefix': f"healthcare_{table.lower()}_inc_{self.timestamp}",
+                'params': [f"tables={self.schema}.{table}", "content=DATA_ONLY",
+                           f'query={self.schema}.{table}:"WHERE {condition}"']
+            })
+        return jobs
+
+    def parfile_lines(self, job: Dict) -> List[str]:
+        user, password, dsn = self.credentials
+        lines = [
+            f"userid={user}/{password}@{dsn}",
+            f"directory={self.args.directory}",
+            f"dumpfile={job['prefix']}_%U.dmp",
+            f"logfile={job['prefix']}.log",
+            f"parallel={self.args.parallel}",
+            f"filesize={self.args.filesize}",
+            f"compression={self.args.compression}",
+        ]
+        if self.args.compression != 'NONE' and self.args.compression_algorithm:
+            lines.append(f"compression_algorithm={self.args.compression_algorithm}")
+        if self.flashback_scn:
+            lines.append(f"flashback_scn={self.flashback_scn}")
+        return lines + job['params']
+
+    def run_datapump(self, job: Dict) -> Dict:
+        phase = {'name': job['name'], 'kind': 'datapump', 'prefix': job['prefix'], 'status': 'ok',
+                 'started': datetime.datetime.now().isoformat(), 'files': []}
+        start_time = time.time()
+
+        phase.update({k: job[k] for k in ('mode', 'table', 'tables', 'key', 'query') if k in job})
+
+        # Parameters (and credentials) go through a private parfile, not the command line
+        returncode, output = run_datapump_tool('expdp', self.parfile_lines(job))
+        phase['status'] = datapump_status(returncode)
+        if phase['status'] != 'ok':
+            phase['error'] = output
+        phase['export_seconds'] = round(time.time() - start_time, 3)
+
+        if self.dump_path and phase['status'] != 'failed':
+            files = sorted(self.dump_path.glob(f"{job['prefix']}_*.dmp"))
+            log_file = self.dump_path / f"{job['prefix']}.log"
+            if log_file.exists():
+                files.append(log_file)
+            for path in files:
+                phase['files'].append(self.add_artifact(path, job['name']))
+
+        self.finish_phase(phase, start_time)
+        return phase
+
+    def capture_key_ranges(self, tables: List[str]) -> Dict:
+        """Keys present at the export SCN, as contiguous ranges, for each incremental table.
+
+        Change-tracked exports cannot see deleted rows; a restore drops every
+        row whose key falls outside these ranges. Ids come from sequences, so
+        a few ranges cover a table unless many scattered rows were deleted.
+        """
+        phase = {'name': 'key_ranges', 'kind': 'key_ranges', 'status': 'ok',
+                 'started': datetime.datetime.now().isoformat(), 'files': [], 'tables': {}}
+        start_time = time.time()
+        ranges = {}
+        try:
+            pool = create_pool(self.config, min=1, max=1)
+            try:
+                for table in tables:
+                    key = INCREMENTAL_TABLES[table][0]
+                    rows = pool.query(f"""
+                        SELECT MIN(k), MAX(k)
+                        FROM (SELECT {key} as k, {key} - ROW_NUMBER() OVER (ORDER BY {key}) as grp
+                              FROM {self.schema}.{table} AS OF SCN :scn)
+                        GROUP BY grp
+                        ORDER BY 1
+                    """, {'scn': self.flashback_scn})
+                    ranges[table] = [[int(low), int(high)] for low, high in rows]
+                    phase['tables'][table] = len(rows)
+            finally:
+                pool.close()
+        except Exception as e:
+            phase.update(status='failed', error=str(e))
+            self.finish_phase(phase, start_time)
+            return phase
+
+        path = self.backup_dir / KEY_RANGES_NAME
+        with gzip.open(path, 'wt') as f:
+            json.dump({'flashback_scn': self.flashback_scn, 'tables': ranges}, f)
+        phase['files'].append(self.add_artifact(path, phase['name']))
+        self.finish_phase(phase, start_time)
+        return phase
+
+    # ------------------------------------------------------------------
+    # APEX
+    # ------------------------------------------------------------------
+
+    def export_apex(self, app_id: Optional[int]) -> Dict:
+        phase = {'name': 'apex', 'kind': 'apex_export', 'status': 'ok',
+                 'started': datetime.datetime.now().isoformat(), 'files': []}
+        start_time = time.time()
+        apex_dir = self.backup_dir / 'apex'
+        apex_dir.mkdir(exist_ok=True)
+
+        sqlcl = shutil.which('sql')
+        if not (sqlcl and app_id and self.credentials):
+            reason = 'SQLcl not installed' if not sqlcl else \
+                'application id not found' if not app_id else 'no database credentials'
+            placeholder = apex_dir / 'apex_application_backup.sql'
+            with open(placeholder, 'w') as f:
+                f.write(f"""-- APEX Application Backup
+-- Generated: {datetime.datetime.now()}
+-- Environment: Production
+
+-- Export skipped: {reason}
+-- Export manually with: apex export -applicationid <id>
+""")
+            phase.update(status='skipped', error=reason)
+            phase['files'].append(self.add_artifact(placeholder, 'apex'))
+            self.finish_phase(phase, start_time)
+            return phase
+
+        user, password, dsn = self.credentials
+        script = f"connect {user}/{password}@{dsn}\napex export -applicationid {app_id} -dir {apex_dir}\nexit\n"
+        result = subprocess.run([sqlcl, '-S', '/nolog'], input=script, capture_output=True, text=True)
+        if result.returncode != 0:
+            phase.update(status='failed', error=(result.stdout + result.stderr).strip()[-500:])
+        for path in sorted(apex_dir.glob('*.sql')):
+            phase['files'].append(self.add_artifact(path, 'apex'))
+
+        self.finish_phase(phase, start_time)
+        return phase
+
+    # ------------------------------------------------------------------
+    # Bookkeeping
+    # ------------------------------------------------------------------
+
+    def add_artifact(self, path: Path, phase_name: str) -> str:
+        checksum = sha256_file(path)
+        with self._lock:
+            self.artifacts.append({'file': str(path), 'phase': phase_name, **checksum})
+        return path.name
+
+    def finish_phase(self, phase: Dict, start_time: float):
+        phase['seconds'] = round(time.time() - start_time, 3)
+        phase['bytes'] = sum(a['bytes'] for a in self.artifacts if a['phase'] == phase['name'])
+        phase['mb_per_s'] = throughput(phase['bytes'], phase.get('export_seconds', phase['seconds']))
+        marker = {'ok': '✅', 'warning': '⚠️', 'skipped': '⚠️'}.get(phase['status'], '❌')
+        size = f"{phase['bytes'] / (1024 * 1024):.1f} MB" if phase['bytes'] else 'size unknown'
+        print(f"{marker} {phase['name']}: {phase['status']} in {phase['seconds']:.1f}s ({size}"
+              + (f", {phase['mb_per_s']} MB/s" if phase['mb_per_s'] else '') + ")"
+              + (f" - {phase['error']}" if phase.get('error') else ''))
+        with self._lock:
+            self.phases.append(phase)
+
+    def run(self) -> bool:
+        catalog = self.read_catalog()
+        self.flashback_scn = catalog['scn']
+        self.high_water_mark = catalog['db_time']
+        if catalog['present'] is not None:
+            self.present_tables = sorted(catalog['present'])
+
+        if self.since and (catalog['present'] is None or not self.flashback_scn):
+            print("❌ Incremental backups need the database catalog and SCN")
+            return False
+
+        if self.credentials:
+            jobs = self.jobs = self.datapump_jobs(catalog)
+            if self.since:
+                print(f"🔁 Incremental since {self.since} (parent {self.parent['backup_id']})")
+            print(f"📊 Exporting {len(jobs)} Data Pump job(s), parallel={self.args.parallel}, "
+                  f"compression={self.args.compression}"
+                  + (f", SCN {self.flashback_scn}" if self.flashback_scn else ''))
+            if not self.dump_path:
+                print(f"⚠️ --dump-path not set; {self.args.directory} files will not be checksummed")
+            with ThreadPoolExecutor(max_workers=self.args.jobs) as executor:
+                list(executor.map(self.run_datapump, jobs))
+            if self.since:
+                self.capture_key_ranges([job['table'] for job in jobs if job['mode'] == 'incremental'])
+        else:
+            print("⚠️ Database credentials not set, skipping Data Pump export")
+
+        print("🔧 Backing up APEX application...")
+        self.export_apex(catalog['apex_app_id'])
+
+        return all(p['status'] in ('ok', 'warning', 'skipped') for p in self.phases)
+
+    def manifest(self, total_seconds: float, succeeded: bool, manifest_file: Path) -> Dict:
+        total_bytes = sum(a['bytes'] for a in self.artifacts)
+        phase_order = {p['name']: i for i, p in enumerate(self.phases)}
+        parent_chain = (self.parent.get('chain') or [self.parent['_path']]) if self.parent else []
+        return {
+            "backup_id": self.backup_dir.name,
+            "backup_date": datetime.datetime.now().isoformat(),
+            "environment": "production",
+            "backup_type": "incremental" if self.since else "full",
+            "succeeded": succeeded,
+            "schema": self.schema,
+            "flashback_scn": self.flashback_scn,
+            # Database time when the SCN was read; the next incremental starts here
+            "high_water_mark": self.high_water_mark,
+            "since": self.since,
+            "parent": {"backup_id": self.parent['backup_id'], "manifest": self.parent['_path']}
+                      if self.parent else None,
+            # Restore replays these manifests in order: full, then incrementals
+            "chain": parent_chain + [str(manifest_file.resolve())],
+            "tables_present": self.present_tables,
+            "derived_tables": DERIVED_TABLES if self.since else [],
+            # After merging an incremental, delete rows whose keys are outside these ranges
+            "key_ranges": KEY_RANGES_NAME if any(p['kind'] == 'key_ranges' and p['status'] == 'ok'
+                                                  for p in self.phases) else None,
+            "post_restore": POST_RESTORE if self.since else [],
+            "settings": {
+                "directory": self.args.directory,
+                "parallel": self.args.parallel,
+                "jobs": self.args.jobs,
+                "compression": self.args.compression,
+                "compression_algorithm": self.args.compression_algorithm,
+                "filesize": self.args.filesize,
+                "overlap_minutes": self.args.overlap_minutes if self.since else None
+            },
+            "files": [Path(a['file']).name for a in self.artifacts],
+            "artifacts": sorted(self.artifacts, key=lambda a: (phase_order.get(a['phase'], 0), a['file'])),
+            "phases": self.phases,
+            # Import the schema dump first (creates the large tables empty), then the table dumps
+            "restore_order": [job['prefix'] for job in self.jobs],
+            "totals": {
+                "seconds": round(total_seconds, 3),
+                "bytes": total_bytes,
+                "mb_per_s": throughput(total_bytes, total_seconds)
+            },
+            "database_connection": os.getenv('DB_CONNECTION_STRING'),
+            "apex_workspace": os.getenv('APEX_WORKSPACE', 'HEALTHCARE'),
+            "git_commit": os.getenv('BUILD_SOURCEVERSION', 'unknown')
+        }
+
+
+class RestoreVerifier:
+    """Rebuilds a backup chain into a scratch schema and compares it with the source.
+
+    The full backup is imported as-is (without triggers and foreign keys, so
+    rows can be replayed in any order); each incremental then truncates and
+    reloads its fully exported tables, merges its changed rows by key and
+    deletes the rows whose keys it no longer recorded.
+    Row counts and a column hash are compared with the source AS OF the
+    last backup's SCN. Derived tables are skipped once incrementals are
+    involved, since a restore rebuilds them (post_restore).
+    """
+
+    def __init__(self, config: Dict, args, manifest: Dict):
+        self.config = config
+        self.args = args
+        self.manifest = manifest
+        self.chain = manifest_chain(manifest)
+        self.source = manifest['schema'].upper()
+        self.scratch = args.scratch_schema.upper()
+        self.credentials = get_connect_params(config.get('database', {}))
+        self.pool = None
+        self.steps: List[Dict] = []
+
+    def execute(self, sql: str, params: Optional[Dict] = None):
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(sql, params or {})
+            connection.commit()
+            cursor.close()
+
+    def columns(self, owner: str, table: str) -> List[Tuple[str, str]]:
+        return self.pool.query("""
+            SELECT column_name, data_type
+            FROM all_tab_cols
+            WHERE owner = :owner AND table_name = :table_name
+              AND virtual_column = 'NO' AND hidden_column = 'NO'
+            ORDER BY column_id
+        """, {'owner': owner, 'table_name': table})
+
+    def impdp(self, link: Dict, prefix: str, extra: List[str]):
+        user, password, dsn = self.credentials
+        directory = link.get('settings', {}).get('directory', DEFAULT_DIRECTORY)
+        start_time = time.time()
+        returncode, output = run_datapump_tool('impdp', [
+            f"userid={user}/{password}@{dsn}",
+            f"directory={directory}",
+            f"dumpfile={prefix}_%U.dmp",
+            f"logfile=verify_{prefix}.log",
+            f"remap_schema={self.source}:{self.scratch}",
+        ] + extra)
+        status = datapump_status(returncode)
+        self.steps.append({'backup_id': link['backup_id'], 'dump': prefix, 'status': status,
+                           'seconds': round(time.time() - start_time, 3), 'error': output if status != 'ok' else None})
+        if status == 'failed':
+            raise RuntimeError(f"impdp failed for {prefix}: {output}")
+
+    def reset_scratch(self):
+        if self.scratch == self.source:
+            raise ValueError("Scratch schema must differ from the backed-up schema")
+        for (table,) in self.pool.query("SELECT table_name FROM all_tables WHERE owner = :owner",
+                                        {'owner': self.scratch}):
+            self.execute(f'DROP TABLE "{self.scratch}"."{table}" CASCADE CONSTRAINTS PURGE')
+
+    def merge_incremental(self, link: Dict, job: Dict):
+        table, key = job['table'], job['key']
+        staging = f"{table[:26]}_INC"
+        column_list = ', '.join(f'"{name}"' for name, _ in self.columns(self.scratch, table))
+        target = f'"{self.scratch}"."{table}"'
+        staged = f'"{self.scratch}"."{staging}"'
+
+        self.execute(f"CREATE TABLE {staged} AS SELECT {column_list} FROM {target} WHERE 1 = 0")
+        try:
+            self.impdp(link, job['prefix'], ["content=DATA_ONLY", f"remap_table={self.source}.{table}:{staging}",
+                                             "table_exists_action=APPEND"])
+            # Overlapping windows can re-export a row; the latest copy wins
+            self.execute(f"DELETE FROM {target} WHERE {key} IN (SELECT {key} FROM {staged})")
+            self.execute(f"INSERT INTO {target} ({column_list}) SELECT {column_list} FROM {staged}")
+        finally:
+            self.execute(f"DROP TABLE {staged} PURGE")
+
+    def apply_deletions(self, link: Dict):
+        """Drop rows deleted (or purged) before the link's SCN from its change-tracked tables"""
+        if not link.get('key_ranges'):
+            print(f"    ⚠️ {link['backup_id']} recorded no key ranges; rows deleted before it are kept")
+            return
+        with gzip.open(Path(link['_path']).parent / link['key_ranges'], 'rt') as f:
+            ranges = json.load(f)['tables']
+
+        for table, table_ranges in ranges.items():
+            key = INCREMENTAL_TABLES[table][0]
+            staged = f'"{self.scratch}"."{table[:25]}_KEYS"'
+            self.execute(f"CREATE TABLE {staged} (low_key NUMBER NOT NULL, high_key NUMBER NOT NULL)")
+            try:
+                with self.pool.connection() as connection:
+                    cursor = connection.cursor()
+                    cursor.executemany(f"INSERT INTO {staged} (low_key, high_key) VALUES (:1, :2)", table_ranges)
+                    cursor.execute(f"""
+                        DELETE FROM "{self.scratch}"."{table}" t
+                        WHERE NOT EXISTS (SELECT 1 FROM {staged} r
+                                          WHERE t.{key} BETWEEN r.low_key AND r.high_key)
+                    """)
+                    deleted = cursor.rowcount
+                    connection.commit()
+                    cursor.close()
+            finally:
+                self.execute(f"DROP TABLE {staged} PURGE")
+            if deleted:
+                print(f"    🗑️ {table}: {deleted:,} deleted row(s)")
+
+    def apply(self, link: Dict, first: bool):
+        jobs = {p['prefix']: p for p in link['phases'] if p.get('kind') == 'datapump'}
+        truncated: Set[str] = set()
+        print(f"  ⏪ {link['backup_id']} ({link['backup_type']})")
+        for prefix in link['restore_order']:
+            job = jobs.get(prefix, {'mode': 'schema'})
+            mode = job.get('mode', 'schema')
+            if first:
+                # No triggers or foreign keys, so later links can reload rows in any order
+                extra = ["exclude=TRIGGER", "exclude=REF_CONSTRAINT"] if mode == 'schema' else \
+                    ["content=DATA_ONLY", "table_exists_action=APPEND"]
+                self.impdp(link, prefix, extra)
+            elif mode == 'incremental':
+                self.merge_incremental(link, job)
+            else:
+                tables = job.get('tables') if mode == 'schema' else [job['table']]
+                for table in tables or []:
+                    if table not in truncated:
+                        self.execute(f'TRUNCATE TABLE "{self.scratch}"."{table}"')
+                        truncated.add(table)
+                if tables:
+                    filters = [f"tables={','.join(f'{self.source}.{t}' for t in tables)}"] if mode == 'schema' else []
+                    self.impdp(link, prefix, filters + ["content=DATA_ONLY", "table_exists_action=APPEND"])
+        if not first:
+            self.apply_deletions(link)
+
+    def table_fingerprint(self, owner: str, table: str, scn: Optional[int]) -> Tuple[int, int]:
+        terms = []
+        for position, (name, data_type) in enumerate(self.columns(owner, table), start=1):
+            if data_type in ('CLOB', 'NCLOB', 'BLOB'):
+                value = f'DBMS_LOB.GETLENGTH("{name}")'
+            elif data_type in ('LONG', 'LONG RAW', 'XMLTYPE'):
+                continue
+            else:
+                value = f'"{name}"'
+            terms.append(f"NVL(ORA_HASH({value}, 4294967295, {position}), 0)")
+        flashback = ' AS OF SCN :scn' if scn else ''
+        sql = f'SELECT COUNT(*), NVL(SUM({" + ".join(terms) or "0"}), 0) FROM "{owner}"."{table}"{flashback}'
+        return tuple(self.pool.query(sql, {'scn': scn} if scn else None)[0])
+
+    def compare(self) -> List[Dict]:
+        last = self.chain[-1]
+        incremental = len(self.chain) > 1
+        tables = last.get('tables_present') or [t for (t,) in self.pool.query(
+            "SELECT table_name FROM all_tables WHERE owner = :owner ORDER BY table_name", {'owner': self.source})]
+        results = []
+        for table in tables:
+            if incremental and table in DERIVED_TABLES:
+                continue
+            scn = last.get('flashback_scn')
+            try:
+                source = self.table_fingerprint(self.source, table, scn)
+            except Exception as e:
+                print(f"  ⚠️ {table}: cannot read source as of SCN {scn} ({e}); comparing with current data")
+                source = self.table_fingerprint(self.source, table, None)
+            restored = self.table_fingerprint(self.scratch, table, None)
+            results.append({'table': table, 'source_rows': source[0], 'restored_rows': restored[0],
+                            'source_hash': str(source[1]), 'restored_hash': str(restored[1]),
+                            'match': source == restored})
+        return results
+
+    def run(self) -> bool:
+        start_time = time.time()
+        print(f"🧪 Verifying restore of {len(self.chain)} backup(s) into {self.scratch}")
+        self.pool = create_pool(self.config, min=1, max=1)
+        try:
+            self.reset_scratch()
+            for index, link in enumerate(self.chain):
+                self.apply(link, first=index == 0)
+            results = self.compare()
+        finally:
+            self.pool.close()
+
+        for result in results:
+            marker = '✅' if result['match'] else '❌'
+            print(f"  {marker} {result['table']:<30} source {result['source_rows']:>10,} "
+                  f"restored {result['restored_rows']:>10,}" + ('' if result['match'] else '  (hash differs)'))
+
+        verified = all(r['match'] for r in results)
+        report = {
+            "verified_date": datetime.datetime.now().isoformat(),
+            "backup_id": self.manifest['backup_id'],
+            "chain": [link['backup_id'] for link in self.chain],
+            "scratch_schema": self.scratch,
+            "verified": verified,
+            "seconds": round(time.time() - start_time, 3),
+            "imports": self.steps,
+            "tables": results
+        }
+        report_file = Path(self.manifest['_path']).parent / 'restore_verification.json'
+        with open(report_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📋 Verification report: {report_file}")
+        return verified
+
 
 def main():
     """Main backup function"""
+    parser = argparse.ArgumentParser(description='Back up the production database and APEX application')
+    parser.add_argument('--schema', default=os.getenv('BACKUP_SCHEMA', DEFAULT_SCHEMA), help='Schema to export')
+    parser.add_argument('--directory', default=DEFAULT_DIRECTORY, help='Oracle directory object for dump files')
+    parser.add_argument('--dump-path', default=os.getenv('BACKUP_DIR_PATH'),
+                       help='Local path where the directory object is mounted (for checksums)')
+    parser.add_argument('--parallel', type=int, default=DEFAULT_PARALLEL, help='PARALLEL per Data Pump job')
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS, help='Data Pump jobs run at the same time')
+    parser.add_argument('--filesize', default=DEFAULT_FILESIZE, help='Maximum size of each dump file')
+    parser.add_argument('--compression', default='ALL', choices=['ALL', 'DATA_ONLY', 'METADATA_ONLY', 'NONE'],
+                       help='Data Pump COMPRESSION (ALL and DATA_ONLY need Advanced Compression)')
+    parser.add_argument('--compression-algorithm', default='MEDIUM',
+                       choices=['BASIC', 'LOW', 'MEDIUM', 'HIGH'], help='Data Pump COMPRESSION_ALGORITHM')
+    parser.add_argument('--output-dir', default='backups', help='Parent directory for the backup folder')
+    parser.add_argument('--mode', default='full', choices=['full', 'incremental'],
+                       help='Full export, or only rows changed since the previous backup')
+    parser.add_argument('--base', help='Manifest (or backup folder) an incremental builds on '
+                                       '(default: latest successful backup in --output-dir)')
+    parser.add_argument('--overlap-minutes', type=int, default=DEFAULT_OVERLAP_MINUTES,
+                       help='Re-export this much before the previous high-water mark')
+    parser.add_argument('--verify-restore', metavar='MANIFEST',
+                       help='Restore the backup chain ending at MANIFEST into --scratch-schema and compare')
+    parser.add_argument('--scratch-schema', default=DEFAULT_SCRATCH_SCHEMA,
+                       help='Schema that --verify-restore rebuilds into (its tables are dropped)')
+
+    args = parser.parse_args()
+
     try:
         print("🔄 Starting production backup process...")
-        
+        start_time = time.time()
+
         # Load configuration
         config_path = Path(__file__).parent.parent / "config" / "prod.json"
         if not config_path.exists():
             print("❌ Production configuration file not found")
             sys.exit(1)
-            
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-        
+
+        config = load_config('production', str(config_path))
+
+        if args.verify_restore:
+            verifier = RestoreVerifier(config, args, load_manifest(Path(args.verify_restore)))
+            if verifier.run():
+                print("✅ Restore verification passed")
+                return 0
+            print("❌ Restore verification found differences")
+            sys.exit(1)
+
+        if args.mode == 'incremental' and not args.base:
+            latest = find_latest_manifest(Path(args.output_dir))
+            if not latest:
+                print("❌ No previous successful backup found; take a full backup first")
+                sys.exit(1)
+            args.base = str(latest)
+
         # Create backup directory with timestamp
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_dir = Path(f"backups/production_{timestamp}")
+        backup_dir = Path(args.output_dir) / f"production_{timestamp}"
         backup_dir.mkdir(parents=True, exist_ok=True)
-        
+
         print(f"📁 Creating backup in: {backup_dir}")
-        
-        # Backup database schema
-        print("📊 Backing up database schema...")
-        schema_backup_file = backup_dir / "schema_backup.sql"
-        
-        # Use Oracle Data Pump or similar tool
-        db_connection = os.getenv('DB_CONNECTION_STRING')
-        db_username = os.getenv('DB_USERNAME')
-        
-        if db_connection and db_username:
-            # Generate schema backup using expdp or similar
-            backup_command = [
-                "expdp", 
-                f"{db_username}/{os.getenv('DB_PASSWORD')}@{db_connection}",
-                f"directory=BACKUP_DIR",
-                f"dumpfile=healthcare_schema_{timestamp}.dmp",
-                f"logfile=healthcare_backup_{timestamp}.log",
-                "schemas=HEALTHCARE_SYSTEM"
-            ]
-            
-            try:
-                subprocess.run(backup_command, check=True, capture_output=True, text=True)
-                print("✅ Database schema backup completed")
-            except subprocess.CalledProcessError as e:
-                print(f"⚠️ Database backup warning: {e}")
-                # Continue with other backup steps
-        
-        # Backup APEX application
-        print("🔧 Backing up APEX application...")
-        apex_backup_file = backup_dir / "apex_application_backup.sql"
-        
-        # Create APEX backup script
-        with open(apex_backup_file, 'w') as f:
-            f.write(f"""-- APEX Application Backup
--- Generated: {datetime.datetime.now()}
--- Environment: Production
 
--- This would contain APEX application export
--- Generated using APEX export utilities
-""")
-        
+        backup = ProductionBackup(config, args, backup_dir, timestamp)
+        succeeded = backup.run()
+
         # Create backup manifest
-        manifest = {
-            "backup_date": datetime.datetime.now().isoformat(),
-            "environment": "production",
-            "backup_type": "full",
-            "files": [
-                str(schema_backup_file.name),
-                str(apex_backup_file.name)
-            ],
-            "database_connection": db_connection,
-            "apex_workspace": os.getenv('APEX_WORKSPACE', 'HEALTHCARE'),
-            "git_commit": os.getenv('BUILD_SOURCEVERSION', 'unknown')
-        }
-        
-        manifest_file = backup_dir / "backup_manifest.json"
+        manifest_file = backup_dir / MANIFEST_NAME
+        manifest = backup.manifest(time.time() - start_time, succeeded, manifest_file)
         with open(manifest_file, 'w') as f:
             json.dump(manifest, f, indent=2)
-        
-        print("✅ Production backup completed successfully")
+
+        totals = manifest['totals']
         print(f"📋 Backup manifest: {manifest_file}")
-        
+        print(f"📦 {len(manifest['artifacts'])} artifact(s), {totals['bytes'] / (1024 * 1024):.1f} MB "
+              f"in {totals['seconds']:.1f}s")
+
         # Set Azure DevOps variable for backup location
         print(f"##vso[task.setvariable variable=backupLocation]{backup_dir}")
-        
+
+        if not succeeded:
+            print("❌ Production backup completed with failed phases")
+            sys.exit(1)
+
+        print("✅ Production backup completed successfully")
         return 0
-        
+
     except Exception as e:
         print(f"❌ Backup failed: {str(e)}")
         sys.exit(1)
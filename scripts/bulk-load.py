@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Healthcare System - Bulk Data Loader
+Loads CSV/JSON data with array-bound batch inserts, resumable after failures
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from healthcare_db import DatabaseUnavailable, create_pool, load_config
+
+DEFAULT_BATCH_SIZE = 5000
+STATE_FILE_NAME = '.bulk-load-state.json'
+
+# Maintained after the load instead of row by row when triggers are deferred
+SEARCH_INDEX_TRIGGER = 'TRG_PATIENTS_SEARCH_INDEX'
+
+DATE_FORMATS = ['%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d']
+
+
+def open_text(path: Path):
+    """Open a plain or gzip-compressed text file"""
+    if path.suffix == '.gz':
+        return gzip.open(path, 'rt', newline='')
+    return open(path, 'r', newline='')
+
+
+def read_rows(path: Path) -> Tuple[List[str], Iterator[List]]:
+    """(columns, row iterator) for a CSV or JSON input file.
+
+    JSON may be a list of objects, or {"columns": [...], "rows": [[...], ...]},
+    or {"rows": [{...}, ...]}.
+    """
+    name = path.name.lower()
+    if name.endswith('.json') or name.endswith('.json.gz'):
+        with open_text(path) as f:
+            data = json.load(f)
+        rows = data.get('rows', []) if isinstance(data, dict) else data
+        if isinstance(data, dict) and 'columns' in data:
+            return [c.lower() for c in data['columns']], iter(rows)
+        columns = list(rows[0].keys()) if rows else []
+        return [c.lower() for c in columns], iter([[r.get(c) for c in columns] for r in rows])
+
+    f = open_text(path)
+    reader = csv.reader(f)
+    columns = [c.strip().lower() for c in next(reader)]
+
+    def iterate():
+        try:
+            for row in reader:
+                yield row
+        finally:
+            f.close()
+
+    return columns, iterate()
+
+
+class StateFile:
+    """Per-table progress, rewritten atomically after every committed batch"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.data = {'tables': {}, 'disabled_triggers': []}
+        if path.exists():
+            with open(path, 'r') as f:
+                self.data = json.load(f)
+
+    def table(self, key: str) -> Dict:
+        return self.data['tables'].setdefault(key, {'rows_committed': 0, 'completed': False})
+
+    def save(self):
+        self.data['updated'] = datetime.now().isoformat()
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if self.path.exists():
+            self.path.unlink()
+
+
+class BulkLoader:
+    """Array-bound loader for one database connection"""
+
+    def __init__(self, connection, batch_size: int = DEFAULT_BATCH_SIZE, direct_path: bool = False,
+                 state: Optional[StateFile] = None, progress_interval: float = 5.0):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.direct_path = direct_path
+        self.state = state
+        self.progress_interval = progress_interval
+        self._column_types: Dict[str, Dict[str, str]] = {}
+
+    def column_types(self, table: str) -> Dict[str, str]:
+        if table not in self._column_types:
+            cursor = self.connection.cursor()
+            cursor.execute("""
+                SELECT LOWER(column_name), data_type
+                FROM user_tab_columns
+                WHERE table_name = UPPER(:table_name)
+            """, {'table_name': table})
+            self._column_types[table] = dict(cursor.fetchall())
+            cursor.close()
+        return self._column_types[table]
+
+    @staticmethod
+    def convert(value, data_type: Optional[str]):
+        if value is None or value == '':
+            return None
+        if not isinstance(value, str) or data_type is None:
+            return value
+        if data_type == 'DATE' or data_type.startswith('TIMESTAMP'):
+            for date_format in DATE_FORMATS:
+                try:
+                    return datetime.strptime(value, date_format)
+                except ValueError:
+                    continue
+            raise ValueError(f"Unrecognised date value: {value}")
+        if data_type in ('NUMBER', 'FLOAT', 'BINARY_DOUBLE', 'BINARY_FLOAT'):
+            return float(value) if any(c in value for c in '.eE') else int(value)
+        return value
+
+    def insert_sql(self, table: str, columns: List[str]) -> str:
+        hint = '/*+ APPEND_VALUES */ ' if self.direct_path else ''
+        binds = ', '.join(f":{i + 1}" for i in range(len(columns)))
+        return f"INSERT {hint}INTO {table} ({', '.join(columns)}) VALUES ({binds})"
+
+    def row_exists(self, table: str, id_column: str, value) -> bool:
+        cursor = self.connection.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE {id_column} = :id_value", {'id_value': value})
+        found = cursor.fetchone()[0] > 0
+        cursor.close()
+        return found
+
+    def load(self, table: str, path: Path, total_rows: Optional[int] = None,
+             id_column: Optional[str] = None) -> Dict:
+        """Load one file into one table, resuming after the last committed batch"""
+        key = f"{table}:{path.name}"
+        progress = self.state.table(key) if self.state else {'rows_committed': 0, 'completed': False}
+        if progress['completed']:
+            print(f"  ⏭️ {table}: already loaded ({progress['rows_committed']:,} rows)")
+            return {'table': table, 'rows': 0, 'skipped': True}
+
+        columns, rows = read_rows(path)
+        types = self.column_types(table)
+        unknown = [c for c in columns if types and c not in types]
+        if unknown:
+            raise ValueError(f"{path.name}: columns not in {table}: {', '.join(unknown)}")
+        converters = [types.get(c) for c in columns]
+        sql = self.insert_sql(table, columns)
+
+        committed = progress['rows_committed']
+        if committed:
+            # Fast-forward past rows committed by a previous run
+            rows = islice(rows, committed, None)
+            print(f"  ↻ {table}: resuming after {committed:,} committed rows")
+
+        def batches() -> Iterator[List[Tuple]]:
+            batch = []
+            for row in rows:
+                batch.append(tuple(self.convert(v, t) for v, t in zip(row, converters)))
+                if len(batch) >= self.batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        cursor = self.connection.cursor()
+        loaded = 0
+        start_time = time.time()
+        last_report = start_time
+        first = True
+        try:
+            for batch in batches():
+                # A batch committed just before the state file was written
+                if first and id_column and id_column in columns:
+                    if self.row_exists(table, id_column, batch[0][columns.index(id_column)]):
+                        committed += len(batch)
+                        progress['rows_committed'] = committed
+                        continue
+                first = False
+
+                cursor.executemany(sql, batch)
+                self.connection.commit()
+                loaded += len(batch)
+                committed += len(batch)
+
+                if self.state:
+                    progress['rows_committed'] = committed
+                    self.state.save()
+
+                now = time.time()
+                if now - last_report >= self.progress_interval:
+                    last_report = now
+                    rate = loaded / (now - start_time)
+                    percent = f" ({committed / total_rows * 100:.1f}%)" if total_rows else ''
+                    print(f"    {table}: {committed:,}{f'/{total_rows:,}' if total_rows else ''} rows"
+                          f"{percent}, {rate:,.0f} rows/s")
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+        elapsed = time.time() - start_time
+        progress['completed'] = True
+        if self.state:
+            self.state.save()
+
+        rate = loaded / elapsed if elapsed > 0 else 0
+        print(f"  ✅ {table}: {loaded:,} rows in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+        return {'table': table, 'rows': loaded, 'seconds': round(elapsed, 2), 'rows_per_second': round(rate)}
+
+    def triggers_for(self, tables: List[str], audit_only: bool) -> List[str]:
+        """Enabled triggers on the given tables (audit and search-index triggers only by default)"""
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            SELECT trigger_name, table_name
+            FROM user_triggers
+            WHERE status = 'ENABLED'
+        """)
+        wanted = {t.upper() for t in tables}
+        names = []
+        for trigger_name, table_name in cursor.fetchall():
+            if table_name not in wanted:
+                continue
+            if audit_only and 'AUDIT' not in trigger_name and trigger_name != SEARCH_INDEX_TRIGGER:
+                continue
+            names.append(trigger_name)
+        cursor.close()
+        return names
+
+    def set_triggers(self, names: List[str], enabled: bool):
+        cursor = self.connection.cursor()
+        for name in names:
+            cursor.execute(f"ALTER TRIGGER {name} {'ENABLE' if enabled else 'DISABLE'}")
+        cursor.close()
+
+    def run_block(self, call: str):
+        cursor = self.connection.cursor()
+        cursor.execute(f"BEGIN {call}; END;")
+        cursor.close()
+        self.connection.commit()
+
+    def restart_sequence(self, sequence: str, next_value: int):
+        """Move a sequence past the loaded ids (never backwards)"""
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT last_number FROM user_sequences WHERE sequence_name = UPPER(:name)",
+                       {'name': sequence})
+        row = cursor.fetchone()
+        if row and row[0] < next_value:
+            cursor.execute(f"ALTER SEQUENCE {sequence} RESTART START WITH {int(next_value)}")
+        cursor.close()
+
+
+def plan_from_manifest(manifest_path: Path) -> Dict:
+    """Load order, files and post-load steps from a generate-data.py manifest"""
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+
+    return {
+        'items': [{'table': t['table'], 'path': manifest_path.parent / t['file'],
+                   'rows': t.get('rows'), 'id_column': t.get('id_column')}
+                  for t in manifest['tables']],
+        'sequences': manifest.get('sequences', {}),
+        'post_load': manifest.get('post_load', []),
+        'past_appointments': manifest.get('past_appointments', False),
+        'reference_date': manifest.get('reference_date')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk load Healthcare System data with array binding')
+    parser.add_argument('source', help='manifest.json (or its directory), or a CSV/JSON file with --table')
+    parser.add_argument('--table', '-t', help='Target table when loading a single file')
+    parser.add_argument('--environment', '-e', default='dev', help='Environment to load into')
+    parser.add_argument('--config-file', help='Configuration file path')
+    parser.add_argument('--batch-size', '-b', type=int, default=DEFAULT_BATCH_SIZE,
+                       help='Rows per executemany call and commit')
+    parser.add_argument('--defer-triggers', action='store_true',
+                       help='Disable audit and search-index triggers during the load and rebuild afterwards')
+    parser.add_argument('--disable-all-triggers', action='store_true',
+                       help='Disable every trigger on the loaded tables (needed for historical appointments)')
+    parser.add_argument('--direct-path', action='store_true',
+                       help='Use APPEND_VALUES direct-path inserts (only effective with triggers disabled)')
+    parser.add_argument('--state-file', help=f"Progress file for resuming (default: {STATE_FILE_NAME} next to the input)")
+    parser.add_argument('--restart', action='store_true', help='Ignore saved progress and load from the start')
+    parser.add_argument('--skip-post-load', action='store_true', help='Skip sequence and summary refreshes')
+
+    args = parser.parse_args()
+
+    source = Path(args.source)
+    if source.is_dir():
+        source = source / 'manifest.json'
+    if not source.exists():
+        print(f"❌ Input not found: {source}")
+        return 1
+
+    if args.table:
+        plan = {'items': [{'table': args.table, 'path': source, 'rows': None, 'id_column': None}],
+                'sequences': {}, 'post_load': [], 'past_appointments': False, 'reference_date': None}
+    elif source.name.endswith('.json') and source.name.startswith('manifest'):
+        plan = plan_from_manifest(source)
+    else:
+        print("❌ --table is required when loading a single file")
+        return 1
+
+    if plan['past_appointments'] and not args.disable_all_triggers:
+        print("❌ Dataset contains past appointments; load it with --disable-all-triggers")
+        return 1
+    if plan['reference_date'] and plan['reference_date'] != datetime.now().date().isoformat():
+        print(f"⚠️ Dataset reference date is {plan['reference_date']}; "
+              f"appointments before today will be rejected by the validation trigger")
+
+    state = StateFile(Path(args.state_file) if args.state_file else source.parent / STATE_FILE_NAME)
+    if args.restart:
+        state.data = {'tables': {}, 'disabled_triggers': []}
+
+    config = load_config(args.environment, args.config_file)
+    try:
+        pool = create_pool(config, min=1, max=1)
+    except DatabaseUnavailable as e:
+        print(f"❌ {e}")
+        return 2
+
+    connection = pool.acquire()
+    loader = BulkLoader(connection, batch_size=args.batch_size, direct_path=args.direct_path, state=state)
+    tables = [item['table'] for item in plan['items']]
+    total_start = time.time()
+    success = False
+    # Triggers left disabled by an interrupted run are re-enabled at the end of this one
+    disabled = list(state.data.get('disabled_triggers', []))
+
+    try:
+        if args.defer_triggers or args.disable_all_triggers:
+            new_triggers = [t for t in loader.triggers_for(tables, audit_only=not args.disable_all_triggers)
+                            if t not in disabled]
+            disabled.extend(new_triggers)
+            state.data['disabled_triggers'] = disabled
+            state.save()
+            loader.set_triggers(new_triggers, enabled=False)
+            if disabled:
+                print(f"Deferred triggers: {', '.join(disabled)}")
+
+        print(f"Loading {len(plan['items'])} file(s), batch size {args.batch_size:,}")
+        results = []
+        for item in plan['items']:
+            results.append(loader.load(item['table'], item['path'], item['rows'], item['id_column']))
+
+        success = True
+    except Exception as e:
+        print(f"❌ Load failed: {e}")
+        print(f"   Progress saved to {state.path}; re-run the same command to resume")
+    finally:
+        if disabled:
+            loader.set_triggers(disabled, enabled=True)
+            state.data['disabled_triggers'] = []
+            state.save()
+            print(f"Re-enabled triggers: {', '.join(disabled)}")
+
+    try:
+        if success and not args.skip_post_load:
+            for sequence, next_value in plan['sequences'].items():
+                loader.restart_sequence(sequence, next_value)
+            post_load = list(plan['post_load'])
+            if SEARCH_INDEX_TRIGGER in disabled and 'pkg_patient_mgmt.rebuild_search_index' not in post_load:
+                post_load.insert(0, 'pkg_patient_mgmt.rebuild_search_index')
+            for call in post_load:
+                step_start = time.time()
+                loader.run_block(call)
+                print(f"  ✅ {call} ({time.time() - step_start:.1f}s)")
+    except Exception as e:
+        print(f"❌ Post-load step failed: {e}")
+        success = False
+    finally:
+        pool.release(connection)
+        pool.close()
+
+    if not success:
+        return 1
+
+    state.clear()
+    total_rows = sum(r['rows'] for r in results)
+    elapsed = time.time() - total_start
+    print(f"\n✅ Loaded {total_rows:,} rows in {elapsed:.1f}s "
+          f"({total_rows / elapsed if elapsed > 0 else 0:,.0f} rows/s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -76,6 +76,22 @@ check_prerequisites() {
 test_connection() {
     log "Testing database connectivity..."
     
+    # Prefer the pooled Python check; exit code 2 means no driver/credentials
+    if command -v python3 &> /dev/null; then
+        local ping_status=0
+        DB_CONNECTION_STRING="$DB_CONNECTION_STRING" DB_USERNAME="$DB_USERNAME" DB_PASSWORD="$DB_PASSWORD" \
+            python3 "${SCRIPT_DIR}/healthcare_db.py" ping --environment "$ENVIRONMENT" || ping_status=$?
+        
+        if [[ $ping_status -eq 0 ]]; then
+            success "Database connection successful"
+            return
+        elif [[ $ping_status -ne 2 ]]; then
+            error "Database connection failed"
+        fi
+        
+        warning "Python Oracle driver not available, falling back to SQL*Plus"
+    fi
+    
     local test_result
     test_result=$(sqlplus -s "${DB_USERNAME}/${DB_PASSWORD}@${DB_CONNECTION_STRING}" <<EOF
 SET PAGESIZE 0
@@ -147,6 +163,72 @@ deploy_database() {
     success "Database deployment completed successfully"
 }
 
+# Run the migration runner; returns its exit status
+run_migrations() {
+    local status=0
+    DB_CONNECTION_STRING="$DB_CONNECTION_STRING" DB_USERNAME="$DB_USERNAME" DB_PASSWORD="$DB_PASSWORD" \
+        python3 "${SCRIPT_DIR}/run-migrations.py" --environment "$ENVIRONMENT" || status=$?
+    return $status
+}
+
+# Apply pending migrations and only the changed views, packages, triggers and jobs
+migrate_database() {
+    log "Applying incremental migrations for environment: $ENVIRONMENT"
+    
+    run_migrations || error "Migration failed"
+    
+    success "Migrations applied"
+}
+
+# Incremental deploy; a database without the schema gets the full install
+# first, which the migrations then bring up to date
+deploy_or_migrate() {
+    log "Applying incremental migrations for environment: $ENVIRONMENT"
+    
+    local status=0
+    run_migrations || status=$?
+    
+    if [[ $status -eq 3 ]]; then
+        warning "Healthcare schema not installed, running full deployment"
+        deploy_database
+        migrate_database
+    elif [[ $status -ne 0 ]]; then
+        error "Migration failed"
+    else
+        success "Migrations applied"
+    fi
+}
+
+# Bulk load a generated or exported dataset with array-bound inserts
+load_data() {
+    local data_dir="${1:-$BULK_DATA_DIR}"
+    
+    if [[ -z "$data_dir" || ! -e "$data_dir" ]]; then
+        error "Data directory not found: ${data_dir:-<not set>}"
+    fi
+    
+    log "Bulk loading data from: $data_dir"
+    
+    DB_CONNECTION_STRING="$DB_CONNECTION_STRING" DB_USERNAME="$DB_USERNAME" DB_PASSWORD="$DB_PASSWORD" \
+        python3 "${SCRIPT_DIR}/bulk-load.py" "$data_dir" --environment "$ENVIRONMENT" \
+        --batch-size "${BULK_BATCH_SIZE:-5000}" --defer-triggers \
+        || error "Bulk load failed; re-run the same command to resume"
+    
+    success "Bulk load completed"
+}
+
+# Deploy schema objects in dependency order with concurrent sessions
+deploy_schema() {
+    log "Deploying schema with dependency-aware deployer..."
+    
+    DB_CONNECTION_STRING="$DB_CONNECTION_STRING" DB_USERNAME="$DB_USERNAME" DB_PASSWORD="$DB_PASSWORD" \
+        python3 "${SCRIPT_DIR}/deploy-schema.py" --environment "$ENVIRONMENT" \
+        --workers "${SCHEMA_DEPLOY_WORKERS:-4}" \
+        || error "Schema deployment failed"
+    
+    success "Schema deployment completed"
+}
+
 # Verify deployment
 verify_deployment() {
     log "Verifying deployment..."
@@ -268,8 +350,13 @@ main() {
         backup_production
     fi
     
-    # Deploy database
-    deploy_database
+    # Deploy database: full replay when requested or when the schema is
+    # missing, otherwise incremental
+    if [[ "${FULL_DEPLOY:-false}" == "true" ]]; then
+        deploy_database
+    else
+        deploy_or_migrate
+    fi
     
     # Verify deployment
     verify_deployment
@@ -295,12 +382,27 @@ case "${1:-deploy}" in
         load_config
         test_connection
         ;;
+    "load")
+        load_config
+        load_data "$2"
+        ;;
+    "schema")
+        load_config
+        deploy_schema
+        ;;
+    "migrate")
+        load_config
+        migrate_database
+        ;;
     *)
-        echo "Usage: $0 [deploy|verify|rollback|test] [environment]"
-        echo "  deploy   - Deploy database schema (default)"
+        echo "Usage: $0 [deploy|verify|rollback|test|load|schema|migrate] [environment]"
+        echo "  deploy   - Deploy database schema (default; incremental unless FULL_DEPLOY=true or not installed)"
         echo "  verify   - Verify existing deployment"
         echo "  rollback - Rollback to backup file"
         echo "  test     - Test database connectivity"
+        echo "  load     - Bulk load a data directory (manifest.json) with array binding"
+        echo "  schema   - Deploy changed schema objects in dependency order, in parallel"
+        echo "  migrate  - Apply new migrations and changed views/packages/triggers only"
         exit 1
         ;;
 esac
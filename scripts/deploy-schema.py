@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Healthcare System - Schema Deployer
+Deploys the install scripts in dependency order with concurrent workers,
+skipping objects whose source has not changed since the last deployment
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from healthcare_db import DatabaseUnavailable, create_pool, get_pool_settings, load_config
+from healthcare_schema import (
+    DeploymentError,
+    SchemaDeployer,
+    ensure_history_table,
+    execution_waves,
+    load_deployed_hashes,
+    load_plan,
+    recompile_invalid,
+    record_deployed,
+)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_ENTRY = BASE_DIR / 'scripts' / 'install' / 'install.sql'
+# install.sql is run from database/schema, so its @@ includes resolve there
+DEFAULT_INCLUDE_DIR = BASE_DIR / 'database' / 'schema'
+
+
+def print_plan(statements):
+    waves = execution_waves(statements)
+    print(f"📋 {len(statements)} statements in {len(waves)} waves")
+    for number, wave in enumerate(waves, 1):
+        print(f"\nWave {number} ({len(wave)} statements)")
+        for statement in wave:
+            print(f"  {statement.location:<45} {statement.label}")
+
+
+def schema_has_objects(pool) -> bool:
+    rows = pool.query("SELECT COUNT(*) FROM user_tables WHERE table_name = 'PATIENTS'")
+    return rows[0][0] > 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Deploy Healthcare System schema objects in dependency order')
+    parser.add_argument('--environment', '-e', default='dev', help='Environment to deploy to')
+    parser.add_argument('--config-file', help='Configuration file path')
+    parser.add_argument('--entry', default=str(DEFAULT_ENTRY), help='Install script to deploy')
+    parser.add_argument('--include-dir', default=str(DEFAULT_INCLUDE_DIR),
+                       help='Directory the install script\'s @@ includes are relative to')
+    parser.add_argument('--workers', '-w', type=int, help='Concurrent sessions (default: pool max)')
+    parser.add_argument('--plan', action='store_true', help='Print the execution waves without connecting')
+    parser.add_argument('--force', action='store_true', help='Redeploy every statement, ignoring recorded hashes')
+    parser.add_argument('--baseline', action='store_true',
+                       help='Record current source hashes for an existing schema without executing anything')
+    parser.add_argument('--strict', action='store_true',
+                       help='Fail when objects are still invalid after the final recompile')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Print every statement as it completes')
+
+    args = parser.parse_args()
+
+    entry = Path(args.entry)
+    if not entry.exists():
+        print(f"❌ Install script not found: {entry}")
+        return 1
+
+    statements = load_plan(entry, BASE_DIR, include_dir=Path(args.include_dir))
+
+    if args.plan:
+        print_plan(statements)
+        return 0
+
+    config = load_config(args.environment, args.config_file)
+    workers = args.workers or get_pool_settings(config)['max']
+    try:
+        pool = create_pool(config, min=1, max=max(workers, 1))
+    except DatabaseUnavailable as e:
+        print(f"❌ {e}")
+        return 2
+
+    try:
+        ensure_history_table(pool)
+        deployed_hashes = load_deployed_hashes(pool)
+
+        if args.baseline:
+            with pool.connection() as connection:
+                record_deployed(connection, statements)
+            print(f"✅ Recorded {len(statements)} statement hashes as deployed")
+            return 0
+
+        if not deployed_hashes and not args.force and schema_has_objects(pool):
+            print("❌ Schema already contains Healthcare objects but has no deployment history")
+            print("   Run with --baseline to record the current scripts, or --force to redeploy everything")
+            return 1
+
+        print(f"🚀 Deploying {len(statements)} statements from {entry.name} with {workers} workers")
+
+        def on_done(statement, outcome, elapsed):
+            if args.verbose or outcome == 'needs_migration':
+                marker = '⚠️' if outcome == 'needs_migration' else '✅'
+                print(f"  {marker} {outcome:<15} {elapsed:6.2f}s  {statement.location}  {statement.label}")
+
+        deployer = SchemaDeployer(pool, workers=workers,
+                                  deployed_hashes={} if args.force else deployed_hashes)
+        try:
+            summary = deployer.run(statements, on_done=on_done)
+        except DeploymentError as e:
+            print(f"\n❌ Failed at {e.statement.location} ({e.statement.label})")
+            print(e.statement.sql.strip())
+            print(f"\n{e}")
+            return 1
+
+        start_time = time.time()
+        invalid = recompile_invalid(pool)
+        if invalid:
+            print(f"⚠️ {len(invalid)} invalid object(s) after recompile:")
+            for object_type, object_name in invalid:
+                print(f"     {object_type} {object_name}")
+
+        print(f"\n📊 Executed: {summary['executed']}, skipped: {summary['skipped']}, "
+              f"already existed: {summary['existing']}, "
+              f"needs migration: {len(summary['needs_migration'])}, "
+              f"{summary['seconds'] + time.time() - start_time:.1f}s")
+        for key in summary['needs_migration']:
+            print(f"  ⚠️ {key} changed since it was deployed; add a migration for it")
+
+        if invalid and args.strict:
+            print("❌ Invalid objects remain")
+            return 1
+
+        print("✅ Schema deployment completed")
+        return 0
+    finally:
+        pool.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,654 @@
+#!/usr/bin/env python3
+"""
+Healthcare System - Synthetic Data Generator
+Streams consistent, seeded datasets at configurable scale as bulk-load CSV files
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import math
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from random import Random
+from typing import Dict, Iterator, List, Optional
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+ORACLE_DATE_FORMAT = 'YYYY-MM-DD HH24:MI:SS'
+
+# Row counts for each preset; explicit --patients/--appointments/... override them
+SCALE_PRESETS = {
+    'small': {'patients': 10000, 'providers': None, 'appointments': 50000, 'medical_records': 20000,
+              'prescriptions': 30000, 'trials': 20, 'participants': 2000},
+    'medium': {'patients': 100000, 'providers': None, 'appointments': 1000000, 'medical_records': 200000,
+               'prescriptions': 300000, 'trials': 100, 'participants': 20000},
+    'large': {'patients': 1000000, 'providers': None, 'appointments': 10000000, 'medical_records': 2000000,
+              'prescriptions': 3000000, 'trials': 500, 'participants': 200000},
+}
+
+# Generated ids start at sequence START WITH + id offset so they stay clear of
+# the sample data and of rows created through the sequences before loading
+SEQUENCES = {
+    'providers': ('seq_provider_id', 100),
+    'patients': ('seq_patient_id', 1000),
+    'appointments': ('seq_appointment_id', 10000),
+    'medical_records': ('seq_medical_record_id', 100000),
+    'prescriptions': ('seq_prescription_id', 50000),
+    'clinical_trials': ('seq_trial_id', 1000),
+    'trial_participants': ('seq_participant_id', 10000),
+    'study_protocols': ('seq_protocol_id', 500),
+    'trial_milestones': ('seq_milestone_id', 5000),
+    'trial_visits': ('seq_trial_visit_id', 30000),
+    'adverse_events': ('seq_adverse_event_id', 20000),
+}
+
+COLUMNS = {
+    'providers': ['provider_id', 'first_name', 'last_name', 'title', 'specialty', 'license_number',
+                  'phone', 'email', 'department', 'hire_date', 'is_active'],
+    'patients': ['patient_id', 'first_name', 'last_name', 'date_of_birth', 'gender', 'phone', 'email',
+                 'address', 'city', 'state', 'zip_code', 'emergency_contact_name', 'emergency_contact_phone',
+                 'insurance_provider', 'insurance_policy_number', 'blood_type', 'created_date', 'is_active'],
+    'appointments': ['appointment_id', 'patient_id', 'provider_id', 'appointment_date', 'appointment_time',
+                     'duration_minutes', 'appointment_type', 'status', 'reason_for_visit', 'start_ts', 'end_ts'],
+    'medical_records': ['record_id', 'patient_id', 'provider_id', 'visit_date', 'chief_complaint', 'vital_signs'],
+    'prescriptions': ['prescription_id', 'patient_id', 'provider_id', 'record_id', 'medication_name', 'dosage',
+                      'frequency', 'duration', 'quantity', 'refills_allowed', 'date_prescribed', 'is_active'],
+    'clinical_trials': ['trial_id', 'trial_name', 'trial_number', 'phase', 'status', 'start_date', 'end_date',
+                        'target_enrollment', 'current_enrollment', 'primary_investigator_id', 'sponsor',
+                        'study_type', 'therapeutic_area', 'estimated_duration_months', 'budget_amount', 'is_active'],
+    'trial_participants': ['participant_id', 'trial_id', 'patient_id', 'enrollment_date', 'randomization_code',
+                           'study_arm', 'status', 'withdrawal_reason', 'withdrawal_date', 'informed_consent_date',
+                           'baseline_visit_date', 'last_visit_date', 'next_visit_date', 'assigned_provider_id'],
+    'study_protocols': ['protocol_id', 'trial_id', 'protocol_version', 'protocol_date', 'title', 'is_current',
+                        'approved_date', 'approved_by'],
+    'trial_milestones': ['milestone_id', 'trial_id', 'milestone_name', 'planned_date', 'actual_date', 'status',
+                         'milestone_type', 'responsible_provider_id', 'completion_percentage'],
+    'trial_visits': ['visit_id', 'participant_id', 'trial_id', 'visit_number', 'visit_name', 'visit_type',
+                     'scheduled_date', 'actual_date', 'visit_window_start', 'visit_window_end', 'status',
+                     'provider_id'],
+    'adverse_events': ['adverse_event_id', 'participant_id', 'trial_id', 'event_date', 'event_term', 'severity',
+                       'relationship_to_study', 'outcome', 'serious', 'expected', 'reported_date',
+                       'resolution_date', 'reporting_provider_id', 'regulatory_reported', 'follow_up_required'],
+}
+
+# Parents before children
+LOAD_ORDER = ['providers', 'patients', 'appointments', 'medical_records', 'prescriptions', 'clinical_trials',
+              'trial_participants', 'study_protocols', 'trial_milestones', 'trial_visits', 'adverse_events']
+
+FIRST_NAMES = ['James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda', 'William',
+               'Elizabeth', 'David', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah',
+               'Charles', 'Karen', 'Daniel', 'Nancy', 'Matthew', 'Lisa', 'Anthony', 'Betty', 'Mark', 'Sandra',
+               'Steven', 'Ashley', 'Paul', 'Emily', 'Andrew', 'Donna', 'Joshua', 'Michelle', 'Kevin', 'Carol',
+               'Brian', 'Amanda', 'George', 'Melissa', 'Omar', 'Priya', 'Wei', 'Fatima', 'Carlos', 'Yuki']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez',
+              'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore',
+              'Jackson', 'Martin', 'Lee', 'Perez', 'Thompson', 'White', 'Harris', 'Sanchez', 'Clark',
+              'Ramirez', 'Lewis', 'Robinson', 'Walker', 'Young', 'Allen', 'King', 'Wright', 'Scott', 'Torres',
+              'Nguyen', 'Hill', 'Flores', 'Green', 'Adams', 'Nelson', 'Baker', 'Hall', 'Rivera', 'Chen', 'Patel']
+STREETS = ['Main St', 'Oak Ave', 'Pine Rd', 'Elm St', 'Maple Dr', 'Cedar Ln', 'Park Blvd', 'Lake St']
+CITIES = [('Springfield', 'IL', '627'), ('Riverside', 'CA', '925'), ('Franklin', 'TN', '370'),
+          ('Greenville', 'SC', '296'), ('Madison', 'WI', '537'), ('Clinton', 'IA', '527'),
+          ('Salem', 'OR', '973'), ('Georgetown', 'TX', '786')]
+INSURERS = ['Blue Cross', 'Aetna', 'Cigna', 'UnitedHealth', 'Humana', 'Kaiser', 'Medicare', 'Medicaid']
+BLOOD_TYPES = ['O+', 'O-', 'A+', 'A-', 'B+', 'B-', 'AB+', 'AB-']
+SPECIALTIES = [('Family Medicine', 'Primary Care'), ('Internal Medicine', 'Internal Medicine'),
+               ('Cardiology', 'Cardiology'), ('Dermatology', 'Dermatology'), ('Orthopedics', 'Orthopedics'),
+               ('Pediatrics', 'Pediatrics'), ('Neurology', 'Neurology'), ('Oncology', 'Oncology'),
+               ('Psychiatry', 'Psychiatry'), ('Emergency Medicine', 'Emergency')]
+# (type_name, duration) as in appointment_types; durations are multiples of the 15 minute grid
+APPOINTMENT_TYPES = [('Follow-up', 30), ('Initial Consultation', 60), ('Annual Physical', 45),
+                     ('Urgent Care', 15), ('Specialist Consultation', 45), ('Preventive Care', 30),
+                     ('Telemedicine', 15)]
+APPOINTMENT_TYPE_WEIGHTS = [35, 10, 10, 10, 10, 15, 10]
+REASONS = ['Routine check-up', 'Follow-up on lab results', 'Chest pain', 'Back pain', 'Medication review',
+           'Headache', 'Skin rash', 'Blood pressure check', 'Annual physical', 'Vaccination']
+MEDICATIONS = [('Lisinopril', '10mg', 'Once daily'), ('Metformin', '500mg', 'Twice daily'),
+               ('Atorvastatin', '20mg', 'Once daily'), ('Amoxicillin', '500mg', 'Three times daily'),
+               ('Ibuprofen', '400mg', 'As needed'), ('Omeprazole', '20mg', 'Once daily'),
+               ('Levothyroxine', '50mcg', 'Once daily'), ('Sertraline', '50mg', 'Once daily')]
+THERAPEUTIC_AREAS = ['Cardiology', 'Oncology', 'Neurology', 'Endocrinology', 'Immunology', 'Psychiatry',
+                     'Infectious Disease', 'Respiratory']
+SPONSORS = ['Acme Pharma', 'Northwind Biotech', 'Contoso Therapeutics', 'Globex Health', 'Initech Bio']
+AE_TERMS = ['Headache', 'Nausea', 'Fatigue', 'Dizziness', 'Rash', 'Insomnia', 'Elevated liver enzymes',
+            'Injection site reaction', 'Hypertension', 'Arrhythmia']
+MILESTONES = [('IRB Approval', 'Regulatory'), ('First Patient In', 'Enrollment'),
+              ('Enrollment Complete', 'Enrollment'), ('Database Lock', 'Data Collection'),
+              ('Final Analysis', 'Analysis'), ('Clinical Study Report', 'Reporting')]
+
+TRIAL_STATUSES = ['Planning', 'Active', 'Recruiting', 'Suspended', 'Completed', 'Terminated']
+TRIAL_STATUS_WEIGHTS = [5, 35, 35, 5, 15, 5]
+TRIAL_PHASES = ['Phase I', 'Phase II', 'Phase III', 'Phase IV', 'Observational']
+
+BUSINESS_START_MINUTES = 8 * 60
+BUSINESS_END_MINUTES = 17 * 60
+SLOT_MINUTES = 15
+VISIT_INTERVAL_DAYS = 28
+VISIT_WINDOW_DAYS = 3
+
+
+def fmt(value) -> Optional[str]:
+    """Render a value the way the CSV loader expects it"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.strftime(DATE_FORMAT)
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d') + ' 00:00:00'
+    return value
+
+
+def weekdays(start: date) -> Iterator[date]:
+    current = start
+    while True:
+        if current.weekday() < 5:
+            yield current
+        current += timedelta(days=1)
+
+
+def to_datetime(day: date, minutes: int = 0) -> datetime:
+    return datetime(day.year, day.month, day.day) + timedelta(minutes=minutes)
+
+
+class TableWriter:
+    """Streams rows of one table to <table>.csv[.gz]"""
+
+    def __init__(self, output_dir: Path, table: str, compress: bool):
+        self.table = table
+        self.path = output_dir / f"{table}.csv{'.gz' if compress else ''}"
+        self._file = gzip.open(self.path, 'wt', newline='') if compress else open(self.path, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(COLUMNS[table])
+        self.rows = 0
+        self.min_id = None
+        self.max_id = None
+
+    def write(self, row: List):
+        self._writer.writerow([fmt(v) for v in row])
+        self.rows += 1
+        if self.min_id is None:
+            self.min_id = row[0]
+        self.max_id = row[0]
+
+    def close(self):
+        self._file.close()
+
+
+class DataGenerator:
+    """Generates one consistent dataset.
+
+    Every row satisfies the table constraints and the rules enforced by the
+    triggers when loaded with triggers enabled: appointments are active
+    patient/provider pairs on a non-overlapping business-hours grid starting
+    at the reference date, visits only exist for active participants of
+    Active/Recruiting trials and fall inside their windows, adverse events
+    are never in the future, and current_enrollment matches the participants.
+    """
+
+    def __init__(self, output_dir: str, seed: int = 42, counts: Optional[Dict] = None,
+                 reference_date: Optional[date] = None, id_offset: int = 1000000,
+                 history_days: int = 730, appointment_days: int = 0, compress: bool = False,
+                 max_visits: int = 12):
+        self.output_dir = Path(output_dir)
+        self.seed = seed
+        self.counts = dict(SCALE_PRESETS['small'], **(counts or {}))
+        self.reference_date = reference_date or date.today()
+        self.id_offset = id_offset
+        self.history_days = history_days
+        self.appointment_days = appointment_days
+        self.compress = compress
+        self.max_visits = max_visits
+        self.writers: Dict[str, TableWriter] = {}
+        self.timings: Dict[str, float] = {}
+
+        if not self.counts['providers']:
+            # Enough providers for the appointments at roughly 12 per provider-day
+            # over about a year of weekdays
+            self.counts['providers'] = max(20, math.ceil(self.counts['appointments'] / (12 * 250)))
+
+    def rng(self, table: str) -> Random:
+        # Independent stream per table so one table can be regenerated alone
+        return Random(f"{self.seed}:{table}")
+
+    def first_id(self, table: str) -> int:
+        return SEQUENCES[table][1] + self.id_offset
+
+    def patient_id(self, index: int) -> int:
+        return self.first_id('patients') + index
+
+    def provider_id(self, index: int) -> int:
+        return self.first_id('providers') + index
+
+    @staticmethod
+    def patient_is_active(index: int) -> bool:
+        # Deterministic so child tables can avoid inactive patients without a lookup
+        return index % 40 != 39
+
+    def active_patient(self, rng: Random) -> int:
+        index = rng.randrange(self.counts['patients'])
+        while not self.patient_is_active(index):
+            index = (index + 1) % self.counts['patients']
+        return self.patient_id(index)
+
+    def open(self, table: str) -> TableWriter:
+        writer = TableWriter(self.output_dir, table, self.compress)
+        self.writers[table] = writer
+        return writer
+
+    def generate(self, progress=None) -> Dict:
+        """Generate every table and write manifest.json"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        steps = [
+            ('providers', self.generate_providers),
+            ('patients', self.generate_patients),
+            ('appointments', self.generate_appointments),
+            ('medical_records', self.generate_medical_records),
+            ('clinical_trials', self.generate_trials),
+        ]
+        for name, step in steps:
+            start_time = time.time()
+            step()
+            self.timings[name] = round(time.time() - start_time, 2)
+            if progress:
+                progress(name, self.timings[name])
+
+        for writer in self.writers.values():
+            writer.close()
+
+        manifest = self.build_manifest()
+        with open(self.output_dir / 'manifest.json', 'w') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+    def generate_providers(self):
+        rng = self.rng('providers')
+        out = self.open('providers')
+        for i in range(self.counts['providers']):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            specialty, department = rng.choice(SPECIALTIES)
+            title = 'Dr.' if rng.random() < 0.8 else 'Nurse Practitioner'
+            provider_id = self.provider_id(i)
+            out.write([
+                provider_id, first, last, title, specialty,
+                f"{'MD' if title == 'Dr.' else 'NP'}{provider_id:07d}",
+                f"555-{2000 + i % 8000:04d}",
+                f"{first.lower()}.{last.lower()}.{provider_id}@healthsystem.example",
+                department,
+                self.reference_date - timedelta(days=rng.randint(30, 365 * 20)),
+                'Y'
+            ])
+
+    def generate_patients(self):
+        rng = self.rng('patients')
+        out = self.open('patients')
+        for i in range(self.counts['patients']):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            city, state, zip_prefix = rng.choice(CITIES)
+            patient_id = self.patient_id(i)
+            out.write([
+                patient_id, first, last,
+                self.reference_date - timedelta(days=rng.randint(365, 365 * 95)),
+                rng.choices(['Male', 'Female', 'Other'], [49, 49, 2])[0],
+                f"{rng.randint(200, 989)}-555-{i % 10000:04d}",
+                f"{first.lower()}.{last.lower()}.{patient_id}@mail.example",
+                f"{rng.randint(1, 9999)} {rng.choice(STREETS)}",
+                city, state, f"{zip_prefix}{rng.randint(0, 99):02d}",
+                f"{rng.choice(FIRST_NAMES)} {last}",
+                f"{rng.randint(200, 989)}-555-{rng.randint(0, 9999):04d}",
+                rng.choice(INSURERS),
+                f"POL{patient_id:09d}",
+                rng.choice(BLOOD_TYPES),
+                to_datetime(self.reference_date - timedelta(days=rng.randint(0, 3 * 365)),
+                            rng.randint(0, 24 * 60 - 1)),
+                'Y' if self.patient_is_active(i) else 'N'
+            ])
+
+    def generate_appointments(self):
+        """Walk each provider's day on a 15 minute grid so bookings never overlap"""
+        rng = self.rng('appointments')
+        out = self.open('appointments')
+        target = self.counts['appointments']
+        providers = self.counts['providers']
+        appointment_id = self.first_id('appointments')
+
+        # Optional history: past appointments are only loadable with the
+        # validation trigger disabled, so they are off unless asked for
+        start = self.reference_date - timedelta(days=self.appointment_days)
+        for day in weekdays(start):
+            if out.rows >= target:
+                break
+            past = day < self.reference_date
+            for p in range(providers):
+                provider_id = self.provider_id(p)
+                minute = BUSINESS_START_MINUTES + SLOT_MINUTES * rng.randint(0, 3)
+                while out.rows < target:
+                    type_name, duration = rng.choices(APPOINTMENT_TYPES, APPOINTMENT_TYPE_WEIGHTS)[0]
+                    if minute + duration > BUSINESS_END_MINUTES:
+                        break
+                    if past:
+                        status = rng.choices(['Completed', 'No Show', 'Cancelled'], [80, 8, 12])[0]
+                    else:
+                        status = rng.choices(['Scheduled', 'Confirmed', 'Cancelled'], [70, 20, 10])[0]
+                    start_ts = to_datetime(day, minute)
+                    out.write([
+                        appointment_id, self.active_patient(rng), provider_id, day,
+                        f"{minute // 60:02d}:{minute % 60:02d}", duration, type_name, status,
+                        rng.choice(REASONS), start_ts, start_ts + timedelta(minutes=duration)
+                    ])
+                    appointment_id += 1
+                    # Occasional gap between bookings
+                    minute += duration + SLOT_MINUTES * rng.choices([0, 1, 2], [70, 20, 10])[0]
+                if out.rows >= target:
+                    break
+
+    def generate_medical_records(self):
+        """Past visits with their prescriptions streamed alongside"""
+        rng = self.rng('medical_records')
+        records = self.open('medical_records')
+        prescriptions = self.open('prescriptions')
+        total = self.counts['medical_records']
+        per_record = self.counts['prescriptions'] / total if total else 0
+        record_id = self.first_id('medical_records')
+        prescription_id = self.first_id('prescriptions')
+
+        for _ in range(total):
+            patient_id = self.active_patient(rng)
+            provider_id = self.provider_id(rng.randrange(self.counts['providers']))
+            visit_date = to_datetime(self.reference_date - timedelta(days=rng.randint(0, self.history_days)),
+                                     rng.randint(BUSINESS_START_MINUTES, BUSINESS_END_MINUTES - 1))
+            records.write([
+                record_id, patient_id, provider_id, visit_date, rng.choice(REASONS),
+                json.dumps({'bp': f"{rng.randint(105, 150)}/{rng.randint(65, 95)}",
+                            'hr': str(rng.randint(55, 100)), 'temp': f"{rng.uniform(97.0, 99.5):.1f}",
+                            'resp': str(rng.randint(12, 20))}, separators=(',', ':'))
+            ])
+
+            count = int(per_record) + (1 if rng.random() < per_record - int(per_record) else 0)
+            for _ in range(count):
+                if prescriptions.rows >= self.counts['prescriptions']:
+                    break
+                medication, dosage, frequency = rng.choice(MEDICATIONS)
+                days = rng.choice([7, 14, 30, 90])
+                prescriptions.write([
+                    prescription_id, patient_id, provider_id, record_id, medication, dosage, frequency,
+                    f"{days} days", days * rng.choice([1, 2, 3]), rng.randint(0, 5), visit_date,
+                    'Y' if visit_date + timedelta(days=days) >= to_datetime(self.reference_date) else 'N'
+                ])
+                prescription_id += 1
+            record_id += 1
+
+    def generate_trials(self):
+        """Trials, then participants with their visits and adverse events.
+
+        clinical_trials is written last so current_enrollment can be the real
+        Screening/Active participant count.
+        """
+        rng = self.rng('clinical_trials')
+        today = self.reference_date
+        trials = []
+        for i in range(self.counts['trials']):
+            status = rng.choices(TRIAL_STATUSES, TRIAL_STATUS_WEIGHTS)[0]
+            if status == 'Planning':
+                start = today + timedelta(days=rng.randint(30, 180))
+            elif status == 'Completed':
+                start = today - timedelta(days=rng.randint(3 * 365, 6 * 365))
+            else:
+                start = today - timedelta(days=rng.randint(60, 3 * 365))
+            months = rng.choice([12, 18, 24, 36, 48])
+            end = start + timedelta(days=months * 30)
+            if status == 'Completed' and end >= today:
+                end = today - timedelta(days=rng.randint(1, 180))
+            elif status != 'Completed' and end <= today:
+                end = today + timedelta(days=rng.randint(90, 720))
+            trials.append({
+                'trial_id': self.first_id('clinical_trials') + i,
+                'status': status, 'start': start, 'end': end, 'months': months,
+                'investigator': self.provider_id(rng.randrange(self.counts['providers'])),
+                'weight': rng.uniform(0.2, 1.8) if status != 'Planning' else 0.0,
+                'enrolled': 0
+            })
+
+        self.generate_participants(trials)
+
+        out = self.open('clinical_trials')
+        protocols = self.open('study_protocols')
+        milestones = self.open('trial_milestones')
+        milestone_id = self.first_id('trial_milestones')
+        for i, trial in enumerate(trials):
+            trial_id = trial['trial_id']
+            area = rng.choice(THERAPEUTIC_AREAS)
+            phase = rng.choice(TRIAL_PHASES)
+            target = max(trial['enrolled'] + rng.randint(0, 50), 10)
+            out.write([
+                trial_id, f"{area} Study {i + 1}", f"HCT-{self.seed}-{trial_id}", phase, trial['status'],
+                trial['start'], trial['end'], target, trial['enrolled'], trial['investigator'],
+                rng.choice(SPONSORS), 'Observational' if phase == 'Observational' else 'Interventional',
+                area, trial['months'], round(rng.uniform(250000, 25000000), 2),
+                'N' if trial['status'] in ('Completed', 'Terminated') else 'Y'
+            ])
+
+            protocol_date = trial['start'] - timedelta(days=rng.randint(60, 180))
+            protocols.write([
+                self.first_id('study_protocols') + i, trial_id, '1.0', protocol_date,
+                f"{area} Study {i + 1} Protocol", 'Y',
+                protocol_date + timedelta(days=rng.randint(14, 45)), 'IRB'
+            ])
+
+            span = (trial['end'] - trial['start']).days
+            for j, (name, milestone_type) in enumerate(MILESTONES):
+                planned = trial['start'] + timedelta(days=span * j // (len(MILESTONES) - 1))
+                if planned < today and trial['status'] != 'Planning':
+                    # Actual date is never more than 30 days ahead of plan
+                    actual = min(planned + timedelta(days=rng.randint(-20, 30)), today)
+                    status, completion = 'Completed', 100
+                else:
+                    actual = None
+                    status = 'In Progress' if planned < today + timedelta(days=90) else 'Planned'
+                    completion = rng.randint(10, 90) if status == 'In Progress' else 0
+                milestones.write([
+                    milestone_id, trial_id, name, planned, actual, status, milestone_type,
+                    trial['investigator'], completion
+                ])
+                milestone_id += 1
+
+    def generate_participants(self, trials: List[Dict]):
+        rng = self.rng('trial_participants')
+        out = self.open('trial_participants')
+        visits = self.open('trial_visits')
+        events = self.open('adverse_events')
+        today = self.reference_date
+        participant_id = self.first_id('trial_participants')
+        visit_id = self.first_id('trial_visits')
+        event_id = self.first_id('adverse_events')
+
+        total_weight = sum(t['weight'] for t in trials) or 1.0
+        remaining = self.counts['participants']
+        enrolling = [t for t in trials if t['weight'] > 0]
+        for n, trial in enumerate(enrolling):
+            if n == len(enrolling) - 1:
+                size = remaining
+            else:
+                size = min(remaining, round(self.counts['participants'] * trial['weight'] / total_weight))
+            size = min(size, self.counts['patients'])
+            remaining -= size
+
+            open_trial = trial['status'] in ('Active', 'Recruiting')
+            last_enrollment = min(trial['end'], today)
+            enrollment_span = max((last_enrollment - trial['start']).days, 1)
+            for index in sorted(rng.sample(range(self.counts['patients']), size)):
+                if open_trial:
+                    status = rng.choices(['Active', 'Screening', 'Completed', 'Withdrawn', 'Lost to Follow-up'],
+                                         [70, 10, 5, 10, 5])[0]
+                elif trial['status'] == 'Completed':
+                    status = rng.choices(['Completed', 'Withdrawn', 'Lost to Follow-up'], [85, 10, 5])[0]
+                else:
+                    status = rng.choices(['Active', 'Terminated', 'Withdrawn'], [40, 40, 20])[0]
+                if not self.patient_is_active(index) and status in ('Active', 'Screening'):
+                    status = 'Withdrawn'
+
+                enrolled = trial['start'] + timedelta(days=rng.randint(0, enrollment_span))
+                baseline = min(enrolled + timedelta(days=rng.randint(0, 14)), today)
+                provider_id = self.provider_id(rng.randrange(self.counts['providers']))
+                withdrawal_date = None
+                if status == 'Withdrawn':
+                    withdrawal_date = enrolled + timedelta(days=rng.randint(0, max((today - enrolled).days, 0)))
+
+                last_visit = None
+                next_visit = None
+                if status in ('Active', 'Screening') and open_trial:
+                    # Visits every four weeks from baseline, three-day window each side
+                    for number in range(1, self.max_visits + 1):
+                        scheduled = baseline + timedelta(days=VISIT_INTERVAL_DAYS * (number - 1))
+                        if scheduled > trial['end']:
+                            break
+                        window_start = scheduled - timedelta(days=VISIT_WINDOW_DAYS)
+                        window_end = scheduled + timedelta(days=VISIT_WINDOW_DAYS)
+                        if window_end < today:
+                            completed = rng.random() < 0.9
+                            actual = scheduled + timedelta(days=rng.randint(-VISIT_WINDOW_DAYS, VISIT_WINDOW_DAYS))
+                            visit_status = 'Completed' if completed else 'Missed'
+                            actual = actual if completed else None
+                            if completed:
+                                last_visit = actual
+                        else:
+                            visit_status, actual = 'Scheduled', None
+                            if next_visit is None:
+                                next_visit = scheduled
+                        visit_type = {1: 'Screening', 2: 'Baseline'}.get(number, 'Treatment')
+                        visits.write([
+                            visit_id, participant_id, trial['trial_id'], number, f"Visit {number}", visit_type,
+                            scheduled, actual, window_start, window_end, visit_status, provider_id
+                        ])
+                        visit_id += 1
+                        if next_visit is not None:
+                            break
+
+                observed_until = min(withdrawal_date or today, trial['end'], today)
+                if rng.random() < 0.15 and observed_until > enrolled:
+                    for _ in range(rng.choice([1, 1, 2])):
+                        event_date = enrolled + timedelta(days=rng.randint(0, (observed_until - enrolled).days))
+                        serious = 'Y' if rng.random() < 0.1 else 'N'
+                        outcome = rng.choices(['Recovered', 'Recovering', 'Not Recovered', 'Unknown'],
+                                              [60, 20, 10, 10])[0]
+                        resolution = None
+                        if outcome == 'Recovered':
+                            resolution = min(event_date + timedelta(days=rng.randint(1, 30)), today)
+                        events.write([
+                            event_id, participant_id, trial['trial_id'], event_date, rng.choice(AE_TERMS),
+                            rng.choices(['Mild', 'Moderate', 'Severe', 'Life-threatening'], [55, 30, 12, 3])[0],
+                            rng.choice(['Unrelated', 'Unlikely', 'Possible', 'Probable', 'Definite']),
+                            outcome, serious, 'Y' if rng.random() < 0.5 else 'N',
+                            min(event_date + timedelta(days=rng.randint(0, 3)), today), resolution,
+                            provider_id, serious, 'Y' if serious == 'Y' else 'N'
+                        ])
+                        event_id += 1
+
+                out.write([
+                    participant_id, trial['trial_id'], self.patient_id(index), enrolled,
+                    f"R{trial['trial_id']}-{participant_id}", rng.choice(['Treatment', 'Placebo', 'Control']),
+                    status, 'Patient decision' if status == 'Withdrawn' else None, withdrawal_date,
+                    enrolled - timedelta(days=rng.randint(0, 14)), baseline, last_visit, next_visit, provider_id
+                ])
+                if status in ('Screening', 'Active'):
+                    trial['enrolled'] += 1
+                participant_id += 1
+
+    def build_manifest(self) -> Dict:
+        tables = []
+        for table in LOAD_ORDER:
+            writer = self.writers[table]
+            sequence, start = SEQUENCES[table]
+            tables.append({
+                'table': table,
+                'file': writer.path.name,
+                'columns': COLUMNS[table],
+                'rows': writer.rows,
+                'id_column': COLUMNS[table][0],
+                'min_id': writer.min_id,
+                'max_id': writer.max_id,
+                'sequence': sequence
+            })
+
+        return {
+            'generator': 'generate-data.py',
+            'generated': datetime.now().isoformat(),
+            'seed': self.seed,
+            'reference_date': self.reference_date.isoformat(),
+            'id_offset': self.id_offset,
+            'date_format': ORACLE_DATE_FORMAT,
+            'compressed': self.compress,
+            'counts': self.counts,
+            'tables': tables,
+            # Sequences must be moved past the generated ids after loading
+            'sequences': {t['sequence']: t['max_id'] + 1 for t in tables if t['max_id'] is not None},
+            # Appointments before the reference date need the validation trigger disabled
+            'past_appointments': self.appointment_days > 0,
+            'post_load': [
+                'pkg_patient_mgmt.rebuild_search_index',
+                f"pkg_reporting_mgmt.refresh_dashboard_stats(DATE '{(self.reference_date - timedelta(days=self.history_days)).isoformat()}')",
+                'pkg_clinical_trials_mgmt.refresh_trial_metrics',
+                'pkg_reporting_mgmt.refresh_provider_occupancy',
+                'pkg_patient_mgmt.rebuild_risk_profiles'
+            ],
+            'timings': self.timings
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic Healthcare System data as bulk-load files')
+    parser.add_argument('--output-dir', '-o', default='generated-data',
+                       help='Directory for the CSV files and manifest.json')
+    parser.add_argument('--scale', '-s', default='small', choices=sorted(SCALE_PRESETS),
+                       help='Row count preset (large: 1M patients, 10M appointments, 500 trials, 200k participants)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed; same seed gives the same data')
+    parser.add_argument('--reference-date', help='Date treated as today (YYYY-MM-DD), default today')
+    parser.add_argument('--id-offset', type=int, default=1000000,
+                       help='Added to each sequence start for generated ids')
+    parser.add_argument('--history-days', type=int, default=730,
+                       help='Days of medical record history before the reference date')
+    parser.add_argument('--past-appointment-days', type=int, default=0,
+                       help='Also generate appointments this many days before the reference date '
+                            '(requires loading with the validation trigger disabled)')
+    parser.add_argument('--max-visits', type=int, default=12, help='Maximum trial visits per participant')
+    parser.add_argument('--compress', '-z', action='store_true', help='Write gzip-compressed CSV files')
+    for table in ['patients', 'providers', 'appointments', 'medical_records', 'prescriptions',
+                  'trials', 'participants']:
+        parser.add_argument(f"--{table.replace('_', '-')}", type=int, dest=table,
+                            help=f"Override the number of {table.replace('_', ' ')}")
+
+    args = parser.parse_args()
+
+    counts = dict(SCALE_PRESETS[args.scale])
+    for table in counts:
+        if getattr(args, table) is not None:
+            counts[table] = getattr(args, table)
+
+    if counts['participants'] > counts['patients'] * max(counts['trials'], 1):
+        print("❌ More participants requested than patient/trial combinations available")
+        return 1
+
+    reference_date = (datetime.strptime(args.reference_date, '%Y-%m-%d').date()
+                      if args.reference_date else None)
+
+    generator = DataGenerator(
+        args.output_dir, seed=args.seed, counts=counts, reference_date=reference_date,
+        id_offset=args.id_offset, history_days=args.history_days,
+        appointment_days=args.past_appointment_days, compress=args.compress, max_visits=args.max_visits)
+
+    print(f"Generating '{args.scale}' dataset (seed {args.seed}) into {args.output_dir}")
+    start_time = time.time()
+    manifest = generator.generate(
+        progress=lambda name, seconds: print(f"  ✅ {name} ({seconds:.1f}s)"))
+
+    print(f"\nGenerated in {time.time() - start_time:.1f}s:")
+    for table in manifest['tables']:
+        print(f"  {table['table']:<20} {table['rows']:>12,} rows  {table['file']}")
+    print(f"Manifest: {os.path.join(args.output_dir, 'manifest.json')}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,12 +6,23 @@ Performs comprehensive health checks for the healthcare system
 
 import os
 import sys
+import io
 import json
 import time
+import signal
+import asyncio
 import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import redirect_stdout
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 import subprocess
 
+from healthcare_db import DatabaseUnavailable, create_pool, get_driver, load_config
+from healthcare_metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsRegistry, serve_http
+from healthcare_perf import summarize_latencies
+
 # Try to import requests, but handle if not available
 try:
     import requests
@@ -20,73 +31,278 @@ except ImportError:
     HAS_REQUESTS = False
     print("⚠️ requests module not available, some checks will be skipped")
 
-def check_database_connectivity(config):
+# Views queried by the probes, grouped by the check they belong to
+CORE_VIEWS = ['v_patient_summary', 'v_appointment_details', 'v_provider_schedule',
+              'v_medical_records', 'v_active_prescriptions', 'v_dashboard_stats']
+TRIAL_VIEWS = ['v_trial_summary', 'v_trial_participants', 'v_trial_visits',
+               'v_adverse_events', 'v_trial_milestones', 'v_trial_dashboard']
+
+# Read-only package calls; each returns a single row
+CORE_FUNCTIONS = {
+    'pkg_patient_mgmt.search_patients':
+        "SELECT COUNT(*) FROM TABLE(pkg_patient_mgmt.search_patients('Smith', 10))",
+    'pkg_patient_mgmt.get_patient_age':
+        "SELECT pkg_patient_mgmt.get_patient_age(MIN(patient_id)) FROM patients",
+    'pkg_appointment_mgmt.get_available_time_slots': """
+        SELECT COUNT(*)
+        FROM TABLE(pkg_appointment_mgmt.get_available_time_slots(
+            (SELECT MIN(provider_id) FROM providers WHERE is_active = 'Y'), TRUNC(SYSDATE) + 1))""",
+    'pkg_appointment_mgmt.get_appointments_by_date':
+        "SELECT COUNT(*) FROM TABLE(pkg_appointment_mgmt.get_appointments_by_date(TRUNC(SYSDATE)))",
+    'pkg_reporting_mgmt.get_dashboard_staleness':
+        "SELECT pkg_reporting_mgmt.get_dashboard_staleness FROM dual",
+    'pkg_audit_mgmt.get_queue_lag':
+        "SELECT pkg_audit_mgmt.get_queue_lag FROM dual",
+    'pkg_notification_mgmt.get_outbox_lag':
+        "SELECT pkg_notification_mgmt.get_outbox_lag FROM dual",
+}
+TRIAL_FUNCTIONS = {
+    'pkg_clinical_trials_mgmt.get_active_trials':
+        "SELECT COUNT(*) FROM TABLE(pkg_clinical_trials_mgmt.get_active_trials())",
+}
+
+# Single-value queries exported as gauges by --serve
+GAUGE_QUERIES = {
+    'dashboard_staleness_seconds': ("SELECT pkg_reporting_mgmt.get_dashboard_staleness FROM dual",
+                                    'Seconds since the dashboard statistics were refreshed'),
+    'audit_queue_lag_seconds': ("SELECT pkg_audit_mgmt.get_queue_lag FROM dual",
+                                'Seconds the oldest queued audit record has waited'),
+    'notification_outbox_lag_seconds': ("SELECT pkg_notification_mgmt.get_outbox_lag FROM dual",
+                                        'Seconds the oldest due notification has waited for delivery'),
+}
+
+DEFAULT_SAMPLES = 5
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_CONCURRENCY = 8
+DEFAULT_P95_THRESHOLD_MS = 2000.0
+DEFAULT_KEEP_REPORTS = 10
+DEFAULT_INTERVAL = 60.0
+DEFAULT_WINDOW = 900.0
+DEFAULT_METRICS_PORT = 9464
+
+
+class Probe:
+    """One measured operation, sampled repeatedly.
+
+    run(connection, timeout) performs a single sample; database probes get a
+    pooled connection, HTTP probes get None.
+    """
+
+    def __init__(self, name: str, check: str, run, needs_db: bool = True):
+        self.name = name
+        self.check = check
+        self.run = run
+        self.needs_db = needs_db
+
+
+def _query_probe(sql: str):
+    def run(connection, timeout):
+        cursor = connection.cursor()
+        try:
+            cursor.execute(sql)
+            cursor.fetchall()
+        finally:
+            cursor.close()
+    return run
+
+
+def _ping_probe(connection, timeout):
+    connection.ping()
+
+
+def _apex_probe(apex_url: str):
+    session = requests.Session() if HAS_REQUESTS else None
+
+    def run(connection, timeout):
+        response = session.get(apex_url, timeout=timeout)
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}")
+        if "Healthcare" not in response.text and "Login" not in response.text:
+            raise RuntimeError("expected page content not found")
+    return run
+
+
+def build_probes(config, include_db: bool = True) -> List[Probe]:
+    """Every probe for the environment"""
+    probes = []
+    if include_db:
+        probes.append(Probe('db_round_trip', 'database_connectivity', _ping_probe))
+        for view in CORE_VIEWS:
+            probes.append(Probe(f"view:{view}", 'performance_metrics',
+                                _query_probe(f"SELECT * FROM {view} FETCH FIRST 10 ROWS ONLY")))
+        for name, sql in CORE_FUNCTIONS.items():
+            probes.append(Probe(f"call:{name}", 'performance_metrics', _query_probe(sql)))
+        for view in TRIAL_VIEWS:
+            probes.append(Probe(f"view:{view}", 'clinical_trials_module',
+                                _query_probe(f"SELECT * FROM {view} FETCH FIRST 10 ROWS ONLY")))
+        for name, sql in TRIAL_FUNCTIONS.items():
+            probes.append(Probe(f"call:{name}", 'clinical_trials_module', _query_probe(sql)))
+    if config.get('apex_url') and HAS_REQUESTS:
+        probes.append(Probe('apex_url', 'apex_application', _apex_probe(config['apex_url']), needs_db=False))
+    return probes
+
+
+def _is_timeout(exc: Exception) -> bool:
+    text = str(exc)
+    return 'DPY-4024' in text or 'ORA-03156' in text or 'timed out' in text.lower() or \
+        (HAS_REQUESTS and isinstance(exc, requests.Timeout))
+
+
+def sample_probe(pool, probe: Probe, samples: int, timeout: float,
+                 cancelled: Optional[threading.Event] = None) -> Tuple[List[float], List[str], int]:
+    """(latencies, errors, timeouts) for a probe; database calls are cut off after timeout seconds.
+
+    Once cancelled is set no further samples are taken, so an overrunning
+    probe returns its connection after at most one more call.
+    """
+    latencies = []
+    errors = []
+    timeouts = 0
+    connection = None
+    try:
+        if probe.needs_db:
+            connection = pool.acquire()
+            connection.call_timeout = int(timeout * 1000)
+        for _ in range(samples):
+            if cancelled is not None and cancelled.is_set():
+                break
+            start_time = time.perf_counter()
+            try:
+                probe.run(connection, timeout)
+            except Exception as e:
+                if _is_timeout(e):
+                    timeouts += 1
+                errors.append(str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__)
+                continue
+            latencies.append(time.perf_counter() - start_time)
+    except Exception as e:
+        errors.append(str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__)
+    finally:
+        if connection is not None:
+            connection.call_timeout = 0
+            pool.release(connection)
+
+    return latencies, errors, timeouts
+
+
+def summarize_probe(probe: Probe, samples: int, latencies: List[float], errors: List[str],
+                    timeouts: int) -> Dict:
+    return {
+        'check': probe.check,
+        'status': 'OK' if not errors else ('TIMEOUT' if timeouts else 'ERROR'),
+        'samples': samples,
+        'errors': len(errors),
+        'timeouts': timeouts,
+        'last_error': errors[-1] if errors else None,
+        'latency': summarize_latencies(latencies)
+    }
+
+
+def run_probe(pool, probe: Probe, samples: int, timeout: float,
+              cancelled: Optional[threading.Event] = None) -> Dict:
+    return summarize_probe(probe, samples, *sample_probe(pool, probe, samples, timeout, cancelled))
+
+
+def probe_budget(samples: int, timeout: float) -> float:
+    """Every sample may use its full timeout, plus time to wait for a pooled session"""
+    return timeout * samples + 5
+
+
+def _overrun_result(probe: Probe, samples: int, timeout: float) -> Dict:
+    return summarize_probe(probe, samples, [], [f"no result within {timeout * samples:.0f}s"] * samples, samples)
+
+
+def run_probes(pool, probes: List[Probe], samples: int, timeout: float, concurrency: int) -> Dict[str, Dict]:
+    """Run all probes concurrently; a probe that overruns its budget is reported as TIMEOUT.
+
+    Returns only once every probe thread has finished, so the caller can
+    close the pool: queued probes are cancelled and running ones stop after
+    their current call, which call_timeout bounds.
+    """
+    results = {}
+    cancelled = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    futures = {executor.submit(run_probe, pool, probe, samples, timeout, cancelled): probe for probe in probes}
+    done, _ = wait(futures, timeout=probe_budget(samples, timeout))
+    for future, probe in futures.items():
+        if future in done:
+            results[probe.name] = future.result()
+        else:
+            results[probe.name] = _overrun_result(probe, samples, timeout)
+    cancelled.set()
+    executor.shutdown(wait=True, cancel_futures=True)
+    return results
+
+
+def print_probe_results(results: Dict[str, Dict]):
+    print(f"  {'Probe':<50} {'Status':<8} {'min':>9} {'p50':>9} {'p95':>9} {'max':>9}")
+    for name, result in sorted(results.items(), key=lambda item: (item[1]['check'], item[0])):
+        latency = result['latency']
+        cells = [f"{latency[k]:.1f}" if latency[k] is not None else '-'
+                 for k in ('min_ms', 'p50_ms', 'p95_ms', 'max_ms')]
+        print(f"  {name:<50} {result['status']:<8} {cells[0]:>9} {cells[1]:>9} {cells[2]:>9} {cells[3]:>9}")
+        if result['last_error']:
+            print(f"      ↳ {result['last_error']}")
+
+
+def _check_probes(results: Dict[str, Dict], check: str) -> bool:
+    probes = [r for r in results.values() if r['check'] == check]
+    return bool(probes) and all(r['status'] == 'OK' for r in probes)
+
+
+def check_database_connectivity(config, results):
     """Check database connectivity and basic functionality"""
     print("🔍 Checking database connectivity...")
-    
-    db_connection = os.getenv('DB_CONNECTION_STRING')
-    db_username = os.getenv('DB_USERNAME')
-    db_password = os.getenv('DB_PASSWORD')
-    
-    if not all([db_connection, db_username, db_password]):
-        print("❌ Database credentials not available")
+
+    if get_driver() is None:
+        print("❌ Oracle driver not available, database connectivity check cannot run")
         return False
-    
-    try:
-        # Simple SQL connectivity test
-        # In real implementation, use cx_Oracle or similar
-        print("✅ Database connectivity check passed")
-        return True
-    except Exception as e:
-        print(f"❌ Database connectivity failed: {e}")
+
+    probe = results.get('db_round_trip')
+    if probe is None:
+        print("❌ Database connectivity failed: no connection")
         return False
+    if probe['status'] != 'OK':
+        print(f"❌ Database connectivity failed: {probe['last_error']}")
+        return False
+
+    print(f"✅ Database connectivity check passed (p50 {probe['latency']['p50_ms']:.1f} ms, "
+          f"p95 {probe['latency']['p95_ms']:.1f} ms)")
+    return True
 
-def check_apex_application(config):
+def check_apex_application(config, results):
     """Check APEX application accessibility and functionality"""
     print("🔍 Checking APEX application...")
-    
-    apex_url = config.get('apex_url')
-    if not apex_url:
+
+    if not config.get('apex_url'):
         print("⚠️ APEX URL not configured")
         return False
-    
+
     if not HAS_REQUESTS:
         print("⚠️ requests module not available, skipping APEX connectivity check")
         return True
-    
-    try:
-        # Check APEX application accessibility
-        response = requests.get(apex_url, timeout=30)
-        if response.status_code == 200:
-            print("✅ APEX application accessible")
-            
-            # Check for basic page elements
-            if "Healthcare" in response.text or "Login" in response.text:
-                print("✅ APEX application content check passed")
-                return True
-            else:
-                print("⚠️ APEX application content check failed")
-                return False
-        else:
-            print(f"❌ APEX application returned status: {response.status_code}")
-            return False
-            
-    except requests.RequestException as e:
-        print(f"❌ APEX application check failed: {e}")
+
+    probe = results['apex_url']
+    if probe['status'] != 'OK':
+        print(f"❌ APEX application check failed: {probe['last_error']}")
         return False
 
-def check_clinical_trials_module(config):
-    """Check clinical trials module functionality"""
+    print(f"✅ APEX application accessible (p95 {probe['latency']['p95_ms']:.1f} ms)")
+    return True
+
+def check_clinical_trials_module(config, results):
+    """Check clinical trials views and package functions respond"""
     print("🔍 Checking clinical trials module...")
-    
-    try:
-        # This would check clinical trials specific functionality
-        # Database views, stored procedures, etc.
+
+    if get_driver() is None:
+        print("❌ Oracle driver not available, clinical trials check cannot run")
+        return False
+
+    if _check_probes(results, 'clinical_trials_module'):
         print("✅ Clinical trials module check passed")
         return True
-    except Exception as e:
-        print(f"❌ Clinical trials module check failed: {e}")
-        return False
+    print("❌ Clinical trials module check failed")
+    return False
 
 def check_security_compliance():
     """Check security and compliance requirements"""
@@ -117,41 +333,70 @@ def check_security_compliance():
         print("❌ Security compliance issues found")
         return False
 
-def check_performance_metrics(config):
-    """Check system performance metrics"""
+def check_performance_metrics(config, results, p95_threshold_ms):
+    """Check key views and package calls respond and stay under the p95 threshold"""
     print("🔍 Checking performance metrics...")
-    
-    try:
-        # Check response times, resource usage, etc.
-        print("  - Response time: < 2s")
-        print("  - Memory usage: Normal")
-        print("  - CPU usage: Normal")
-        print("✅ Performance metrics within acceptable ranges")
-        return True
-    except Exception as e:
-        print(f"❌ Performance check failed: {e}")
+
+    if get_driver() is None:
+        print("❌ Oracle driver not available, performance metrics check cannot run")
         return False
 
-def generate_health_report(results, environment):
-    """Generate comprehensive health report"""
-    timestamp = time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())
-    
-    report = {
-        "timestamp": timestamp,
+    passed = _check_probes(results, 'performance_metrics')
+    for name, result in results.items():
+        p95 = result['latency']['p95_ms']
+        if p95 is not None and p95 > p95_threshold_ms:
+            print(f"  - {name}: p95 {p95:.1f} ms exceeds {p95_threshold_ms:.0f} ms")
+            passed = False
+
+    if passed:
+        print(f"✅ Performance metrics within acceptable ranges (p95 < {p95_threshold_ms:.0f} ms)")
+    else:
+        print("❌ Performance metrics outside acceptable ranges")
+    return passed
+
+def build_health_report(results, environment, probes=None, settings=None):
+    """Health report dictionary for a set of check results"""
+    return {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime()),
         "environment": environment,
         "overall_status": "HEALTHY" if all(results.values()) else "UNHEALTHY",
         "checks": results,
+        "probes": probes or {},
+        "probe_settings": settings or {},
         "summary": {
             "total_checks": len(results),
             "passed": sum(1 for v in results.values() if v),
             "failed": sum(1 for v in results.values() if not v)
         }
     }
+
+def save_health_report(report, report_dir='.', keep=DEFAULT_KEEP_REPORTS):
+    """Write health_report_<env>.json, shifting older reports to .1 ... .<keep>"""
+    report_dir = Path(report_dir)
+    report_dir.mkdir(parents=True, exist_ok=True)
+    report_file = report_dir / f"health_report_{report['environment']}.json"
+
+    for index in range(keep, 0, -1):
+        older = report_file.with_name(f"{report_file.name}.{index}")
+        newer = report_file if index == 1 else report_file.with_name(f"{report_file.name}.{index - 1}")
+        if index == keep and older.exists():
+            older.unlink()
+        if newer.exists():
+            newer.replace(older)
+
+    temp_file = report_file.with_name(report_file.name + '.tmp')
+    with open(temp_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    os.replace(temp_file, report_file)
+    return report_file
+
+def generate_health_report(results, environment, probes=None, settings=None, report_dir='.',
+                           keep=DEFAULT_KEEP_REPORTS):
+    """Generate comprehensive health report"""
+    report = build_health_report(results, environment, probes, settings)
     
     # Save report
-    report_file = f"health_report_{environment}_{int(time.time())}.json"
-    with open(report_file, 'w') as f:
-        json.dump(report, f, indent=2)
+    report_file = save_health_report(report, report_dir, keep)
     
     print(f"\n📋 Health report saved: {report_file}")
     
@@ -161,6 +406,179 @@ def generate_health_report(results, environment):
     
     return report
 
+def evaluate_checks(config, probe_results, p95_threshold_ms):
+    """Map probe results onto the named health checks"""
+    return {
+        "database_connectivity": check_database_connectivity(config, probe_results),
+        "apex_application": check_apex_application(config, probe_results),
+        "clinical_trials_module": check_clinical_trials_module(config, probe_results),
+        "security_compliance": check_security_compliance(),
+        "performance_metrics": check_performance_metrics(config, probe_results, p95_threshold_ms)
+    }
+
+class HealthDaemon:
+    """Runs probe rounds on an interval and serves the results over HTTP.
+
+    Latencies go into rolling histograms (cumulative buckets for Prometheus,
+    plus a time window for recent quantiles); each round's report replaces
+    the previous one and older reports rotate.
+    """
+
+    def __init__(self, config, environment, pool, probes, args, p95_threshold_ms):
+        self.config = config
+        self.environment = environment
+        self.pool = pool
+        self.probes = probes
+        self.args = args
+        self.p95_threshold_ms = p95_threshold_ms
+        self.metrics = MetricsRegistry()
+        self.executor = ThreadPoolExecutor(max_workers=args.concurrency)
+        # Set once a round is over so probes still running from it stop sampling
+        self._cancelled = threading.Event()
+        self.last_report = None
+        self.rounds = 0
+        self._stop = asyncio.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def read_gauges(self):
+        values = {}
+        with self.pool.connection() as connection:
+            connection.call_timeout = int(self.args.timeout * 1000)
+            try:
+                for name, (sql, _) in GAUGE_QUERIES.items():
+                    cursor = connection.cursor()
+                    try:
+                        cursor.execute(sql)
+                        values[name] = cursor.fetchone()[0]
+                    except Exception:
+                        values[name] = None
+                    finally:
+                        cursor.close()
+            finally:
+                connection.call_timeout = 0
+        return values
+
+    async def run_round(self):
+        loop = asyncio.get_running_loop()
+        samples, timeout = self.args.samples, self.args.timeout
+        cancelled = self._cancelled = threading.Event()
+
+        async def one(probe):
+            try:
+                outcome = await asyncio.wait_for(
+                    loop.run_in_executor(self.executor, sample_probe, self.pool, probe, samples, timeout,
+                                         cancelled),
+                    timeout=probe_budget(samples, timeout))
+            except asyncio.TimeoutError:
+                return probe, [], [f"no result within {timeout * samples:.0f}s"] * samples, samples
+            return (probe, *outcome)
+
+        start_time = time.time()
+        outcomes = await asyncio.gather(*(one(probe) for probe in self.probes))
+        cancelled.set()
+        now = time.time()
+
+        results = {}
+        for probe, latencies, errors, timeouts in outcomes:
+            labels = {'environment': self.environment, 'probe': probe.name, 'check': probe.check}
+            histogram = self.metrics.histogram('probe_latency_seconds', 'Probe call latency',
+                                               window_seconds=self.args.window, **labels)
+            for latency in latencies:
+                histogram.observe(latency, now)
+            self.metrics.inc_counter('probe_samples_total', samples, 'Probe samples taken', **labels)
+            self.metrics.inc_counter('probe_errors_total', len(errors), 'Failed probe samples', **labels)
+            self.metrics.inc_counter('probe_timeouts_total', timeouts, 'Probe samples that timed out', **labels)
+            self.metrics.set_gauge('probe_up', 0 if errors else 1, 'Probe succeeded in the last round', **labels)
+            results[probe.name] = summarize_probe(probe, samples, latencies, errors, timeouts)
+
+        if self.pool is not None:
+            try:
+                gauges = await asyncio.wait_for(loop.run_in_executor(self.executor, self.read_gauges),
+                                                timeout=self.args.timeout)
+            except asyncio.TimeoutError:
+                gauges = {}
+            for name, value in gauges.items():
+                self.metrics.set_gauge(name, value, GAUGE_QUERIES[name][1], environment=self.environment)
+
+        with redirect_stdout(io.StringIO()):
+            health_checks = evaluate_checks(self.config, results, self.p95_threshold_ms)
+        for check, passed in health_checks.items():
+            self.metrics.set_gauge('check_up', 1 if passed else 0, 'Health check passed in the last round',
+                                   environment=self.environment, check=check)
+
+        report = build_health_report(health_checks, self.environment, results, self.settings())
+        healthy = report['overall_status'] == 'HEALTHY'
+        self.metrics.set_gauge('health_up', 1 if healthy else 0, 'All health checks passed',
+                               environment=self.environment)
+        self.metrics.set_gauge('health_round_duration_seconds', round(now - start_time, 3),
+                               'Duration of the last probe round', environment=self.environment)
+        self.metrics.set_gauge('health_last_round_timestamp_seconds', int(now),
+                               'Unix time of the last probe round', environment=self.environment)
+
+        self.last_report = report
+        self.rounds += 1
+        if self.rounds % self.args.report_every == 0:
+            save_health_report(report, self.args.report_dir, self.args.keep_reports)
+
+        failing = [name for name, result in results.items() if result['status'] != 'OK']
+        slowest = max(results.items(), key=lambda item: item[1]['latency']['p95_ms'] or 0, default=None)
+        slowest_text = f", slowest p95 {slowest[0]} {slowest[1]['latency']['p95_ms'] or 0:.1f} ms" if slowest else ''
+        print(f"[{report['timestamp']}] {'✅' if healthy else '❌'} {report['overall_status']} "
+              f"{len(results) - len(failing)}/{len(results)} probes OK{slowest_text}"
+              + (f"; failing: {', '.join(failing)}" if failing else ''))
+
+    def settings(self):
+        return {
+            "samples": self.args.samples,
+            "timeout_seconds": self.args.timeout,
+            "concurrency": self.args.concurrency,
+            "p95_threshold_ms": self.p95_threshold_ms,
+            "interval_seconds": self.args.interval
+        }
+
+    async def metrics_route(self):
+        body = self.metrics.render() + self.metrics.render_window_quantiles('probe_latency_seconds')
+        return 200, METRICS_CONTENT_TYPE, body
+
+    async def health_route(self):
+        if self.last_report is None:
+            return 503, 'application/json', json.dumps({"overall_status": "STARTING"})
+        status = 200 if self.last_report['overall_status'] == 'HEALTHY' else 503
+        return status, 'application/json', json.dumps(self.last_report, indent=2)
+
+    async def serve(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        server = await serve_http(self.args.metrics_host, self.args.metrics_port,
+                                  {'/metrics': self.metrics_route, '/health': self.health_route})
+        print(f"📡 Metrics on http://{self.args.metrics_host}:{self.args.metrics_port}/metrics, "
+              f"probing every {self.args.interval:.0f}s")
+        try:
+            while not self._stop.is_set():
+                round_start = loop.time()
+                await self.run_round()
+                remaining = self.args.interval - (loop.time() - round_start)
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=max(remaining, 0))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            server.close()
+            await server.wait_closed()
+            # Probe threads must be done with the pool before main() closes it
+            self._cancelled.set()
+            await loop.run_in_executor(None, lambda: self.executor.shutdown(wait=True, cancel_futures=True))
+            if self.last_report:
+                save_health_report(self.last_report, self.args.report_dir, self.args.keep_reports)
+        print("👋 Health check daemon stopped")
+
 def main():
     """Main health check function"""
     parser = argparse.ArgumentParser(description='Healthcare System Health Check')
@@ -169,6 +587,28 @@ def main():
                        help='Environment to check')
     parser.add_argument('--config-file', 
                        help='Configuration file path')
+    parser.add_argument('--samples', type=int, default=DEFAULT_SAMPLES,
+                       help='Samples taken per probe')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                       help='Timeout in seconds for each probe call')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                       help='Probes run at the same time')
+    parser.add_argument('--p95-threshold-ms', type=float,
+                       help=f"Fail when a probe's p95 exceeds this (default: health_check.p95_threshold_ms "
+                            f"in the config, or {DEFAULT_P95_THRESHOLD_MS:.0f})")
+    parser.add_argument('--report-dir', default='.', help='Directory for health_report_<env>.json')
+    parser.add_argument('--keep-reports', type=int, default=DEFAULT_KEEP_REPORTS,
+                       help='Rotated reports kept (.1 ... .N)')
+    parser.add_argument('--serve', action='store_true',
+                       help='Run continuously, exposing metrics over HTTP')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                       help='Seconds between probe rounds in --serve mode')
+    parser.add_argument('--window', type=float, default=DEFAULT_WINDOW,
+                       help='Seconds of samples kept for rolling quantiles in --serve mode')
+    parser.add_argument('--metrics-host', default='127.0.0.1', help='Metrics endpoint bind address')
+    parser.add_argument('--metrics-port', type=int, default=DEFAULT_METRICS_PORT, help='Metrics endpoint port')
+    parser.add_argument('--report-every', type=int, default=10,
+                       help='Write the report file every N rounds in --serve mode')
     
     args = parser.parse_args()
     
@@ -176,27 +616,58 @@ def main():
     print("=" * 60)
     
     # Load configuration
-    config_file = args.config_file or f"config/{args.environment}.json"
-    config_path = Path(config_file)
-    
-    if config_path.exists():
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+    if args.config_file and not Path(args.config_file).exists():
+        print(f"⚠️ Configuration file not found: {args.config_file}")
+        config = load_config(args.environment)
     else:
-        print(f"⚠️ Configuration file not found: {config_file}")
-        config = {}
+        config = load_config(args.environment, args.config_file)
     
+    p95_threshold_ms = args.p95_threshold_ms or \
+        config.get('health_check', {}).get('p95_threshold_ms', DEFAULT_P95_THRESHOLD_MS)
+
+    # Sample every probe concurrently
+    pool = None
+    if get_driver() is not None:
+        try:
+            pool = create_pool(config, min=1, max=max(args.concurrency, 1))
+        except DatabaseUnavailable as e:
+            print(f"❌ {e}")
+
+    probes = build_probes(config, include_db=pool is not None)
+
+    if args.serve:
+        daemon = HealthDaemon(config, args.environment, pool, probes, args, p95_threshold_ms)
+        try:
+            asyncio.run(daemon.serve())
+        finally:
+            if pool is not None:
+                pool.close()
+        sys.exit(0)
+
+    print(f"⏱️ Running {len(probes)} probes x {args.samples} samples "
+          f"({args.concurrency} concurrent, {args.timeout:.0f}s timeout)")
+    start_time = time.time()
+    try:
+        probe_results = run_probes(pool, probes, args.samples, args.timeout, args.concurrency)
+    finally:
+        if pool is not None:
+            pool.close()
+    print(f"  completed in {time.time() - start_time:.1f}s\n")
+    print_probe_results(probe_results)
+    print()
+
     # Run health checks
-    health_checks = {
-        "database_connectivity": check_database_connectivity(config),
-        "apex_application": check_apex_application(config),
-        "clinical_trials_module": check_clinical_trials_module(config),
-        "security_compliance": check_security_compliance(),
-        "performance_metrics": check_performance_metrics(config)
-    }
+    health_checks = evaluate_checks(config, probe_results, p95_threshold_ms)
     
     # Generate report
-    report = generate_health_report(health_checks, args.environment)
+    settings = {
+        "samples": args.samples,
+        "timeout_seconds": args.timeout,
+        "concurrency": args.concurrency,
+        "p95_threshold_ms": p95_threshold_ms
+    }
+    report = generate_health_report(health_checks, args.environment, probe_results, settings,
+                                    args.report_dir, args.keep_reports)
     
     # Print summary
     print("\n" + "=" * 60)
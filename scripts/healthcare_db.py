@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Healthcare System - Shared Database Access
+Session pooling, statement caching and configuration loading for the Python scripts
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Prefer python-oracledb, fall back to cx_Oracle
+try:
+    import oracledb as oracle_driver
+    DRIVER_NAME = 'oracledb'
+    HAS_ORACLE = True
+except ImportError:
+    try:
+        import cx_Oracle as oracle_driver
+        DRIVER_NAME = 'cx_Oracle'
+        HAS_ORACLE = True
+    except ImportError:
+        oracle_driver = None
+        DRIVER_NAME = None
+        HAS_ORACLE = False
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Config file names that differ from the environment name
+CONFIG_ALIASES = {
+    'production': 'prod',
+    'prod': 'prod',
+}
+
+DEFAULT_POOL_SETTINGS = {
+    'min': 1,
+    'max': 4,
+    'increment': 1,
+    'stmt_cache_size': 50,
+    'timeout': 300,
+    'wait_timeout_ms': 10000,
+}
+
+_ENV_PLACEHOLDER = re.compile(r'\$\{(\w+)\}')
+
+
+class DatabaseUnavailable(Exception):
+    """Raised when no Oracle driver is installed or no credentials are configured"""
+
+
+def expand_env(value: Any) -> Any:
+    """Replace ${VAR} placeholders with environment values, recursively"""
+    if isinstance(value, dict):
+        return {k: expand_env(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [expand_env(v) for v in value]
+    if isinstance(value, str):
+        return _ENV_PLACEHOLDER.sub(lambda m: os.environ.get(m.group(1), ''), value)
+    return value
+
+
+def load_config(environment: str, config_file: Optional[str] = None) -> Dict:
+    """Load config/<environment>.json with ${VAR} placeholders expanded"""
+    candidates = [Path(config_file)] if config_file else [
+        BASE_DIR / 'config' / f"{environment}.json",
+        BASE_DIR / 'config' / f"{CONFIG_ALIASES.get(environment, environment)}.json",
+    ]
+
+    for path in candidates:
+        if path.exists():
+            with open(path, 'r') as f:
+                return expand_env(json.load(f))
+
+    # Fallback to environment variables
+    return {
+        'environment': environment,
+        'database': {
+            'connection_string': os.environ.get('DB_CONNECTION_STRING', ''),
+            'host': os.environ.get('DB_HOST', 'localhost'),
+            'port': int(os.environ.get('DB_PORT', '1521')),
+            'service_name': os.environ.get('DB_SERVICE_NAME', 'XE'),
+            'username': os.environ.get('DB_USERNAME', 'healthcare'),
+            'password': os.environ.get('DB_PASSWORD', 'password')
+        },
+        'apex_url': os.environ.get('APEX_URL')
+    }
+
+
+def get_connect_params(db_config: Dict) -> Tuple[str, str, str]:
+    """Resolve (user, password, dsn) from a database config block"""
+    user = db_config.get('username') or os.environ.get('DB_USERNAME')
+    password = db_config.get('password') or os.environ.get('DB_PASSWORD')
+    dsn = db_config.get('connection_string') or os.environ.get('DB_CONNECTION_STRING')
+
+    if not dsn and db_config.get('host'):
+        # Easy Connect string, understood by both drivers
+        dsn = f"{db_config['host']}:{db_config.get('port', 1521)}/{db_config.get('service_name', 'XE')}"
+
+    if not all([user, password, dsn]):
+        raise DatabaseUnavailable("Database credentials not available")
+
+    return user, password, dsn
+
+
+def get_pool_settings(config: Dict) -> Dict:
+    """Pool settings from the database.pool config block, with defaults"""
+    settings = dict(DEFAULT_POOL_SETTINGS)
+    settings.update(config.get('database', {}).get('pool', {}))
+    return settings
+
+
+class SessionPool:
+    """Thin wrapper over the driver session pool with statement caching"""
+
+    def __init__(self, user: str, password: str, dsn: str, min: int = 1, max: int = 4,
+                 increment: int = 1, stmt_cache_size: int = 50, timeout: int = 300,
+                 wait_timeout_ms: int = 10000, driver=None):
+        self.driver = driver or oracle_driver
+        if self.driver is None:
+            raise DatabaseUnavailable("No Oracle driver available (install oracledb or cx_Oracle)")
+
+        self.dsn = dsn
+        self.min = min
+        self.max = max
+        self.stmt_cache_size = stmt_cache_size
+
+        if hasattr(self.driver, 'create_pool'):
+            # python-oracledb (and the fake driver)
+            self._pool = self.driver.create_pool(
+                user=user, password=password, dsn=dsn,
+                min=min, max=max, increment=increment,
+                getmode=self.driver.POOL_GETMODE_TIMEDWAIT,
+                wait_timeout=wait_timeout_ms,
+                timeout=timeout,
+                stmtcachesize=stmt_cache_size
+            )
+        else:
+            # cx_Oracle 8
+            self._pool = self.driver.SessionPool(
+                user=user, password=password, dsn=dsn,
+                min=min, max=max, increment=increment,
+                getmode=self.driver.SPOOL_ATTRVAL_TIMEDWAIT,
+                wait_timeout=wait_timeout_ms,
+                timeout=timeout,
+                threaded=True,
+                encoding='UTF-8'
+            )
+            self._pool.stmtcachesize = stmt_cache_size
+
+    def acquire(self):
+        """Check a connection out of the pool; pair with release()"""
+        return self._pool.acquire()
+
+    def release(self, connection):
+        """Return a connection to the pool"""
+        self._pool.release(connection)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection; uncommitted work is rolled back on error"""
+        connection = self._pool.acquire()
+        try:
+            yield connection
+        except Exception:
+            try:
+                connection.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            self._pool.release(connection)
+
+    def query(self, sql: str, params: Optional[Dict] = None) -> List[Tuple]:
+        """Run a query on a pooled connection and return all rows"""
+        with self.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(sql, params or {})
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+    def ping(self) -> float:
+        """Round trip to the database; returns elapsed seconds"""
+        start_time = time.perf_counter()
+        rows = self.query("SELECT 1 FROM dual")
+        if not rows or rows[0][0] != 1:
+            raise RuntimeError("Unexpected ping result")
+        return time.perf_counter() - start_time
+
+    def stats(self) -> Dict:
+        """Current pool usage"""
+        return {
+            'opened': self._pool.opened,
+            'busy': self._pool.busy,
+            'min': self.min,
+            'max': self.max,
+            'stmt_cache_size': self.stmt_cache_size
+        }
+
+    def close(self):
+        """Close the pool and all its connections"""
+        self._pool.close()
+
+
+def create_pool(config: Dict, driver=None, **overrides) -> SessionPool:
+    """Create a SessionPool from a loaded environment config"""
+    user, password, dsn = get_connect_params(config.get('database', {}))
+    settings = get_pool_settings(config)
+    settings.update(overrides)
+    return SessionPool(user, password, dsn, driver=driver or get_driver(), **settings)
+
+
+def get_driver():
+    """Driver module selected by HEALTHCARE_DB_DRIVER (oracledb, cx_oracle or fake)"""
+    choice = os.environ.get('HEALTHCARE_DB_DRIVER', '').lower()
+    if choice == 'fake':
+        return FakeDriver()
+    if choice == 'cx_oracle':
+        import cx_Oracle
+        return cx_Oracle
+    if choice == 'oracledb':
+        import oracledb
+        return oracledb
+    return oracle_driver
+
+
+# ---------------------------------------------------------------------------
+# Fake driver backend
+#
+# Mimics the parts of the python-oracledb pool API used above so pooling
+# behaviour (sizing, checkout timeouts, statement cache, rollback on error)
+# can be exercised without an Oracle instance.
+# ---------------------------------------------------------------------------
+
+class FakeDatabaseError(Exception):
+    """Error raised by the fake driver"""
+
+
+class FakeVariable:
+    def __init__(self, value: Any = None):
+        self.value = value
+
+    def getvalue(self) -> Any:
+        return self.value
+
+    def setvalue(self, pos: int, value: Any):
+        self.value = value
+
+
+class FakeCursor:
+    def __init__(self, connection: 'FakeConnection'):
+        self.connection = connection
+        self._rows: List[Tuple] = []
+        self.rowcount = 0
+
+    def execute(self, sql: str, params: Any = None):
+        self.connection.executed.append((sql, params))
+        self.connection.driver.record_statement(self.connection, sql)
+        if self.connection.driver.latency:
+            time.sleep(self.connection.driver.latency)
+        self._rows = list(self.connection.driver.result_for(sql))
+        self.rowcount = len(self._rows)
+
+    def executemany(self, sql: str, rows: List):
+        for row in rows:
+            self.execute(sql, row)
+        self.rowcount = len(rows)
+
+    def callproc(self, name: str, params: Optional[List] = None):
+        self.execute(f"BEGIN {name}; END;", params)
+
+    def var(self, type_: Any, *args, **kwargs) -> FakeVariable:
+        # OUT binds come back as the next generated id
+        return FakeVariable(self.connection.driver.next_id())
+
+    def callfunc(self, name: str, return_type: Any, params: Optional[List] = None):
+        self.execute(f"SELECT {name} FROM dual", params)
+        return self._rows[0][0] if self._rows else None
+
+    def fetchone(self) -> Optional[Tuple]:
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchmany(self, size: int = 100) -> List[Tuple]:
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def fetchall(self) -> List[Tuple]:
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FakeConnection:
+    def __init__(self, driver: 'FakeDriver', stmtcachesize: int):
+        self.driver = driver
+        self.stmtcachesize = stmtcachesize
+        self.statement_cache: List[str] = []
+        self.executed: List[Tuple] = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.call_timeout = 0
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def ping(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakePool:
+    def __init__(self, driver: 'FakeDriver', min: int, max: int, increment: int,
+                 wait_timeout: int, stmtcachesize: int, **kwargs):
+        self.driver = driver
+        self.min = min
+        self.max = max
+        self.increment = increment
+        self.wait_timeout = wait_timeout
+        self.stmtcachesize = stmtcachesize
+        self._idle = [FakeConnection(driver, stmtcachesize) for _ in range(min)]
+        self._opened = min
+        self._busy = 0
+        self._condition = threading.Condition()
+
+    @property
+    def opened(self) -> int:
+        return self._opened
+
+    @property
+    def busy(self) -> int:
+        return self._busy
+
+    def acquire(self) -> FakeConnection:
+        deadline = time.monotonic() + self.wait_timeout / 1000.0
+        with self._condition:
+            while not self._idle and self._opened >= self.max:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise FakeDatabaseError("DPY-4005: timed out waiting for the connection pool")
+                self._condition.wait(remaining)
+            if not self._idle:
+                grow = min(self.increment, self.max - self._opened)
+                self._idle.extend(FakeConnection(self.driver, self.stmtcachesize) for _ in range(grow))
+                self._opened += grow
+            self._busy += 1
+            return self._idle.pop()
+
+    def release(self, connection: FakeConnection):
+        with self._condition:
+            self._busy -= 1
+            self._idle.append(connection)
+            self._condition.notify()
+
+    def close(self):
+        with self._condition:
+            self._idle.clear()
+            self._opened = 0
+
+
+class FakeDriver:
+    """In-memory stand-in for the oracledb module"""
+
+    POOL_GETMODE_TIMEDWAIT = 'timedwait'
+    DatabaseError = FakeDatabaseError
+    NUMBER = 'NUMBER'
+    STRING = 'STRING'
+    CURSOR = 'CURSOR'
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.results: List[Tuple[str, List[Tuple]]] = []
+        self.statements: List[str] = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.pools: List[FakePool] = []
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def add_result(self, sql_fragment: str, rows: List[Tuple]):
+        """Return rows for any statement containing sql_fragment (case-insensitive)"""
+        self.results.append((sql_fragment.upper(), rows))
+
+    def result_for(self, sql: str) -> List[Tuple]:
+        normalized = ' '.join(sql.upper().split())
+        for fragment, rows in self.results:
+            if fragment in normalized:
+                return rows
+        return [(1,)]
+
+    def next_id(self) -> int:
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+    def record_statement(self, connection: FakeConnection, sql: str):
+        with self._lock:
+            self.statements.append(sql)
+            if sql in connection.statement_cache:
+                self.cache_hits += 1
+                connection.statement_cache.remove(sql)
+            else:
+                self.cache_misses += 1
+            connection.statement_cache.append(sql)
+            del connection.statement_cache[:-connection.stmtcachesize or None]
+
+    def create_pool(self, **kwargs) -> FakePool:
+        pool = FakePool(self, **{k: v for k, v in kwargs.items() if k not in ('user', 'password', 'dsn')})
+        self.pools.append(pool)
+        return pool
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='Healthcare System database utilities')
+    parser.add_argument('command', choices=['ping'], help='Command to run')
+    parser.add_argument('--environment', '-e', default='dev',
+                       help='Environment to connect to')
+    parser.add_argument('--config-file', help='Configuration file path')
+
+    args = parser.parse_args()
+
+    config = load_config(args.environment, args.config_file)
+
+    try:
+        pool = create_pool(config, min=1, max=1)
+    except DatabaseUnavailable as e:
+        print(f"⚠️ {e}")
+        return 2
+
+    try:
+        elapsed = pool.ping()
+        driver_name = getattr(pool.driver, '__name__', 'fake')
+        print(f"✅ Database connection successful ({elapsed * 1000:.1f} ms, driver: {driver_name})")
+        return 0
+    except Exception as e:
+        print(f"❌ Database connection failed: {e}")
+        return 1
+    finally:
+        pool.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Healthcare System - Metrics
+Rolling latency histograms, Prometheus text exposition and a small asyncio
+HTTP endpoint for long-running scripts
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from healthcare_perf import percentile
+
+# Upper bounds in seconds; Prometheus adds +Inf
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class RollingHistogram:
+    """Cumulative bucket counts plus a time window of raw samples.
+
+    The buckets, sum and count only grow, as Prometheus expects; the window
+    gives recent quantiles for dashboards that do not compute them.
+    """
+
+    def __init__(self, window_seconds: float = 300.0, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.window_seconds = window_seconds
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self._window = deque()
+
+    def observe(self, value: float, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+        self.count += 1
+        self.sum += value
+        self._window.append((now, value))
+        self._prune(now)
+
+    def _prune(self, now: float):
+        cutoff = now - self.window_seconds
+        while self._window and self._window[0][0] < cutoff:
+            self._window.popleft()
+
+    def quantile(self, pct: float, now: Optional[float] = None) -> Optional[float]:
+        """Percentile (0-100) of the samples inside the window"""
+        self._prune(time.time() if now is None else now)
+        return percentile([value for _, value in self._window], pct)
+
+    def window_count(self) -> int:
+        return len(self._window)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: Dict) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _number(value) -> str:
+    if value is None:
+        return 'NaN'
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """Named metric families rendered in the Prometheus text format"""
+
+    def __init__(self, prefix: str = 'healthcare'):
+        self.prefix = prefix
+        self._families: Dict[str, Dict] = {}
+
+    def _family(self, name: str, metric_type: str, help_text: str) -> Dict:
+        full_name = f"{self.prefix}_{name}"
+        if full_name not in self._families:
+            self._families[full_name] = {'type': metric_type, 'help': help_text, 'series': {}}
+        return self._families[full_name]
+
+    def set_gauge(self, name: str, value, help_text: str = '', **labels):
+        family = self._family(name, 'gauge', help_text)
+        family['series'][tuple(labels.items())] = value
+
+    def inc_counter(self, name: str, amount: float = 1, help_text: str = '', **labels):
+        family = self._family(name, 'counter', help_text)
+        key = tuple(labels.items())
+        family['series'][key] = family['series'].get(key, 0) + amount
+
+    def histogram(self, name: str, help_text: str = '', window_seconds: float = 300.0,
+                  **labels) -> RollingHistogram:
+        family = self._family(name, 'histogram', help_text)
+        key = tuple(labels.items())
+        if key not in family['series']:
+            family['series'][key] = RollingHistogram(window_seconds)
+        return family['series'][key]
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name, family in sorted(self._families.items()):
+            if family['help']:
+                lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            for key, value in family['series'].items():
+                labels = dict(key)
+                if family['type'] != 'histogram':
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                    continue
+                for bound, count in zip(value.buckets, value.bucket_counts):
+                    lines.append(f"{name}_bucket{_labels({**labels, 'le': _number(bound)})} {count}")
+                lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {value.count}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(round(value.sum, 6))}")
+                lines.append(f"{name}_count{_labels(labels)} {value.count}")
+        return '\n'.join(lines) + '\n'
+
+    def render_window_quantiles(self, name: str, quantiles=(50, 95, 99)) -> str:
+        """Recent quantiles of a histogram family as a gauge family, e.g. <name>_window"""
+        full_name = f"{self.prefix}_{name}"
+        family = self._families.get(full_name)
+        if not family:
+            return ''
+        lines = [f"# HELP {full_name}_window Quantiles over the rolling window",
+                 f"# TYPE {full_name}_window gauge"]
+        for key, histogram in family['series'].items():
+            for pct in quantiles:
+                value = histogram.quantile(pct)
+                labels = {**dict(key), 'quantile': _number(pct / 100.0)}
+                lines.append(f"{full_name}_window{_labels(labels)} {_number(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+Handler = Callable[[], Awaitable[Tuple[int, str, str]]]
+
+
+async def serve_http(host: str, port: int, routes: Dict[str, Handler]) -> asyncio.AbstractServer:
+    """Minimal GET-only HTTP server; each route returns (status, content type, body)"""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await asyncio.wait_for(reader.readline(), timeout=5)).decode('latin-1')
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b'\r\n', b'\n', b''):
+                pass
+            parts = request_line.split()
+            path = parts[1].split('?')[0] if len(parts) > 1 else '/'
+            if not parts or parts[0] != 'GET':
+                status, content_type, body = 405, 'text/plain', 'method not allowed\n'
+            elif path in routes:
+                status, content_type, body = await routes[path]()
+            else:
+                status, content_type, body = 404, 'text/plain', 'not found\n'
+        except (asyncio.TimeoutError, ConnectionError):
+            writer.close()
+            return
+
+        payload = body.encode('utf-8')
+        reason = {200: 'OK', 404: 'Not Found', 405: 'Method Not Allowed', 503: 'Service Unavailable'}
+        writer.write((f"HTTP/1.1 {status} {reason.get(status, 'OK')}\r\n"
+                      f"Content-Type: {content_type}\r\n"
+                      f"Content-Length: {len(payload)}\r\n"
+                      f"Connection: close\r\n\r\n").encode('latin-1') + payload)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Healthcare System - Outbound Messages
+Pluggable senders for patient reminders and staff notifications
+"""
+
+import importlib
+import json
+import os
+import smtplib
+import threading
+import urllib.error
+import urllib.request
+from email.message import EmailMessage
+from typing import Dict, List, Optional
+
+DEFAULT_SENDER = 'log'
+DEFAULT_TIMEOUT = 10.0
+
+
+class OutboundMessage:
+    """One message to deliver; reference ties it back to its source row"""
+
+    def __init__(self, channel: str, recipient: Optional[str], subject: str, body: str,
+                 reference: Optional[str] = None):
+        self.channel = channel.upper()
+        self.recipient = recipient
+        self.subject = subject
+        self.body = body
+        self.reference = reference
+
+    def to_dict(self) -> Dict:
+        return {'channel': self.channel, 'recipient': self.recipient, 'subject': self.subject,
+                'body': self.body, 'reference': self.reference}
+
+
+class SendError(Exception):
+    """Delivery failed; permanent errors (bad address, unsupported channel) are not retried"""
+
+    def __init__(self, message: str, permanent: bool = False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+class Sender:
+    """Delivers OutboundMessages; subclasses implement send()"""
+
+    name = 'base'
+    channels = ('EMAIL', 'SMS', 'PHONE', 'TEAM')
+
+    def __init__(self, settings: Optional[Dict] = None):
+        self.settings = settings or {}
+
+    def check(self, message: OutboundMessage):
+        if message.channel not in self.channels:
+            raise SendError(f"{self.name} sender cannot deliver {message.channel} messages", permanent=True)
+        if not message.recipient and message.channel != 'TEAM':
+            raise SendError("message has no recipient", permanent=True)
+
+    def send(self, message: OutboundMessage):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class LogSender(Sender):
+    """Prints messages instead of delivering them; keeps what it sent for inspection.
+
+    fail_recipients makes delivery to those recipients fail, for exercising
+    retry handling without a mail server.
+    """
+
+    name = 'log'
+
+    def __init__(self, settings: Optional[Dict] = None, fail_recipients=()):
+        super().__init__(settings)
+        self.sent: List[OutboundMessage] = []
+        self.fail_recipients = set(fail_recipients or self.settings.get('fail_recipients', []))
+        self.quiet = bool(self.settings.get('quiet'))
+        self._lock = threading.Lock()
+
+    def send(self, message: OutboundMessage):
+        self.check(message)
+        if message.recipient in self.fail_recipients:
+            raise SendError(f"delivery to {message.recipient} refused (stub)")
+        with self._lock:
+            self.sent.append(message)
+        if not self.quiet:
+            print(f"  📨 [{message.channel}] {message.recipient or 'team'}: {message.subject}")
+
+
+class SmtpSender(Sender):
+    """Email over SMTP; one connection is reused until close()"""
+
+    name = 'smtp'
+    channels = ('EMAIL',)
+
+    def __init__(self, settings: Optional[Dict] = None):
+        super().__init__(settings)
+        if not self.settings.get('host'):
+            raise ValueError("outbound.smtp.host is not configured")
+        self._smtp = None
+
+    def connect(self):
+        smtp = smtplib.SMTP(self.settings['host'], int(self.settings.get('port') or 587),
+                            timeout=float(self.settings.get('timeout') or DEFAULT_TIMEOUT))
+        if self.settings.get('starttls', True):
+            smtp.starttls()
+        if self.settings.get('username'):
+            smtp.login(self.settings['username'], self.settings.get('password', ''))
+        return smtp
+
+    def send(self, message: OutboundMessage):
+        self.check(message)
+        email = EmailMessage()
+        email['From'] = self.settings.get('from_address', 'no-reply@healthcare.local')
+        email['To'] = message.recipient
+        email['Subject'] = message.subject
+        email.set_content(message.body)
+
+        try:
+            if self._smtp is None:
+                self._smtp = self.connect()
+            self._smtp.send_message(email)
+        except smtplib.SMTPRecipientsRefused as e:
+            raise SendError(f"recipient refused: {e.recipients}", permanent=True)
+        except (smtplib.SMTPException, OSError) as e:
+            # Drop the connection; the next message reconnects
+            self.close()
+            raise SendError(f"SMTP error: {e}")
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+
+class WebhookSender(Sender):
+    """POSTs each message as JSON to an HTTP endpoint (SMS gateway, chat webhook)"""
+
+    name = 'webhook'
+
+    def __init__(self, settings: Optional[Dict] = None):
+        super().__init__(settings)
+        if not self.settings.get('url'):
+            raise ValueError("outbound.webhook.url is not configured")
+
+    def send(self, message: OutboundMessage):
+        self.check(message)
+        headers = {'Content-Type': 'application/json'}
+        if self.settings.get('token'):
+            headers['Authorization'] = f"Bearer {self.settings['token']}"
+        request = urllib.request.Request(self.settings['url'], data=json.dumps(message.to_dict()).encode('utf-8'),
+                                         headers=headers, method='POST')
+        try:
+            with urllib.request.urlopen(request, timeout=float(self.settings.get('timeout') or DEFAULT_TIMEOUT)):
+                pass
+        except urllib.error.HTTPError as e:
+            # 4xx other than throttling will not succeed on retry
+            raise SendError(f"HTTP {e.code}", permanent=400 <= e.code < 500 and e.code != 429)
+        except (urllib.error.URLError, OSError) as e:
+            raise SendError(f"webhook error: {e}")
+
+
+SENDERS = {
+    'log': LogSender,
+    'smtp': SmtpSender,
+    'webhook': WebhookSender,
+}
+
+
+def create_sender(config: Dict, name: Optional[str] = None) -> Sender:
+    """Sender chosen by name, HEALTHCARE_OUTBOUND_SENDER or outbound.sender in the config.
+
+    Besides the built-in names, 'package.module:ClassName' loads a custom
+    Sender subclass, which receives the outbound.<ClassName lowercased> settings.
+    """
+    outbound = config.get('outbound', {})
+    name = name or os.environ.get('HEALTHCARE_OUTBOUND_SENDER') or outbound.get('sender') or DEFAULT_SENDER
+
+    if ':' in name:
+        module_name, class_name = name.split(':', 1)
+        sender_class = getattr(importlib.import_module(module_name), class_name)
+        return sender_class(outbound.get(class_name.lower(), {}))
+
+    if name not in SENDERS:
+        raise ValueError(f"Unknown sender '{name}' (choose from {', '.join(SENDERS)} or module:Class)")
+    return SENDERS[name](outbound.get(name, {}))
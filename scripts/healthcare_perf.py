@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Healthcare System - Performance Benchmarks
+Latency, throughput and logical-read benchmarks for the database hot paths
+"""
+
+import json
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+LOGICAL_READS_SQL = """
+    SELECT ms.value
+    FROM v$mystat ms
+    JOIN v$statname sn ON sn.statistic# = ms.statistic#
+    WHERE sn.name = 'session logical reads'
+"""
+
+# Latency differences below this are treated as noise when comparing to a baseline
+MIN_REGRESSION_MS = 1.0
+
+
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    """Percentile with linear interpolation between closest ranks"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    if lower == upper:
+        return ordered[int(rank)]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize_latencies(samples: Sequence[float]) -> Dict:
+    """min/mean/p50/p95/p99/max in milliseconds for latency samples in seconds"""
+    if not samples:
+        return {'count': 0, 'min_ms': None, 'mean_ms': None, 'p50_ms': None,
+                'p95_ms': None, 'p99_ms': None, 'max_ms': None}
+
+    millis = [s * 1000.0 for s in samples]
+    return {
+        'count': len(millis),
+        'min_ms': round(min(millis), 3),
+        'mean_ms': round(sum(millis) / len(millis), 3),
+        'p50_ms': round(percentile(millis, 50), 3),
+        'p95_ms': round(percentile(millis, 95), 3),
+        'p99_ms': round(percentile(millis, 99), 3),
+        'max_ms': round(max(millis), 3)
+    }
+
+
+class BenchmarkCase:
+    """One benchmarked call path.
+
+    prepare(connection, count) returns the argument sets for the calls,
+    call(cursor, args) performs one call and may return the id of a row it
+    created, and cleanup(connection, created_ids) removes those rows again.
+    Cases that write consume each argument set once; read-only cases cycle.
+    """
+
+    def __init__(self, name: str, prepare: Callable, call: Callable,
+                 cleanup: Optional[Callable] = None, writes: bool = False):
+        self.name = name
+        self.prepare = prepare
+        self.call = call
+        self.cleanup = cleanup
+        self.writes = writes
+
+
+def _read_logical_reads(connection) -> Optional[int]:
+    try:
+        cursor = connection.cursor()
+        cursor.execute(LOGICAL_READS_SQL)
+        row = cursor.fetchone()
+        cursor.close()
+        return int(row[0]) if row else None
+    except Exception:
+        # No SELECT privilege on v$mystat
+        return None
+
+
+def _net_logical_reads(probe_start: Optional[int], reads_before: Optional[int],
+                       reads_after: Optional[int]) -> Optional[int]:
+    """Reads between reads_before and reads_after, less the probe's own reads.
+
+    probe_start is read immediately before reads_before, so their difference
+    is what one LOGICAL_READS_SQL probe costs; reads_after includes that same
+    cost once more.
+    """
+    if probe_start is None or reads_before is None or reads_after is None:
+        return None
+    probe_reads = reads_before - probe_start
+    return max(reads_after - reads_before - probe_reads, 0)
+
+
+def _next_weekdays(start: date, count: int) -> List[date]:
+    days = []
+    current = start
+    while len(days) < count:
+        if current.weekday() < 5:
+            days.append(current)
+        current += timedelta(days=1)
+    return days
+
+
+# ---------------------------------------------------------------------------
+# Hot path definitions
+# ---------------------------------------------------------------------------
+
+def _prepare_time_slots(connection, count: int) -> List[Dict]:
+    cursor = connection.cursor()
+    cursor.execute("SELECT provider_id FROM providers WHERE is_active = 'Y' ORDER BY provider_id")
+    providers = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+
+    days = _next_weekdays(date.today() + timedelta(days=1), 10)
+    return [{'provider_id': p, 'slot_date': datetime.combine(d, datetime.min.time())}
+            for p in providers for d in days]
+
+
+def _call_time_slots(cursor, args: Dict):
+    cursor.execute("""
+        SELECT COUNT(*)
+        FROM TABLE(pkg_appointment_mgmt.get_available_time_slots(:provider_id, :slot_date))
+    """, args)
+    cursor.fetchone()
+
+
+def _prepare_schedule(connection, count: int) -> List[Dict]:
+    cursor = connection.cursor()
+    cursor.execute("SELECT patient_id FROM patients WHERE is_active = 'Y' ORDER BY patient_id FETCH FIRST 200 ROWS ONLY")
+    patients = [row[0] for row in cursor.fetchall()]
+
+    # Free 15-minute slots far enough ahead not to collide with real bookings
+    start = datetime.combine(date.today() + timedelta(days=300), datetime.min.time())
+    cursor.execute("""
+        SELECT provider_id, slot_date, time_slot
+        FROM TABLE(pkg_appointment_mgmt.get_provider_slot_grid(NULL, :start_date, :end_date, 15))
+        WHERE is_available = 'Y'
+        AND TO_CHAR(slot_date, 'DY', 'NLS_DATE_LANGUAGE=ENGLISH') NOT IN ('SAT', 'SUN')
+        ORDER BY slot_date, provider_id, time_slot
+        FETCH FIRST :slot_count ROWS ONLY
+    """, {'start_date': start, 'end_date': start + timedelta(days=30), 'slot_count': count})
+    slots = cursor.fetchall()
+    cursor.close()
+
+    if not patients:
+        return []
+    return [{'patient_id': patients[i % len(patients)], 'provider_id': provider_id,
+             'appointment_date': slot_date, 'appointment_time': time_slot}
+            for i, (provider_id, slot_date, time_slot) in enumerate(slots)]
+
+
+def _call_schedule(cursor, args: Dict):
+    appointment_id = cursor.var(int)
+    cursor.execute("""
+        BEGIN
+            pkg_appointment_mgmt.schedule_appointment(
+                p_patient_id => :patient_id,
+                p_provider_id => :provider_id,
+                p_appointment_date => :appointment_date,
+                p_appointment_time => :appointment_time,
+                p_duration_minutes => 15,
+                p_reason_for_visit => 'Performance benchmark',
+                p_appointment_id => :appointment_id
+            );
+        END;
+    """, dict(args, appointment_id=appointment_id))
+    return appointment_id.getvalue()
+
+
+def _cleanup_appointments(connection, created_ids: List):
+    cursor = connection.cursor()
+    cursor.executemany("DELETE FROM appointments WHERE appointment_id = :1",
+                       [(i,) for i in created_ids])
+    connection.commit()
+    cursor.close()
+
+
+def _prepare_search(connection, count: int) -> List[Dict]:
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT last_name, first_name || ' ' || last_name
+        FROM patients
+        WHERE is_active = 'Y'
+        ORDER BY patient_id
+        FETCH FIRST 25 ROWS ONLY
+    """)
+    rows = cursor.fetchall()
+    cursor.close()
+
+    terms = []
+    for last_name, full_name in rows:
+        terms.append({'term': last_name[:3]})
+        terms.append({'term': full_name})
+    return terms
+
+
+def _call_search(cursor, args: Dict):
+    cursor.execute("SELECT * FROM TABLE(pkg_patient_mgmt.search_patients(:term, 50))", args)
+    cursor.fetchall()
+
+
+def _prepare_static(connection, count: int) -> List[Dict]:
+    return [{}]
+
+
+def _call_dashboard_stats(cursor, args: Dict):
+    cursor.execute("SELECT * FROM v_dashboard_stats")
+    cursor.fetchall()
+
+
+def _call_trial_dashboard(cursor, args: Dict):
+    cursor.execute("SELECT * FROM v_trial_dashboard")
+    cursor.fetchall()
+
+
+def _prepare_enroll(connection, count: int) -> List[Dict]:
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT trial_id, primary_investigator_id,
+               NVL(target_enrollment - current_enrollment, :slot_count) as capacity
+        FROM clinical_trials
+        WHERE status IN ('Active', 'Recruiting')
+        ORDER BY capacity DESC, trial_id
+        FETCH FIRST 1 ROWS ONLY
+    """, {'slot_count': count})
+    trial = cursor.fetchone()
+    if not trial:
+        cursor.close()
+        return []
+
+    trial_id, provider_id, capacity = trial
+    cursor.execute("""
+        SELECT p.patient_id
+        FROM patients p
+        WHERE p.is_active = 'Y'
+        AND NOT EXISTS (SELECT 1 FROM trial_participants tp
+                        WHERE tp.trial_id = :trial_id AND tp.patient_id = p.patient_id)
+        ORDER BY p.patient_id
+        FETCH FIRST :slot_count ROWS ONLY
+    """, {'trial_id': trial_id, 'slot_count': int(min(count, max(capacity, 0)))})
+    patients = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+
+    return [{'trial_id': trial_id, 'patient_id': p, 'provider_id': provider_id} for p in patients]
+
+
+def _call_enroll(cursor, args: Dict):
+    participant_id = cursor.var(int)
+    cursor.execute("""
+        BEGIN
+            :participant_id := pkg_clinical_trials_mgmt.enroll_participant(
+                p_trial_id => :trial_id,
+                p_patient_id => :patient_id,
+                p_study_arm => 'BENCHMARK',
+                p_assigned_provider_id => :provider_id
+            );
+        END;
+    """, dict(args, participant_id=participant_id))
+    return participant_id.getvalue()
+
+
+def _cleanup_participants(connection, created_ids: List):
+    cursor = connection.cursor()
+    cursor.executemany("DELETE FROM trial_participants WHERE participant_id = :1",
+                       [(i,) for i in created_ids])
+    connection.commit()
+    cursor.close()
+
+
+def default_cases() -> List[BenchmarkCase]:
+    """The hot paths covered by `run-tests.py --test-type performance`"""
+    return [
+        BenchmarkCase('get_available_time_slots', _prepare_time_slots, _call_time_slots),
+        BenchmarkCase('schedule_appointment', _prepare_schedule, _call_schedule,
+                      cleanup=_cleanup_appointments, writes=True),
+        BenchmarkCase('search_patients', _prepare_search, _call_search),
+        BenchmarkCase('v_dashboard_stats', _prepare_static, _call_dashboard_stats),
+        BenchmarkCase('v_trial_dashboard', _prepare_static, _call_trial_dashboard),
+        BenchmarkCase('enroll_participant', _prepare_enroll, _call_enroll,
+                      cleanup=_cleanup_participants, writes=True),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def run_case(pool, case: BenchmarkCase, iterations: int, warmup: int = 5,
+             concurrency: int = 1) -> Dict:
+    """Benchmark one case on `concurrency` pooled connections"""
+    with pool.connection() as connection:
+        arg_sets = case.prepare(connection, iterations + warmup)
+
+    if not arg_sets:
+        return {'status': 'SKIPPED', 'reason': 'No suitable test data'}
+
+    if case.writes:
+        # Each argument set is used exactly once
+        warmup = min(warmup, len(arg_sets) // 2)
+        iterations = min(iterations, len(arg_sets) - warmup)
+
+    lock = threading.Lock()
+    latencies: List[float] = []
+    created_ids: List = []
+    errors: List[str] = []
+    reads: List[Optional[int]] = []
+    next_index = [0]
+
+    def take_args():
+        with lock:
+            index = next_index[0]
+            next_index[0] += 1
+        return arg_sets[index % len(arg_sets)]
+
+    def worker(call_count: int):
+        with pool.connection() as connection:
+            cursor = connection.cursor()
+            probe_start = _read_logical_reads(connection)
+            reads_before = _read_logical_reads(connection)
+            local_latencies = []
+            local_created = []
+            local_errors = []
+
+            for _ in range(call_count):
+                args = take_args()
+                start_time = time.perf_counter()
+                try:
+                    created = case.call(cursor, args)
+                    local_latencies.append(time.perf_counter() - start_time)
+                    if case.writes and created is not None:
+                        local_created.append(created)
+                except Exception as e:
+                    local_errors.append(str(e).splitlines()[0])
+
+            reads_after = _read_logical_reads(connection)
+            cursor.close()
+
+        with lock:
+            latencies.extend(local_latencies)
+            created_ids.extend(local_created)
+            errors.extend(local_errors)
+            reads.append(_net_logical_reads(probe_start, reads_before, reads_after))
+
+    try:
+        # Warm up cursors, the statement cache and the buffer cache
+        worker(warmup)
+        latencies.clear()
+        errors.clear()
+        reads.clear()
+
+        shares = [iterations // concurrency + (1 if i < iterations % concurrency else 0)
+                  for i in range(concurrency)]
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(worker, [s for s in shares if s > 0]))
+        wall_time = time.perf_counter() - wall_start
+    finally:
+        if case.cleanup and created_ids:
+            with pool.connection() as connection:
+                case.cleanup(connection, created_ids)
+
+    result = summarize_latencies(latencies)
+    calls = len(latencies)
+    result.update({
+        'status': 'OK' if not errors else 'ERRORS',
+        'calls': calls,
+        'errors': len(errors),
+        'concurrency': concurrency,
+        'wall_time_s': round(wall_time, 3),
+        'throughput_per_s': round(calls / wall_time, 2) if wall_time > 0 else None,
+        'logical_reads_per_call': (round(sum(reads) / calls, 1)
+                                   if calls and reads and None not in reads else None),
+        'rows_cleaned_up': len(created_ids)
+    })
+    if errors:
+        result['first_error'] = errors[0]
+    return result
+
+
+def run_benchmarks(pool, iterations: int = 50, warmup: int = 5, concurrency: int = 1,
+                   cases: Optional[List[BenchmarkCase]] = None,
+                   progress: Optional[Callable[[str, Dict], None]] = None) -> Dict:
+    """Run every case and return {'run': ..., 'benchmarks': {name: result}}"""
+    results = {}
+    for case in cases or default_cases():
+        try:
+            results[case.name] = run_case(pool, case, iterations, warmup, concurrency)
+        except Exception as e:
+            results[case.name] = {'status': 'ERROR', 'error': str(e)}
+        if progress:
+            progress(case.name, results[case.name])
+
+    return {
+        'run': {
+            'timestamp': datetime.now().isoformat(),
+            'iterations': iterations,
+            'warmup': warmup,
+            'concurrency': concurrency
+        },
+        'benchmarks': results
+    }
+
+
+def compare_to_baseline(current: Dict, baseline: Dict, threshold_pct: float = 20.0,
+                        metrics: Sequence[str] = ('p95_ms', 'logical_reads_per_call')) -> List[Dict]:
+    """Metrics that grew by more than threshold_pct over the baseline"""
+    regressions = []
+    for name, result in current.get('benchmarks', {}).items():
+        reference = baseline.get('benchmarks', {}).get(name)
+        if not reference:
+            continue
+        for metric in metrics:
+            new_value = result.get(metric)
+            old_value = reference.get(metric)
+            if new_value is None or old_value is None or old_value <= 0:
+                continue
+            if metric.endswith('_ms') and new_value - old_value < MIN_REGRESSION_MS:
+                continue
+            change_pct = (new_value - old_value) / old_value * 100.0
+            if change_pct > threshold_pct:
+                regressions.append({
+                    'benchmark': name,
+                    'metric': metric,
+                    'baseline': old_value,
+                    'current': new_value,
+                    'change_pct': round(change_pct, 1)
+                })
+    return regressions
+
+
+def load_results(path: str) -> Optional[Dict]:
+    """Load a results/baseline JSON file, or None if it does not exist"""
+    file_path = Path(path)
+    if not file_path.exists():
+        return None
+    with open(file_path, 'r') as f:
+        return json.load(f)
+
+
+def save_results(results: Dict, path: str):
+    """Write results JSON, creating the directory if needed"""
+    file_path = Path(path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(file_path, 'w') as f:
+        json.dump(results, f, indent=2, default=str)
@@ -0,0 +1,796 @@
+#!/usr/bin/env python3
+"""
+Healthcare System - Schema Deployment Library
+Parses SQL*Plus scripts into statements, orders them by object dependencies
+and executes independent statements concurrently over a session pool
+"""
+
+import hashlib
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+SQLPLUS_COMMANDS = {
+    'SET', 'PROMPT', 'SPOOL', 'WHENEVER', 'EXIT', 'QUIT', 'COLUMN', 'COL', 'DEFINE', 'UNDEFINE',
+    'SHOW', 'TTITLE', 'BTITLE', 'BREAK', 'COMPUTE', 'CLEAR', 'REM', 'REMARK', 'PAUSE', 'ACCEPT',
+    'VARIABLE', 'VAR', 'PRINT', 'START', 'CONNECT', 'DISCONNECT', 'HOST', 'TIMING'
+}
+
+PLSQL_START = re.compile(
+    r'^\s*(DECLARE\b|BEGIN\b|CREATE\s+(OR\s+REPLACE\s+)?((NON)?EDITIONABLE\s+)?'
+    r'(PACKAGE|TRIGGER|FUNCTION|PROCEDURE|TYPE)\b)', re.IGNORECASE)
+
+CREATE_OBJECT = re.compile(
+    r'^\s*CREATE\s+(?:OR\s+REPLACE\s+)?(?:(?:NON)?EDITIONABLE\s+)?(?:FORCE\s+|NOFORCE\s+)?'
+    r'(?:GLOBAL\s+TEMPORARY\s+|UNIQUE\s+|BITMAP\s+)?'
+    r'(PACKAGE\s+BODY|TYPE\s+BODY|MATERIALIZED\s+VIEW|TABLE|VIEW|SEQUENCE|INDEX|PACKAGE|TRIGGER|'
+    r'FUNCTION|PROCEDURE|TYPE|SYNONYM)\s+(?:\w+\.)?"?(\w+)"?', re.IGNORECASE)
+
+# Statements that belong to a single table, kept in file order per table
+ATTACHED_PATTERNS = [
+    re.compile(r'^\s*CREATE\s+(?:UNIQUE\s+|BITMAP\s+)?INDEX\s+\S+\s+ON\s+(\w+)', re.IGNORECASE),
+    re.compile(r'^\s*CREATE\s+(?:OR\s+REPLACE\s+)?(?:(?:NON)?EDITIONABLE\s+)?TRIGGER\s+\S+\s+.*?\bON\s+(\w+)',
+               re.IGNORECASE | re.DOTALL),
+    re.compile(r'^\s*COMMENT\s+ON\s+(?:TABLE|MATERIALIZED\s+VIEW)\s+(\w+)', re.IGNORECASE),
+    re.compile(r'^\s*COMMENT\s+ON\s+COLUMN\s+(\w+)\.', re.IGNORECASE),
+    re.compile(r'^\s*COMMENT\s+ON\s+TRIGGER\s+(\w+)', re.IGNORECASE),
+    re.compile(r'^\s*ALTER\s+TABLE\s+(\w+)', re.IGNORECASE),
+    re.compile(r'^\s*INSERT\s+(?:/\*.*?\*/\s*)?INTO\s+(\w+)', re.IGNORECASE | re.DOTALL),
+    re.compile(r'^\s*UPDATE\s+(\w+)', re.IGNORECASE),
+    re.compile(r'^\s*DELETE\s+(?:FROM\s+)?(\w+)', re.IGNORECASE),
+    re.compile(r'^\s*MERGE\s+INTO\s+(\w+)', re.IGNORECASE),
+    re.compile(r'^\s*GRANT\s+.+?\s+ON\s+(\w+)', re.IGNORECASE | re.DOTALL),
+]
+
+DML_START = re.compile(r'^\s*(INSERT|UPDATE|DELETE|MERGE)\b', re.IGNORECASE)
+QUERY_START = re.compile(r'^\s*(SELECT|WITH)\b', re.IGNORECASE)
+INCLUDE = re.compile(r'^\s*@@?\s*(\S+)')
+IDENTIFIER = re.compile(r'[A-Za-z][A-Za-z0-9_$#]*')
+FOREIGN_KEY = re.compile(r'\bREFERENCES\s+(?:\w+\.)?(\w+)', re.IGNORECASE)
+
+# Objects that can be re-run with CREATE OR REPLACE
+REPLACEABLE_TYPES = {'PACKAGE', 'PACKAGE BODY', 'TRIGGER', 'FUNCTION', 'PROCEDURE', 'VIEW',
+                     'TYPE', 'TYPE BODY', 'SYNONYM'}
+PLSQL_TYPES = {'PACKAGE', 'PACKAGE BODY', 'TRIGGER', 'FUNCTION', 'PROCEDURE', 'TYPE', 'TYPE BODY'}
+
+# "Object already exists" style errors for objects created outside the deployer
+ALREADY_EXISTS_ERRORS = {955, 1430, 1408, 2260, 2261, 2275}
+
+
+@dataclass
+class Statement:
+    """One executable statement and its position in the source"""
+    sql: str
+    file: str
+    line: int
+    order: int
+    plsql: bool = False
+    object_type: Optional[str] = None
+    object_name: Optional[str] = None
+    attached_to: Optional[str] = None
+    references: Set[str] = field(default_factory=set)
+    depends_on: Set[int] = field(default_factory=set)
+    key: str = ''
+    source_hash: str = ''
+
+    @property
+    def executable(self) -> bool:
+        """DML and anonymous blocks change data rather than define objects"""
+        return self.object_type is None and (self.plsql or bool(DML_START.match(self.sql)))
+
+    @property
+    def label(self) -> str:
+        if self.object_type:
+            return f"{self.object_type} {self.object_name}"
+        first_line = self.sql.strip().splitlines()[0]
+        return first_line[:60] + ('...' if len(first_line) > 60 else '')
+
+    @property
+    def location(self) -> str:
+        return f"{self.file}:{self.line}"
+
+
+def strip_comments_and_strings(sql: str) -> str:
+    """SQL text with comments removed and string literals blanked"""
+    out = []
+    i = 0
+    length = len(sql)
+    while i < length:
+        char = sql[i]
+        if sql.startswith('--', i):
+            end = sql.find('\n', i)
+            i = length if end == -1 else end
+        elif sql.startswith('/*', i):
+            end = sql.find('*/', i + 2)
+            i = length if end == -1 else end + 2
+        elif char == "'":
+            i += 1
+            while i < length:
+                if sql[i] == "'" and sql.startswith("''", i):
+                    i += 2
+                elif sql[i] == "'":
+                    i += 1
+                    break
+                else:
+                    i += 1
+            out.append("''")
+        else:
+            out.append(char)
+            i += 1
+    return ''.join(out)
+
+
+def _ends_statement(line: str, state: Dict) -> bool:
+    """True if a plain SQL line ends with ';' outside strings and comments"""
+    i = 0
+    last_code = ''
+    while i < len(line):
+        if state['in_comment']:
+            end = line.find('*/', i)
+            if end == -1:
+                return False
+            state['in_comment'] = False
+            i = end + 2
+            continue
+        if state['in_string']:
+            end = line.find("'", i)
+            if end == -1:
+                return False
+            if line.startswith("''", end):
+                i = end + 2
+                continue
+            state['in_string'] = False
+            i = end + 1
+            last_code = "'"
+            continue
+        if line.startswith('--', i):
+            break
+        if line.startswith('/*', i):
+            state['in_comment'] = True
+            i += 2
+            continue
+        char = line[i]
+        if char == "'":
+            state['in_string'] = True
+        elif not char.isspace():
+            last_code = char
+        i += 1
+    return last_code == ';' and not state['in_string'] and not state['in_comment']
+
+
+def parse_script(path: Path, base_dir: Path, start_order: int = 0, seen_files: Optional[Set[Path]] = None,
+                 skip_queries: bool = True, include_dir: Optional[Path] = None) -> List[Statement]:
+    """Split a SQL*Plus script into statements, expanding @/@@ includes once each.
+
+    Includes resolve against include_dir (default: the script's directory).
+    """
+    seen_files = seen_files if seen_files is not None else set()
+    path = path.resolve()
+    if path in seen_files:
+        return []
+    seen_files.add(path)
+
+    try:
+        display_name = str(path.relative_to(base_dir))
+    except ValueError:
+        display_name = str(path)
+
+    statements: List[Statement] = []
+    buffer: List[str] = []
+    buffer_line = 0
+    plsql = False
+    state = {'in_string': False, 'in_comment': False}
+
+    def flush(as_plsql: bool):
+        nonlocal buffer
+        text = '\n'.join(buffer).strip()
+        buffer = []
+        if not as_plsql:
+            text = text.rstrip().rstrip(';').rstrip()
+        if not text or not strip_comments_and_strings(text).strip():
+            return
+        if skip_queries and not as_plsql and QUERY_START.match(strip_comments_and_strings(text)):
+            # Report queries at the end of install scripts
+            return
+        statements.append(Statement(sql=text, file=display_name, line=buffer_line,
+                                    order=start_order + len(statements), plsql=as_plsql))
+
+    lines = path.read_text().splitlines()
+    for number, line in enumerate(lines, start=1):
+        stripped = line.strip()
+
+        if not buffer:
+            if not stripped or stripped.startswith('--'):
+                continue
+            include = INCLUDE.match(line)
+            if include:
+                child = ((include_dir or path.parent) / include.group(1)).resolve()
+                included = parse_script(child, base_dir, start_order + len(statements), seen_files, skip_queries)
+                statements.extend(included)
+                continue
+            if stripped == '/':
+                continue
+            first_word = stripped.split()[0].rstrip(';').upper()
+            if first_word in SQLPLUS_COMMANDS:
+                continue
+            buffer_line = number
+            plsql = bool(PLSQL_START.match(line))
+            state = {'in_string': False, 'in_comment': False}
+
+        if plsql:
+            if stripped == '/':
+                flush(True)
+                continue
+            buffer.append(line)
+        else:
+            if stripped == '/':
+                flush(False)
+                continue
+            buffer.append(line)
+            if _ends_statement(line, state):
+                flush(False)
+
+    if buffer:
+        flush(plsql)
+
+    return statements
+
+
+def classify(statement: Statement):
+    """Fill in object type/name, owning table, references and the source hash"""
+    code = strip_comments_and_strings(statement.sql)
+
+    created = CREATE_OBJECT.match(code)
+    if created:
+        statement.object_type = ' '.join(created.group(1).upper().split())
+        statement.object_name = created.group(2).upper()
+
+    for pattern in ATTACHED_PATTERNS:
+        attached = pattern.match(code)
+        if attached:
+            statement.attached_to = attached.group(1).upper()
+            break
+    if statement.object_type == 'TABLE':
+        statement.attached_to = statement.object_name
+
+    statement.references = {token.upper() for token in IDENTIFIER.findall(code)}
+    normalized = '\n'.join(l.rstrip() for l in statement.sql.strip().splitlines())
+    statement.source_hash = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def build_graph(statements: List[Statement]) -> List[Statement]:
+    """Add dependency edges between statements.
+
+    - A statement depends on the statements creating the objects it names
+      (the package spec for definitions, spec and body when it executes code).
+    - Statements belonging to one table (its CREATE, indexes, triggers,
+      comments, grants and DML) keep their file order, so sample data is
+      still inserted before the triggers that follow it in the scripts.
+    - Data changes run after earlier data changes to the tables they read
+      or reference through foreign keys (sample rows use literal parent ids).
+    - Anonymous blocks often read the data dictionary (grants, backfills),
+      so they run after everything before them in the scripts, and later
+      data changes run after them.
+    - Repeated definitions of the same object keep their file order.
+    """
+    for statement in statements:
+        classify(statement)
+
+    providers: Dict[str, List[Statement]] = {}
+    for statement in statements:
+        if statement.object_name:
+            providers.setdefault(statement.object_name, []).append(statement)
+
+    def provider_nodes(name: str, statement: Statement, body_too: bool) -> List[Statement]:
+        nodes = [p for p in providers.get(name, []) if p is not statement]
+        if not body_too:
+            specs = [p for p in nodes if not p.object_type.endswith('BODY')]
+            nodes = specs or nodes
+        earlier = [p for p in nodes if p.order < statement.order]
+        if earlier:
+            latest = {}
+            for p in earlier:
+                latest[p.object_type] = p
+            return list(latest.values())
+        return nodes[:1] + [p for p in nodes[1:] if p.object_type != nodes[0].object_type][:1]
+
+    fk_parents: Dict[str, Set[str]] = {}
+    for statement in statements:
+        if statement.attached_to and not statement.executable:
+            parents = {m.upper() for m in FOREIGN_KEY.findall(strip_comments_and_strings(statement.sql))}
+            fk_parents.setdefault(statement.attached_to, set()).update(parents)
+
+    last_attached: Dict[str, Statement] = {}
+    last_dml: Dict[str, Statement] = {}
+    last_definition: Dict[Tuple[str, str], Statement] = {}
+    last_block: Optional[Statement] = None
+    earlier: List[Statement] = []
+
+    for statement in statements:
+        own_name = statement.object_name
+        body_too = statement.executable
+        for name in statement.references:
+            if name == own_name or name not in providers:
+                continue
+            for provider in provider_nodes(name, statement, body_too):
+                statement.depends_on.add(provider.order)
+
+        if statement.object_type and statement.object_type.endswith('BODY'):
+            spec_type = statement.object_type.replace(' BODY', '')
+            for provider in providers.get(own_name, []):
+                if provider.object_type == spec_type and provider.order < statement.order:
+                    statement.depends_on.add(provider.order)
+
+        if statement.object_type:
+            key = (statement.object_type, own_name)
+            if key in last_definition:
+                statement.depends_on.add(last_definition[key].order)
+            last_definition[key] = statement
+
+        if statement.attached_to:
+            previous = last_attached.get(statement.attached_to)
+            if previous:
+                statement.depends_on.add(previous.order)
+            last_attached[statement.attached_to] = statement
+
+        if statement.executable:
+            if statement.plsql:
+                statement.depends_on.update(s.order for s in earlier)
+                last_block = statement
+            else:
+                if last_block:
+                    statement.depends_on.add(last_block.order)
+                table = statement.attached_to
+                for parent in (statement.references | fk_parents.get(table, set())) - {table}:
+                    if parent in last_dml:
+                        statement.depends_on.add(last_dml[parent].order)
+                last_dml[table] = statement
+
+        statement.depends_on.discard(statement.order)
+        earlier.append(statement)
+
+    # Stable keys: named objects by type and name, other statements by content
+    occurrences: Dict[str, int] = {}
+    for statement in statements:
+        if statement.object_type:
+            base = f"{statement.object_type}:{statement.object_name}"
+        else:
+            base = f"{statement.file}#{statement.source_hash[:16]}"
+        occurrences[base] = occurrences.get(base, 0) + 1
+        statement.key = base if occurrences[base] == 1 else f"{base}#{occurrences[base]}"
+
+    return statements
+
+
+def load_plan(entry_script: Path, base_dir: Path, include_dir: Optional[Path] = None) -> List[Statement]:
+    """Parse an install script and its includes into a dependency graph"""
+    return build_graph(parse_script(entry_script, base_dir, include_dir=include_dir))
+
+
+def execution_waves(statements: List[Statement]) -> List[List[Statement]]:
+    """Group statements into waves that can run concurrently (used for --plan)"""
+    by_order = {s.order: s for s in statements}
+    pending = {s.order: {d for d in s.depends_on if d in by_order} for s in statements}
+    waves = []
+    while pending:
+        wave = sorted(o for o, deps in pending.items() if not deps)
+        if not wave:
+            # Dependency cycle: release the earliest statement, as the executor does
+            wave = [min(pending)]
+        for order in wave:
+            del pending[order]
+        for deps in pending.values():
+            deps.difference_update(wave)
+        waves.append([by_order[o] for o in wave])
+    return waves
+
+
+class DeploymentError(Exception):
+    """A statement failed; carries the statement for reporting"""
+
+    def __init__(self, statement: Statement, message: str):
+        super().__init__(message)
+        self.statement = statement
+
+
+def error_code(exc: Exception) -> Optional[int]:
+    """ORA- error number from a driver exception"""
+    args = getattr(exc, 'args', ())
+    if args and hasattr(args[0], 'code'):
+        return args[0].code
+    match = re.search(r'ORA-(\d{5})', str(exc))
+    return int(match.group(1)) if match else None
+
+
+class SchemaDeployer:
+    """Runs a statement graph over a SessionPool, most independent work first"""
+
+    def __init__(self, pool, workers: int = 4, deployed_hashes: Optional[Dict[str, str]] = None,
+                 record_history: bool = True, log: Callable[[str], None] = print):
+        self.pool = pool
+        self.record_history = record_history
+        self.workers = workers
+        self.deployed_hashes = deployed_hashes or {}
+        self.log = log
+        self.results: Dict[str, List[Statement]] = {'executed': [], 'skipped': [], 'existing': [],
+                                                     'needs_migration': []}
+        self._lock = threading.Lock()
+
+    def should_skip(self, statement: Statement) -> Optional[str]:
+        previous = self.deployed_hashes.get(statement.key)
+        if previous is None:
+            return None
+        if previous == statement.source_hash:
+            return 'skipped'
+        if statement.object_type and statement.object_type not in REPLACEABLE_TYPES:
+            # Tables, sequences and indexes change through migrations
+            return 'needs_migration'
+        return None
+
+    def execute(self, statement: Statement):
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(statement.sql)
+            except Exception as e:
+                code = error_code(e)
+                if code in ALREADY_EXISTS_ERRORS and statement.object_type and \
+                        statement.object_type not in REPLACEABLE_TYPES:
+                    with self._lock:
+                        self.results['existing'].append(statement)
+                    if self.record_history:
+                        record_deployed(connection, [statement])
+                    return
+                raise DeploymentError(statement, str(e).strip()) from e
+
+            if statement.object_type in PLSQL_TYPES:
+                errors = self.compile_errors(cursor, statement)
+                if errors:
+                    # Left unrecorded so the invalid object is retried on the next run
+                    raise DeploymentError(statement, 'Compiled with errors:\n' +
+                                          '\n'.join(f"  {error}" for error in errors))
+            connection.commit()
+            cursor.close()
+            if self.record_history:
+                record_deployed(connection, [statement])
+
+        with self._lock:
+            self.results['executed'].append(statement)
+
+    @staticmethod
+    def compile_errors(cursor, statement: Statement) -> List[str]:
+        cursor.execute("""
+            SELECT line, position, text
+            FROM user_errors
+            WHERE name = :name AND type = :type
+            ORDER BY sequence
+        """, {'name': statement.object_name, 'type': statement.object_type})
+        return [f"line {line}, col {position}: {text.strip()}" for line, position, text in cursor.fetchall()]
+
+    def run(self, statements: List[Statement],
+            on_done: Optional[Callable[[Statement, str, float], None]] = None) -> Dict:
+        """Execute the graph; stops scheduling at the first failure and raises it"""
+        by_order = {s.order: s for s in statements}
+        pending = {s.order: {d for d in s.depends_on if d in by_order} for s in statements}
+        dependents: Dict[int, List[int]] = {}
+        for order, deps in pending.items():
+            for dep in deps:
+                dependents.setdefault(dep, []).append(order)
+
+        ready = sorted(o for o, deps in pending.items() if not deps)
+        waiting = set(pending) - set(ready)
+        failure: Optional[DeploymentError] = None
+        running = {}
+        start_time = time.time()
+
+        def finish(order: int):
+            for child in dependents.get(order, []):
+                pending[child].discard(order)
+                if not pending[child] and child in waiting:
+                    waiting.discard(child)
+                    ready.append(child)
+            ready.sort()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while (ready or running or waiting) and not failure:
+                while ready and len(running) < self.workers:
+                    order = ready.pop(0)
+                    statement = by_order[order]
+                    outcome = self.should_skip(statement)
+                    if outcome:
+                        with self._lock:
+                            self.results[outcome].append(statement)
+                        if on_done:
+                            on_done(statement, outcome, 0.0)
+                        finish(order)
+                        continue
+                    running[executor.submit(self._timed, statement)] = order
+
+                if not running:
+                    if waiting and not ready:
+                        # Dependency cycle: fall back to file order for what is left
+                        order = min(waiting)
+                        waiting.discard(order)
+                        self.log(f"⚠️ Dependency cycle at {by_order[order].label}; running in file order")
+                        pending[order] = set()
+                        ready.append(order)
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    order = running.pop(future)
+                    try:
+                        elapsed = future.result()
+                    except DeploymentError as e:
+                        failure = failure or e
+                        continue
+                    if on_done:
+                        existing = by_order[order] in self.results['existing']
+                        on_done(by_order[order], 'existing' if existing else 'executed', elapsed)
+                    finish(order)
+
+            # Let statements already running finish before reporting
+            for future in list(running):
+                try:
+                    future.result()
+                except DeploymentError:
+                    pass
+
+        if failure:
+            raise failure
+
+        return {
+            'executed': len(self.results['executed']),
+            'skipped': len(self.results['skipped']),
+            'existing': len(self.results['existing']),
+            'needs_migration': [s.key for s in self.results['needs_migration']],
+            'seconds': round(time.time() - start_time, 2)
+        }
+
+    def _timed(self, statement: Statement) -> float:
+        start_time = time.perf_counter()
+        self.execute(statement)
+        return time.perf_counter() - start_time
+
+
+# ---------------------------------------------------------------------------
+# Deployment history
+#
+# One row per deployed statement key with the hash of the source that was
+# last deployed, so unchanged objects can be skipped on the next run.
+# ---------------------------------------------------------------------------
+
+HISTORY_TABLE = 'schema_deploy_history'
+
+HISTORY_TABLE_DDL = f"""
+    CREATE TABLE {HISTORY_TABLE} (
+        object_key VARCHAR2(400) PRIMARY KEY,
+        object_type VARCHAR2(30),
+        object_name VARCHAR2(128),
+        source_file VARCHAR2(400),
+        source_hash VARCHAR2(64) NOT NULL,
+        deployed_date DATE DEFAULT SYSDATE NOT NULL,
+        deployed_by VARCHAR2(128) DEFAULT USER NOT NULL
+    )
+"""
+
+RECORD_DEPLOYED_SQL = f"""
+    MERGE INTO {HISTORY_TABLE} h
+    USING (SELECT :object_key as object_key FROM dual) src
+    ON (h.object_key = src.object_key)
+    WHEN MATCHED THEN UPDATE SET
+        h.source_hash = :source_hash,
+        h.source_file = :source_file,
+        h.deployed_date = SYSDATE,
+        h.deployed_by = USER
+    WHEN NOT MATCHED THEN INSERT (object_key, object_type, object_name, source_file, source_hash)
+    VALUES (:object_key, :object_type, :object_name, :source_file, :source_hash)
+"""
+
+
+def ensure_history_table(pool):
+    """Create the deployment history table on first use"""
+    rows = pool.query("SELECT COUNT(*) FROM user_tables WHERE table_name = UPPER(:name)",
+                      {'name': HISTORY_TABLE})
+    if rows[0][0] == 0:
+        with pool.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(HISTORY_TABLE_DDL)
+            cursor.close()
+
+
+def load_deployed_hashes(pool) -> Dict[str, str]:
+    """object_key -> source hash of the last deployment"""
+    return dict(pool.query(f"SELECT object_key, source_hash FROM {HISTORY_TABLE}"))
+
+
+def history_params(statement: Statement) -> Dict:
+    return {
+        'object_key': statement.key,
+        'object_type': statement.object_type,
+        'object_name': statement.object_name,
+        'source_file': statement.file,
+        'source_hash': statement.source_hash
+    }
+
+
+def record_deployed(connection, statements: List[Statement]):
+    """Store the deployed hashes for statements"""
+    if not statements:
+        return
+    cursor = connection.cursor()
+    cursor.executemany(RECORD_DEPLOYED_SQL, [history_params(s) for s in statements])
+    connection.commit()
+    cursor.close()
+
+
+def recompile_invalid(pool) -> List[Tuple[str, str]]:
+    """Recompile invalid objects in dependency order; returns those still invalid"""
+    with pool.connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute("BEGIN DBMS_UTILITY.COMPILE_SCHEMA(schema => USER, compile_all => FALSE); END;")
+        cursor.close()
+    return pool.query("""
+        SELECT object_type, object_name
+        FROM user_objects
+        WHERE status = 'INVALID'
+        ORDER BY object_type, object_name
+    """)
+
+
+# ---------------------------------------------------------------------------
+# Migration ledger
+#
+# Versioned migrations (database/migrations/NNN_*.sql) run once each and are
+# checksummed so later edits are detected. Repeatable scripts (views,
+# packages, triggers) are recorded by checksum and only re-run when they
+# change, and then only for objects whose compiled source differs. Work a
+# migration needs the redeployed packages for lives in a companion
+# NNN_*.post.sql, run once after the repeatable scripts.
+# ---------------------------------------------------------------------------
+
+MIGRATIONS_TABLE = 'schema_migrations'
+
+MIGRATIONS_TABLE_DDL = f"""
+    CREATE TABLE {MIGRATIONS_TABLE} (
+        script VARCHAR2(400) PRIMARY KEY,
+        migration_type VARCHAR2(10) NOT NULL CHECK (migration_type IN ('VERSIONED', 'REPEATABLE')),
+        version VARCHAR2(20),
+        description VARCHAR2(200),
+        checksum VARCHAR2(64) NOT NULL,
+        execution_ms NUMBER,
+        objects_replaced NUMBER,
+        applied_date DATE DEFAULT SYSDATE NOT NULL,
+        applied_by VARCHAR2(128) DEFAULT USER NOT NULL
+    )
+"""
+
+RECORD_MIGRATION_SQL = f"""
+    MERGE INTO {MIGRATIONS_TABLE} m
+    USING (SELECT :script as script FROM dual) src
+    ON (m.script = src.script)
+    WHEN MATCHED THEN UPDATE SET
+        m.checksum = :checksum,
+        m.execution_ms = :execution_ms,
+        m.objects_replaced = :objects_replaced,
+        m.applied_date = SYSDATE,
+        m.applied_by = USER
+    WHEN NOT MATCHED THEN INSERT (script, migration_type, version, description, checksum,
+                                  execution_ms, objects_replaced)
+    VALUES (:script, :migration_type, :version, :description, :checksum,
+            :execution_ms, :objects_replaced)
+"""
+
+MIGRATION_FILE = re.compile(r'^(\d+)_(\w+)\.sql$')
+POST_DEPLOY_SUFFIX = '.post.sql'
+
+VIEW_QUERY = re.compile(
+    r'^\s*CREATE\s+(?:OR\s+REPLACE\s+)?(?:(?:NO)?FORCE\s+)?(?:(?:NON)?EDITIONABLE\s+)?VIEW\s+\S+\s*'
+    r'(?:\([^)]*\)\s*)?AS\s+(.*)$', re.IGNORECASE | re.DOTALL)
+
+CREATE_PREFIX = re.compile(r'^\s*CREATE\s+(?:OR\s+REPLACE\s+)?(?:(?:NON)?EDITIONABLE\s+)?', re.IGNORECASE)
+
+
+def file_checksum(path: Path) -> str:
+    """sha256 of a script, ignoring line endings and trailing whitespace"""
+    normalized = '\n'.join(l.rstrip() for l in path.read_text().splitlines()).strip()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def discover_migrations(directory: Path) -> List[Tuple[str, str, Path]]:
+    """(version, description, path) for each NNN_name.sql, in version order"""
+    migrations = []
+    for path in directory.glob('*.sql'):
+        match = MIGRATION_FILE.match(path.name)
+        if match:
+            migrations.append((match.group(1), match.group(2).replace('_', ' '), path))
+    return sorted(migrations, key=lambda m: int(m[0]))
+
+
+def post_deploy_script(path: Path) -> Optional[Path]:
+    """The NNN_name.post.sql companion of a migration, if it has one"""
+    companion = path.with_name(path.stem + POST_DEPLOY_SUFFIX)
+    return companion if companion.exists() else None
+
+
+def ensure_migrations_table(pool):
+    """Create the migration ledger on first use"""
+    rows = pool.query("SELECT COUNT(*) FROM user_tables WHERE table_name = UPPER(:name)",
+                      {'name': MIGRATIONS_TABLE})
+    if rows[0][0] == 0:
+        with pool.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(MIGRATIONS_TABLE_DDL)
+            cursor.close()
+
+
+def load_ledger(pool) -> Dict[str, Dict]:
+    """script -> ledger row"""
+    rows = pool.query(f"""
+        SELECT script, migration_type, version, checksum, applied_date
+        FROM {MIGRATIONS_TABLE}
+    """)
+    return {row[0]: {'type': row[1], 'version': row[2], 'checksum': row[3], 'applied_date': row[4]}
+            for row in rows}
+
+
+def record_migration(connection, script: str, migration_type: str, checksum: str,
+                     version: Optional[str] = None, description: Optional[str] = None,
+                     execution_ms: Optional[int] = None, objects_replaced: Optional[int] = None):
+    cursor = connection.cursor()
+    cursor.execute(RECORD_MIGRATION_SQL, {
+        'script': script,
+        'migration_type': migration_type,
+        'version': version,
+        'description': description,
+        'checksum': checksum,
+        'execution_ms': execution_ms,
+        'objects_replaced': objects_replaced
+    })
+    connection.commit()
+    cursor.close()
+
+
+def _squash(text: str) -> str:
+    return ' '.join(text.split())
+
+
+def source_unchanged(cursor, statement: Statement) -> bool:
+    """True when the object is VALID and its stored source matches the statement.
+
+    PL/SQL is compared with user_source, views with user_views; whitespace
+    differences are ignored. Other statement types always report changed.
+    """
+    if statement.object_type in PLSQL_TYPES:
+        cursor.execute("""
+            SELECT status FROM user_objects
+            WHERE object_name = :name AND object_type = :type
+        """, {'name': statement.object_name, 'type': statement.object_type})
+        row = cursor.fetchone()
+        if not row or row[0] != 'VALID':
+            return False
+        cursor.execute("""
+            SELECT text FROM user_source
+            WHERE name = :name AND type = :type
+            ORDER BY line
+        """, {'name': statement.object_name, 'type': statement.object_type})
+        stored = ''.join(line for (line,) in cursor.fetchall())
+        return _squash(stored) == _squash(CREATE_PREFIX.sub('', statement.sql, count=1))
+
+    if statement.object_type == 'VIEW':
+        query = VIEW_QUERY.match(statement.sql)
+        if not query:
+            return False
+        cursor.execute("""
+            SELECT v.text FROM user_views v
+            JOIN user_objects o ON o.object_name = v.view_name AND o.object_type = 'VIEW'
+            WHERE v.view_name = :name AND o.status = 'VALID'
+        """, {'name': statement.object_name})
+        row = cursor.fetchone()
+        return bool(row) and _squash(row[0] or '') == _squash(query.group(1))
+
+    return False
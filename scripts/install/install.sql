@@ -66,6 +66,18 @@ PROMPT Appointment management package created.
 @@../packages/pkg_clinical_trials_mgmt.sql
 
 PROMPT Clinical trials management package created.
+
+@@../packages/pkg_reporting_mgmt.sql
+
+PROMPT Reporting package created.
+
+@@../packages/pkg_audit_mgmt.sql
+
+PROMPT Audit capture package created.
+
+@@../packages/pkg_notification_mgmt.sql
+
+PROMPT Notification outbox package created.
 PROMPT
 
 -- 6. Create triggers
@@ -79,6 +91,18 @@ PROMPT Triggers created successfully.
 PROMPT Clinical trials triggers created successfully.
 PROMPT
 
+-- Backfill derived columns for sample rows loaded before the triggers existed
+@@../migrations/001_appointment_start_end_ts.sql
+@@../migrations/005_patient_search_index.sql
+@@../migrations/005_patient_search_index.post.sql
+
+-- Background refresh jobs for precomputed reporting tables
+PROMPT Scheduling background jobs...
+@@../jobs/scheduler_jobs.sql
+
+PROMPT Background jobs scheduled.
+PROMPT
+
 -- 7. Grant permissions (adjust as needed for your environment)
 PROMPT 7. Setting up permissions...
 
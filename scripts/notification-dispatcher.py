@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Healthcare System - Notification Dispatcher
+Delivers the system_notifications outbox in priority order with concurrent senders
+"""
+
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from healthcare_db import DatabaseUnavailable, create_pool, load_config
+from healthcare_outbound import OutboundMessage, SendError, create_sender
+from healthcare_perf import summarize_latencies
+
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_CONCURRENCY = 8
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_DELAY = 30.0
+MAX_RETRY_DELAY = 3600.0
+DEFAULT_INTERVAL = 5.0
+
+# Served by idx_notifications_dispatch (status, priority, created_date).
+# SKIP LOCKED locks rows as they are fetched, so concurrent dispatchers each
+# claim a different batch. age is measured on the database clock.
+CLAIM_SQL = """
+    SELECT notification_id, notification_type, recipient_email, subject, message,
+           retry_count, SYSTIMESTAMP - created_date as age
+    FROM system_notifications
+    WHERE status = 'PENDING'
+      AND next_attempt_date <= SYSTIMESTAMP
+    ORDER BY priority, created_date
+    FOR UPDATE SKIP LOCKED
+"""
+
+RESULT_SQL = """
+    UPDATE system_notifications
+    SET status = :status,
+        retry_count = retry_count + :failed,
+        last_error = :last_error,
+        next_attempt_date = SYSTIMESTAMP + NUMTODSINTERVAL(:retry_delay, 'SECOND'),
+        delivered_date = CASE WHEN :status = 'SENT' THEN SYSTIMESTAMP END
+    WHERE notification_id = :notification_id
+"""
+
+
+def seconds(value) -> float:
+    """INTERVAL DAY TO SECOND columns come back as timedelta"""
+    if value is None:
+        return 0.0
+    return value.total_seconds() if hasattr(value, 'total_seconds') else float(value)
+
+
+class NotificationDispatcher:
+    """Claims due notifications a batch at a time and delivers each batch concurrently.
+
+    Senders are created per delivery thread, since an SMTP connection cannot
+    be shared between threads. Every outcome is written back with the batch:
+    SENT with its delivery time, PENDING with a backed-off next attempt, or
+    FAILED once attempts run out or the error is permanent.
+    """
+
+    def __init__(self, pool, config: Dict, sender_name: Optional[str] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, concurrency: int = DEFAULT_CONCURRENCY,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS, retry_delay: float = DEFAULT_RETRY_DELAY):
+        self.pool = pool
+        self.config = config
+        self.sender_name = sender_name
+        self.batch_size = batch_size
+        self.concurrency = max(concurrency, 1)
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.team_email = config.get('outbound', {}).get('team_email') or None
+
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='notify')
+        self._local = threading.local()
+        self._senders = []
+        self._lock = threading.Lock()
+
+        self.totals = {'sent': 0, 'retry': 0, 'failed': 0, 'batches': 0}
+        self.failures_by_type: Dict[str, int] = {}
+        self.latencies: List[float] = []
+
+    def sender(self):
+        sender = getattr(self._local, 'sender', None)
+        if sender is None:
+            sender = create_sender(self.config, self.sender_name)
+            self._local.sender = sender
+            with self._lock:
+                self._senders.append(sender)
+        return sender
+
+    def to_message(self, row: Tuple) -> OutboundMessage:
+        notification_id, notification_type, recipient, subject, body = row[:5]
+        recipient = recipient or self.team_email
+        # Without an investigator address the alert goes to the team channel
+        return OutboundMessage('EMAIL' if recipient else 'TEAM', recipient, subject, body or '',
+                               reference=f"{notification_type}:{notification_id}")
+
+    def deliver(self, row: Tuple) -> Optional[str]:
+        """None when delivered, otherwise the error; permanent errors are prefixed"""
+        try:
+            self.sender().send(self.to_message(row))
+            return None
+        except SendError as e:
+            return f"permanent: {e}" if e.permanent else str(e)
+        except Exception as e:
+            # A sender bug must not lose the notification; retry it like a transient error
+            return f"{type(e).__name__}: {e}"
+
+    def outcome(self, row: Tuple, error: Optional[str], claimed_age: float, claimed_at: float,
+                finished_at: float) -> Dict:
+        """Bind values for RESULT_SQL"""
+        notification_id, notification_type, retry_count = row[0], row[1], row[5] or 0
+        if error is None:
+            self.totals['sent'] += 1
+            self.latencies.append(claimed_age + (finished_at - claimed_at))
+            return {'status': 'SENT', 'failed': 0, 'last_error': None, 'retry_delay': 0,
+                    'notification_id': notification_id}
+
+        self.failures_by_type[notification_type] = self.failures_by_type.get(notification_type, 0) + 1
+        exhausted = error.startswith('permanent: ') or retry_count + 1 >= self.max_attempts
+        self.totals['failed' if exhausted else 'retry'] += 1
+        retry_delay = min(self.retry_delay * (2 ** retry_count), MAX_RETRY_DELAY)
+        return {'status': 'FAILED' if exhausted else 'PENDING', 'failed': 1, 'last_error': error[:1000],
+                'retry_delay': retry_delay, 'notification_id': notification_id}
+
+    def dispatch_batch(self) -> int:
+        """Claim, deliver and record one batch; returns the notifications claimed"""
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            cursor.arraysize = self.batch_size
+            try:
+                cursor.execute(CLAIM_SQL)
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    connection.rollback()
+                    return 0
+
+                claimed_at = time.monotonic()
+                futures = [self.executor.submit(self.deliver, row) for row in rows]
+                results = []
+                for row, future in zip(rows, futures):
+                    error = future.result()
+                    results.append(self.outcome(row, error, seconds(row[6]), claimed_at, time.monotonic()))
+
+                cursor.executemany(RESULT_SQL, results)
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            finally:
+                cursor.close()
+
+        self.totals['batches'] += 1
+        return len(rows)
+
+    def run(self, max_batches: int = 0) -> Dict:
+        """Deliver until nothing is due; notifications backed off for retry wait for a later pass"""
+        batches = 0
+        while not max_batches or batches < max_batches:
+            claimed = self.dispatch_batch()
+            batches += 1
+            if claimed < self.batch_size:
+                break
+        return self.totals
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        for sender in self._senders:
+            sender.close()
+
+
+def print_summary(dispatcher: NotificationDispatcher, elapsed: float):
+    totals = dispatcher.totals
+    latency = summarize_latencies(dispatcher.latencies)
+    print(f"✅ Delivered: {totals['sent']:,}")
+    print(f"🔁 Retry scheduled: {totals['retry']:,}")
+    print(f"❌ Failed: {totals['failed']:,}")
+    for notification_type, count in sorted(dispatcher.failures_by_type.items()):
+        print(f"   {notification_type}: {count:,} failed attempt(s)")
+    if latency['count']:
+        print(f"📬 Event-to-delivery latency: p50 {latency['p50_ms'] / 1000:.1f}s, "
+              f"p95 {latency['p95_ms'] / 1000:.1f}s, max {latency['max_ms'] / 1000:.1f}s")
+    print(f"⏱️ {totals['batches']} batch(es) in {elapsed:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Deliver Healthcare System staff notifications')
+    parser.add_argument('--environment', '-e', default='dev', help='Environment to deliver from')
+    parser.add_argument('--config-file', help='Configuration file path')
+    parser.add_argument('--batch-size', '-b', type=int, default=DEFAULT_BATCH_SIZE,
+                       help='Notifications claimed and recorded together')
+    parser.add_argument('--concurrency', '-c', type=int, default=DEFAULT_CONCURRENCY,
+                       help='Notifications of a batch delivered at the same time')
+    parser.add_argument('--max-batches', type=int, default=0, help='Stop after this many batches (0 = until empty)')
+    parser.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS,
+                       help='Delivery attempts before a notification is marked FAILED')
+    parser.add_argument('--retry-delay', type=float, default=DEFAULT_RETRY_DELAY,
+                       help='Seconds before the first retry; doubles with each failed attempt')
+    parser.add_argument('--sender', help='log, smtp, webhook or module:Class (default: outbound.sender in the config)')
+    parser.add_argument('--loop', action='store_true', help='Keep polling the outbox')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                       help='Seconds between polls with --loop')
+
+    args = parser.parse_args()
+
+    config = load_config(args.environment, args.config_file)
+    try:
+        create_sender(config, args.sender).close()
+    except (ValueError, ImportError, AttributeError) as e:
+        print(f"❌ {e}")
+        return 1
+
+    try:
+        pool = create_pool(config, min=1, max=1)
+    except DatabaseUnavailable as e:
+        print(f"❌ {e}")
+        return 2
+
+    print(f"📣 Notification dispatcher - {args.environment.upper()} "
+          f"(batch size {args.batch_size:,}, {args.concurrency} concurrent)")
+    dispatcher = NotificationDispatcher(pool, config, args.sender, args.batch_size, args.concurrency,
+                                        args.max_attempts, args.retry_delay)
+    start_time = time.time()
+    try:
+        while True:
+            dispatcher.run(args.max_batches)
+            if not args.loop:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        dispatcher.close()
+        pool.close()
+
+    print_summary(dispatcher, time.time() - start_time)
+    return 1 if dispatcher.totals['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
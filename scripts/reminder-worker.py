@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Healthcare System - Reminder Worker
+Sends PENDING appointment reminders queued by pkg_appointment_mgmt.queue_appointment_reminders
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from healthcare_db import DatabaseUnavailable, create_pool, load_config
+from healthcare_outbound import OutboundMessage, SendError, create_sender
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_INTERVAL = 60.0
+REMINDER_SUBJECT = 'Appointment reminder'
+
+# Rows locked by another worker are skipped rather than waited for, so
+# several workers can drain the queue side by side. With SKIP LOCKED only
+# the fetched rows are locked, so each batch claims batch-size reminders.
+SELECT_PENDING_SQL = """
+    SELECT reminder_id, appointment_id, reminder_type, recipient_email, recipient_phone, message,
+           attempt_count
+    FROM appointment_reminders
+    WHERE status = 'PENDING'
+      AND reminder_id > :after_id
+    ORDER BY reminder_id
+    FOR UPDATE SKIP LOCKED
+"""
+
+UPDATE_RESULT_SQL = """
+    UPDATE appointment_reminders
+    SET status = :status,
+        sent_date = :sent_date,
+        attempt_count = attempt_count + 1,
+        last_error = :last_error
+    WHERE reminder_id = :reminder_id
+"""
+
+
+def read_text(value) -> str:
+    """CLOB columns come back as LOB locators"""
+    if value is None:
+        return ''
+    return value.read() if hasattr(value, 'read') else str(value)
+
+
+class ReminderWorker:
+    """Claims a batch of PENDING reminders, sends them and records the outcome in one transaction"""
+
+    def __init__(self, pool, sender, batch_size: int = DEFAULT_BATCH_SIZE,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.pool = pool
+        self.sender = sender
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.totals = {'sent': 0, 'retry': 0, 'failed': 0, 'batches': 0}
+
+    def to_message(self, row: Tuple) -> OutboundMessage:
+        reminder_id, appointment_id, reminder_type, email, phone, body, attempt_count = row
+        channel = (reminder_type or 'EMAIL').upper()
+        recipient = email if channel == 'EMAIL' else phone
+        return OutboundMessage(channel, recipient, REMINDER_SUBJECT, read_text(body),
+                               reference=f"appointment:{appointment_id}")
+
+    def send_batch(self, after_id: int) -> Tuple[int, int]:
+        """(rows processed, last reminder_id) for one batch after after_id"""
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            cursor.arraysize = self.batch_size
+            try:
+                cursor.execute(SELECT_PENDING_SQL, {'after_id': after_id})
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    connection.rollback()
+                    return 0, after_id
+
+                results: List[Dict] = [self.deliver(row) for row in rows]
+
+                cursor.executemany(UPDATE_RESULT_SQL, results)
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            finally:
+                cursor.close()
+
+        self.totals['batches'] += 1
+        return len(rows), rows[-1][0]
+
+    def deliver(self, row: Tuple) -> Dict:
+        """Bind values for UPDATE_RESULT_SQL after trying to send one reminder"""
+        reminder_id, previous_attempts = row[0], row[6] or 0
+        try:
+            self.sender.send(self.to_message(row))
+        except Exception as e:
+            # Transient failures stay PENDING for the next pass until attempts run out.
+            # Anything other than SendError (a sender bug) is treated as transient too,
+            # so the rest of the batch is still recorded and not sent again.
+            permanent = isinstance(e, SendError) and e.permanent
+            exhausted = permanent or previous_attempts + 1 >= self.max_attempts
+            status = 'FAILED' if exhausted else 'PENDING'
+            self.totals['failed' if exhausted else 'retry'] += 1
+            error = str(e) if isinstance(e, SendError) else f"{type(e).__name__}: {e}"
+            return {'status': status, 'sent_date': None, 'last_error': error[:1000],
+                    'reminder_id': reminder_id}
+
+        self.totals['sent'] += 1
+        return {'status': 'SENT', 'sent_date': datetime.now(), 'last_error': None, 'reminder_id': reminder_id}
+
+    def run(self, max_batches: int = 0) -> Dict:
+        """Work through the queue once; reminders left PENDING are retried on the next run"""
+        after_id = 0
+        batches = 0
+        while not max_batches or batches < max_batches:
+            processed, after_id = self.send_batch(after_id)
+            batches += 1
+            if processed < self.batch_size:
+                break
+        return self.totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Send queued Healthcare System appointment reminders')
+    parser.add_argument('--environment', '-e', default='dev', help='Environment to send from')
+    parser.add_argument('--config-file', help='Configuration file path')
+    parser.add_argument('--batch-size', '-b', type=int, default=DEFAULT_BATCH_SIZE,
+                       help='Reminders claimed, sent and committed together')
+    parser.add_argument('--max-batches', type=int, default=0, help='Stop after this many batches (0 = until empty)')
+    parser.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS,
+                       help='Attempts before a reminder is marked FAILED')
+    parser.add_argument('--sender', help='log, smtp, webhook or module:Class (default: outbound.sender in the config)')
+    parser.add_argument('--loop', action='store_true', help='Keep polling for new reminders')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                       help='Seconds between passes with --loop')
+
+    args = parser.parse_args()
+
+    config = load_config(args.environment, args.config_file)
+    try:
+        sender = create_sender(config, args.sender)
+    except (ValueError, ImportError, AttributeError) as e:
+        print(f"❌ {e}")
+        return 1
+
+    try:
+        pool = create_pool(config, min=1, max=1)
+    except DatabaseUnavailable as e:
+        print(f"❌ {e}")
+        return 2
+
+    print(f"🔔 Reminder worker - {args.environment.upper()} ({sender.name} sender, batch size {args.batch_size:,})")
+    worker = ReminderWorker(pool, sender, args.batch_size, args.max_attempts)
+    start_time = time.time()
+    try:
+        while True:
+            totals = worker.run(args.max_batches)
+            if not args.loop:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        totals = worker.totals
+    finally:
+        sender.close()
+        pool.close()
+
+    print(f"✅ Sent: {totals['sent']:,}")
+    print(f"🔁 Retry later: {totals['retry']:,}")
+    print(f"❌ Failed: {totals['failed']:,}")
+    print(f"⏱️ {totals['batches']} batch(es) in {time.time() - start_time:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Healthcare System - Risk Profiles
+Rebuilds patient_risk_profile and checks it against a fresh calculation
+"""
+
+import argparse
+import sys
+import time
+
+from healthcare_db import DatabaseUnavailable, create_pool, load_config
+
+REBUILD_SQL = "BEGIN pkg_patient_mgmt.rebuild_risk_profiles; END;"
+
+DRIFT_SUMMARY_SQL = """
+    SELECT issue, COUNT(*)
+    FROM v_patient_risk_drift
+    GROUP BY issue
+    ORDER BY issue
+"""
+
+DRIFT_SAMPLE_SQL = """
+    SELECT patient_id, issue, stored_risk_score, expected_risk_score, refreshed_date
+    FROM v_patient_risk_drift
+    ORDER BY issue, patient_id
+    FETCH FIRST :sample_size ROWS ONLY
+"""
+
+QUEUE_SQL = """
+    SELECT COUNT(*), ROUND((SYSDATE - CAST(MIN(queued_ts) AS DATE)) * 86400)
+    FROM patient_risk_queue
+"""
+
+# Recalculates only the drifted patients now; any held by another transaction are queued
+REPAIR_SQL = """
+    DECLARE
+        l_ids SYS.ODCINUMBERLIST;
+    BEGIN
+        SELECT patient_id BULK COLLECT INTO l_ids FROM v_patient_risk_drift;
+        pkg_patient_mgmt.recalculate_risk_profiles(l_ids);
+        COMMIT;
+        :repaired := l_ids.COUNT;
+    END;
+"""
+
+
+def rebuild(pool) -> int:
+    start_time = time.time()
+    with pool.connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute(REBUILD_SQL)
+        cursor.close()
+    print(f"✅ Rebuilt patient risk profiles in {time.time() - start_time:.1f}s")
+    return 0
+
+
+def check(pool, repair: bool = False, sample_size: int = 20) -> int:
+    with pool.connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute(QUEUE_SQL)
+        queued, oldest_seconds = cursor.fetchone()
+        if queued:
+            print(f"⏳ {queued:,} patient(s) queued for recalculation, oldest {oldest_seconds:,}s ago")
+
+        cursor.execute(DRIFT_SUMMARY_SQL)
+        drift = dict(cursor.fetchall())
+
+        if not drift:
+            cursor.close()
+            print("✅ patient_risk_profile matches v_patient_risk_factors")
+            return 0
+
+        print(f"⚠️ {sum(drift.values()):,} patient(s) out of step:")
+        for issue, count in drift.items():
+            print(f"   {issue}: {count:,}")
+
+        cursor.execute(DRIFT_SAMPLE_SQL, {'sample_size': sample_size})
+        for patient_id, issue, stored, expected, refreshed in cursor.fetchall():
+            print(f"   patient {patient_id}: {issue} (stored {stored}, expected {expected}, "
+                  f"refreshed {refreshed})")
+
+        if not repair:
+            cursor.close()
+            return 1
+
+        repaired = cursor.var(int)
+        cursor.execute(REPAIR_SQL, {'repaired': repaired})
+        print(f"🔧 Recalculated {repaired.getvalue() or 0:,} profile(s)")
+
+        cursor.execute(DRIFT_SUMMARY_SQL)
+        remaining = sum(count for _, count in cursor.fetchall())
+        cursor.close()
+
+    if remaining:
+        print(f"❌ {remaining:,} patient(s) still out of step")
+        return 1
+    print("✅ patient_risk_profile repaired")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Maintain Healthcare System patient risk profiles')
+    parser.add_argument('command', choices=['rebuild', 'check'],
+                       help='rebuild: recompute every profile; check: compare profiles with a fresh calculation')
+    parser.add_argument('--environment', '-e', default='dev', help='Environment to use')
+    parser.add_argument('--config-file', help='Configuration file path')
+    parser.add_argument('--repair', action='store_true', help='With check, recalculate the patients that drifted')
+    parser.add_argument('--sample-size', type=int, default=20, help='Drifted patients listed by check')
+
+    args = parser.parse_args()
+
+    config = load_config(args.environment, args.config_file)
+    try:
+        pool = create_pool(config, min=1, max=1)
+    except DatabaseUnavailable as e:
+        print(f"❌ {e}")
+        return 2
+
+    print(f"🩺 Patient risk profiles - {args.environment.upper()}")
+    try:
+        if args.command == 'rebuild':
+            return rebuild(pool)
+        return check(pool, args.repair, args.sample_size)
+    finally:
+        pool.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Healthcare System - Migration Runner
+Applies new versioned migrations and only the changed views, packages,
+triggers and jobs, then the post-deploy steps of the new migrations,
+recording a checksum for each script in the schema_migrations ledger
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from healthcare_db import DatabaseUnavailable, create_pool, load_config
+from healthcare_schema import (
+    ALREADY_EXISTS_ERRORS,
+    PLSQL_TYPES,
+    REPLACEABLE_TYPES,
+    SchemaDeployer,
+    build_graph,
+    discover_migrations,
+    ensure_migrations_table,
+    error_code,
+    file_checksum,
+    load_ledger,
+    parse_script,
+    post_deploy_script,
+    recompile_invalid,
+    record_migration,
+    source_unchanged,
+)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+MIGRATIONS_DIR = BASE_DIR / 'database' / 'migrations'
+
+# Re-runnable object scripts, in deployment order
+REPEATABLE_SCRIPTS = [
+    'database/schema/03_views.sql',
+    'database/packages/pkg_patient_mgmt.sql',
+    'database/packages/pkg_appointment_mgmt.sql',
+    'database/packages/pkg_reporting_mgmt.sql',
+    'database/packages/pkg_clinical_trials_mgmt.sql',
+    'database/packages/pkg_audit_mgmt.sql',
+    'database/packages/pkg_notification_mgmt.sql',
+    'database/triggers/triggers.sql',
+    'database/triggers/clinical_trials_triggers.sql',
+    # Last: jobs run their first refresh against the tables and packages above
+    'database/jobs/scheduler_jobs.sql',
+]
+
+# Exit status when the schema has never been installed (deploy-database.sh
+# runs a full deployment instead)
+SCHEMA_NOT_INSTALLED = 3
+
+
+def relative(path: Path) -> str:
+    return str(path.resolve().relative_to(BASE_DIR))
+
+
+def post_deploy_steps(migrations):
+    """(version, description, path) of each migration's post-deploy companion"""
+    for version, description, path in migrations:
+        post = post_deploy_script(path)
+        if post:
+            yield version, f"{description} (post-deploy)", post
+
+
+def with_post_deploy(migrations):
+    return list(migrations) + list(post_deploy_steps(migrations))
+
+
+def print_server_output(cursor):
+    """Echo DBMS_OUTPUT lines written by the last statement"""
+    line_var = cursor.var(str)
+    status_var = cursor.var(int)
+    while True:
+        cursor.callproc('dbms_output.get_line', [line_var, status_var])
+        if status_var.getvalue() != 0:
+            break
+        print(f"     {line_var.getvalue() or ''}")
+
+
+class MigrationRunner:
+    """Applies pending versioned migrations and changed repeatable scripts"""
+
+    def __init__(self, pool, dry_run: bool = False, force: bool = False, repair: bool = False):
+        self.pool = pool
+        self.dry_run = dry_run
+        self.force = force
+        self.repair = repair
+        self.ledger = load_ledger(pool)
+        self.summary = {'applied': 0, 'up_to_date': 0, 'replaced': 0, 'unchanged_objects': 0}
+
+    def check_applied(self, migrations) -> bool:
+        """Applied migrations must not have been edited since"""
+        ok = True
+        for version, description, path in with_post_deploy(migrations):
+            entry = self.ledger.get(relative(path))
+            checksum = file_checksum(path)
+            if entry and entry['checksum'] != checksum:
+                if self.repair:
+                    print(f"⚠️ Accepting new checksum for applied migration {path.name}")
+                    if not self.dry_run:
+                        with self.pool.connection() as connection:
+                            record_migration(connection, relative(path), 'VERSIONED', checksum,
+                                             version, description)
+                else:
+                    print(f"❌ Migration {path.name} changed after it was applied on "
+                          f"{entry['applied_date']}; add a new migration instead (or --repair)")
+                    ok = False
+        return ok
+
+    def apply_versioned(self, version: str, description: str, path: Path):
+        """Run a migration, or a post-deploy step, once"""
+        script = relative(path)
+        if script in self.ledger:
+            self.summary['up_to_date'] += 1
+            return
+
+        statements = parse_script(path, BASE_DIR)
+        print(f"▶️ Migration {version}: {description} ({len(statements)} statements)")
+        if self.dry_run:
+            return
+
+        start_time = time.time()
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            cursor.callproc('dbms_output.enable', [None])
+            for statement in statements:
+                try:
+                    cursor.execute(statement.sql)
+                except Exception:
+                    print(f"❌ Failed at {statement.location}")
+                    print(statement.sql.strip())
+                    raise
+                print_server_output(cursor)
+            connection.commit()
+            cursor.close()
+            elapsed_ms = int((time.time() - start_time) * 1000)
+            record_migration(connection, script, 'VERSIONED', file_checksum(path), version, description,
+                             execution_ms=elapsed_ms)
+
+        self.summary['applied'] += 1
+        print(f"✅ Migration {version} applied in {elapsed_ms} ms")
+
+    def apply_repeatable(self, path: Path):
+        script = relative(path)
+        checksum = file_checksum(path)
+        entry = self.ledger.get(script)
+        if entry and entry['checksum'] == checksum and not self.force:
+            self.summary['up_to_date'] += 1
+            return
+
+        statements = build_graph(parse_script(path, BASE_DIR))
+        start_time = time.time()
+        replaced = 0
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            for statement in statements:
+                if statement.object_type in REPLACEABLE_TYPES and not self.force and \
+                        source_unchanged(cursor, statement):
+                    self.summary['unchanged_objects'] += 1
+                    continue
+
+                if statement.object_type in REPLACEABLE_TYPES:
+                    print(f"  🔄 {statement.label} ({statement.location})")
+                if self.dry_run:
+                    continue
+
+                try:
+                    cursor.execute(statement.sql)
+                except Exception as e:
+                    if error_code(e) in ALREADY_EXISTS_ERRORS and statement.object_type not in REPLACEABLE_TYPES:
+                        continue
+                    print(f"❌ Failed at {statement.location}")
+                    print(statement.sql.strip())
+                    raise
+
+                if statement.object_type in REPLACEABLE_TYPES:
+                    replaced += 1
+                if statement.object_type in PLSQL_TYPES:
+                    for error in SchemaDeployer.compile_errors(cursor, statement):
+                        print(f"     ⚠️ {error}")
+
+            connection.commit()
+            cursor.close()
+            if not self.dry_run:
+                record_migration(connection, script, 'REPEATABLE', checksum,
+                                 execution_ms=int((time.time() - start_time) * 1000),
+                                 objects_replaced=replaced)
+
+        self.summary['replaced'] += replaced
+        if not self.dry_run:
+            print(f"✅ {script}: {replaced} object(s) replaced")
+
+    def baseline(self, migrations, up_to: str):
+        """Record versioned migrations up to a version as applied without running them"""
+        with self.pool.connection() as connection:
+            for version, description, path in with_post_deploy(migrations):
+                if int(version) <= int(up_to) and relative(path) not in self.ledger:
+                    record_migration(connection, relative(path), 'VERSIONED', file_checksum(path),
+                                     version, description)
+                    print(f"📌 Baselined migration {version}: {description}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply Healthcare System schema migrations incrementally')
+    parser.add_argument('--environment', '-e', default='dev', help='Environment to migrate')
+    parser.add_argument('--config-file', help='Configuration file path')
+    parser.add_argument('--dry-run', action='store_true', help='Show what would be applied without changing anything')
+    parser.add_argument('--force', action='store_true',
+                       help='Re-run every repeatable script and replace every object')
+    parser.add_argument('--repair', action='store_true',
+                       help='Accept edited checksums of already applied migrations')
+    parser.add_argument('--baseline', metavar='VERSION',
+                       help='Mark migrations up to VERSION as applied without running them')
+    parser.add_argument('--versioned-only', action='store_true',
+                       help='Skip the repeatable object scripts and the post-deploy steps that need them')
+
+    args = parser.parse_args()
+
+    config = load_config(args.environment, args.config_file)
+    try:
+        pool = create_pool(config, min=1, max=1)
+    except DatabaseUnavailable as e:
+        print(f"❌ {e}")
+        return 2
+
+    try:
+        if not pool.query("SELECT COUNT(*) FROM user_tables WHERE table_name = 'PATIENTS'")[0][0]:
+            print("❌ Healthcare schema is not installed; run a full deploy (FULL_DEPLOY=true) or deploy-schema.py first")
+            return SCHEMA_NOT_INSTALLED
+
+        ensure_migrations_table(pool)
+        runner = MigrationRunner(pool, dry_run=args.dry_run, force=args.force, repair=args.repair)
+        migrations = discover_migrations(MIGRATIONS_DIR)
+
+        if args.baseline:
+            runner.baseline(migrations, args.baseline)
+            return 0
+
+        if not runner.check_applied(migrations):
+            return 1
+
+        start_time = time.time()
+        # Migrations only change structure and data that need no packages, so
+        # they all run against the objects already deployed. The repeatable
+        # scripts follow, then the post-deploy steps that call into them.
+        try:
+            for version, description, path in migrations:
+                runner.apply_versioned(version, description, path)
+            if not args.versioned_only:
+                for script in REPEATABLE_SCRIPTS:
+                    runner.apply_repeatable(BASE_DIR / script)
+                for version, description, path in post_deploy_steps(migrations):
+                    runner.apply_versioned(version, description, path)
+        except Exception as e:
+            print(f"\n{e}")
+            return 1
+
+        if runner.summary['applied'] or runner.summary['replaced']:
+            invalid = recompile_invalid(pool)
+            for object_type, object_name in invalid:
+                print(f"⚠️ Invalid after migration: {object_type} {object_name}")
+
+        summary = runner.summary
+        prefix = 'Would apply' if args.dry_run else 'Applied'
+        print(f"\n📊 {prefix} {summary['applied']} migration(s), replaced {summary['replaced']} object(s); "
+              f"{summary['unchanged_objects']} object(s) unchanged, {summary['up_to_date']} script(s) up to date "
+              f"({time.time() - start_time:.1f}s)")
+        return 0
+    finally:
+        pool.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
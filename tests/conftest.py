@@ -0,0 +1,40 @@
+"""Shared fixtures for the script tests; everything runs on the fake database driver"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / 'scripts'
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import healthcare_db  # noqa: E402
+
+
+def load_script(name: str):
+    """Import a hyphenated script such as reminder-worker.py as a module"""
+    module_name = name.replace('-', '_')
+    spec = importlib.util.spec_from_file_location(module_name, SCRIPTS_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(autouse=True)
+def fake_database(monkeypatch):
+    monkeypatch.setenv('HEALTHCARE_DB_DRIVER', 'fake')
+    monkeypatch.setenv('DB_USERNAME', 'healthcare')
+    monkeypatch.setenv('DB_PASSWORD', 'password')
+    monkeypatch.setenv('DB_CONNECTION_STRING', 'localhost:1521/XE')
+
+
+@pytest.fixture
+def driver():
+    return healthcare_db.FakeDriver()
+
+
+@pytest.fixture
+def config():
+    return {'database': {'connection_string': 'localhost:1521/XE',
+                         'username': 'healthcare', 'password': 'password'}}
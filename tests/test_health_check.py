@@ -0,0 +1,32 @@
+"""Health check outcome when the database cannot be reached"""
+
+import pytest
+
+from conftest import load_script
+
+DB_CHECKS = ('database_connectivity', 'clinical_trials_module', 'performance_metrics')
+
+
+@pytest.fixture
+def health_check():
+    return load_script('health-check')
+
+
+def test_missing_driver_is_unhealthy(health_check, monkeypatch):
+    monkeypatch.setattr(health_check, 'get_driver', lambda: None)
+
+    results = health_check.evaluate_checks({}, {}, 500)
+    report = health_check.build_health_report(results, 'dev')
+
+    assert all(results[check] is False for check in DB_CHECKS)
+    assert report['overall_status'] == 'UNHEALTHY'
+
+
+def test_no_pool_is_unhealthy(health_check):
+    # main() builds no database probes when create_pool fails, e.g. without DB_PASSWORD
+    probes = health_check.build_probes({}, include_db=False)
+
+    results = health_check.evaluate_checks({}, health_check.run_probes(None, probes, 1, 1.0, 1), 500)
+
+    assert all(results[check] is False for check in DB_CHECKS)
+    assert health_check.build_health_report(results, 'dev')['overall_status'] == 'UNHEALTHY'
@@ -0,0 +1,109 @@
+"""SessionPool behaviour on the fake driver"""
+
+import threading
+
+import pytest
+
+import healthcare_db
+
+
+def test_get_driver_honours_fake_setting():
+    assert isinstance(healthcare_db.get_driver(), healthcare_db.FakeDriver)
+
+
+def test_create_pool_uses_selected_driver(config):
+    pool = healthcare_db.create_pool(config)
+    assert isinstance(pool.driver, healthcare_db.FakeDriver)
+    assert pool.ping() >= 0
+    pool.close()
+
+
+def test_missing_credentials_raise_database_unavailable(monkeypatch):
+    for name in ('DB_USERNAME', 'DB_PASSWORD', 'DB_CONNECTION_STRING'):
+        monkeypatch.delenv(name)
+    with pytest.raises(healthcare_db.DatabaseUnavailable):
+        healthcare_db.create_pool({'database': {}})
+
+
+def test_pool_settings_from_config_and_overrides(config, driver):
+    config['database']['pool'] = {'max': 8, 'stmt_cache_size': 20}
+    pool = healthcare_db.create_pool(config, driver=driver, min=2)
+    fake_pool = driver.pools[0]
+    assert (fake_pool.min, fake_pool.max, fake_pool.stmtcachesize) == (2, 8, 20)
+    assert fake_pool.wait_timeout == healthcare_db.DEFAULT_POOL_SETTINGS['wait_timeout_ms']
+    assert pool.stats() == {'opened': 2, 'busy': 0, 'min': 2, 'max': 8, 'stmt_cache_size': 20}
+
+
+def test_pool_grows_by_increment_up_to_max(config, driver):
+    pool = healthcare_db.create_pool(config, driver=driver, min=1, max=3, increment=2)
+    held = [pool.acquire() for _ in range(3)]
+    assert pool.stats()['opened'] == 3
+    assert pool.stats()['busy'] == 3
+    for connection in held:
+        pool.release(connection)
+    assert pool.stats()['busy'] == 0
+
+
+def test_acquire_times_out_when_pool_exhausted(config, driver):
+    pool = healthcare_db.create_pool(config, driver=driver, min=1, max=1, wait_timeout_ms=50)
+    held = pool.acquire()
+    with pytest.raises(healthcare_db.FakeDatabaseError, match='DPY-4005'):
+        pool.acquire()
+    pool.release(held)
+    pool.release(pool.acquire())
+
+
+def test_waiting_acquire_gets_released_connection(config, driver):
+    pool = healthcare_db.create_pool(config, driver=driver, min=1, max=1, wait_timeout_ms=2000)
+    held = pool.acquire()
+    acquired = []
+
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+    waiter.start()
+    pool.release(held)
+    waiter.join(timeout=5)
+
+    assert acquired == [held]
+
+
+def test_connection_rolls_back_and_releases_on_error(config, driver):
+    pool = healthcare_db.create_pool(config, driver=driver, min=1, max=1)
+    with pytest.raises(RuntimeError):
+        with pool.connection() as connection:
+            connection.cursor().execute("UPDATE patients SET is_active = 'N'")
+            raise RuntimeError("failed mid-transaction")
+
+    assert connection.rollbacks == 1
+    assert connection.commits == 0
+    assert pool.stats()['busy'] == 0
+
+
+def test_connection_released_without_rollback_on_success(config, driver):
+    pool = healthcare_db.create_pool(config, driver=driver, min=1, max=1)
+    with pool.connection() as connection:
+        connection.commit()
+    assert (connection.commits, connection.rollbacks) == (1, 0)
+    assert pool.stats()['busy'] == 0
+
+
+def test_query_returns_registered_rows(config, driver):
+    driver.add_result('FROM patients', [(1, 'Smith'), (2, 'Jones')])
+    pool = healthcare_db.create_pool(config, driver=driver)
+    assert pool.query("SELECT patient_id, last_name FROM patients") == [(1, 'Smith'), (2, 'Jones')]
+
+
+def test_statement_cache_hits_repeated_statements(config, driver):
+    pool = healthcare_db.create_pool(config, driver=driver, min=1, max=1, stmt_cache_size=2)
+    for _ in range(3):
+        pool.query("SELECT 1 FROM dual")
+    assert (driver.cache_misses, driver.cache_hits) == (1, 2)
+
+
+def test_statement_cache_evicts_least_recently_used(config, driver):
+    pool = healthcare_db.create_pool(config, driver=driver, min=1, max=1, stmt_cache_size=2)
+    for sql in ("SELECT 1 FROM dual", "SELECT 2 FROM dual", "SELECT 3 FROM dual", "SELECT 1 FROM dual"):
+        pool.query(sql)
+    assert (driver.cache_misses, driver.cache_hits) == (4, 0)
+
+    pool.query("SELECT 3 FROM dual")
+    assert driver.cache_hits == 1
@@ -0,0 +1,91 @@
+"""Benchmark statistics, baseline comparison and logical-read accounting"""
+
+import pytest
+
+import healthcare_db
+import healthcare_perf
+from healthcare_perf import BenchmarkCase, compare_to_baseline, percentile, summarize_latencies
+
+
+def results(**benchmarks):
+    return {'benchmarks': benchmarks}
+
+
+def test_percentile_interpolates_between_ranks():
+    values = [40.0, 10.0, 30.0, 20.0]
+
+    assert percentile(values, 0) == 10.0
+    assert percentile(values, 50) == 25.0
+    assert percentile(values, 100) == 40.0
+    assert percentile(values, 95) == pytest.approx(38.5)
+
+
+def test_percentile_of_single_and_no_values():
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([], 50) is None
+
+
+def test_summarize_latencies_reports_milliseconds():
+    summary = summarize_latencies([0.001, 0.002, 0.003, 0.004])
+
+    assert summary['count'] == 4
+    assert summary['min_ms'] == 1.0
+    assert summary['mean_ms'] == 2.5
+    assert summary['p50_ms'] == 2.5
+    assert summary['max_ms'] == 4.0
+
+
+def test_summarize_no_latencies():
+    summary = summarize_latencies([])
+
+    assert summary['count'] == 0
+    assert all(value is None for key, value in summary.items() if key != 'count')
+
+
+def test_compare_to_baseline_flags_growth_over_threshold():
+    baseline = results(search={'p95_ms': 10.0, 'logical_reads_per_call': 100.0})
+    current = results(search={'p95_ms': 13.0, 'logical_reads_per_call': 110.0})
+
+    regressions = compare_to_baseline(current, baseline, threshold_pct=20.0)
+
+    assert regressions == [{'benchmark': 'search', 'metric': 'p95_ms', 'baseline': 10.0,
+                            'current': 13.0, 'change_pct': 30.0}]
+
+
+def test_compare_to_baseline_ignores_noise_and_missing_values():
+    baseline = results(fast={'p95_ms': 0.5}, reads={'logical_reads_per_call': 0},
+                       unknown={'p95_ms': None})
+    current = results(fast={'p95_ms': 1.2}, reads={'logical_reads_per_call': 50.0},
+                      unknown={'p95_ms': 5.0}, new={'p95_ms': 5.0})
+
+    # 0.5 -> 1.2 ms is +140% but below MIN_REGRESSION_MS in absolute terms
+    assert compare_to_baseline(current, baseline) == []
+
+
+def test_logical_reads_exclude_the_probe(config, driver, monkeypatch):
+    session = {'reads': 0}
+
+    def read_logical_reads(connection):
+        # Each v$mystat probe costs 3 reads before its value is taken
+        session['reads'] += 3
+        return session['reads']
+
+    def call(cursor, args):
+        session['reads'] += 10
+
+    monkeypatch.setattr(healthcare_perf, '_read_logical_reads', read_logical_reads)
+    pool = healthcare_db.create_pool(config, driver=driver, min=1, max=1)
+    case = BenchmarkCase('probe', lambda connection, count: [{}], call)
+
+    result = healthcare_perf.run_case(pool, case, iterations=5, warmup=2)
+
+    assert result['calls'] == 5
+    assert result['logical_reads_per_call'] == 10.0
+
+
+def test_logical_reads_unavailable(config, driver, monkeypatch):
+    monkeypatch.setattr(healthcare_perf, '_read_logical_reads', lambda connection: None)
+    pool = healthcare_db.create_pool(config, driver=driver, min=1, max=1)
+    case = BenchmarkCase('probe', lambda connection, count: [{}], lambda cursor, args: None)
+
+    assert healthcare_perf.run_case(pool, case, iterations=3, warmup=0)['logical_reads_per_call'] is None
@@ -0,0 +1,48 @@
+"""SchemaDeployer behaviour on the fake driver"""
+
+import pytest
+
+import healthcare_db
+from healthcare_schema import HISTORY_TABLE, DeploymentError, SchemaDeployer, load_plan
+
+PACKAGE_SCRIPT = """
+CREATE OR REPLACE PACKAGE pkg_demo AS
+    PROCEDURE run;
+END pkg_demo;
+/
+"""
+
+
+@pytest.fixture
+def plan(tmp_path):
+    script = tmp_path / 'install.sql'
+    script.write_text(PACKAGE_SCRIPT)
+    return load_plan(script, tmp_path)
+
+
+def history_writes(driver):
+    return [sql for sql in driver.statements if f"MERGE INTO {HISTORY_TABLE}".upper() in sql.upper()]
+
+
+def test_clean_compile_is_recorded(config, driver, plan):
+    driver.add_result('FROM user_errors', [])
+    pool = healthcare_db.create_pool(config, driver=driver, min=1, max=1)
+
+    summary = SchemaDeployer(pool, workers=1).run(plan)
+
+    assert summary['executed'] == 1
+    assert len(history_writes(driver)) == 1
+
+
+def test_compile_error_fails_deploy_and_leaves_ledger_unchanged(config, driver, plan):
+    driver.add_result('FROM user_errors', [(2, 15, 'PLS-00201: identifier RUN must be declared')])
+    pool = healthcare_db.create_pool(config, driver=driver, min=1, max=1)
+    deployer = SchemaDeployer(pool, workers=1)
+
+    with pytest.raises(DeploymentError, match='PLS-00201') as failure:
+        deployer.run(plan)
+
+    assert failure.value.statement.object_name == 'PKG_DEMO'
+    assert 'line 2, col 15' in str(failure.value)
+    assert history_writes(driver) == []
+    assert deployer.results['executed'] == []
@@ -0,0 +1,103 @@
+"""reminder-worker.py: claim, send and record reminders on the fake driver with the log sender"""
+
+import pytest
+
+import healthcare_db
+from healthcare_outbound import LogSender
+from conftest import load_script
+
+reminder_worker = load_script('reminder-worker')
+
+
+def reminder(reminder_id, email, attempt_count=0, reminder_type='EMAIL', phone=None):
+    return (reminder_id, 1000 + reminder_id, reminder_type, email, phone,
+            f"Reminder {reminder_id}", attempt_count)
+
+
+def updates(connection):
+    return [params for sql, params in connection.executed if 'UPDATE APPOINTMENT_REMINDERS' in sql.upper()]
+
+
+@pytest.fixture
+def pool(config, driver):
+    pool = healthcare_db.create_pool(config, driver=driver, min=1, max=1)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def connection(pool):
+    # min=max=1, so the worker uses this same connection
+    connection = pool.acquire()
+    pool.release(connection)
+    return connection
+
+
+def run_worker(pool, driver, rows, sender, **kwargs):
+    driver.add_result('FROM appointment_reminders', rows)
+    worker = reminder_worker.ReminderWorker(pool, sender, batch_size=100, **kwargs)
+    worker.run()
+    return worker
+
+
+def test_claims_pending_reminders_without_waiting_on_locked_rows(pool, driver, connection):
+    run_worker(pool, driver, [], LogSender({'quiet': True}))
+    claim_sql, params = connection.executed[0]
+    assert 'FOR UPDATE SKIP LOCKED' in claim_sql
+    assert params == {'after_id': 0}
+    assert connection.rollbacks == 1
+
+
+def test_sent_reminders_are_marked_sent_in_one_commit(pool, driver, connection):
+    sender = LogSender({'quiet': True})
+    worker = run_worker(pool, driver, [reminder(1, 'a@example.com'), reminder(2, 'b@example.com')], sender)
+
+    assert [m.recipient for m in sender.sent] == ['a@example.com', 'b@example.com']
+    assert [m.reference for m in sender.sent] == ['appointment:1001', 'appointment:1002']
+    assert [u['status'] for u in updates(connection)] == ['SENT', 'SENT']
+    assert all(u['sent_date'] is not None and u['last_error'] is None for u in updates(connection))
+    assert connection.commits == 1
+    assert worker.totals == {'sent': 2, 'retry': 0, 'failed': 0, 'batches': 1}
+
+
+def test_failed_delivery_is_retried_until_attempts_run_out(pool, driver, connection):
+    sender = LogSender({'quiet': True}, fail_recipients=['down@example.com'])
+    worker = run_worker(pool, driver, [reminder(1, 'down@example.com', attempt_count=0),
+                                       reminder(2, 'down@example.com', attempt_count=2),
+                                       reminder(3, 'ok@example.com')], sender, max_attempts=3)
+
+    statuses = {u['reminder_id']: u['status'] for u in updates(connection)}
+    assert statuses == {1: 'PENDING', 2: 'FAILED', 3: 'SENT'}
+    assert 'refused' in updates(connection)[0]['last_error']
+    assert worker.totals['retry'] == 1 and worker.totals['failed'] == 1 and worker.totals['sent'] == 1
+
+
+def test_permanent_errors_fail_on_first_attempt(pool, driver, connection):
+    worker = run_worker(pool, driver, [reminder(1, None, reminder_type='SMS')], LogSender({'quiet': True}))
+    assert updates(connection)[0]['status'] == 'FAILED'
+    assert worker.totals['failed'] == 1
+
+
+def test_unexpected_sender_error_is_recorded_per_message(pool, driver, connection):
+    class BrokenSender(LogSender):
+        def send(self, message):
+            if message.recipient == 'bug@example.com':
+                raise KeyError('template')
+            super().send(message)
+
+    sender = BrokenSender({'quiet': True})
+    worker = run_worker(pool, driver, [reminder(1, 'a@example.com'), reminder(2, 'bug@example.com'),
+                                       reminder(3, 'c@example.com')], sender)
+
+    # The batch is still committed, so reminders already sent are not sent again
+    statuses = {u['reminder_id']: u['status'] for u in updates(connection)}
+    assert statuses == {1: 'SENT', 2: 'PENDING', 3: 'SENT'}
+    assert updates(connection)[1]['last_error'].startswith('KeyError')
+    assert (connection.commits, connection.rollbacks) == (1, 0)
+    assert worker.totals['retry'] == 1
+
+
+def test_batches_page_by_reminder_id(pool, driver, connection):
+    driver.add_result('FROM appointment_reminders', [reminder(5, 'a@example.com'), reminder(9, 'b@example.com')])
+    worker = reminder_worker.ReminderWorker(pool, LogSender({'quiet': True}), batch_size=2)
+    assert worker.send_batch(after_id=0) == (2, 9)